@@ -0,0 +1,39 @@
+"""add_email_log_shard_key
+
+Revision ID: 3c5e7a9b1d2f
+Revises: 2f4a1b2c3d45, b1c3d5e7f9a1, b9c0d1e2f3a4
+Create Date: 2026-10-19 00:00:00.000000
+"""
+import zlib
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "3c5e7a9b1d2f"
+down_revision = ("2f4a1b2c3d45", "b1c3d5e7f9a1", "b9c0d1e2f3a4")
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column("email_logs", sa.Column("shard_key", sa.Integer(), nullable=True))
+    op.create_index("ix_email_logs_shard_key", "email_logs", ["shard_key"])
+
+    # crc32 is not portable SQL, so backfill from Python in batches.
+    bind = op.get_bind()
+    logs = sa.table("email_logs", sa.column("id", sa.String()), sa.column("lead_id", sa.String()), sa.column("shard_key", sa.Integer()))
+    while True:
+        rows = bind.execute(sa.select(logs.c.id, logs.c.lead_id).where(logs.c.shard_key.is_(None)).limit(1000)).all()
+        if not rows:
+            break
+        bind.execute(
+            logs.update().where(logs.c.id == sa.bindparam("log_id")).values(shard_key=sa.bindparam("key")),
+            [{"log_id": row.id, "key": zlib.crc32(row.lead_id.encode("utf-8")) & 0x7FFFFFFF} for row in rows],
+        )
+
+
+def downgrade():
+    op.drop_index("ix_email_logs_shard_key", table_name="email_logs")
+    op.drop_column("email_logs", "shard_key")
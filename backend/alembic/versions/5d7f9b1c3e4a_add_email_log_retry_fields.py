@@ -0,0 +1,30 @@
+"""add_email_log_retry_fields
+
+Revision ID: 5d7f9b1c3e4a
+Revises: 3c5e7a9b1d2f
+Create Date: 2026-10-19 00:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "5d7f9b1c3e4a"
+down_revision = "3c5e7a9b1d2f"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column("email_logs", sa.Column("attempt_count", sa.Integer(), nullable=False, server_default="0"))
+    op.add_column("email_logs", sa.Column("next_attempt_at", sa.DateTime(), nullable=True))
+    op.add_column("email_logs", sa.Column("last_error_class", sa.String(), nullable=True))
+    op.execute("UPDATE email_logs SET next_attempt_at = scheduled_at WHERE next_attempt_at IS NULL")
+    op.create_index("ix_email_logs_status_next_attempt_at", "email_logs", ["status", "next_attempt_at"])
+
+
+def downgrade():
+    op.drop_index("ix_email_logs_status_next_attempt_at", table_name="email_logs")
+    op.drop_column("email_logs", "last_error_class")
+    op.drop_column("email_logs", "next_attempt_at")
+    op.drop_column("email_logs", "attempt_count")
@@ -0,0 +1,73 @@
+"""add_email_logs_archive
+
+Revision ID: 7e9a1c3d5f6b
+Revises: 5d7f9b1c3e4a
+Create Date: 2026-10-19 00:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "7e9a1c3d5f6b"
+down_revision = "5d7f9b1c3e4a"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index("ix_email_logs_status_created_at", "email_logs", ["status", "created_at"])
+
+    if op.get_bind().dialect.name == "postgresql":
+        # Monthly range partitions on created_at are created on demand by the archive job,
+        # so old months can be dropped wholesale by `purge-email-archive`.
+        op.execute(
+            """
+            CREATE TABLE email_logs_archive (
+                id VARCHAR NOT NULL,
+                lead_id VARCHAR NOT NULL,
+                sequence_id VARCHAR,
+                step_id VARCHAR,
+                subject VARCHAR NOT NULL,
+                body VARCHAR,
+                body_compressed BYTEA,
+                status VARCHAR NOT NULL,
+                provider_message_id VARCHAR,
+                error_message VARCHAR,
+                scheduled_at TIMESTAMP WITHOUT TIME ZONE,
+                sent_at TIMESTAMP WITHOUT TIME ZONE,
+                attempt_count INTEGER NOT NULL DEFAULT 0,
+                last_error_class VARCHAR,
+                created_at TIMESTAMP WITH TIME ZONE NOT NULL,
+                archived_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+                PRIMARY KEY (id, created_at)
+            ) PARTITION BY RANGE (created_at)
+            """
+        )
+    else:
+        op.create_table(
+            "email_logs_archive",
+            sa.Column("id", sa.String(), primary_key=True),
+            sa.Column("lead_id", sa.String(), nullable=False),
+            sa.Column("sequence_id", sa.String(), nullable=True),
+            sa.Column("step_id", sa.String(), nullable=True),
+            sa.Column("subject", sa.String(), nullable=False),
+            sa.Column("body", sa.String(), nullable=True),
+            sa.Column("body_compressed", sa.LargeBinary(), nullable=True),
+            sa.Column("status", sa.String(), nullable=False),
+            sa.Column("provider_message_id", sa.String(), nullable=True),
+            sa.Column("error_message", sa.String(), nullable=True),
+            sa.Column("scheduled_at", sa.DateTime(), nullable=True),
+            sa.Column("sent_at", sa.DateTime(), nullable=True),
+            sa.Column("attempt_count", sa.Integer(), nullable=False, server_default="0"),
+            sa.Column("last_error_class", sa.String(), nullable=True),
+            sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+            sa.Column("archived_at", sa.DateTime(), nullable=False),
+        )
+    op.create_index("ix_email_logs_archive_lead_id", "email_logs_archive", ["lead_id"])
+
+
+def downgrade():
+    op.drop_index("ix_email_logs_archive_lead_id", table_name="email_logs_archive")
+    op.drop_table("email_logs_archive")
+    op.drop_index("ix_email_logs_status_created_at", table_name="email_logs")
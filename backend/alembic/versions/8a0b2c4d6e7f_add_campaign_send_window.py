@@ -0,0 +1,23 @@
+"""add_campaign_send_window
+
+Revision ID: 8a0b2c4d6e7f
+Revises: 7e9a1c3d5f6b
+Create Date: 2026-10-19 00:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "8a0b2c4d6e7f"
+down_revision = "7e9a1c3d5f6b"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column("campaigns", sa.Column("send_window", sa.String(), nullable=True))
+
+
+def downgrade():
+    op.drop_column("campaigns", "send_window")
@@ -0,0 +1,28 @@
+"""add_landing_page_rendered_html
+
+Revision ID: 9b1c3d5e7f0a
+Revises: 8a0b2c4d6e7f
+Create Date: 2026-10-19 00:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "9b1c3d5e7f0a"
+down_revision = "8a0b2c4d6e7f"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Filled by `python -m app.cli backfill-landing-html` (or the API's startup re-render).
+    op.add_column("landing_pages", sa.Column("rendered_html", sa.Text(), nullable=True))
+    op.add_column("landing_pages", sa.Column("content_version", sa.String(), nullable=True))
+    op.add_column("landing_pages", sa.Column("render_version", sa.Integer(), nullable=True))
+
+
+def downgrade():
+    op.drop_column("landing_pages", "render_version")
+    op.drop_column("landing_pages", "content_version")
+    op.drop_column("landing_pages", "rendered_html")
@@ -0,0 +1,56 @@
+"""add_lead_email_unique_index
+
+Revision ID: a2c4e6f8b0d1
+Revises: 9b1c3d5e7f0a
+Create Date: 2026-10-19 00:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "a2c4e6f8b0d1"
+down_revision = "9b1c3d5e7f0a"
+branch_labels = None
+depends_on = None
+
+
+def _duplicate_leads(conn) -> list[dict]:
+    """(duplicate, kept) lead id pairs: the earliest lead per (landing page, lower(email)) is kept."""
+    rows = conn.execute(
+        sa.text(
+            "SELECT id, landing_page_id, lower(email) AS email_key FROM leads "
+            "WHERE landing_page_id IS NOT NULL "
+            "ORDER BY landing_page_id, lower(email), created_at, id"
+        )
+    )
+    pairs = []
+    group = None
+    keep = None
+    for lead_id, landing_page_id, email_key in rows:
+        if (landing_page_id, email_key) != group:
+            group, keep = (landing_page_id, email_key), lead_id
+        else:
+            pairs.append({"dup": lead_id, "keep": keep})
+    return pairs
+
+
+def upgrade():
+    conn = op.get_bind()
+    pairs = _duplicate_leads(conn)
+    if pairs:
+        # Unsent copies of the nurture sequence go; delivered history moves to the kept lead.
+        conn.execute(sa.text("DELETE FROM email_logs WHERE lead_id = :dup AND status = 'queued'"), pairs)
+        conn.execute(sa.text("UPDATE email_logs SET lead_id = :keep WHERE lead_id = :dup"), pairs)
+        conn.execute(sa.text("UPDATE email_logs_archive SET lead_id = :keep WHERE lead_id = :dup"), pairs)
+        conn.execute(sa.text("DELETE FROM leads WHERE id = :dup"), pairs)
+    op.create_index(
+        "uq_leads_landing_page_id_email",
+        "leads",
+        ["landing_page_id", sa.text("lower(email)")],
+        unique=True,
+    )
+
+
+def downgrade():
+    op.drop_index("uq_leads_landing_page_id_email", table_name="leads")
@@ -0,0 +1,58 @@
+"""add_landing_page_variants
+
+Revision ID: c4e6a8b0d2f3
+Revises: a2c4e6f8b0d1
+Create Date: 2026-10-19 00:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "c4e6a8b0d2f3"
+down_revision = "a2c4e6f8b0d1"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "landing_page_variants",
+        sa.Column("id", sa.String(), primary_key=True),
+        sa.Column("landing_page_id", sa.String(), sa.ForeignKey("landing_pages.id"), nullable=False),
+        sa.Column("key", sa.String(), nullable=False),
+        sa.Column("weight", sa.Float(), nullable=False, server_default="1"),
+        sa.Column("headline", sa.String(), nullable=True),
+        sa.Column("subheadline", sa.String(), nullable=True),
+        sa.Column("cta", sa.String(), nullable=True),
+        sa.Column("html_content", sa.String(), nullable=False),
+        sa.Column("rendered_html", sa.Text(), nullable=True),
+        sa.Column("content_version", sa.String(), nullable=True),
+        sa.Column("render_version", sa.Integer(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_index("ix_landing_page_variants_id", "landing_page_variants", ["id"])
+    op.create_index("ix_landing_page_variants_landing_page_id", "landing_page_variants", ["landing_page_id"])
+    op.create_index(
+        "uq_landing_page_variants_landing_page_id_key",
+        "landing_page_variants",
+        ["landing_page_id", "key"],
+        unique=True,
+    )
+    op.create_table(
+        "landing_variant_stats",
+        sa.Column("landing_page_id", sa.String(), sa.ForeignKey("landing_pages.id"), primary_key=True),
+        sa.Column("variant", sa.String(), primary_key=True),
+        sa.Column("leads", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+    )
+    op.add_column("leads", sa.Column("variant", sa.String(), nullable=True))
+
+
+def downgrade():
+    op.drop_column("leads", "variant")
+    op.drop_table("landing_variant_stats")
+    op.drop_index("uq_landing_page_variants_landing_page_id_key", table_name="landing_page_variants")
+    op.drop_index("ix_landing_page_variants_landing_page_id", table_name="landing_page_variants")
+    op.drop_index("ix_landing_page_variants_id", table_name="landing_page_variants")
+    op.drop_table("landing_page_variants")
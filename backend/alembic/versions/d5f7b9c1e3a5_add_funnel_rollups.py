@@ -0,0 +1,37 @@
+"""add_funnel_rollups
+
+Revision ID: d5f7b9c1e3a5
+Revises: c4e6a8b0d2f3
+Create Date: 2026-10-19 00:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "d5f7b9c1e3a5"
+down_revision = "c4e6a8b0d2f3"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Empty until `python -m app.cli rebuild-funnel-rollups` runs; writers keep it current afterwards.
+    op.create_table(
+        "funnel_rollups",
+        sa.Column("campaign_id", sa.String(), primary_key=True),
+        sa.Column("landing_page_id", sa.String(), primary_key=True),
+        sa.Column("day", sa.Date(), primary_key=True),
+        sa.Column("leads", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("emails_queued", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("emails_sent", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("emails_failed", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("emails_dead", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+    )
+    op.create_index("ix_funnel_rollups_landing_page_id_day", "funnel_rollups", ["landing_page_id", "day"])
+
+
+def downgrade():
+    op.drop_index("ix_funnel_rollups_landing_page_id_day", table_name="funnel_rollups")
+    op.drop_table("funnel_rollups")
@@ -0,0 +1,42 @@
+"""backfill_lead_campaign_id
+
+Revision ID: e6a8c0d2f4b6
+Revises: d5f7b9c1e3a5
+Create Date: 2026-10-19 00:00:00.000000
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "e6a8c0d2f4b6"
+down_revision = "d5f7b9c1e3a5"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Leads captured before campaign_id was stamped carry only their lead magnet / landing page;
+    # without this the funnel writers file their emails under an empty campaign.
+    op.execute(
+        """
+        UPDATE leads SET campaign_id = (
+            SELECT lead_magnets.campaign_id FROM lead_magnets WHERE lead_magnets.id = leads.lead_magnet_id
+        )
+        WHERE campaign_id IS NULL AND lead_magnet_id IS NOT NULL
+        """
+    )
+    op.execute(
+        """
+        UPDATE leads SET campaign_id = (
+            SELECT lead_magnets.campaign_id FROM landing_pages
+            JOIN lead_magnets ON lead_magnets.id = landing_pages.lead_magnet_id
+            WHERE landing_pages.id = leads.landing_page_id
+        )
+        WHERE campaign_id IS NULL AND landing_page_id IS NOT NULL
+        """
+    )
+
+
+def downgrade():
+    # The backfilled ids are indistinguishable from captured ones; leave them.
+    pass
@@ -13,6 +13,10 @@ from app.api.routes.email_logs import router as email_logs_router
 from app.api.routes.nurture_sequences import router as nurture_sequences_router
 from app.api.routes.social import router as social_router
 from app.api.routes.auth import router as auth_router
+from app.api.routes.metrics import router as metrics_router
+from app.api.routes.exports import router as exports_router
+from app.api.routes.landing_variants import router as landing_variants_router
+from app.api.routes.analytics import router as analytics_router
 
 api_router = APIRouter()
 
@@ -31,3 +35,7 @@ api_router.include_router(public_router, prefix="/public", tags=["public"])
 api_router.include_router(public_router, prefix="/api/public", tags=["public"])
 api_router.include_router(social_router, prefix="/api/social", tags=["social"])
 api_router.include_router(auth_router, prefix="/api/auth", tags=["auth"])
+api_router.include_router(metrics_router, prefix="/api/metrics", tags=["metrics"])
+api_router.include_router(exports_router, prefix="/api/exports", tags=["exports"])
+api_router.include_router(landing_variants_router, prefix="/api/landing-pages", tags=["landing-pages"])
+api_router.include_router(analytics_router, prefix="/api/analytics", tags=["analytics"])
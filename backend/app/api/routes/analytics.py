@@ -0,0 +1,22 @@
+from datetime import date
+from typing import Literal, Optional
+from fastapi import APIRouter, Depends
+from sqlmodel import Session
+from app.core.responses import ok
+from app.db.session import get_session
+from app.services.funnel import funnel_report
+
+router = APIRouter()
+
+
+@router.get("/funnel", response_model=None)
+def get_funnel(
+    campaign_id: Optional[str] = None,
+    landing_page_id: Optional[str] = None,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    group_by: Literal["day", "campaign", "landing_page"] = "day",
+    session: Session = Depends(get_session),
+):
+    """Leads and email outcomes from funnel_rollups only (no scan of leads or email_logs)."""
+    return ok(funnel_report(session, campaign_id, landing_page_id, start, end, group_by))
@@ -2,7 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlmodel import Session
 
 from app.core.responses import ok
-from app.db.session import get_session
+from app.db.session import get_session, run_db
 from app.models.schemas import AuthResponse, UserCreate, UserLogin, UserPublic
 from app.models.db import User as UserDB
 from app.services.auth import create_access_token, get_current_user, get_user_by_email, hash_password, verify_password
@@ -10,8 +10,7 @@ from app.services.auth import create_access_token, get_current_user, get_user_by
 router = APIRouter()
 
 
-@router.post("/signup", response_model=None)
-async def signup(payload: UserCreate, session: Session = Depends(get_session)):
+def _create_user(session: Session, payload: UserCreate) -> UserDB:
     existing = get_user_by_email(session, payload.email)
     if existing:
         raise HTTPException(status_code=400, detail="Email already registered")
@@ -25,6 +24,23 @@ async def signup(payload: UserCreate, session: Session = Depends(get_session)):
     session.add(user)
     session.commit()
     session.refresh(user)
+    return user
+
+
+def _authenticate(session: Session, payload: UserLogin) -> UserDB:
+    user = get_user_by_email(session, payload.email)
+    if not user or not user.hashed_password:
+        raise HTTPException(status_code=401, detail="Invalid credentials")
+
+    if not verify_password(payload.password, user.hashed_password):
+        raise HTTPException(status_code=401, detail="Invalid credentials")
+    return user
+
+
+@router.post("/signup", response_model=None)
+async def signup(payload: UserCreate, session: Session = Depends(get_session)):
+    # DB lookups and bcrypt hashing block; keep them off the event loop.
+    user = await run_db(_create_user, session, payload)
 
     token = create_access_token(user.id)
     return ok({
@@ -39,12 +55,7 @@ async def signup(payload: UserCreate, session: Session = Depends(get_session)):
 
 @router.post("/login", response_model=None)
 async def login(payload: UserLogin, session: Session = Depends(get_session)):
-    user = get_user_by_email(session, payload.email)
-    if not user or not user.hashed_password:
-        raise HTTPException(status_code=401, detail="Invalid credentials")
-
-    if not verify_password(payload.password, user.hashed_password):
-        raise HTTPException(status_code=401, detail="Invalid credentials")
+    user = await run_db(_authenticate, session, payload)
 
     token = create_access_token(user.id)
     return ok({
@@ -2,11 +2,22 @@ from fastapi import APIRouter, Depends
 from sqlmodel import Session
 from app.core.responses import ok
 from app.db.session import get_session
+from app.models.schemas import EmailLogRequeue
 from app.services import email_logs
 
 router = APIRouter()
 
 
 @router.get("", response_model=None)
-def list_logs(lead_id: str | None = None, campaign_id: str | None = None, session: Session = Depends(get_session)):
-    return ok(email_logs.list_logs(session, lead_id=lead_id, campaign_id=campaign_id))
\ No newline at end of file
+def list_logs(
+    lead_id: str | None = None,
+    campaign_id: str | None = None,
+    status: str | None = None,
+    session: Session = Depends(get_session),
+):
+    return ok(email_logs.list_logs(session, lead_id=lead_id, campaign_id=campaign_id, status=status))
+
+
+@router.post("/requeue-dead", response_model=None)
+def requeue_dead(payload: EmailLogRequeue, session: Session = Depends(get_session)):
+    return ok({"requeued": email_logs.requeue_dead(session, ids=payload.ids, lead_id=payload.lead_id)})
@@ -0,0 +1,62 @@
+from datetime import date, datetime
+from typing import Literal
+from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
+from sqlmodel import Session
+from app.core.responses import ok
+from app.db.session import get_session
+from app.services.data_export import MEDIA_TYPES, export_rows
+from app.services.static_export import export_static
+
+router = APIRouter()
+
+
+@router.post("/static", response_model=None)
+def export_static_site(full: bool = False):
+    """Re-export published landing/thank-you pages to STATIC_EXPORT_DIR (incremental unless `full`)."""
+    return ok(export_static(full=full))
+
+
+def _stream(
+    kind: str,
+    fmt: str,
+    session: Session,
+    campaign_id: str | None,
+    landing_page_id: str | None,
+    start: date | None,
+    end: date | None,
+) -> StreamingResponse:
+    # The rows are read on a connection of their own once the response starts streaming.
+    chunks = export_rows(session.get_bind(), kind, fmt, campaign_id, landing_page_id, start, end)
+    filename = f"{kind}-{datetime.utcnow():%Y%m%d}.{fmt}"
+    return StreamingResponse(
+        chunks,
+        media_type=MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@router.get("/leads", response_model=None)
+def export_leads(
+    format: Literal["csv", "ndjson"] = "csv",
+    campaign_id: str | None = None,
+    landing_page_id: str | None = None,
+    start: date | None = None,
+    end: date | None = None,
+    session: Session = Depends(get_session),
+):
+    """Stream leads created between `start` and `end` (inclusive) as CSV or NDJSON."""
+    return _stream("leads", format, session, campaign_id, landing_page_id, start, end)
+
+
+@router.get("/email-logs", response_model=None)
+def export_email_logs(
+    format: Literal["csv", "ndjson"] = "csv",
+    campaign_id: str | None = None,
+    landing_page_id: str | None = None,
+    start: date | None = None,
+    end: date | None = None,
+    session: Session = Depends(get_session),
+):
+    """Stream email logs (without bodies) of the matching leads, created between `start` and `end`."""
+    return _stream("email-logs", format, session, campaign_id, landing_page_id, start, end)
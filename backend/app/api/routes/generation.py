@@ -2,7 +2,7 @@ from fastapi import APIRouter, HTTPException, Depends
 from sqlmodel import Session
 from app.core.responses import ok
 from app.services import generation
-from app.db.session import get_session
+from app.db.session import get_session, run_db
 
 router = APIRouter()
 
@@ -13,7 +13,7 @@ async def ideate_campaign(campaign_id: str, session: Session = Depends(get_sessi
     from app.services.llm_service import LLMClient, ideate_lead_magnets
     from app.core.config import get_settings
     
-    project = get_project(session, campaign_id)
+    project = await run_db(get_project, session, campaign_id)
     if not project:
         raise HTTPException(status_code=404, detail="Campaign not found")
         
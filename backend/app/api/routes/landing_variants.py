@@ -0,0 +1,44 @@
+from fastapi import APIRouter, HTTPException, Depends
+from sqlmodel import Session
+from app.core.responses import ok
+from app.models.schemas import LandingVariantCreate, LandingVariantUpdate
+from app.services import landing_variants
+from app.db.session import get_session
+
+router = APIRouter()
+
+
+@router.get("/{landing_page_id}/variants", response_model=None)
+def list_variants(landing_page_id: str, session: Session = Depends(get_session)):
+    report = landing_variants.list_variants(session, landing_page_id)
+    if not report:
+        raise HTTPException(status_code=404, detail="Landing page not found")
+    return ok(report)
+
+
+@router.post("/{landing_page_id}/variants", response_model=None)
+def create_variant(landing_page_id: str, payload: LandingVariantCreate, session: Session = Depends(get_session)):
+    try:
+        variant = landing_variants.create_variant(session, landing_page_id, payload)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    if not variant:
+        raise HTTPException(status_code=404, detail="Landing page not found")
+    return ok(variant)
+
+
+@router.put("/{landing_page_id}/variants/{variant_id}", response_model=None)
+def update_variant(
+    landing_page_id: str, variant_id: str, payload: LandingVariantUpdate, session: Session = Depends(get_session)
+):
+    updated = landing_variants.update_variant(session, landing_page_id, variant_id, payload)
+    if not updated:
+        raise HTTPException(status_code=404, detail="Landing page variant not found")
+    return ok(updated)
+
+
+@router.delete("/{landing_page_id}/variants/{variant_id}", response_model=None)
+def delete_variant(landing_page_id: str, variant_id: str, session: Session = Depends(get_session)):
+    if not landing_variants.delete_variant(session, landing_page_id, variant_id):
+        raise HTTPException(status_code=404, detail="Landing page variant not found")
+    return ok({"deleted": True})
@@ -1,7 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 from app.core.responses import ok
-from app.db.session import get_session
+from app.db.session import get_async_session
 from app.models.schemas import (
     IdeationRequest,
     AssetRequest,
@@ -33,14 +33,16 @@ from app.services.llm_service import (
 router = APIRouter()
 
 
-def _client(session: Session) -> LLMClient:
-    cfg = settings_service.get_app_settings(session)
+async def _client(session: AsyncSession) -> LLMClient:
+    cfg = await session.run_sync(settings_service.get_app_settings)
+    # Hand the connection back before the (slow) provider call.
+    await session.close()
     return LLMClient(cfg)
 
 
 @router.post("/ideate", response_model=None)
-async def ideate(payload: IdeationRequest, session: Session = Depends(get_session)):
-    client = _client(session)
+async def ideate(payload: IdeationRequest, session: AsyncSession = Depends(get_async_session)):
+    client = await _client(session)
     try:
         ideas = await ideate_lead_magnets(
             client, 
@@ -61,8 +63,8 @@ async def ideate(payload: IdeationRequest, session: Session = Depends(get_sessio
 
 
 @router.post("/asset", response_model=None)
-async def asset(payload: AssetRequest, session: Session = Depends(get_session)):
-    client = _client(session)
+async def asset(payload: AssetRequest, session: AsyncSession = Depends(get_async_session)):
+    client = await _client(session)
     try:
         result = await generate_asset(
             client,
@@ -81,8 +83,8 @@ async def asset(payload: AssetRequest, session: Session = Depends(get_session)):
 
 
 @router.post("/landing-page", response_model=None)
-async def landing_page(payload: LandingPageRequest, session: Session = Depends(get_session)):
-    client = _client(session)
+async def landing_page(payload: LandingPageRequest, session: AsyncSession = Depends(get_async_session)):
+    client = await _client(session)
     try:
         result = await generate_landing_page(
             client, 
@@ -105,8 +107,8 @@ async def landing_page(payload: LandingPageRequest, session: Session = Depends(g
 
 
 @router.post("/thank-you", response_model=None)
-async def thank_you(payload: ThankYouRequest, session: Session = Depends(get_session)):
-    client = _client(session)
+async def thank_you(payload: ThankYouRequest, session: AsyncSession = Depends(get_async_session)):
+    client = await _client(session)
     try:
         result = await generate_thank_you_page(client, payload.idea)
         return ok(result)
@@ -118,8 +120,8 @@ async def thank_you(payload: ThankYouRequest, session: Session = Depends(get_ses
 
 
 @router.post("/nurture-sequence", response_model=None)
-async def nurture(payload: NurtureRequest, session: Session = Depends(get_session)):
-    client = _client(session)
+async def nurture(payload: NurtureRequest, session: AsyncSession = Depends(get_async_session)):
+    client = await _client(session)
     try:
         result = await generate_nurture_sequence(
             client,
@@ -139,8 +141,8 @@ async def nurture(payload: NurtureRequest, session: Session = Depends(get_sessio
 
 
 @router.post("/upgrade-offer", response_model=None)
-async def upgrade(payload: UpgradeOfferRequest, session: Session = Depends(get_session)):
-    client = _client(session)
+async def upgrade(payload: UpgradeOfferRequest, session: AsyncSession = Depends(get_async_session)):
+    client = await _client(session)
     try:
         result = await generate_upgrade_offer(
             client,
@@ -160,8 +162,8 @@ async def upgrade(payload: UpgradeOfferRequest, session: Session = Depends(get_s
 
 
 @router.post("/linkedin-post", response_model=None)
-async def linkedin(payload: LinkedInRequest, session: Session = Depends(get_session)):
-    client = _client(session)
+async def linkedin(payload: LinkedInRequest, session: AsyncSession = Depends(get_async_session)):
+    client = await _client(session)
     try:
         result = await generate_linkedin_post(
             client,
@@ -180,8 +182,8 @@ async def linkedin(payload: LinkedInRequest, session: Session = Depends(get_sess
 
 
 @router.post("/hero-image", response_model=None)
-async def hero_image(payload: HeroImageRequest, session: Session = Depends(get_session)):
-    client = _client(session)
+async def hero_image(payload: HeroImageRequest, session: AsyncSession = Depends(get_async_session)):
+    client = await _client(session)
     try:
         result = await generate_hero_image(
             client,
@@ -199,8 +201,8 @@ async def hero_image(payload: HeroImageRequest, session: Session = Depends(get_s
 
 
 @router.post("/persona-summary", response_model=None)
-async def persona_summary(payload: PersonaSummaryRequest, session: Session = Depends(get_session)):
-    client = _client(session)
+async def persona_summary(payload: PersonaSummaryRequest, session: AsyncSession = Depends(get_async_session)):
+    client = await _client(session)
     try:
         result = await generate_persona_summary(client, payload.icp)
         return ok(result)
@@ -212,12 +214,13 @@ async def persona_summary(payload: PersonaSummaryRequest, session: Session = Dep
 
 
 @router.post("/chat", response_model=None)
-async def chat(payload: ChatRequest, session: Session = Depends(get_session)):
+async def chat(payload: ChatRequest, session: AsyncSession = Depends(get_async_session)):
     from app.services.projects import get_project
 
-    client = _client(session)
+    client = await _client(session)
     try:
-        project = get_project(session, payload.project_id) if payload.project_id else None
+        project = await session.run_sync(get_project, payload.project_id) if payload.project_id else None
+        await session.close()
         reply = await chat_marketing_assistant(client, payload.message, project)
         return ok({"reply": reply})
     except LLMProviderError as exc:
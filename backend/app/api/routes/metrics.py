@@ -0,0 +1,10 @@
+from fastapi import APIRouter
+from app.core.metrics import metrics
+from app.core.responses import ok
+
+router = APIRouter()
+
+
+@router.get("", response_model=None)
+def get_metrics():
+    return ok(metrics.snapshot())
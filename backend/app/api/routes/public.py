@@ -1,231 +1,174 @@
-from datetime import datetime, timedelta
 import asyncio
+from datetime import datetime
+from typing import Optional
 from fastapi import APIRouter, HTTPException, Depends, Request, Form, BackgroundTasks
-from fastapi.responses import HTMLResponse, JSONResponse
-from sqlmodel import Session, select
-import bleach
-from bleach.css_sanitizer import CSSSanitizer
-from app.core.responses import ok
-from app.db.session import get_session, engine
-from app.models.db import LandingPage as LandingPageDB, EmailLog as EmailLogDB
+from fastapi.responses import HTMLResponse, JSONResponse, Response
+from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.core.http_cache import cached_response, not_modified, not_modified_response, strong_etag
+from app.core.responses import ApiResponse, ok
+from app.core.metrics import metrics
+from app.db.session import engine, get_async_session, get_session, run_db
+from app.models.db import LandingPage as LandingPageDB, LandingPageVariant as LandingPageVariantDB, EmailLog as EmailLogDB
 from app.models.schemas import LeadCreate
-from app.services.leads import create_lead, create_email_log
-from app.services.email_service import enqueue_sequence_for_lead, send_email
-
-router = APIRouter()
+from app.services.admission import admit_public
+from app.services.lead_ingest import IngestQueueFull, Submission, get_ingestor
+from app.services.leads import IMMEDIATE_SEND_WINDOW, capture_lead, find_lead
+from app.services.email_service import send_email
+from app.services.landing_render import (
+    SANITIZER_VERSION,
+    content_version,
+    landing_html,
+    stored_render,
+    variant_html,
+)
+from app.services.landing_resolver import ResolvedLanding, resolve_landing
+from app.services.landing_variants import (
+    VISITOR_COOKIE,
+    arm,
+    choose_variant,
+    split_test_response,
+    submitted_variant,
+    visitor_id,
+)
+from app.services.thank_you import ThankYouNotFound, thank_you_page
+
+# Admission control runs first: an over-limit request costs no DB or sanitizer work.
+router = APIRouter(dependencies=[Depends(admit_public)])
+
+
+def _json_response(request: Request, body: ApiResponse) -> Response:
+    return cached_response(request, body.model_dump_json(), "application/json")
+
+
+def _idempotency_key(request: Request) -> Optional[str]:
+    """Optional Idempotency-Key header: retries with the same key resolve to the same lead."""
+    key = (request.headers.get("idempotency-key") or "").strip()
+    if len(key) > 255:
+        raise HTTPException(status_code=400, detail="Idempotency-Key must be at most 255 characters")
+    return key or None
+
+
+async def _ingest(session: AsyncSession, lead_data: LeadCreate, idempotency_key: Optional[str]) -> Optional[str]:
+    """Hand the lead to the group-commit writer in queued mode; None means write it here.
+
+    A repeat submission gets the id of the lead already queued or stored, as in sync mode.
+    """
+    ingestor = get_ingestor()
+    if ingestor is None:
+        return None
+    submission = Submission.from_lead(lead_data, idempotency_key)
+    existing = ingestor.queued_id(submission)
+    if existing is None:
+        lead = await session.run_sync(find_lead, submission.id, submission.landing_page_id, submission.email)
+        existing = lead.id if lead else None
+    if existing:
+        return existing
+    try:
+        # The spool append (and fsync) stays off the event loop.
+        return await run_db(ingestor.submit, submission)
+    except IngestQueueFull:
+        return None
 
 
 def send_email_task(log_id: str) -> None:
     try:
-        with Session(engine) as task_session:
+        with Session(engine, expire_on_commit=False) as task_session:
             log = task_session.get(EmailLogDB, log_id)
             if not log:
                 return
-            asyncio.run(send_email(task_session, log))
+            # A log leased by a dispatcher pass is due later than this, so it is not sent twice.
+            asyncio.run(send_email(task_session, log, datetime.utcnow() + IMMEDIATE_SEND_WINDOW))
     except Exception:
         return
 
 
 @router.get("/landing/{slug_or_id}", response_model=None)
-def get_landing_page_json(slug_or_id: str, session: Session = Depends(get_session)):
+def get_landing_page_json(slug_or_id: str, request: Request, session: Session = Depends(get_session)):
     """API endpoint to get landing page data as JSON (for SPA)"""
-    landing = session.get(LandingPageDB, slug_or_id)
-    if not landing:
-        landing = session.exec(select(LandingPageDB).where(LandingPageDB.slug == slug_or_id)).first()
+    resolved = resolve_landing(session, slug_or_id)
+    landing = session.get(LandingPageDB, resolved.id) if resolved else None
     if not landing:
         raise HTTPException(status_code=404, detail="Landing page not found")
-    return ok(landing)
+    # The SPA renders html_content itself; the stored server render would only double the payload.
+    data = landing.model_dump(exclude={"rendered_html"})
+    if not resolved.variants:
+        return _json_response(request, ok(data))
+
+    visitor, new_visitor = visitor_id(request)
+    variant = choose_variant(resolved, visitor)
+    row = session.get(LandingPageVariantDB, variant.id) if variant else None
+    if row is None:
+        variant = None
+    else:
+        for field in ("headline", "subheadline", "cta", "html_content"):
+            if getattr(row, field) is not None:
+                data[field] = getattr(row, field)
+    # Echoed back as `_variant` on submit, so the lead is attributed to the arm that was shown.
+    data["variant"] = arm(variant)
+    metrics.inc("landing_variant_views_total", landing=resolved.slug, variant=arm(variant))
+    return split_test_response(_json_response(request, ok(data)), visitor, new_visitor)
 
 
 @router.get("/lp/{slug}", response_class=HTMLResponse)
-def get_landing_page_html(slug: str, session: Session = Depends(get_session)):
+def get_landing_page_html(slug: str, request: Request, session: Session = Depends(get_session)):
     """Public endpoint to serve server-rendered HTML"""
-    landing = session.exec(select(LandingPageDB).where(LandingPageDB.slug == slug)).first()
-    if not landing:
-        # Fallback to check ID
-        landing = session.get(LandingPageDB, slug)
-        
+    resolved = resolve_landing(session, slug)
+    if not resolved:
+        return HTMLResponse(content="<h1>404 - Page Not Found</h1>", status_code=404)
+    if resolved.variants:
+        return _split_test_page(request, session, resolved, slug)
+    return _landing_page(request, session, resolved, slug)
+
+
+def _split_test_page(request: Request, session: Session, resolved: ResolvedLanding, slug: str) -> Response:
+    """The visitor's arm of a page under test: a hash of the visitor cookie, no DB write."""
+    visitor, new_visitor = visitor_id(request)
+    variant = choose_variant(resolved, visitor)
+    response = None
+    if variant is not None:
+        etag = None
+        if variant.content_version and variant.render_version == SANITIZER_VERSION:
+            etag = strong_etag(variant.content_version)
+        if etag and not_modified(request, etag):
+            response = not_modified_response(etag, request)
+        else:
+            page = variant_html(session, resolved, variant)
+            if page is not None:
+                response = cached_response(request, page, "text/html", etag)
+    if response is None:
+        variant = None
+        response = _landing_page(request, session, resolved, slug)
+    metrics.inc("landing_variant_views_total", landing=resolved.slug, variant=arm(variant))
+    return split_test_response(response, visitor, new_visitor)
+
+
+def _landing_page(request: Request, session: Session, resolved: ResolvedLanding, slug: str) -> Response:
+    if resolved.content_version and resolved.render_version == SANITIZER_VERSION:
+        etag = strong_etag(resolved.content_version)
+        if not_modified(request, etag):
+            return not_modified_response(etag, request)
+    page = stored_render(session, resolved.id)
+    if page and page.rendered_html is not None and page.render_version == SANITIZER_VERSION:
+        return cached_response(request, page.rendered_html, "text/html", strong_etag(page.content_version))
+
+    # Not pre-rendered yet (or rendered by an older sanitizer): render live through the cache.
+    landing = session.get(LandingPageDB, resolved.id)
     if not landing:
         return HTMLResponse(content="<h1>404 - Page Not Found</h1>", status_code=404)
-        
-    # Inject simple script for form handling if not present
-    html_content = landing.html_content
-    css_sanitizer = CSSSanitizer(
-        allowed_css_properties=[
-            "color",
-            "background",
-            "background-color",
-            "font",
-            "font-size",
-            "font-weight",
-            "font-family",
-            "text-align",
-            "text-decoration",
-            "margin",
-            "margin-top",
-            "margin-right",
-            "margin-bottom",
-            "margin-left",
-            "padding",
-            "padding-top",
-            "padding-right",
-            "padding-bottom",
-            "padding-left",
-            "border",
-            "border-radius",
-            "display",
-            "width",
-            "height",
-            "max-width",
-            "min-width",
-            "max-height",
-            "min-height",
-        ]
-    )
-    allowed_tags = [
-        "html",
-        "head",
-        "body",
-        "title",
-        "meta",
-        "link",
-        "style",
-        "div",
-        "span",
-        "p",
-        "h1",
-        "h2",
-        "h3",
-        "h4",
-        "h5",
-        "h6",
-        "a",
-        "img",
-        "ul",
-        "ol",
-        "li",
-        "br",
-        "hr",
-        "strong",
-        "em",
-        "b",
-        "i",
-        "section",
-        "header",
-        "footer",
-        "main",
-        "form",
-        "input",
-        "button",
-        "label",
-        "textarea",
-        "select",
-        "option",
-        "table",
-        "thead",
-        "tbody",
-        "tr",
-        "th",
-        "td",
-    ]
-    allowed_attrs = {
-        "*": ["class", "style", "id"],
-        "a": ["href", "title", "target", "rel"],
-        "img": ["src", "alt", "title"],
-        "input": ["type", "name", "value", "placeholder", "required"],
-        "button": ["type"],
-        "form": ["action", "method"],
-        "textarea": ["name", "placeholder", "required", "rows", "cols"],
-        "select": ["name"],
-        "option": ["value"],
-        "meta": ["charset", "name", "content"],
-        "link": ["rel", "href"],
-    }
-    html_content = bleach.clean(
-        html_content,
-        tags=allowed_tags,
-        attributes=allowed_attrs,
-        protocols=["http", "https", "mailto"],
-        css_sanitizer=css_sanitizer,
-        strip=True,
-    )
 
-    # Inject brand logo/name for live display (from campaign product_context)
-    try:
-        from app.models.db import LeadMagnet as LeadMagnetDB, Campaign as CampaignDB
-
-        lead_magnet = session.get(LeadMagnetDB, landing.lead_magnet_id) if landing.lead_magnet_id else None
-        campaign = session.get(CampaignDB, lead_magnet.campaign_id) if lead_magnet else None
-        product_context = campaign.product_context or {} if campaign else {}
-        logo_url = product_context.get("logo_url") or product_context.get("logoUrl")
-        company_name = product_context.get("company_name") or product_context.get("companyName")
-
-        if logo_url:
-            name_html = f"<span style=\"font-family:Inter,system-ui,sans-serif;font-weight:600;color:#111827;\">{company_name}</span>" if company_name else ""
-            logo_html = (
-                "<div id=\"brand-nav\" style=\"display:flex;align-items:center;gap:12px;"
-                "padding:16px 24px;border-bottom:1px solid #e5e7eb;background:#ffffff;"
-                "position:sticky;top:0;z-index:10;\">"
-                f"<img src=\"{logo_url}\" alt=\"{company_name or 'Logo'}\" style=\"height:32px;width:auto;\"/>"
-                f"{name_html}"
-                "</div>"
-            )
-
-            lower = html_content.lower()
-            body_idx = lower.find("<body")
-            if body_idx != -1:
-                close_idx = html_content.find(">", body_idx)
-                if close_idx != -1:
-                    html_content = html_content[: close_idx + 1] + logo_html + html_content[close_idx + 1 :]
-                else:
-                    html_content = logo_html + html_content
-            else:
-                html_content = logo_html + html_content
-    except Exception:
-        pass
-    if "</body>" in html_content and "<script>" not in html_content:
-        script = f"""
-        <script>
-          document.addEventListener('DOMContentLoaded', function() {{
-            const forms = document.querySelectorAll('form');
-            forms.forEach(form => {{
-              form.addEventListener('submit', async (e) => {{
-                e.preventDefault();
-                const formData = new FormData(form);
-                const data = Object.fromEntries(formData.entries());
-                
-                // Add honeypot if missing from DOM
-                data._honeypot = ""; 
-                
-                try {{
-                  const res = await fetch(f'/public/lp/{slug}/submit', {{
-                    method: 'POST',
-                    headers: {{'Content-Type': 'application/json'}},
-                    body: JSON.stringify(data)
-                  }});
-                  const result = await res.json();
-                  if (result.success) {{
-                    if (result.redirect_url) {{
-                        window.location.href = result.redirect_url;
-                    }} else {{
-                        alert('Thanks! We will be in touch.');
-                        form.reset();
-                    }}
-                  }} else {{
-                    alert('Something went wrong.');
-                  }}
-                }} catch (err) {{
-                  console.error(err);
-                  alert('Error submitting form');
-                }}
-              }});
-            }});
-          }});
-        </script>
-        """
-        html_content = html_content.replace("</body>", f"{script}</body>")
-
-    return HTMLResponse(content=html_content)
+    # Brand logo/name for live display (from campaign product_context)
+    from app.models.db import Campaign as CampaignDB
+
+    campaign = session.get(CampaignDB, resolved.campaign_id) if resolved.campaign_id else None
+    product_context = campaign.product_context if campaign else None
+
+    return cached_response(
+        request,
+        landing_html(landing.id, landing.html_content, product_context, slug),
+        "text/html",
+        strong_etag(content_version(landing.html_content, product_context, slug)),
+    )
 
 
 @router.post("/lp/{slug}/submit", response_model=None)
@@ -233,7 +176,7 @@ async def submit_lead_form(
     slug: str, 
     request: Request,
     background_tasks: BackgroundTasks,
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_async_session)
 ):
     """
     Handle lead form submission from the public landing page.
@@ -250,10 +193,7 @@ async def submit_lead_form(
         return ok({"message": "Received"})
     
     # 1. Resolve Landing Page
-    landing = session.exec(select(LandingPageDB).where(LandingPageDB.slug == slug)).first()
-    if not landing:
-         landing = session.get(LandingPageDB, slug)
-    
+    landing = await session.run_sync(resolve_landing, slug)
     if not landing:
         raise HTTPException(status_code=404, detail="Landing page not found")
 
@@ -268,211 +208,54 @@ async def submit_lead_form(
     # 3. Create Lead
     # We map the dynamic form fields to the LeadCreate schema where possible
     lead_data = LeadCreate(
+        campaign_id=landing.campaign_id,
         landing_page_id=landing.id,
         lead_magnet_id=landing.lead_magnet_id,
         email=email,
         name=name,
-        company=company
+        company=company,
+        variant=submitted_variant(landing, body.get("_variant"), request.cookies.get(VISITOR_COOKIE)),
     )
+    redirect_url = f"/landing/{slug}/thank-you"
+    idempotency_key = _idempotency_key(request)
+    queued_id = await _ingest(session, lead_data, idempotency_key)
+    if queued_id:
+        return ok({"lead_id": queued_id, "message": "Success", "success": True, "redirect_url": redirect_url})
     
-    lead = create_lead(session, lead_data)
-    
-    # 4. Log Email Intent (Welcome)
-    create_email_log(session, lead.id, "Welcome", "Thanks for downloading.")
-
-    # 5. Enqueue nurture sequence and send immediate email if scheduled now
-    logs = enqueue_sequence_for_lead(session, lead)
-    now = datetime.utcnow()
-    immediate = None
-    for log in logs:
-        if log.scheduled_at and log.scheduled_at <= now + timedelta(minutes=1):
-            if not immediate or log.scheduled_at < immediate.scheduled_at:
-                immediate = log
-    if immediate:
-        background_tasks.add_task(send_email_task, immediate.id)
+    # 4. Lead, welcome email and nurture sequence in one transaction (off the event loop);
+    # a repeat submission gets the existing lead id and queues nothing.
+    captured = await session.run_sync(capture_lead, lead_data, idempotency_key)
+    if captured.immediate_log_id:
+        background_tasks.add_task(send_email_task, captured.immediate_log_id)
     
-    return ok({"lead_id": lead.id, "message": "Success", "success": True, "redirect_url": f"/landing/{slug}/thank-you"})
+    return ok({"lead_id": captured.lead_id, "message": "Success", "success": True, "redirect_url": redirect_url})
 
 
 @router.get("/lp/{slug}/thank-you", response_class=HTMLResponse)
-def get_thank_you_page(slug: str, session: Session = Depends(get_session)):
+def get_thank_you_page(slug: str, request: Request, session: Session = Depends(get_session)):
     """
     Serve the Thank You page with the Upgrade Offer.
     """
-    landing = session.exec(select(LandingPageDB).where(LandingPageDB.slug == slug)).first()
-    if not landing:
-        landing = session.get(LandingPageDB, slug)
-    
-    if not landing:
+    resolved = resolve_landing(session, slug)
+    try:
+        page = thank_you_page(session, resolved.id) if resolved else None
+    except ThankYouNotFound as exc:
+        return HTMLResponse(content=f"<h1>Error: {exc}</h1>", status_code=500)
+    if not page:
         return HTMLResponse(content="<h1>404 - Page Not Found</h1>", status_code=404)
-
-    # Get the Upgrade Offer from the Campaign
-    # LandingPage -> LeadMagnet -> Campaign
-    from app.models.db import LeadMagnet, Campaign
-    
-    # We need to manually join or fetch related objects since SQLModel relationships might not be async-loaded automatically in this simple query context if not configured
-    # But let's try direct fetching for safety
-    lead_magnet = session.get(LeadMagnet, landing.lead_magnet_id)
-    if not lead_magnet:
-        return HTMLResponse(content="<h1>Error: Lead Magnet not found</h1>", status_code=500)
-        
-    campaign = session.get(Campaign, lead_magnet.campaign_id)
-    if not campaign:
-        return HTMLResponse(content="<h1>Error: Campaign not found</h1>", status_code=500)
-        
-    upgrade = campaign.upgrade_offer or {}
-    
-    # Simple HTML Template for Thank You Page
-    html = f"""
-    <!DOCTYPE html>
-    <html lang="en">
-    <head>
-        <meta charset="UTF-8">
-        <meta name="viewport" content="width=device-width, initial-scale=1.0">
-        <title>Thank You | {landing.headline}</title>
-         <script src="https://cdn.tailwindcss.com"></script>
-         <link href="https://fonts.googleapis.com/css2?family=Inter:wght@400;600;700&display=swap" rel="stylesheet">
-         <style>
-            body {{ font-family: 'Inter', sans-serif; }}
-         </style>
-    </head>
-    <body class="bg-gray-50 min-h-screen flex flex-col">
-        
-        <main class="flex-grow flex items-center justify-center p-4">
-            <div class="max-w-3xl w-full bg-white rounded-2xl shadow-xl overflow-hidden border border-gray-100">
-                
-                <!-- Success Header -->
-                <div class="bg-green-50 p-8 text-center border-b border-green-100">
-                    <div class="w-16 h-16 bg-green-100 text-green-600 rounded-full flex items-center justify-center mx-auto mb-4">
-                        <svg xmlns="http://www.w3.org/2000/svg" class="h-8 w-8" fill="none" viewBox="0 0 24 24" stroke="currentColor">
-                          <path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M5 13l4 4L19 7" />
-                        </svg>
-                    </div>
-                    <h1 class="text-3xl font-bold text-gray-900 mb-2">Success! check your inbox.</h1>
-                    <p class="text-green-800">Your {lead_magnet.type.replace('_', ' ')} is on its way to your email.</p>
-                </div>
-
-                <!-- Upgrade Offer Section -->
-                <div class="p-8 md:p-12">
-    """
-    
-    if upgrade:
-        html += f"""
-                    <div class="text-center mb-8">
-                        <span class="inline-block px-3 py-1 bg-purple-100 text-purple-700 rounded-full text-xs font-bold tracking-wide uppercase mb-4">
-                            Limited Time Offer
-                        </span>
-                        <h2 class="text-2xl md:text-3xl font-extrabold text-gray-900 mb-4">
-                            {upgrade.get('core_offer', 'Wait! Before you go...')}
-                        </h2>
-                        <div class="flex items-end justify-center gap-3 mb-4">
-                            <span class="text-sm text-gray-400 line-through">{upgrade.get('value_anchor', '')}</span>
-                            <span class="text-3xl font-extrabold text-gray-900">{upgrade.get('price', '')}</span>
-                        </div>
-                        <p class="text-lg text-gray-600 leading-relaxed max-w-2xl mx-auto">
-                            Here is a special offer tailored to your next step.
-                        </p>
-                    </div>
-                    
-                    <div class="max-w-2xl mx-auto mb-8">
-                        <div class="bg-white border border-purple-100 rounded-xl p-4 mb-4">
-                            <div class="flex items-center gap-2 font-semibold text-purple-700 mb-2">
-                                <span>🛡️</span>
-                                <span>Guarantee</span>
-                            </div>
-                            <p class="text-gray-700">{upgrade.get('guarantee', '100% satisfaction guaranteed.')}</p>
-                        </div>
-
-                        <div class="bg-purple-50 border border-purple-100 rounded-xl p-4">
-                            <div class="text-xs font-bold text-purple-600 uppercase tracking-wider mb-3">Bonuses Included</div>
-                            <ul class="space-y-2 text-sm text-gray-700">
-                                {''.join([f"<li class='flex items-start gap-2'><span class='text-purple-500 mt-0.5'>✔</span><span>{b}</span></li>" for b in (upgrade.get('bonuses') or [])])}
-                            </ul>
-                        </div>
-                    </div>
-
-                    <div class="text-center">
-                        <a href="#" class="inline-block bg-purple-600 hover:bg-purple-700 text-white text-lg font-bold py-4 px-12 rounded-xl shadow-lg hover:shadow-xl transition transform hover:-translate-y-1">
-                            Claim Offer &rarr;
-                        </a>
-                        <p class="mt-4 text-sm text-gray-400">No thanks, I'll stick to the free guide.</p>
-                    </div>
-        """
-    else:
-        html += """
-                    <div class="text-center">
-                        <p class="text-gray-600">You can close this page now.</p>
-                    </div>
-        """
-
-    html += """
-                </div>
-            </div>
-        </main>
-        
-        <footer class="bg-gray-900 text-white py-6 text-center text-sm text-gray-500">
-            &copy; 2024 All rights reserved.
-        </footer>
-
-    </body>
-    </html>
-    """
-    
-    return HTMLResponse(content=html)
+    return cached_response(request, page.html, "text/html", strong_etag(page.version))
 
 
 @router.get("/landing/{slug}/thank-you", response_model=None)
-def get_thank_you_data(slug: str, session: Session = Depends(get_session)):
-    landing = session.exec(select(LandingPageDB).where(LandingPageDB.slug == slug)).first()
-    if not landing:
-        landing = session.get(LandingPageDB, slug)
-    if not landing:
+def get_thank_you_data(slug: str, request: Request, session: Session = Depends(get_session)):
+    resolved = resolve_landing(session, slug)
+    try:
+        page = thank_you_page(session, resolved.id) if resolved else None
+    except ThankYouNotFound as exc:
+        raise HTTPException(status_code=500, detail=str(exc))
+    if not page:
         raise HTTPException(status_code=404, detail="Landing page not found")
-
-    from app.models.db import LeadMagnet, Campaign
-
-    lead_magnet = session.get(LeadMagnet, landing.lead_magnet_id)
-    if not lead_magnet:
-        raise HTTPException(status_code=500, detail="Lead Magnet not found")
-
-    campaign = session.get(Campaign, lead_magnet.campaign_id)
-    if not campaign:
-        raise HTTPException(status_code=500, detail="Campaign not found")
-
-    upgrade = campaign.upgrade_offer or {}
-    product_context = campaign.product_context or {}
-    payload = {
-        "headline": upgrade.get("core_offer")
-        or upgrade.get("coreOffer")
-        or upgrade.get("positioning")
-        or "Wait! Before you go...",
-        "copy": upgrade.get("offerCopy")
-        or upgrade.get("offer_copy")
-        or "Here is a special offer tailored to your next step.",
-        "cta": upgrade.get("cta") or "Claim Offer",
-        "coreOffer": upgrade.get("core_offer") or upgrade.get("coreOffer"),
-        "price": upgrade.get("price"),
-        "valueAnchor": upgrade.get("value_anchor") or upgrade.get("valueAnchor"),
-        "guarantee": upgrade.get("guarantee"),
-        "bonuses": upgrade.get("bonuses", []),
-        "companyName": product_context.get("company_name")
-        or product_context.get("companyName")
-        or "GenieOps",
-        "logoUrl": product_context.get("logo_url")
-        or product_context.get("logoUrl"),
-        "primaryColor": product_context.get("primary_color")
-        or product_context.get("primaryColor")
-        or "#2563eb",
-        "fontStyle": product_context.get("font_style")
-        or product_context.get("fontStyle")
-        or "sans",
-        "backgroundStyle": getattr(landing, "background_style", "plain_white"),
-        "theme": getattr(landing, "theme", "light"),
-        "designVibe": product_context.get("design_vibe")
-        or product_context.get("designVibe"),
-    }
-
-    return ok(payload)
+    return cached_response(request, page.json, "application/json", strong_etag(page.version))
 
 
 @router.post("/landing/{slug_or_id}", response_model=None)
@@ -480,7 +263,7 @@ async def submit_lead_api(
     slug_or_id: str, 
     request: Request,
     background_tasks: BackgroundTasks,
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_async_session)
 ):
     """
     API endpoint for lead submission (matching user requirement).
@@ -495,10 +278,7 @@ async def submit_lead_api(
         return ok({"message": "Received"})
     
     # 1. Resolve Landing Page
-    landing = session.get(LandingPageDB, slug_or_id)
-    if not landing:
-         landing = session.exec(select(LandingPageDB).where(LandingPageDB.slug == slug_or_id)).first()
-    
+    landing = await session.run_sync(resolve_landing, slug_or_id)
     if not landing:
         raise HTTPException(status_code=404, detail="Landing page not found")
 
@@ -512,28 +292,24 @@ async def submit_lead_api(
 
     # 3. Create Lead
     lead_data = LeadCreate(
+        campaign_id=landing.campaign_id,
         landing_page_id=landing.id,
         lead_magnet_id=landing.lead_magnet_id,
         email=email,
         name=name,
-        company=company
+        company=company,
+        variant=submitted_variant(landing, body.get("_variant"), request.cookies.get(VISITOR_COOKIE)),
     )
+    idempotency_key = _idempotency_key(request)
+    queued_id = await _ingest(session, lead_data, idempotency_key)
+    if queued_id:
+        return ok({"lead_id": queued_id, "message": "Success"})
     
-    lead = create_lead(session, lead_data)
-    
-    # 4. Log Email Intent (Welcome)
-    create_email_log(session, lead.id, "Welcome", "Thanks for downloading.")
-
-    # 5. Enqueue nurture sequence and send immediate email if scheduled now
-    logs = enqueue_sequence_for_lead(session, lead)
-    now = datetime.utcnow()
-    immediate = None
-    for log in logs:
-        if log.scheduled_at and log.scheduled_at <= now + timedelta(minutes=1):
-            if not immediate or log.scheduled_at < immediate.scheduled_at:
-                immediate = log
-    if immediate:
-        background_tasks.add_task(send_email_task, immediate.id)
+    # 4. Lead, welcome email and nurture sequence in one transaction (off the event loop);
+    # a repeat submission gets the existing lead id and queues nothing.
+    captured = await session.run_sync(capture_lead, lead_data, idempotency_key)
+    if captured.immediate_log_id:
+        background_tasks.add_task(send_email_task, captured.immediate_log_id)
     
-    return ok({"lead_id": lead.id, "message": "Success"})
+    return ok({"lead_id": captured.lead_id, "message": "Success"})
 
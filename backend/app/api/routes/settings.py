@@ -1,18 +1,18 @@
 from fastapi import APIRouter, Depends
-from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 from app.core.responses import ok
 from app.models.schemas import SettingsUpdate
 from app.services import settings
-from app.db.session import get_session
+from app.db.session import get_async_session
 
 router = APIRouter()
 
 
 @router.get("", response_model=None)
-def get_settings(session: Session = Depends(get_session)):
-    return ok(settings.get_app_settings(session))
+async def get_settings(session: AsyncSession = Depends(get_async_session)):
+    return ok(await session.run_sync(settings.get_app_settings))
 
 
 @router.put("", response_model=None)
-def update_settings(payload: SettingsUpdate, session: Session = Depends(get_session)):
-    return ok(settings.update_app_settings(session, payload))
+async def update_settings(payload: SettingsUpdate, session: AsyncSession = Depends(get_async_session)):
+    return ok(await session.run_sync(settings.update_app_settings, payload))
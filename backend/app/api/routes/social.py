@@ -2,7 +2,7 @@ import time
 from fastapi import APIRouter, Depends, HTTPException
 from sqlmodel import Session, select
 from app.core.responses import ok
-from app.db.session import get_session
+from app.db.session import get_session, run_db
 from app.models.db import SocialConnection
 from app.services import linkedin
 from pydantic import BaseModel
@@ -24,6 +24,36 @@ def linkedin_login(redirect_uri: str):
         raise HTTPException(status_code=400, detail=str(e))
 
 
+def _save_connection(db: Session, urn_id: str, access_token: str, expires_at: int | None) -> None:
+    existing = db.exec(
+        select(SocialConnection)
+        .where(SocialConnection.provider == "linkedin")
+        .where(SocialConnection.provider_user_id == urn_id)
+    ).first()
+    if existing:
+        existing.access_token = access_token
+        existing.expires_at = expires_at
+        db.add(existing)
+    else:
+        db.add(
+            SocialConnection(
+                provider="linkedin",
+                provider_user_id=urn_id,
+                access_token=access_token,
+                expires_at=expires_at,
+            )
+        )
+    db.commit()
+
+
+def _latest_connection(db: Session) -> SocialConnection | None:
+    return db.exec(
+        select(SocialConnection)
+        .where(SocialConnection.provider == "linkedin")
+        .order_by(SocialConnection.created_at.desc())
+    ).first()
+
+
 @router.get("/auth/linkedin/callback")
 async def linkedin_callback(code: str, redirect_uri: str, db: Session = Depends(get_session)):
     try:
@@ -54,25 +84,7 @@ async def linkedin_callback(code: str, redirect_uri: str, db: Session = Depends(
             except ValueError:
                 expires_at = None
 
-        existing = db.exec(
-            select(SocialConnection)
-            .where(SocialConnection.provider == "linkedin")
-            .where(SocialConnection.provider_user_id == urn_id)
-        ).first()
-        if existing:
-            existing.access_token = access_token
-            existing.expires_at = expires_at
-            db.add(existing)
-        else:
-            db.add(
-                SocialConnection(
-                    provider="linkedin",
-                    provider_user_id=urn_id,
-                    access_token=access_token,
-                    expires_at=expires_at,
-                )
-            )
-        db.commit()
+        await run_db(_save_connection, db, urn_id, access_token, expires_at)
 
         return ok({"connected": True, "user": name})
     except ValueError as e:
@@ -84,11 +96,7 @@ async def linkedin_callback(code: str, redirect_uri: str, db: Session = Depends(
 
 @router.post("/linkedin/share")
 async def linkedin_share(payload: ShareRequest, db: Session = Depends(get_session)):
-    conn = db.exec(
-        select(SocialConnection)
-        .where(SocialConnection.provider == "linkedin")
-        .order_by(SocialConnection.created_at.desc())
-    ).first()
+    conn = await run_db(_latest_connection, db)
     if not conn:
         raise HTTPException(status_code=401, detail="Not connected to LinkedIn")
     try:
@@ -106,14 +114,7 @@ async def linkedin_share(payload: ShareRequest, db: Session = Depends(get_sessio
 
 @router.get("/status")
 def social_status(db: Session = Depends(get_session)):
-    connected = (
-        db.exec(
-            select(SocialConnection)
-            .where(SocialConnection.provider == "linkedin")
-            .order_by(SocialConnection.created_at.desc())
-        ).first()
-        is not None
-    )
+    connected = _latest_connection(db) is not None
     return ok({
         "linkedin_connected": connected,
         "user": None,
@@ -0,0 +1,101 @@
+"""Maintenance commands.
+
+    python -m app.cli archive-email-logs                  # move old sent/failed/dead logs to the archive
+    python -m app.cli archive-email-logs --older-than-days 7 --no-compress
+    python -m app.cli purge-email-archive --older-than-days 365
+    python -m app.cli backfill-landing-html               # pre-render pages missing/stale rendered_html
+    python -m app.cli backfill-landing-html --all
+    python -m app.cli export-static --output ./public-site  # incremental static export of published pages
+    python -m app.cli rebuild-funnel-rollups              # recompute funnel_rollups from leads/email logs
+
+Intended to run from cron (or a k8s CronJob) next to the API and worker processes.
+"""
+from __future__ import annotations
+import argparse
+import logging
+import sys
+from typing import Optional
+from app.services.email_archive import archive_email_logs, purge_email_archive
+from app.services.funnel import rebuild_funnel_rollups
+from app.services.landing_render import rerender_all
+from app.services.static_export import export_static
+
+logger = logging.getLogger("app.cli")
+
+
+def _archive_email_logs(args: argparse.Namespace) -> int:
+    moved = archive_email_logs(
+        older_than_days=args.older_than_days,
+        batch_size=args.batch_size,
+        compress=args.compress,
+    )
+    logger.info(f"Archived {moved} email logs.")
+    return 0
+
+
+def _purge_email_archive(args: argparse.Namespace) -> int:
+    removed = purge_email_archive(older_than_days=args.older_than_days)
+    logger.info(f"Purged {removed} archived email logs.")
+    return 0
+
+
+def _backfill_landing_html(args: argparse.Namespace) -> int:
+    written = rerender_all(stale_only=not args.all, batch_size=args.batch_size)
+    logger.info(f"Rendered {written} landing pages.")
+    return 0
+
+
+def _export_static(args: argparse.Namespace) -> int:
+    result = export_static(out_dir=args.output, full=args.full, api_base=args.api_base)
+    logger.info(
+        f"Exported {result['exported']} pages ({result['unchanged']} unchanged, {result['removed']} removed) "
+        f"to {result['directory']}."
+    )
+    return 0
+
+
+def _rebuild_funnel_rollups(args: argparse.Namespace) -> int:
+    written = rebuild_funnel_rollups(batch_size=args.batch_size)
+    logger.info(f"Rebuilt {written} funnel rollup rows.")
+    return 0
+
+
+def _parse_args(argv: Optional[list[str]]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description="GenieOps maintenance commands.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    archive = commands.add_parser("archive-email-logs", help="Move terminal email logs to email_logs_archive.")
+    archive.add_argument("--older-than-days", type=int, default=None, help="Defaults to EMAIL_LOG_RETENTION_DAYS.")
+    archive.add_argument("--batch-size", type=int, default=None, help="Logs per transaction.")
+    archive.add_argument("--compress", action=argparse.BooleanOptionalAction, default=None, help="zlib-compress bodies.")
+    archive.set_defaults(handler=_archive_email_logs)
+
+    purge = commands.add_parser("purge-email-archive", help="Delete archived logs (drops partitions on Postgres).")
+    purge.add_argument("--older-than-days", type=int, required=True)
+    purge.set_defaults(handler=_purge_email_archive)
+
+    backfill = commands.add_parser("backfill-landing-html", help="Store sanitized rendered_html for landing pages.")
+    backfill.add_argument("--all", action="store_true", help="Re-render every page, not only missing/stale ones.")
+    backfill.add_argument("--batch-size", type=int, default=100, help="Pages per transaction.")
+    backfill.set_defaults(handler=_backfill_landing_html)
+
+    export = commands.add_parser("export-static", help="Write published landing/thank-you pages as static files.")
+    export.add_argument("--output", default=None, help="Defaults to STATIC_EXPORT_DIR.")
+    export.add_argument("--full", action="store_true", help="Rewrite every page, not only changed ones.")
+    export.add_argument("--api-base", default=None, help="Origin forms submit to; defaults to PUBLIC_API_BASE_URL.")
+    export.set_defaults(handler=_export_static)
+
+    rollups = commands.add_parser("rebuild-funnel-rollups", help="Recompute funnel_rollups from the raw tables.")
+    rollups.add_argument("--batch-size", type=int, default=1000, help="Leads read per batch.")
+    rollups.set_defaults(handler=_rebuild_funnel_rollups)
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    args = _parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
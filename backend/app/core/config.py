@@ -16,6 +16,9 @@ class Settings(BaseSettings):
 
     environment: str = "local"
     database_url: str = "sqlite:///./genieops.db"
+    # Async routes use DATABASE_URL through its async driver (aiosqlite / psycopg); blocking session
+    # work still called from async routes runs on a threadpool of this many threads.
+    db_threadpool_size: int = 10
 
     llm_provider: str = "openai"
     llm_api_key: str | None = None
@@ -27,6 +30,100 @@ class Settings(BaseSettings):
     email_api_key: str | None = None
     email_from: str = "no-reply@genieops.ai"
     email_from_name: str = "GenieOps"
+    # Provider endpoints; overridable so benchmarks can point at a local stand-in.
+    sendgrid_api_url: str = "https://api.sendgrid.com/v3/mail/send"
+    mailersend_api_url: str = "https://api.mailersend.com/v1/email"
+    mailersend_bulk_api_url: str = "https://api.mailersend.com/v1/bulk-email"
+    # Logs due together that share a template go out as one provider request (SendGrid/MailerSend).
+    email_bulk_enabled: bool = True
+    email_bulk_max_recipients: int = 500
+    # SMTP relay used when email_provider is "smtp"; the password falls back to email_api_key.
+    smtp_host: str | None = None
+    smtp_port: int = 587
+    smtp_username: str | None = None
+    smtp_password: str | None = None
+    smtp_starttls: bool = True
+    smtp_ssl: bool = False
+    smtp_pool_size: int = 4
+    smtp_timeout_seconds: float = 30.0
+    smtp_max_messages_per_connection: int = 1000
+    # Set to false when dispatch runs in separate `python -m app.worker` processes.
+    email_scheduler_enabled: bool = True
+    email_dispatch_safety_poll_seconds: float = 300.0
+    email_dispatch_listen: bool = True
+    # Due logs claimed per dispatcher pass; also caps how many logs one bulk request can coalesce.
+    email_dispatch_batch_size: int = 100
+    # A sender leases the logs it is about to send by pushing next_attempt_at this far ahead, so the
+    # dispatcher and the post-submit send never deliver the same log twice; a crashed sender's logs
+    # become due again once the lease runs out.
+    email_claim_lease_seconds: float = 300.0
+    # Provider requests in flight per dispatcher pass (SMTP: at most SMTP_POOL_SIZE).
+    email_send_concurrency: int = 8
+    # Sends per second per provider; providers not listed are not rate limited.
+    email_rate_limits: dict[str, float] = {"sendgrid": 100.0, "mailersend": 10.0}
+    # Throttles are per process: each dispatching process gets EMAIL_RATE_LIMITS / this (and the
+    # burst likewise). Set it to the number of processes running dispatch; `app.worker --shard i/N`
+    # raises it to N.
+    email_dispatch_workers: int = 1
+    email_rate_burst: int = 10
+    email_breaker_failure_threshold: int = 5
+    email_breaker_cooldown_seconds: float = 60.0
+    # Retryable send failures back off exponentially; the last attempt moves the log to "dead".
+    email_max_attempts: int = 5
+    email_retry_base_seconds: float = 60.0
+    email_retry_max_seconds: float = 3600.0
+    # Retention: sent/failed/dead logs older than this move to email_logs_archive.
+    email_log_retention_days: int = 30
+    email_archive_batch_size: int = 500
+    email_archive_compress: bool = True
+    # Nurture sequence/step plans cached per lead magnet or campaign; bounds cross-process staleness.
+    sequence_plan_cache_ttl_seconds: float = 60.0
+
+    # Rendered public landing pages kept in memory (LRU); 0 disables the cache.
+    landing_html_cache_size: int = 256
+    # Rendered thank-you pages (HTML and SPA JSON) kept in memory (LRU); 0 disables the cache.
+    thank_you_cache_size: int = 256
+    # Re-render stored landing pages in the background when SANITIZER_VERSION changes.
+    landing_rerender_on_startup: bool = True
+    # Public lead submissions: "sync" writes in the request; "queued" returns at once and a background
+    # writer group-commits batches every LEAD_INGEST_FLUSH_MS. The spool file keeps queued leads across crashes.
+    lead_ingest_mode: str = "sync"
+    lead_ingest_flush_ms: float = 5.0
+    lead_ingest_max_batch: int = 500
+    lead_ingest_queue_size: int = 10000
+    lead_ingest_spool_path: str | None = None
+    lead_ingest_spool_fsync: bool = False
+    # Public routes resolve slug/id -> landing page through this cache (misses are not cached).
+    landing_resolver_cache_ttl_seconds: float = 30.0
+    landing_resolver_cache_size: int = 2048
+    # HTTP caching for /public pages: Cache-Control sent with every 200/304, and how many
+    # gzip/brotli bodies (one per ETag and encoding) stay in memory; smaller bodies go uncompressed.
+    public_cache_control: str = "public, max-age=60, s-maxage=300, stale-while-revalidate=600"
+    public_compressed_cache_size: int = 512
+    public_compress_min_bytes: int = 1024
+    # Admission control for /public/*: token buckets per client IP and per slug, [burst, refill per
+    # second] per rule; a burst of 0 disables the rule. Over-limit requests get 429 before any DB work.
+    # The "sqlite" backend shares buckets between worker processes through a local file.
+    public_rate_limit_enabled: bool = True
+    public_rate_limits: dict[str, list[float]] = {
+        "view_ip": [120, 20.0],
+        "view_slug": [2000, 500.0],
+        "submit_ip": [10, 0.5],
+        "submit_slug": [200, 50.0],
+    }
+    public_rate_limit_backend: str = "memory"
+    public_rate_limit_store_path: str = "public_rate_limits.sqlite"
+    public_rate_limit_max_keys: int = 100000
+    # Behind a trusted proxy/CDN: key per-IP buckets on the first X-Forwarded-For address.
+    public_rate_limit_trust_forwarded_for: bool = False
+    # Static export (python -m app.cli export-static / POST /api/exports/static). Set the API origin
+    # when the export is served from another host so forms still post to /public/lp/{slug}/submit.
+    static_export_dir: str = "static_export"
+    public_api_base_url: str = ""
+    # Lead / email log exports (GET /api/exports/leads|email-logs): rows fetched per cursor round
+    # trip, and the size at which buffered CSV/NDJSON is flushed to the client.
+    export_yield_per: int = 1000
+    export_chunk_bytes: int = 64 * 1024
 
     cors_origins: list[str] = ["http://localhost:5173", "http://127.0.0.1:5173"]
 
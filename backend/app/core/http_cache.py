@@ -0,0 +1,166 @@
+"""Conditional GET and precompressed bodies for the public pages.
+
+Each response carries a strong ETag derived from its content version, answers matching
+`If-None-Match` with 304, and serves gzip (and brotli, when the optional `brotli` package
+is installed) variants compressed once per ETag and kept in a bounded LRU. Compressed
+variants are different representations, so their ETags carry the coding (`"<version>-gzip"`).
+"""
+from __future__ import annotations
+from collections import OrderedDict
+import gzip
+import hashlib
+import threading
+from typing import Optional, Union
+from fastapi import Request, Response
+from app.core.config import get_settings
+from app.core.metrics import metrics
+
+try:
+    import brotli
+except ImportError:  # optional; without it only gzip variants are offered
+    brotli = None
+
+# Preference order when a client accepts several codings with the same q-value.
+_PREFERENCE = ("br", "gzip", "identity")
+
+
+def strong_etag(version: str) -> str:
+    """Quoted strong ETag for a content version that already changes with the body."""
+    return f'"{version}"'
+
+
+def body_etag(body: bytes) -> str:
+    """Strong ETag for responses without a stored version: a digest of the body itself."""
+    return strong_etag(hashlib.blake2b(body, digest_size=16).hexdigest())
+
+
+def encoded_etag(etag: str, encoding: str) -> str:
+    """ETag of `etag`'s representation in `encoding`; identity keeps the tag as is."""
+    if encoding == "identity":
+        return etag
+    return f'{etag[:-1]}-{encoding}"'
+
+
+def _matching_tag(request: Request, etag: str) -> Optional[str]:
+    """The `If-None-Match` entry matching any encoding's form of `etag` (weak comparison)."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return None
+    if header.strip() == "*":
+        return etag
+    bare = etag.removeprefix("W/")
+    forms = {encoded_etag(bare, encoding) for encoding in _PREFERENCE}
+    for tag in header.split(","):
+        tag = tag.strip().removeprefix("W/")
+        if tag in forms:
+            return tag
+    return None
+
+
+def not_modified(request: Request, etag: str) -> bool:
+    """Weak comparison of `If-None-Match` against `etag` in any content-coding, as RFC 9110 requires for GET."""
+    return _matching_tag(request, etag) is not None
+
+
+def available_encodings() -> tuple[str, ...]:
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def choose_encoding(accept_encoding: Optional[str]) -> str:
+    """Best content-coding for an `Accept-Encoding` header among the ones we can produce."""
+    if not accept_encoding:
+        return "identity"
+    offered = available_encodings()
+    weights: dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        coding, _, params = item.strip().partition(";")
+        coding = coding.strip().lower()
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        if coding == "*":
+            for name in offered:
+                weights.setdefault(name, q)
+        elif coding in offered:
+            weights[coding] = q
+    ranked = [name for name in _PREFERENCE if weights.get(name, 0.0) > 0.0]
+    if not ranked:
+        return "identity"
+    return max(ranked, key=lambda name: (weights[name], -_PREFERENCE.index(name)))
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=11)
+    return gzip.compress(body, compresslevel=9, mtime=0)
+
+
+_variants: OrderedDict[tuple[str, str], bytes] = OrderedDict()
+_lock = threading.Lock()
+
+
+def clear_variants() -> None:
+    with _lock:
+        _variants.clear()
+
+
+def encoded_body(etag: str, body: bytes, encoding: str) -> bytes:
+    """`body` in `encoding`, compressed at most once per (ETag, encoding) while it stays cached."""
+    if encoding == "identity":
+        return body
+    key = (etag, encoding)
+    with _lock:
+        hit = _variants.get(key)
+        if hit is not None:
+            _variants.move_to_end(key)
+            return hit
+    compressed = compress(body, encoding)
+    size = get_settings().public_compressed_cache_size
+    if size > 0:
+        with _lock:
+            _variants[key] = compressed
+            _variants.move_to_end(key)
+            while len(_variants) > size:
+                _variants.popitem(last=False)
+    return compressed
+
+
+def _validator_headers(etag: str) -> dict[str, str]:
+    return {"ETag": etag, "Cache-Control": get_settings().public_cache_control, "Vary": "Accept-Encoding"}
+
+
+def not_modified_response(etag: str, request: Optional[Request] = None) -> Response:
+    """304 for a request whose If-None-Match already matched; lets routes skip loading the body.
+
+    With `request`, the 304 repeats the tag of the representation the client holds.
+    """
+    metrics.inc("public_page_responses_total", status="304", encoding="none")
+    matched = _matching_tag(request, etag) if request is not None else None
+    return Response(status_code=304, headers=_validator_headers(matched or etag))
+
+
+def cached_response(
+    request: Request,
+    body: Union[str, bytes],
+    media_type: str,
+    etag: Optional[str] = None,
+) -> Response:
+    """200 (possibly compressed) or 304 response for a public page, with ETag and Cache-Control."""
+    settings = get_settings()
+    raw = body.encode("utf-8") if isinstance(body, str) else body
+    etag = etag or body_etag(raw)
+    if not_modified(request, etag):
+        return not_modified_response(etag, request)
+
+    encoding = "identity"
+    if len(raw) >= settings.public_compress_min_bytes:
+        encoding = choose_encoding(request.headers.get("accept-encoding"))
+    headers = _validator_headers(encoded_etag(etag, encoding))
+    if encoding != "identity":
+        headers["Content-Encoding"] = encoding
+    metrics.inc("public_page_responses_total", status="200", encoding=encoding)
+    return Response(content=encoded_body(etag, raw, encoding), media_type=media_type, headers=headers)
@@ -0,0 +1,55 @@
+from __future__ import annotations
+import threading
+from typing import Callable
+
+
+def _key(name: str, labels: dict[str, str]) -> str:
+    if not labels:
+        return name
+    rendered = ",".join(f"{key}={value}" for key, value in sorted(labels.items()))
+    return f"{name}{{{rendered}}}"
+
+
+class Metrics:
+    """Minimal in-process counters and gauges, exported as JSON by /api/metrics."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: dict[str, float] = {}
+        self._gauges: dict[str, float] = {}
+        self._collectors: list[Callable[[], dict[str, float]]] = []
+
+    def inc(self, name: str, value: float = 1, **labels: str) -> None:
+        key = _key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def set_gauge(self, name: str, value: float, **labels: str) -> None:
+        with self._lock:
+            self._gauges[_key(name, labels)] = value
+
+    def register_collector(self, collector: Callable[[], dict[str, float]]) -> None:
+        """Register a callable returning gauge values computed at scrape time."""
+        with self._lock:
+            self._collectors.append(collector)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            counters = dict(self._counters)
+            gauges = dict(self._gauges)
+            collectors = list(self._collectors)
+        for collector in collectors:
+            gauges.update(collector())
+        return {"counters": counters, "gauges": gauges}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+
+
+metrics = Metrics()
+
+
+def gauge_key(name: str, **labels: str) -> str:
+    return _key(name, labels)
@@ -0,0 +1,77 @@
+from __future__ import annotations
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from functools import lru_cache
+import re
+from typing import Optional
+
+# Named windows accepted in Campaign.send_window alongside the raw spec syntax.
+PRESETS = {
+    "minute": "1m",
+    "quarter_hour": "15m",
+    "hourly": "1h",
+    "business_hours": "15m@09-17/weekdays",
+}
+
+_SPEC = re.compile(
+    r"^(?P<count>\d+)(?P<unit>[mh])(?:@(?P<start>\d{1,2})-(?P<end>\d{1,2}))?(?P<weekdays>/weekdays)?$"
+)
+
+
+@dataclass(frozen=True)
+class SendWindow:
+    """When a campaign's emails may go out: bucket boundaries plus optional allowed hours (UTC)."""
+
+    bucket: timedelta
+    start_hour: Optional[int] = None
+    end_hour: Optional[int] = None
+    weekdays_only: bool = False
+
+
+@lru_cache(maxsize=256)
+def parse_send_window(spec: Optional[str]) -> Optional[SendWindow]:
+    """Parse `"<N>m|<N>h[@HH-HH][/weekdays]"` or a preset name; None/"" means send exactly on time.
+
+    Examples: "1m", "15m@09-17", "1h@08-18/weekdays", "business_hours".
+    """
+    if not spec or not spec.strip():
+        return None
+    text = PRESETS.get(spec.strip().lower(), spec.strip().lower())
+    match = _SPEC.match(text)
+    if not match:
+        raise ValueError(f"Invalid send window {spec!r}; expected e.g. '15m', '1h@09-17/weekdays' or a preset")
+    count = int(match["count"])
+    bucket = timedelta(minutes=count) if match["unit"] == "m" else timedelta(hours=count)
+    if not timedelta(0) < bucket <= timedelta(days=1):
+        raise ValueError(f"Send window bucket must be between 1 minute and 24 hours: {spec!r}")
+    start = int(match["start"]) if match["start"] else None
+    end = int(match["end"]) if match["end"] else None
+    if start is not None and not 0 <= start < end <= 24:
+        raise ValueError(f"Send window hours must satisfy 0 <= start < end <= 24: {spec!r}")
+    return SendWindow(bucket=bucket, start_hour=start, end_hour=end, weekdays_only=bool(match["weekdays"]))
+
+
+def align(when: datetime, window: Optional[SendWindow]) -> datetime:
+    """First instant at or after `when` that is a bucket boundary inside the allowed hours."""
+    if window is None:
+        return when
+    day = datetime(when.year, when.month, when.day, tzinfo=when.tzinfo)
+    elapsed = when - day
+    buckets = -(-elapsed // window.bucket)  # ceil
+    aligned = day + buckets * window.bucket
+    if window.start_hour is None and not window.weekdays_only:
+        return aligned
+
+    start = timedelta(hours=window.start_hour or 0)
+    end = timedelta(hours=window.end_hour if window.end_hour is not None else 24)
+    for _ in range(8):
+        day = datetime(aligned.year, aligned.month, aligned.day, tzinfo=aligned.tzinfo)
+        if window.weekdays_only and day.weekday() >= 5:
+            aligned = day + timedelta(days=1) + start
+        elif aligned < day + start:
+            aligned = day + start
+        elif aligned >= day + end:
+            aligned = day + timedelta(days=1) + start
+        else:
+            break
+    return aligned
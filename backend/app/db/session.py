@@ -1,7 +1,22 @@
 from __future__ import annotations
-from typing import Generator
+from functools import partial
+import threading
+from typing import AsyncGenerator, Callable, Generator, Optional, TypeVar
+import anyio
+from anyio.lowlevel import RunVar
+from sqlalchemy import event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
 from sqlmodel import SQLModel, Session, create_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
 from app.core.config import get_settings
+from app.core.metrics import gauge_key, metrics
+
+T = TypeVar("T")
+
+# Async driver per backend for the async engine.
+_ASYNC_DRIVERS = {"sqlite": "sqlite+aiosqlite", "postgresql": "postgresql+psycopg"}
 
 
 def get_engine():
@@ -9,7 +24,62 @@ def get_engine():
     return create_engine(settings.database_url, pool_pre_ping=True)
 
 
+_async_engine: Optional[AsyncEngine] = None
+_async_engine_lock = threading.Lock()
+_db_limiter: RunVar[anyio.CapacityLimiter] = RunVar("db_limiter")
+# Most connections checked out at once since start, per engine ("sync", "async").
+_pool_peaks: dict[str, int] = {}
+
+
+def _track_pool(name: str, sync_engine: Engine) -> None:
+    pool = sync_engine.pool
+    if not isinstance(pool, QueuePool):
+        return
+    _pool_peaks[name] = 0
+
+    @event.listens_for(sync_engine, "checkout")
+    def _checkout(*_args) -> None:
+        _pool_peaks[name] = max(_pool_peaks[name], pool.checkedout())
+
+
 engine = get_engine()
+_track_pool("sync", engine)
+
+
+def async_database_url(database_url: str) -> str:
+    """DATABASE_URL with the backend's async driver, e.g. sqlite:/// -> sqlite+aiosqlite:///."""
+    url = make_url(database_url)
+    driver = _ASYNC_DRIVERS.get(url.get_backend_name())
+    if driver is None:
+        raise ValueError(f"No async driver configured for {url.get_backend_name()}")
+    return url.set(drivername=driver).render_as_string(hide_password=False)
+
+
+def create_async_db_engine(database_url: str) -> AsyncEngine:
+    url = make_url(async_database_url(database_url))
+    options = {"pool_pre_ping": True}
+    if url.get_backend_name() == "sqlite":
+        # SQLite has one writer: queue for a single connection instead of spinning on busy locks.
+        options.update(poolclass=AsyncAdaptedQueuePool, pool_size=1, max_overflow=0)
+    return create_async_engine(url, **options)
+
+
+def get_async_engine() -> AsyncEngine:
+    """The process-wide async engine, created on first use."""
+    global _async_engine
+    with _async_engine_lock:
+        if _async_engine is None:
+            _async_engine = create_async_db_engine(get_settings().database_url)
+            _track_pool("async", _async_engine.sync_engine)
+        return _async_engine
+
+
+async def dispose_async_engine() -> None:
+    global _async_engine
+    with _async_engine_lock:
+        async_engine, _async_engine = _async_engine, None
+    if async_engine is not None:
+        await async_engine.dispose()
 
 
 def init_db() -> None:
@@ -19,3 +89,35 @@ def init_db() -> None:
 def get_session() -> Generator[Session, None, None]:
     with Session(engine) as session:
         yield session
+
+
+async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
+    # Not expiring on commit: attributes read after `await session.run_sync(...)` must not lazy-load.
+    async with AsyncSession(get_async_engine(), expire_on_commit=False) as session:
+        yield session
+
+
+async def run_db(fn: Callable[..., T], *args) -> T:
+    """Run blocking (sync Session) work from an async route on the bounded DB threadpool."""
+    try:
+        limiter = _db_limiter.get()
+    except LookupError:
+        limiter = anyio.CapacityLimiter(get_settings().db_threadpool_size)
+        _db_limiter.set(limiter)
+    return await anyio.to_thread.run_sync(partial(fn, *args), limiter=limiter)
+
+
+def _collect() -> dict[str, float]:
+    values: dict[str, float] = {}
+    engines = {"sync": engine, "async": _async_engine.sync_engine if _async_engine is not None else None}
+    for name, tracked in engines.items():
+        if tracked is None or name not in _pool_peaks:
+            continue
+        pool = tracked.pool
+        values[gauge_key("db_pool_checked_out", engine=name)] = pool.checkedout()
+        values[gauge_key("db_pool_checked_out_peak", engine=name)] = _pool_peaks[name]
+        values[gauge_key("db_pool_capacity", engine=name)] = pool.size() + max(pool._max_overflow, 0)
+    return values
+
+
+metrics.register_collector(_collect)
@@ -4,7 +4,10 @@ from fastapi.middleware.cors import CORSMiddleware
 from app.api.router import api_router
 from app.core.config import get_settings
 from app.core.errors import add_exception_handlers
+from app.db.session import dispose_async_engine
 from app.services.email_scheduler import build_scheduler
+from app.services.landing_render import start_background_rerender
+from app.services.lead_ingest import close_ingestor, get_ingestor
 
 
 def create_app() -> FastAPI:
@@ -22,6 +25,33 @@ def create_app() -> FastAPI:
     app.include_router(api_router)
     add_exception_handlers(app)
 
+    @app.on_event("shutdown")
+    async def _close_async_engine():
+        await dispose_async_engine()
+
+    if settings.landing_rerender_on_startup:
+
+        @app.on_event("startup")
+        async def _rerender_landing_pages():
+            # Pages stored by an older sanitizer are served via the live-render path until redone.
+            try:
+                start_background_rerender()
+            except Exception as exc:
+                logging.getLogger(__name__).warning(f"Landing page re-render not started: {exc}")
+
+    if (settings.lead_ingest_mode or "sync").lower() == "queued":
+
+        @app.on_event("startup")
+        async def _start_lead_ingest():
+            get_ingestor()  # replays the spool before traffic arrives
+
+        @app.on_event("shutdown")
+        async def _stop_lead_ingest():
+            close_ingestor()
+
+    if not settings.email_scheduler_enabled:
+        return app
+
     scheduler = build_scheduler()
 
     @app.on_event("startup")
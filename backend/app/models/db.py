@@ -1,9 +1,9 @@
 from __future__ import annotations
-from datetime import datetime
+from datetime import date, datetime
 from uuid import uuid4
 from typing import Optional
 from sqlmodel import SQLModel, Field
-from sqlalchemy import Column, DateTime, func
+from sqlalchemy import Column, DateTime, Index, LargeBinary, Text, func, text
 from sqlalchemy.types import JSON
 
 
@@ -66,6 +66,8 @@ class Campaign(SQLModel, table=True):
 
     linked_in_post: Optional[str] = None
     upgrade_offer: Optional[dict] = Field(default=None, sa_column=Column(JSON))
+    # Send-time alignment for nurture emails, e.g. "15m@09-17/weekdays"; NULL sends on the exact offset.
+    send_window: Optional[str] = None
 
     created_at: datetime = Field(
         default_factory=_now,
@@ -123,12 +125,53 @@ class LandingPage(SQLModel, table=True):
     sections: Optional[dict] = Field(default=None, sa_column=Column(JSON))
     form_schema: Optional[dict] = Field(default=None, sa_column=Column(JSON))
     image_url: Optional[str] = None
+    # Sanitized, script-injected page written on every save; served as-is by /public/lp/{slug}.
+    rendered_html: Optional[str] = Field(default=None, sa_column=Column(Text, nullable=True))
+    content_version: Optional[str] = None
+    render_version: Optional[int] = None
     created_at: datetime = Field(
         default_factory=_now,
         sa_column=Column(DateTime(timezone=True), server_default=func.now()),
     )
 
 
+class LandingPageVariant(SQLModel, table=True):
+    """Alternative copy of a landing page for split tests; the page itself is the "control" arm."""
+
+    __tablename__ = "landing_page_variants"
+    __table_args__ = (
+        Index("uq_landing_page_variants_landing_page_id_key", "landing_page_id", "key", unique=True),
+    )
+
+    id: str = Field(default_factory=_uuid, primary_key=True, index=True)
+    landing_page_id: str = Field(foreign_key="landing_pages.id", index=True)
+    key: str
+    # Share of traffic relative to the control arm (weight 1); 0 pauses the variant.
+    weight: float = Field(default=1.0)
+    headline: Optional[str] = None
+    subheadline: Optional[str] = None
+    cta: Optional[str] = None
+    html_content: str
+    rendered_html: Optional[str] = Field(default=None, sa_column=Column(Text, nullable=True))
+    content_version: Optional[str] = None
+    render_version: Optional[int] = None
+    created_at: datetime = Field(
+        default_factory=_now,
+        sa_column=Column(DateTime(timezone=True), server_default=func.now()),
+    )
+
+
+class LandingVariantStat(SQLModel, table=True):
+    """Leads per landing page arm, incremented in the transaction that inserts each lead."""
+
+    __tablename__ = "landing_variant_stats"
+
+    landing_page_id: str = Field(foreign_key="landing_pages.id", primary_key=True)
+    variant: str = Field(primary_key=True)
+    leads: int = Field(default=0)
+    updated_at: datetime = Field(default_factory=_now)
+
+
 class NurtureSequence(SQLModel, table=True):
     __tablename__ = "nurture_sequences"
 
@@ -161,6 +204,10 @@ class NurtureStep(SQLModel, table=True):
 
 class Lead(SQLModel, table=True):
     __tablename__ = "leads"
+    # One lead per address per landing page; submissions upsert against this index.
+    __table_args__ = (
+        Index("uq_leads_landing_page_id_email", "landing_page_id", text("lower(email)"), unique=True),
+    )
 
     id: str = Field(default_factory=_uuid, primary_key=True, index=True)
     campaign_id: Optional[str] = Field(default=None, foreign_key="campaigns.id", index=True)
@@ -169,6 +216,8 @@ class Lead(SQLModel, table=True):
     email: str = Field(index=True)
     name: Optional[str] = None
     company: Optional[str] = None
+    # Split-test arm shown when the lead converted ("control" or a variant key); NULL without a test.
+    variant: Optional[str] = None
     created_at: datetime = Field(
         default_factory=_now,
         sa_column=Column(DateTime(timezone=True), server_default=func.now()),
@@ -177,6 +226,12 @@ class Lead(SQLModel, table=True):
 
 class EmailLog(SQLModel, table=True):
     __tablename__ = "email_logs"
+    # The dispatcher queue: status == "queued" ordered by next_attempt_at.
+    __table_args__ = (
+        Index("ix_email_logs_status_next_attempt_at", "status", "next_attempt_at"),
+        # Retention scans: terminal logs older than the cutoff.
+        Index("ix_email_logs_status_created_at", "status", "created_at"),
+    )
 
     id: str = Field(default_factory=_uuid, primary_key=True, index=True)
     lead_id: str = Field(foreign_key="leads.id", index=True)
@@ -189,12 +244,67 @@ class EmailLog(SQLModel, table=True):
     error_message: Optional[str] = None
     scheduled_at: Optional[datetime] = None
     sent_at: Optional[datetime] = None
+    attempt_count: int = Field(default=0)
+    next_attempt_at: Optional[datetime] = None
+    last_error_class: Optional[str] = None
+    # crc32(lead_id); dispatcher workers claim rows where shard_key % N == i.
+    shard_key: Optional[int] = Field(default=None, index=True)
     created_at: datetime = Field(
         default_factory=_now,
         sa_column=Column(DateTime(timezone=True), server_default=func.now()),
     )
 
 
+class EmailLogArchive(SQLModel, table=True):
+    """Terminal email logs moved out of `email_logs` by the retention job.
+
+    On Postgres the table is range-partitioned by `created_at` (monthly) and its primary
+    key is (id, created_at). `body` is NULL when the body is stored zlib-compressed in
+    `body_compressed`.
+    """
+
+    __tablename__ = "email_logs_archive"
+
+    id: str = Field(primary_key=True)
+    lead_id: str = Field(index=True)
+    sequence_id: Optional[str] = None
+    step_id: Optional[str] = None
+    subject: str
+    body: Optional[str] = None
+    body_compressed: Optional[bytes] = Field(default=None, sa_column=Column(LargeBinary, nullable=True))
+    status: str
+    provider_message_id: Optional[str] = None
+    error_message: Optional[str] = None
+    scheduled_at: Optional[datetime] = None
+    sent_at: Optional[datetime] = None
+    attempt_count: int = Field(default=0)
+    last_error_class: Optional[str] = None
+    created_at: datetime = Field(sa_column=Column(DateTime(timezone=True), nullable=False))
+    archived_at: datetime = Field(default_factory=_now)
+
+
+class FunnelRollup(SQLModel, table=True):
+    """Lead and email counts per (campaign, landing page, day), kept current by the writers.
+
+    Leads count on the day they were created; emails on the day they are scheduled, under
+    their current status, so a rebuild from leads/email_logs/email_logs_archive reproduces
+    the same rows. An empty campaign_id/landing_page_id stands for leads without one.
+    """
+
+    __tablename__ = "funnel_rollups"
+    __table_args__ = (Index("ix_funnel_rollups_landing_page_id_day", "landing_page_id", "day"),)
+
+    campaign_id: str = Field(primary_key=True)
+    landing_page_id: str = Field(primary_key=True)
+    day: date = Field(primary_key=True)
+    leads: int = Field(default=0)
+    emails_queued: int = Field(default=0)
+    emails_sent: int = Field(default=0)
+    emails_failed: int = Field(default=0)
+    emails_dead: int = Field(default=0)
+    updated_at: datetime = Field(default_factory=_now)
+
+
 class EmailTemplate(SQLModel, table=True):
     __tablename__ = "email_templates"
 
@@ -1,9 +1,19 @@
 from __future__ import annotations
-from datetime import datetime
+from datetime import date, datetime
 from enum import Enum
 import re
-from typing import Optional
-from pydantic import BaseModel, EmailStr, Field, field_validator
+from typing import Annotated, Optional
+from pydantic import AfterValidator, BaseModel, EmailStr, Field, field_validator
+from app.core.send_windows import parse_send_window
+
+
+def _check_send_window(value: Optional[str]) -> Optional[str]:
+    parse_send_window(value)
+    return value or None
+
+
+# A campaign send window spec ("15m", "1h@09-17/weekdays", a preset); "" is stored as None.
+SendWindowSpec = Annotated[Optional[str], AfterValidator(_check_send_window)]
 
 
 class CampaignStatus(str, Enum):
@@ -118,6 +128,8 @@ class CampaignBase(BaseModel):
     brand_voice: Optional[str] = None
     target_conversion: Optional[str] = None
     strategy_summary: Optional[dict] = Field(default=None, alias="strategySummary")
+    # Align nurture email send times, e.g. "15m" or "business_hours" (see app.core.send_windows).
+    send_window: SendWindowSpec = None
 
 
 class CampaignCreate(CampaignBase):
@@ -132,6 +144,7 @@ class CampaignUpdate(BaseModel):
     brand_voice: Optional[str] = None
     target_conversion: Optional[str] = None
     strategy_summary: Optional[dict] = Field(default=None, alias="strategySummary")
+    send_window: SendWindowSpec = None
 
 
 class Campaign(CampaignBase):
@@ -276,6 +289,63 @@ class LandingPageCreate(BaseModel):
     raw_image_prompt: Optional[str] = None
 
 
+class LandingVariant(BaseModel):
+    id: str
+    landing_page_id: str
+    key: str
+    weight: float
+    headline: Optional[str] = None
+    subheadline: Optional[str] = None
+    cta: Optional[str] = None
+    html_content: str
+    leads: int = 0
+    created_at: datetime
+
+
+class LandingVariantCreate(BaseModel):
+    key: str = Field(pattern=r"^[a-z0-9][a-z0-9_-]{0,31}$")
+    html_content: str
+    weight: float = Field(default=1.0, ge=0)
+    headline: Optional[str] = None
+    subheadline: Optional[str] = None
+    cta: Optional[str] = None
+
+
+class LandingVariantUpdate(BaseModel):
+    html_content: Optional[str] = None
+    weight: Optional[float] = Field(default=None, ge=0)
+    headline: Optional[str] = None
+    subheadline: Optional[str] = None
+    cta: Optional[str] = None
+
+
+class LandingVariantReport(BaseModel):
+    landing_page_id: str
+    # Leads per arm ("control" plus each variant key), from the incrementally updated aggregate.
+    leads: dict[str, int]
+    variants: list[LandingVariant]
+
+
+class FunnelCounts(BaseModel):
+    leads: int = 0
+    emails_queued: int = 0
+    emails_sent: int = 0
+    emails_failed: int = 0
+    emails_dead: int = 0
+
+
+class FunnelRow(FunnelCounts):
+    campaign_id: Optional[str] = None
+    landing_page_id: Optional[str] = None
+    day: Optional[date] = None
+
+
+class FunnelReport(BaseModel):
+    group_by: str
+    totals: FunnelCounts
+    rows: list[FunnelRow]
+
+
 class IdeationRequest(BaseModel):
     icp: ICPProfile
     product_context: Optional[ProductContext] = None
@@ -486,6 +556,7 @@ class Lead(BaseModel):
     email: EmailStr
     name: Optional[str] = None
     company: Optional[str] = None
+    variant: Optional[str] = None
     created_at: datetime
 
 
@@ -496,6 +567,7 @@ class LeadCreate(BaseModel):
     email: EmailStr
     name: Optional[str] = None
     company: Optional[str] = None
+    variant: Optional[str] = None
 
 
 class EmailLog(BaseModel):
@@ -510,9 +582,17 @@ class EmailLog(BaseModel):
     error_message: Optional[str] = None
     scheduled_at: Optional[datetime] = None
     sent_at: Optional[datetime] = None
+    attempt_count: int = 0
+    next_attempt_at: Optional[datetime] = None
+    last_error_class: Optional[str] = None
     created_at: datetime
 
 
+class EmailLogRequeue(BaseModel):
+    ids: Optional[list[str]] = None
+    lead_id: Optional[str] = None
+
+
 class Settings(BaseModel):
     llm_provider: str
     llm_api_key: Optional[str] = None
@@ -575,6 +655,7 @@ class ProjectCreate(BaseModel):
     email_sequence: Optional[EmailSequenceCreate] = None
     linked_in_post: Optional[str] = None
     upgrade_offer: Optional[OfferStack] = None
+    send_window: SendWindowSpec = None
 
 
 class ProjectUpdate(BaseModel):
@@ -593,6 +674,7 @@ class ProjectUpdate(BaseModel):
     email_sequence: Optional[EmailSequenceCreate] = None
     linked_in_post: Optional[str] = None
     upgrade_offer: Optional[OfferStack] = None
+    send_window: SendWindowSpec = None
 
 
 class ProjectSummary(BaseModel):
@@ -620,6 +702,7 @@ class ProjectView(BaseModel):
     email_sequence: Optional[EmailSequence] = None
     linked_in_post: Optional[str] = None
     upgrade_offer: Optional[OfferStack] = None
+    send_window: Optional[str] = None
 
 
 class PersonaSummary(BaseModel):
@@ -0,0 +1,201 @@
+"""Token-bucket admission control for the public landing-page routes.
+
+Every request to /public/* takes one token from a bucket per client IP and one per slug, for its
+kind ("view" for GETs, "submit" for POSTs). PUBLIC_RATE_LIMITS sets [burst, refill per second]
+per rule (view_ip, view_slug, submit_ip, submit_slug); a burst of 0 disables a rule. Buckets live
+in process memory by default; PUBLIC_RATE_LIMIT_BACKEND=sqlite keeps them in a local SQLite file
+so every worker on the host shares them.
+"""
+from __future__ import annotations
+from collections import OrderedDict
+import math
+import sqlite3
+import threading
+import time
+from typing import Optional, Protocol
+from fastapi import HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from app.core.config import get_settings
+from app.core.metrics import metrics
+
+VIEW = "view"
+SUBMIT = "submit"
+
+
+class BucketStore(Protocol):
+    def take(self, key: str, burst: float, rate: float, now: float) -> float:
+        """Take one token; returns 0 when admitted, else seconds until a token is available."""
+
+
+def _take(tokens: float, updated: float, burst: float, rate: float, now: float) -> tuple[float, float]:
+    """(tokens left, wait): refill since `updated`, then try to spend one token."""
+    tokens = min(burst, tokens + max(0.0, now - updated) * rate)
+    if tokens >= 1:
+        return tokens - 1, 0.0
+    return tokens, (1 - tokens) / rate if rate > 0 else math.inf
+
+
+class MemoryBucketStore:
+    """Per-process buckets, least recently used evicted beyond `max_keys` (an evicted key starts full)."""
+
+    def __init__(self, max_keys: int = 100_000):
+        self.max_keys = max(1, max_keys)
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def take(self, key: str, burst: float, rate: float, now: float) -> float:
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (burst, now))
+            tokens, wait = _take(tokens, updated, burst, rate, now)
+            self._buckets[key] = (tokens, now)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return wait
+
+
+class SqliteBucketStore:
+    """Buckets in a local SQLite file, shared by every worker process on the host.
+
+    Each take is one short write transaction. If the file stays locked past `timeout`, the
+    request is admitted (and counted) rather than queued behind the lock. Buckets idle for
+    `idle_seconds` are full again and are pruned every `prune_every` takes.
+    """
+
+    def __init__(self, path: str, timeout: float = 0.05, idle_seconds: float = 3600.0, prune_every: int = 10_000):
+        self.path = path
+        self.timeout = timeout
+        self.idle_seconds = idle_seconds
+        self.prune_every = prune_every
+        self._takes = 0
+        self._local = threading.local()
+        conn = self._connect()
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("CREATE TABLE IF NOT EXISTS buckets (key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)")
+        finally:
+            conn.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
+            conn.execute("PRAGMA synchronous=OFF")
+        return conn
+
+    def __len__(self) -> int:
+        return self._conn().execute("SELECT COUNT(*) FROM buckets").fetchone()[0]
+
+    def take(self, key: str, burst: float, rate: float, now: float) -> float:
+        conn = self._conn()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute("SELECT tokens, updated FROM buckets WHERE key = ?", (key,)).fetchone()
+                tokens, wait = _take(*(row or (burst, now)), burst, rate, now)
+                conn.execute("INSERT OR REPLACE INTO buckets (key, tokens, updated) VALUES (?, ?, ?)", (key, tokens, now))
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        except sqlite3.OperationalError:
+            metrics.inc("public_rate_limit_store_errors_total")
+            return 0.0
+        self._takes += 1
+        if self._takes % self.prune_every == 0:
+            self.prune(now - self.idle_seconds)
+        return wait
+
+    def prune(self, older_than: float) -> int:
+        """Drop buckets idle since `older_than` (they would be full again anyway)."""
+        return self._conn().execute("DELETE FROM buckets WHERE updated < ?", (older_than,)).rowcount
+
+
+class Admission:
+    def __init__(self, store: BucketStore, rules: dict[str, list[float]], clock=time.time):
+        self.store = store
+        self.rules = {name: (float(limit[0]), float(limit[1])) for name, limit in rules.items() if limit and limit[0] > 0}
+        self.clock = clock
+
+    def check(self, kind: str, client_ip: Optional[str], slug: Optional[str]) -> float:
+        """0 when the request is admitted, else the Retry-After in seconds. Spends one token per rule."""
+        now = self.clock()
+        wait = 0.0
+        for scope, value in (("ip", client_ip), ("slug", slug)):
+            rule = f"{kind}_{scope}"
+            limit = self.rules.get(rule)
+            if limit is None or not value:
+                continue
+            rule_wait = self.store.take(f"{rule}:{value}", limit[0], limit[1], now)
+            if rule_wait > 0:
+                metrics.inc("public_requests_rejected_total", kind=kind, rule=rule)
+                wait = max(wait, rule_wait)
+        if not wait:
+            metrics.inc("public_requests_admitted_total", kind=kind)
+        return wait
+
+
+_admission: Optional[Admission] = None
+_admission_lock = threading.Lock()
+
+
+def get_admission() -> Optional[Admission]:
+    """The process-wide limiter, built from settings on first use; None when disabled."""
+    global _admission
+    settings = get_settings()
+    if not settings.public_rate_limit_enabled:
+        return None
+    with _admission_lock:
+        if _admission is None:
+            if (settings.public_rate_limit_backend or "memory").lower() == "sqlite":
+                store: BucketStore = SqliteBucketStore(settings.public_rate_limit_store_path)
+            else:
+                store = MemoryBucketStore(settings.public_rate_limit_max_keys)
+            _admission = Admission(store, settings.public_rate_limits)
+        return _admission
+
+
+def reset_admission() -> None:
+    global _admission
+    with _admission_lock:
+        _admission = None
+
+
+def client_ip(request: Request) -> Optional[str]:
+    if get_settings().public_rate_limit_trust_forwarded_for:
+        forwarded = request.headers.get("x-forwarded-for")
+        if forwarded:
+            return forwarded.split(",")[0].strip()
+    return request.client.host if request.client else None
+
+
+async def admit_public(request: Request) -> None:
+    """Router dependency: reject over-limit requests with 429 before any DB or render work."""
+    admission = get_admission()
+    if admission is None:
+        return
+    kind = SUBMIT if request.method == "POST" else VIEW
+    slug = request.path_params.get("slug") or request.path_params.get("slug_or_id")
+    if isinstance(admission.store, SqliteBucketStore):
+        # A write transaction that may wait on the file lock: keep it off the event loop.
+        wait = await run_in_threadpool(admission.check, kind, client_ip(request), slug)
+    else:
+        wait = admission.check(kind, client_ip(request), slug)
+    if wait > 0:
+        retry_after = "3600" if math.isinf(wait) else str(max(1, math.ceil(wait)))
+        raise HTTPException(status_code=429, detail="Too many requests", headers={"Retry-After": retry_after})
+
+
+def _collect() -> dict[str, float]:
+    admission = _admission
+    if admission is None or not isinstance(admission.store, MemoryBucketStore):
+        return {}
+    return {"public_rate_limit_buckets": len(admission.store)}
+
+
+metrics.register_collector(_collect)
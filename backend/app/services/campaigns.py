@@ -2,6 +2,7 @@ from __future__ import annotations
 from sqlmodel import Session, select
 from app.models.db import Campaign as CampaignDB
 from app.models.schemas import Campaign, CampaignCreate, CampaignUpdate, ICPProfile
+from app.services.sequence_plans import invalidate_plans
 
 
 def _to_schema(db: CampaignDB) -> Campaign:
@@ -19,6 +20,7 @@ def _to_schema(db: CampaignDB) -> Campaign:
         offer_type=db.offer_type,
         brand_voice=db.brand_voice,
         target_conversion=db.target_conversion,
+        send_window=db.send_window,
         created_at=db.created_at,
     )
 
@@ -45,6 +47,7 @@ def create_campaign(session: Session, payload: CampaignCreate) -> Campaign:
         offer_type=payload.offer_type,
         brand_voice=payload.brand_voice,
         target_conversion=payload.target_conversion,
+        send_window=payload.send_window,
     )
     session.add(db_item)
     session.commit()
@@ -68,8 +71,11 @@ def update_campaign(session: Session, campaign_id: str, payload: CampaignUpdate)
         if key == "status" and hasattr(value, "value"):
             value = value.value
         setattr(existing, key, value)
+    if "send_window" in payload.model_fields_set:
+        existing.send_window = payload.send_window
     session.add(existing)
     session.commit()
+    invalidate_plans()
     session.refresh(existing)
     return _to_schema(existing)
 
@@ -80,4 +86,5 @@ def delete_campaign(session: Session, campaign_id: str) -> bool:
         return False
     session.delete(existing)
     session.commit()
+    invalidate_plans()
     return True
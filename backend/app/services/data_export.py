@@ -0,0 +1,124 @@
+"""Streaming CSV / NDJSON exports of leads and email logs.
+
+Rows are read through one SELECT on a server-side cursor (`yield_per`: psycopg uses a named
+cursor, SQLite steps its cursor lazily) and written into chunks of about EXPORT_CHUNK_BYTES,
+so memory stays flat however many rows match. The generator opens its own connection, since a
+StreamingResponse outlives the request's session.
+"""
+from __future__ import annotations
+import csv
+from datetime import date, datetime, time, timedelta
+import io
+import json
+from typing import Iterator, Optional
+from sqlalchemy import select
+from sqlalchemy.engine import Engine
+from app.core.config import get_settings
+from app.core.metrics import metrics
+from app.models.db import EmailLog as EmailLogDB, Lead as LeadDB
+from app.services.leads import lead_campaign_id
+
+LEAD_COLUMNS = (
+    "id",
+    "campaign_id",
+    "lead_magnet_id",
+    "landing_page_id",
+    "email",
+    "name",
+    "company",
+    "variant",
+    "created_at",
+)
+# Bodies are left out: they are the bulk of a log row and are rendered from the step anyway.
+EMAIL_LOG_COLUMNS = (
+    "id",
+    "lead_id",
+    "sequence_id",
+    "step_id",
+    "subject",
+    "status",
+    "provider_message_id",
+    "error_message",
+    "scheduled_at",
+    "sent_at",
+    "attempt_count",
+    "next_attempt_at",
+    "last_error_class",
+    "created_at",
+)
+EXPORTS = {"leads": (LeadDB, LEAD_COLUMNS), "email-logs": (EmailLogDB, EMAIL_LOG_COLUMNS)}
+MEDIA_TYPES = {"csv": "text/csv; charset=utf-8", "ndjson": "application/x-ndjson"}
+# Spreadsheets evaluate cells starting with these as formulas; CSV cells get a leading quote.
+FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+def _statement(
+    kind: str,
+    campaign_id: Optional[str],
+    landing_page_id: Optional[str],
+    start: Optional[date],
+    end: Optional[date],
+):
+    model, columns = EXPORTS[kind]
+    stmt = select(*(getattr(model, name) for name in columns))
+    # Logs are filtered through their lead, which also covers welcome emails outside any sequence.
+    if model is EmailLogDB and (campaign_id or landing_page_id):
+        stmt = stmt.join(LeadDB, LeadDB.id == EmailLogDB.lead_id)
+    if campaign_id:
+        stmt = stmt.where(lead_campaign_id() == campaign_id)
+    if landing_page_id:
+        stmt = stmt.where(LeadDB.landing_page_id == landing_page_id)
+    if start:
+        stmt = stmt.where(model.created_at >= datetime.combine(start, time.min))
+    if end:
+        stmt = stmt.where(model.created_at < datetime.combine(end + timedelta(days=1), time.min))
+    return stmt.order_by(model.created_at, model.id)
+
+
+def _cell(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def _csv_cell(value):
+    value = _cell(value)
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def export_rows(
+    engine: Engine,
+    kind: str,
+    fmt: str = "csv",
+    campaign_id: Optional[str] = None,
+    landing_page_id: Optional[str] = None,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+) -> Iterator[bytes]:
+    """Encoded chunks of `kind` ("leads" / "email-logs") created between `start` and `end` (inclusive)."""
+    settings = get_settings()
+    columns = EXPORTS[kind][1]
+    stmt = _statement(kind, campaign_id, landing_page_id, start, end)
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    if fmt == "csv":
+        writer.writerow(columns)
+    count = 0
+    with engine.connect() as conn:
+        result = conn.execution_options(yield_per=settings.export_yield_per).execute(stmt)
+        for row in result:
+            if fmt == "csv":
+                writer.writerow([_csv_cell(value) for value in row])
+            else:
+                buffer.write(json.dumps(dict(zip(columns, map(_cell, row))), separators=(",", ":")))
+                buffer.write("\n")
+            count += 1
+            if buffer.tell() >= settings.export_chunk_bytes:
+                yield buffer.getvalue().encode("utf-8")
+                buffer.seek(0)
+                buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+    metrics.inc("export_rows_total", count, kind=kind, format=fmt)
@@ -0,0 +1,161 @@
+from __future__ import annotations
+from datetime import datetime, timedelta
+from typing import Optional
+import zlib
+from sqlalchemy import delete, insert, text
+from sqlalchemy.engine import Engine
+from sqlmodel import Session, select
+from app.core.config import get_settings
+from app.core.metrics import metrics
+from app.db.session import engine as default_engine
+from app.models.db import EmailLog as EmailLogDB, EmailLogArchive as EmailLogArchiveDB
+
+TERMINAL_STATUSES = ("sent", "failed", "dead")
+
+
+def compress_body(body: str) -> bytes:
+    return zlib.compress(body.encode("utf-8"), 6)
+
+
+def archived_body(row: EmailLogArchiveDB) -> str:
+    if row.body is not None:
+        return row.body
+    return zlib.decompress(row.body_compressed).decode("utf-8") if row.body_compressed else ""
+
+
+def _archive_row(log: EmailLogDB, compress: bool, archived_at: datetime) -> dict:
+    return {
+        "id": log.id,
+        "lead_id": log.lead_id,
+        "sequence_id": log.sequence_id,
+        "step_id": log.step_id,
+        "subject": log.subject,
+        "body": None if compress else log.body,
+        "body_compressed": compress_body(log.body) if compress else None,
+        "status": log.status,
+        "provider_message_id": log.provider_message_id,
+        "error_message": log.error_message,
+        "scheduled_at": log.scheduled_at,
+        "sent_at": log.sent_at,
+        "attempt_count": log.attempt_count or 0,
+        "last_error_class": log.last_error_class,
+        "created_at": log.created_at or archived_at,
+        "archived_at": archived_at,
+    }
+
+
+def _month_start(value: datetime) -> datetime:
+    return datetime(value.year, value.month, 1)
+
+
+def _next_month(value: datetime) -> datetime:
+    return datetime(value.year + value.month // 12, value.month % 12 + 1, 1)
+
+
+def _partition_name(month: datetime) -> str:
+    return f"email_logs_archive_p{month:%Y%m}"
+
+
+def is_partitioned(session: Session) -> bool:
+    if session.get_bind().dialect.name != "postgresql":
+        return False
+    relkind = session.exec(text("SELECT relkind FROM pg_class WHERE relname = 'email_logs_archive'")).scalar()
+    return relkind == "p"
+
+
+def ensure_partitions(session: Session, timestamps: list[datetime]) -> None:
+    """Create the monthly archive partitions covering `timestamps` (Postgres only)."""
+    for month in sorted({_month_start(ts.replace(tzinfo=None)) for ts in timestamps}):
+        session.exec(
+            text(
+                f"CREATE TABLE IF NOT EXISTS {_partition_name(month)} PARTITION OF email_logs_archive "
+                f"FOR VALUES FROM ('{month:%Y-%m-%d}') TO ('{_next_month(month):%Y-%m-%d}')"
+            )
+        )
+
+
+def archive_email_logs(
+    engine: Optional[Engine] = None,
+    older_than_days: Optional[int] = None,
+    batch_size: Optional[int] = None,
+    compress: Optional[bool] = None,
+    now: Optional[datetime] = None,
+) -> int:
+    """Move terminal logs older than the retention cutoff into `email_logs_archive`.
+
+    Each batch is its own transaction (insert into the archive, delete from the hot
+    table), so lock time and WAL per commit stay bounded however large the backlog is.
+    Returns the number of logs archived.
+    """
+    settings = get_settings()
+    engine = engine or default_engine
+    days = settings.email_log_retention_days if older_than_days is None else older_than_days
+    batch_size = batch_size or settings.email_archive_batch_size
+    compress = settings.email_archive_compress if compress is None else compress
+    cutoff = (now or datetime.utcnow()) - timedelta(days=days)
+
+    total = 0
+    while True:
+        with Session(engine) as session:
+            logs = session.exec(
+                select(EmailLogDB)
+                .where(EmailLogDB.status.in_(TERMINAL_STATUSES), EmailLogDB.created_at < cutoff)
+                .order_by(EmailLogDB.created_at)
+                .limit(batch_size)
+                # requeue_dead could flip a row back to queued mid-move; lock the batch.
+                .with_for_update(skip_locked=True)
+            ).all()
+            if not logs:
+                break
+            archived_at = datetime.utcnow()
+            rows = [_archive_row(log, compress, archived_at) for log in logs]
+            if is_partitioned(session):
+                ensure_partitions(session, [row["created_at"] for row in rows])
+            session.exec(insert(EmailLogArchiveDB), params=rows)
+            session.exec(delete(EmailLogDB).where(EmailLogDB.id.in_([log.id for log in logs])))
+            session.commit()
+        total += len(logs)
+        metrics.inc("email_logs_archived_total", len(logs))
+        if len(logs) < batch_size:
+            break
+    return total
+
+
+def purge_email_archive(engine: Optional[Engine] = None, older_than_days: int = 365, batch_size: int = 5000) -> int:
+    """Drop archived logs created before the cutoff.
+
+    On a partitioned archive whole monthly partitions are dropped (no row-by-row delete);
+    otherwise rows are deleted in batches. Returns rows removed (partitions are counted
+    before they are dropped).
+    """
+    engine = engine or default_engine
+    cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+    total = 0
+    with Session(engine) as session:
+        if is_partitioned(session):
+            partitions = session.exec(
+                text(
+                    "SELECT child.relname FROM pg_inherits "
+                    "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+                    "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+                    "WHERE parent.relname = 'email_logs_archive'"
+                )
+            ).scalars().all()
+            for name in sorted(partitions):
+                month = datetime.strptime(name.rsplit("_p", 1)[1], "%Y%m")
+                if _next_month(month) <= cutoff:
+                    total += session.exec(text(f"SELECT count(*) FROM {name}")).scalar() or 0
+                    session.exec(text(f"DROP TABLE {name}"))
+            session.commit()
+            return total
+
+    while True:
+        with Session(engine) as session:
+            ids = session.exec(
+                select(EmailLogArchiveDB.id).where(EmailLogArchiveDB.created_at < cutoff).limit(batch_size)
+            ).all()
+            if not ids:
+                return total
+            session.exec(delete(EmailLogArchiveDB).where(EmailLogArchiveDB.id.in_(ids)))
+            session.commit()
+        total += len(ids)
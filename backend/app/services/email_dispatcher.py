@@ -0,0 +1,204 @@
+from __future__ import annotations
+from datetime import datetime, timedelta
+import heapq
+import logging
+import threading
+import time
+from typing import Callable, Optional
+import zlib
+from sqlalchemy import func, text
+from sqlalchemy.engine import Engine
+from sqlmodel import Session, select
+from app.models.db import EmailLog as EmailLogDB
+
+logger = logging.getLogger(__name__)
+
+NOTIFY_CHANNEL = "email_logs_enqueued"
+# After a failed pass the next one waits this long, doubling per consecutive failure up to the
+# safety poll, so a row that keeps failing cannot turn the loop into a busy retry.
+FAILURE_BACKOFF_SECONDS = 1.0
+
+_active: Optional["EmailDispatcher"] = None
+
+
+def shard_key_for(lead_id: str) -> int:
+    return zlib.crc32(lead_id.encode("utf-8")) & 0x7FFFFFFF
+
+
+def parse_shard(value: Optional[str]) -> Optional[tuple[int, int]]:
+    """Parse an `i/N` shard spec into (index, count)."""
+    if not value:
+        return None
+    try:
+        index, count = (int(part) for part in value.split("/", 1))
+    except ValueError:
+        raise ValueError(f"Invalid shard '{value}', expected i/N")
+    if count < 1 or not 0 <= index < count:
+        raise ValueError(f"Invalid shard '{value}', expected 0 <= i < N")
+    return index, count
+
+
+def in_shard(stmt, shard: Optional[tuple[int, int]]):
+    if not shard or shard[1] == 1:
+        return stmt
+    index, count = shard
+    return stmt.where(EmailLogDB.shard_key % count == index)
+
+
+class EmailDispatcher:
+    """Wakes the email processor exactly when the next queued email is due.
+
+    Deadlines are kept in a min-heap fed by in-process enqueues (`notify_enqueued`),
+    by Postgres LISTEN/NOTIFY from other processes and by a lookup of the earliest
+    queued `next_attempt_at` after every pass. A slow safety poll covers anything the
+    other sources miss (e.g. rows inserted by hand). After a failed pass nothing wakes it
+    before the backoff (FAILURE_BACKOFF_SECONDS, doubling up to the safety poll) has elapsed.
+    """
+
+    def __init__(
+        self,
+        process_due: Callable[[], Optional[datetime]],
+        engine: Engine,
+        safety_poll_seconds: float = 300.0,
+        listen: bool = True,
+        shard: Optional[tuple[int, int]] = None,
+    ):
+        self._process_due = process_due
+        self._engine = engine
+        self._shard = shard
+        self._safety_poll_seconds = safety_poll_seconds
+        self._listen = listen
+        self._deadlines: list[datetime] = []
+        self._known: set[datetime] = set()
+        self._failures = 0
+        self._retry_at: Optional[datetime] = None
+        self._cond = threading.Condition()
+        self._stopping = False
+        self._thread: Optional[threading.Thread] = None
+        self._listener: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        global _active
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name="email-dispatcher", daemon=True)
+        self._thread.start()
+        if self._listen and self._engine.dialect.name == "postgresql":
+            self._listener = threading.Thread(target=self._listen_loop, name="email-dispatcher-listen", daemon=True)
+            self._listener.start()
+        _active = self
+
+    def shutdown(self, wait: bool = True, timeout: Optional[float] = None) -> None:
+        """Stop after the batch in flight (if any) has been written back."""
+        global _active
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+        if wait and self._thread:
+            self._thread.join(timeout)
+        if _active is self:
+            _active = None
+
+    def notify(self, scheduled_at: Optional[datetime] = None) -> None:
+        deadline = scheduled_at or datetime.utcnow()
+        if deadline.tzinfo is not None:
+            deadline = deadline.replace(tzinfo=None)
+        with self._cond:
+            if deadline in self._known:
+                return
+            self._known.add(deadline)
+            heapq.heappush(self._deadlines, deadline)
+            self._cond.notify()
+
+    def next_deadline(self) -> Optional[datetime]:
+        with self._cond:
+            return self._deadlines[0] if self._deadlines else None
+
+    def _wait_for_due(self) -> bool:
+        """Block until a deadline passes or the safety poll elapses; False means shut down."""
+        poll_at = time.monotonic() + self._safety_poll_seconds
+        with self._cond:
+            while not self._stopping:
+                now = datetime.utcnow()
+                backing_off = self._retry_at is not None and now < self._retry_at
+                if self._deadlines and self._deadlines[0] <= now and not backing_off:
+                    while self._deadlines and self._deadlines[0] <= now:
+                        self._known.discard(heapq.heappop(self._deadlines))
+                    return True
+                remaining = poll_at - time.monotonic()
+                if remaining <= 0:
+                    return True
+                if self._deadlines:
+                    due_at = max(self._deadlines[0], self._retry_at) if backing_off else self._deadlines[0]
+                    remaining = min(remaining, (due_at - now).total_seconds())
+                self._cond.wait(timeout=remaining)
+            return False
+
+    def _earliest_queued(self) -> Optional[datetime]:
+        with Session(self._engine) as session:
+            stmt = select(func.min(EmailLogDB.next_attempt_at)).where(EmailLogDB.status == "queued")
+            return session.exec(in_shard(stmt, self._shard)).first()
+
+    def _run(self) -> None:
+        # Catch up on anything that became due while no dispatcher was running.
+        self.notify()
+        while self._wait_for_due():
+            # process_due may ask to hold off (e.g. provider throttled) until a given time.
+            resume_at = None
+            try:
+                resume_at = self._process_due()
+                self._failures = 0
+                self._retry_at = None
+            except Exception as exc:
+                self._failures += 1
+                delay = min(self._safety_poll_seconds, FAILURE_BACKOFF_SECONDS * 2 ** (self._failures - 1))
+                self._retry_at = datetime.utcnow() + timedelta(seconds=delay)
+                logger.error(f"Email Dispatcher: processing failed ({self._failures} in a row), retrying in {delay:.0f}s: {exc}")
+            try:
+                earliest = self._earliest_queued()
+            except Exception as exc:
+                logger.error(f"Email Dispatcher: could not read next deadline: {exc}")
+                earliest = None
+            if earliest and resume_at and earliest < resume_at:
+                earliest = resume_at
+            if earliest:
+                self.notify(earliest)
+
+    def _listen_loop(self) -> None:
+        import psycopg
+
+        conninfo = self._engine.url.set(drivername="postgresql").render_as_string(hide_password=False)
+        while not self._stopping:
+            try:
+                with psycopg.connect(conninfo, autocommit=True) as conn:
+                    conn.execute(f"LISTEN {NOTIFY_CHANNEL}")
+                    while not self._stopping:
+                        for note in conn.notifies(timeout=5.0):
+                            self.notify(_parse_payload(note.payload))
+            except Exception as exc:
+                logger.warning(f"Email Dispatcher: LISTEN connection lost: {exc}")
+                time.sleep(5)
+
+
+def _parse_payload(payload: str) -> Optional[datetime]:
+    try:
+        return datetime.fromisoformat(payload)
+    except (TypeError, ValueError):
+        return None
+
+
+def publish_enqueued(session: Session, scheduled_at: Optional[datetime]) -> None:
+    """Queue a NOTIFY for other processes; Postgres delivers it when the transaction commits."""
+    if session.get_bind().dialect.name != "postgresql":
+        return
+    payload = (scheduled_at or datetime.utcnow()).isoformat()
+    session.exec(text("SELECT pg_notify(:channel, :payload)").bindparams(channel=NOTIFY_CHANNEL, payload=payload))
+
+
+def notify_enqueued(scheduled_at: Optional[datetime]) -> None:
+    """Wake the in-process dispatcher, if one is running, after new logs were committed."""
+    if _active is not None:
+        _active.notify(scheduled_at)
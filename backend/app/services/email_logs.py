@@ -1,9 +1,13 @@
 from __future__ import annotations
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import Optional
+from sqlalchemy import update
 from sqlmodel import Session, select
-from app.models.db import EmailLog as EmailLogDB, NurtureSequence as NurtureSequenceDB
+from app.models.db import EmailLog as EmailLogDB, Lead as LeadDB, NurtureSequence as NurtureSequenceDB
+from app.core.config import get_settings
 from app.models.schemas import EmailLog
+from app.services.email_dispatcher import in_shard, notify_enqueued, publish_enqueued
+from app.services.funnel import FunnelDelta, record_funnel
 
 
 def _to_schema(item: EmailLogDB) -> EmailLog:
@@ -19,6 +23,9 @@ def _to_schema(item: EmailLogDB) -> EmailLog:
         error_message=item.error_message,
         scheduled_at=item.scheduled_at,
         sent_at=item.sent_at,
+        attempt_count=item.attempt_count or 0,
+        next_attempt_at=item.next_attempt_at,
+        last_error_class=item.last_error_class,
         created_at=item.created_at,
     )
 
@@ -27,29 +34,88 @@ def list_logs(
     session: Session,
     lead_id: Optional[str] = None,
     campaign_id: Optional[str] = None,
+    status: Optional[str] = None,
     limit: int = 200,
 ) -> list[EmailLog]:
     stmt = select(EmailLogDB)
     if lead_id:
         stmt = stmt.where(EmailLogDB.lead_id == lead_id)
+    if status:
+        stmt = stmt.where(EmailLogDB.status == status)
     if campaign_id:
-        seq_ids = session.exec(
-            select(NurtureSequenceDB.id).where(NurtureSequenceDB.campaign_id == campaign_id)
-        ).all()
-        if seq_ids:
-            stmt = stmt.where(EmailLogDB.sequence_id.in_(seq_ids))
-        else:
-            return []
+        # One round trip: the campaign's sequences as a subquery rather than a fetched id list.
+        sequences = select(NurtureSequenceDB.id).where(NurtureSequenceDB.campaign_id == campaign_id)
+        stmt = stmt.where(EmailLogDB.sequence_id.in_(sequences.scalar_subquery()))
     stmt = stmt.order_by(EmailLogDB.created_at.desc()).limit(limit)
     return [_to_schema(item) for item in session.exec(stmt).all()]
 
 
-def list_due(session: Session, now: datetime) -> list[EmailLogDB]:
+def list_due(session: Session, now: datetime, shard: Optional[tuple[int, int]] = None) -> list[EmailLogDB]:
     stmt = (
         select(EmailLogDB)
         .where(EmailLogDB.status == "queued")
-        .where(EmailLogDB.scheduled_at <= now)
-        .order_by(EmailLogDB.scheduled_at.asc())
-        .limit(100)
+        .where(EmailLogDB.next_attempt_at <= now)
+        .order_by(EmailLogDB.next_attempt_at.asc())
+        .limit(get_settings().email_dispatch_batch_size)
     )
-    return session.exec(stmt).all()
\ No newline at end of file
+    return session.exec(in_shard(stmt, shard)).all()
+
+
+def claim_logs(session: Session, logs: list[EmailLogDB], due_by: datetime) -> list[EmailLogDB]:
+    """The subset of `logs` this sender won, leased for EMAIL_CLAIM_LEASE_SECONDS; commits.
+
+    One conditional UPDATE: a log is won only while it is still queued and due by `due_by`, so
+    concurrent senders (dispatcher passes, the post-submit send) never deliver the same log. The
+    loaded objects keep their pre-claim values, which status_values and `release_logs` rely on.
+    """
+    if not logs:
+        return []
+    lease_until = datetime.utcnow() + timedelta(seconds=get_settings().email_claim_lease_seconds)
+    won = set(
+        session.exec(
+            update(EmailLogDB)
+            .where(
+                EmailLogDB.id.in_([log.id for log in logs]),
+                EmailLogDB.status == "queued",
+                EmailLogDB.next_attempt_at <= due_by,
+            )
+            .values(next_attempt_at=lease_until)
+            .returning(EmailLogDB.id)
+            .execution_options(synchronize_session=False)
+        ).scalars()
+    )
+    session.commit()
+    return [log for log in logs if log.id in won]
+
+
+def release_logs(session: Session, logs: list[EmailLogDB]) -> None:
+    """Hand claimed but unsent (e.g. throttle-deferred) logs back at their old next_attempt_at."""
+    if logs:
+        session.exec(update(EmailLogDB), params=[{"id": log.id, "next_attempt_at": log.next_attempt_at} for log in logs])
+
+
+def requeue_dead(session: Session, ids: Optional[list[str]] = None, lead_id: Optional[str] = None) -> int:
+    """Move dead letters back onto the queue with a fresh attempt budget."""
+    now = datetime.utcnow()
+    match = [EmailLogDB.status == "dead"]
+    if ids:
+        match.append(EmailLogDB.id.in_(ids))
+    if lead_id:
+        match.append(EmailLogDB.lead_id == lead_id)
+    funnel = FunnelDelta()
+    dead = session.exec(
+        select(LeadDB.campaign_id, LeadDB.landing_page_id, EmailLogDB.scheduled_at, EmailLogDB.created_at)
+        .join(LeadDB, LeadDB.id == EmailLogDB.lead_id)
+        .where(*match)
+    ).all()
+    for campaign, landing_page, scheduled_at, created_at in dead:
+        funnel.transition(campaign, landing_page, scheduled_at or created_at, "dead", "queued")
+    stmt = update(EmailLogDB).where(*match).values(status="queued", attempt_count=0, next_attempt_at=now)
+    requeued = session.exec(stmt).rowcount
+    if requeued:
+        record_funnel(session, funnel)
+        publish_enqueued(session, now)
+    session.commit()
+    if requeued:
+        notify_enqueued(now)
+    return requeued
\ No newline at end of file
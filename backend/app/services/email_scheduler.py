@@ -1,66 +1,76 @@
 from __future__ import annotations
+import asyncio
 from datetime import datetime
 import logging
-from apscheduler.schedulers.background import BackgroundScheduler
-from apscheduler.jobstores.sqlalchemy import SQLAlchemyJobStore
+from typing import Optional
+from sqlalchemy import update
+from sqlalchemy.engine import Engine
 from sqlmodel import Session
-from app.db.session import get_engine
+from app.db.session import engine as default_engine
 from app.core.config import get_settings
-from app.services.email_logs import list_due
-from app.services.email_service import send_email
+from app.models.db import EmailLog as EmailLogDB
+from app.services.email_dispatcher import EmailDispatcher
+from app.services.email_logs import claim_logs, list_due, release_logs
+from app.services.email_service import deliver_batch, load_send_context, status_values
+from app.services.email_throttle import get_throttle
+from app.services.funnel import record_funnel, transitions
 
 logger = logging.getLogger(__name__)
 
 
-def _process_due() -> None:
-    engine = get_engine()
-    try:
-        with Session(engine) as session:
-            due = list_due(session, datetime.utcnow())
-            if due:
-                logger.info(f"Email Scheduler: Found {len(due)} emails to send.")
-            for log in due:
-                try:
-                    success, provider_id, error = _send_sync(session, log)
-                    log.status = "sent" if success else "failed"
-                    log.provider_message_id = provider_id
-                    log.error_message = error
-                    log.sent_at = datetime.utcnow() if success else None
-                    session.add(log)
-                    session.commit()
-                except Exception as exc:
-                    logger.error(f"Failed to process email {log.id}: {exc}")
-                    log.status = "failed"
-                    log.error_message = str(exc)
-                    session.add(log)
-                    session.commit()
-    except Exception as exc:
-        logger.error(f"Scheduler connection error: {exc}")
-    finally:
-        engine.dispose()
-
-
-def _send_sync(session: Session, log):
-    import asyncio
+def _process_due(engine: Optional[Engine] = None, shard: Optional[tuple[int, int]] = None) -> Optional[datetime]:
+    """Send one batch of due emails.
 
-    return asyncio.run(send_email(session, log))
+    Returns the time dispatch may resume when the provider throttle deferred part of
+    the batch, so the dispatcher does not spin on logs it cannot send yet. Errors propagate:
+    the dispatcher backs off before the next pass, `drain` stops.
+    """
+    # Claimed logs are used after the claim commits; keep their loaded (pre-claim) values.
+    with Session(engine or default_engine, expire_on_commit=False) as session:
+        now = datetime.utcnow()
+        due = claim_logs(session, list_due(session, now, shard=shard), now)
+        if not due:
+            return None
+        logger.info(f"Email Scheduler: Found {len(due)} emails to send.")
+        ctx = load_send_context(session, due)
+        # The provider rate is split between the shard workers.
+        workers = shard[1] if shard else None
+        results = asyncio.run(deliver_batch(ctx, due, workers))
+        values = [status_values(log, result) for log, result in zip(due, results)]
+        updates = [item for item in values if item]
+        if updates:
+            # Before the UPDATE, which refreshes the statuses of the loaded logs.
+            funnel = transitions(due, values, ctx.leads)
+            session.exec(update(EmailLogDB), params=updates)
+            record_funnel(session, funnel)
+        release_logs(session, [log for log, item in zip(due, values) if item is None])
+        session.commit()
+        if len(updates) < len(due):
+            deferred = len(due) - len(updates)
+            logger.info(f"Email Scheduler: {deferred} emails deferred by provider throttle.")
+            return get_throttle(ctx.settings.email_provider, workers).resume_at()
+    return None
 
 
-def build_scheduler() -> BackgroundScheduler:
+def build_scheduler(engine: Optional[Engine] = None, shard: Optional[tuple[int, int]] = None) -> EmailDispatcher:
     settings = get_settings()
-    jobstores = {
-        "default": SQLAlchemyJobStore(url=settings.database_url)
-    }
-    scheduler = BackgroundScheduler(jobstores=jobstores)
-    # Run immediately on startup (catch up on missed jobs), then every 30s
-    scheduler.add_job(
-        _process_due, 
-        "interval", 
-        seconds=30, 
-        id="email_processor",
-        replace_existing=True,
-        coalesce=True,
-        max_instances=1, 
-        next_run_time=datetime.now()
+    engine = engine or default_engine
+    return EmailDispatcher(
+        process_due=lambda: _process_due(engine, shard),
+        engine=engine,
+        safety_poll_seconds=settings.email_dispatch_safety_poll_seconds,
+        listen=settings.email_dispatch_listen,
+        shard=shard,
     )
-    return scheduler
\ No newline at end of file
+
+
+def drain(engine: Optional[Engine] = None, shard: Optional[tuple[int, int]] = None) -> None:
+    """Process due emails until none are left (or only throttle-deferred ones remain)."""
+    engine = engine or default_engine
+    while True:
+        resume_at = _process_due(engine, shard)
+        if resume_at and resume_at > datetime.utcnow():
+            return
+        with Session(engine) as session:
+            if not list_due(session, datetime.utcnow(), shard=shard):
+                return
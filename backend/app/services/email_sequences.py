@@ -3,6 +3,7 @@ from typing import Optional
 from sqlmodel import Session, select
 from app.models.db import NurtureSequence as NurtureSequenceDB, NurtureStep as NurtureStepDB, LeadMagnet as LeadMagnetDB
 from app.models.schemas import Email, EmailSequence, EmailSequenceCreate, EmailSequenceUpdate
+from app.services.sequence_plans import invalidate_plans
 
 
 def _parse_offset(delay: str) -> int:
@@ -79,6 +80,7 @@ def create_sequence(session: Session, payload: EmailSequenceCreate, campaign_id:
         )
         session.add(step)
     session.commit()
+    invalidate_plans()
     steps = session.exec(select(NurtureStepDB).where(NurtureStepDB.sequence_id == seq.id)).all()
     return _to_schema(seq, steps)
 
@@ -105,6 +107,7 @@ def update_sequence(session: Session, sequence_id: str, payload: EmailSequenceUp
             )
             session.add(step)
     session.commit()
+    invalidate_plans()
     steps = session.exec(select(NurtureStepDB).where(NurtureStepDB.sequence_id == seq.id)).all()
     return _to_schema(seq, steps)
 
@@ -118,4 +121,5 @@ def delete_sequence(session: Session, sequence_id: str) -> bool:
         session.delete(step)
     session.delete(seq)
     session.commit()
+    invalidate_plans()
     return True
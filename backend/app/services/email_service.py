@@ -1,84 +1,232 @@
 from __future__ import annotations
+import asyncio
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta
+from email.utils import parsedate_to_datetime
+import smtplib
 from typing import Optional
+from uuid import uuid4
 import httpx
+from sqlalchemy import insert
 from sqlmodel import Session, select
 from app.models.db import (
     Lead as LeadDB,
     Campaign as CampaignDB,
     LeadMagnet as LeadMagnetDB,
-    NurtureSequence as NurtureSequenceDB,
-    NurtureStep as NurtureStepDB,
     EmailLog as EmailLogDB,
 )
-from app.models.schemas import Lead
+from app.core.config import get_settings
+from app.core.metrics import metrics
+from app.core.send_windows import align, parse_send_window
+from app.models.schemas import Lead, Settings
+from app.services.email_dispatcher import notify_enqueued, publish_enqueued, shard_key_for
+from app.services.email_logs import claim_logs, release_logs
+from app.services.email_throttle import get_throttle
+from app.services.funnel import FunnelDelta, record_funnel, transitions
+from app.services.sequence_plans import plan_for
+from app.services.smtp_pool import SMTPSendError, build_message, get_smtp_pool
 from app.services.settings import get_app_settings
 
 
+def substitutions(lead: LeadDB, campaign: Optional[CampaignDB], lead_magnet: Optional[LeadMagnetDB]) -> dict[str, str]:
+    return {
+        "{{name}}": lead.name or "there",
+        "{{company}}": lead.company or "",
+        "{{lead_magnet_title}}": lead_magnet.title if lead_magnet else "",
+        "{{campaign_name}}": campaign.name if campaign else "",
+    }
+
+
+def with_footer(body: str) -> str:
+    if "{{unsubscribe_url}}" not in body:
+        body += "\n\n---\nUnsubscribe: {{unsubscribe_url}}"
+    return body
+
+
 def render_email(body: str, lead: LeadDB, campaign: Optional[CampaignDB], lead_magnet: Optional[LeadMagnetDB]) -> str:
     rendered = body
-    rendered = rendered.replace("{{name}}", lead.name or "there")
-    rendered = rendered.replace("{{company}}", lead.company or "")
-    rendered = rendered.replace("{{lead_magnet_title}}", lead_magnet.title if lead_magnet else "")
-    rendered = rendered.replace("{{campaign_name}}", campaign.name if campaign else "")
-
-    if "{{unsubscribe_url}}" not in rendered:
-        rendered += "\n\n---\nUnsubscribe: {{unsubscribe_url}}"
-    return rendered
+    for token, value in substitutions(lead, campaign, lead_magnet).items():
+        rendered = rendered.replace(token, value)
+    return with_footer(rendered)
 
 
-def enqueue_sequence_for_lead(session: Session, lead: LeadDB) -> list[EmailLogDB]:
-    seq = None
-    # 1. Try exact Lead Magnet match
-    if lead.lead_magnet_id:
-        seq = session.exec(
-            select(NurtureSequenceDB).where(NurtureSequenceDB.lead_magnet_id == lead.lead_magnet_id)
-        ).first()
-
-    # 2. Fallback: Try Campaign match
-    if not seq and lead.campaign_id:
-        seq = session.exec(
-            select(NurtureSequenceDB).where(NurtureSequenceDB.campaign_id == lead.campaign_id)
-        ).first()
-
-    if not seq:
-        print(f"[WARN] No Nurture Sequence found for Lead {lead.id}")
+def sequence_rows(
+    session: Session,
+    lead_id: str,
+    lead_magnet_id: Optional[str],
+    campaign_id: Optional[str],
+    now: Optional[datetime] = None,
+) -> list[dict]:
+    """email_logs rows (client-side ids) for a lead's nurture sequence, aligned to its send window."""
+    plan = plan_for(session, lead_magnet_id, campaign_id)
+    if not plan:
+        print(f"[WARN] No Nurture Sequence found for Lead {lead_id}")
         return []
 
-    steps = session.exec(
-        select(NurtureStepDB).where(NurtureStepDB.sequence_id == seq.id)
-    ).all()
-    now = datetime.utcnow()
-    logs: list[EmailLogDB] = []
-
-    for step in steps:
+    now = now or datetime.utcnow()
+    shard_key = shard_key_for(lead_id)
+    try:
+        window = parse_send_window(plan.send_window)
+    except ValueError as exc:
+        print(f"[WARN] Ignoring send window for campaign {plan.campaign_id}: {exc}")
+        window = None
+    rows: list[dict] = []
+    for step in plan.steps:
         # Add small buffer to ensure "Day 0" isn't skipped by scheduler timing
         scheduled = now + timedelta(days=step.offset_days)
         if step.offset_days > 0:
             scheduled += timedelta(minutes=5)
-
-        log = EmailLogDB(
-            lead_id=lead.id,
-            sequence_id=seq.id,
-            step_id=step.id,
-            subject=step.subject,
-            body=step.body,
-            status="queued",
-            scheduled_at=scheduled,
+        # Snap to the campaign's send window so leads due around the same time share a batch.
+        scheduled = align(scheduled, window)
+        rows.append(
+            {
+                "id": str(uuid4()),
+                "lead_id": lead_id,
+                "sequence_id": plan.sequence_id,
+                "step_id": step.id,
+                "subject": step.subject,
+                "body": step.body,
+                "status": "queued",
+                "scheduled_at": scheduled,
+                "next_attempt_at": scheduled,
+                "attempt_count": 0,
+                "shard_key": shard_key,
+                "created_at": now,
+            }
         )
-        session.add(log)
-        logs.append(log)
+    return rows
+
+
+def enqueue_sequence_for_lead(session: Session, lead: LeadDB) -> list[EmailLogDB]:
+    rows = sequence_rows(session, lead.id, lead.lead_magnet_id, lead.campaign_id)
+    if not rows:
+        return []
 
+    # One multi-row INSERT with client-side ids; the rows are returned as-is, no refresh.
+    session.exec(insert(EmailLogDB), params=rows)
+    funnel = FunnelDelta()
+    for row in rows:
+        funnel.email(lead.campaign_id, lead.landing_page_id, row["scheduled_at"], row["status"])
+    record_funnel(session, funnel)
+    earliest = min(row["scheduled_at"] for row in rows)
+    publish_enqueued(session, earliest)
     session.commit()
-    for log in logs:
-        session.refresh(log)
-    return logs
+    notify_enqueued(earliest)
+    return [EmailLogDB(**row) for row in rows]
+
+
+@dataclass
+class SendContext:
+    """Everything needed to render and send a batch of logs, loaded up front."""
+
+    settings: Settings
+    leads: dict[str, LeadDB] = field(default_factory=dict)
+    campaigns: dict[str, CampaignDB] = field(default_factory=dict)
+    lead_magnets: dict[str, LeadMagnetDB] = field(default_factory=dict)
+
+
+def _load_by_id(session: Session, model, ids: set[str]) -> dict:
+    if not ids:
+        return {}
+    return {item.id: item for item in session.exec(select(model).where(model.id.in_(ids))).all()}
+
+
+def load_send_context(session: Session, logs: list[EmailLogDB], settings: Optional[Settings] = None) -> SendContext:
+    leads = _load_by_id(session, LeadDB, {log.lead_id for log in logs})
+    return SendContext(
+        settings=settings or get_app_settings(session),
+        leads=leads,
+        campaigns=_load_by_id(session, CampaignDB, {lead.campaign_id for lead in leads.values() if lead.campaign_id}),
+        lead_magnets=_load_by_id(
+            session, LeadMagnetDB, {lead.lead_magnet_id for lead in leads.values() if lead.lead_magnet_id}
+        ),
+    )
+
+
+class EmailProviderError(Exception):
+    """A provider call failed in a way dispatch should react to: 429, 5xx or a timeout."""
+
+    def __init__(
+        self,
+        message: str,
+        status_code: Optional[int] = None,
+        retry_after: Optional[float] = None,
+        error_class: str = "connection",
+    ):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+        self.error_class = error_class
+
+
+RETRYABLE_ERROR_CLASSES = {"timeout", "connection", "rate_limited", "server_error"}
+
+
+@dataclass
+class DeliveryResult:
+    success: bool
+    provider_message_id: Optional[str] = None
+    error_message: Optional[str] = None
+    error_class: Optional[str] = None
+    status_code: Optional[int] = None
+    retry_after: Optional[float] = None
+    # Not attempted (provider throttled or breaker open) - the log stays queued untouched.
+    deferred: bool = False
+
+    @property
+    def retryable(self) -> bool:
+        return self.error_class in RETRYABLE_ERROR_CLASSES
+
+    def as_tuple(self) -> tuple[bool, Optional[str], Optional[str]]:
+        return self.success, self.provider_message_id, self.error_message
+
+
+def retry_delay(attempt: int, retry_after: Optional[float] = None) -> float:
+    """Exponential backoff for the given (1-based) attempt, never shorter than Retry-After."""
+    env = get_settings()
+    delay = min(env.email_retry_max_seconds, env.email_retry_base_seconds * (2 ** max(0, attempt - 1)))
+    return max(delay, retry_after or 0)
+
+
+def status_values(log: EmailLogDB, result: DeliveryResult) -> Optional[dict]:
+    """Column values for a bulk UPDATE of `log` after a send attempt; None leaves it queued."""
+    if result.deferred:
+        return None
+    now = datetime.utcnow()
+    attempts = (log.attempt_count or 0) + 1
+    status = "sent" if result.success else "failed"
+    next_attempt_at = log.next_attempt_at
+    if not result.success and result.retryable:
+        if attempts >= get_settings().email_max_attempts:
+            status = "dead"
+        else:
+            status = "queued"
+            next_attempt_at = now + timedelta(seconds=retry_delay(attempts, result.retry_after))
+    return {
+        "id": log.id,
+        "status": status,
+        "sent_at": now if result.success else None,
+        "provider_message_id": result.provider_message_id,
+        "error_message": result.error_message,
+        "attempt_count": attempts,
+        "next_attempt_at": next_attempt_at,
+        "last_error_class": result.error_class,
+    }
+
+
+def _error_class(exc: EmailProviderError) -> str:
+    if exc.status_code == 429:
+        return "rate_limited"
+    if exc.status_code and exc.status_code >= 500:
+        return "server_error"
+    return exc.error_class
 
 
-async def send_email(session: Session, log: EmailLogDB) -> tuple[bool, Optional[str], Optional[str]]:
-    settings = get_app_settings(session)
+async def deliver_email(ctx: SendContext, log: EmailLogDB) -> DeliveryResult:
+    settings = ctx.settings
     provider_id: Optional[str] = None
     error_message: Optional[str] = None
+    error_class: Optional[str] = None
     success = False
 
     try:
@@ -90,14 +238,15 @@ async def send_email(session: Session, log: EmailLogDB) -> tuple[bool, Optional[
             or ("mlsn." in settings.email_api_key and len(settings.email_api_key) < 20)
         ):
             print(f"[MOCK EMAIL] Simulating MailerSend: To={log.lead_id}")
-            return True, "mock-id", None
+            return DeliveryResult(True, "mock-id")
         else:
-            lead = session.get(LeadDB, log.lead_id)
+            lead = ctx.leads.get(log.lead_id)
             if not lead:
                 error_message = "Lead not found"
+                error_class = "lead_not_found"
             else:
-                campaign = session.get(CampaignDB, lead.campaign_id) if lead.campaign_id else None
-                lead_magnet = session.get(LeadMagnetDB, lead.lead_magnet_id) if lead.lead_magnet_id else None
+                campaign = ctx.campaigns.get(lead.campaign_id) if lead.campaign_id else None
+                lead_magnet = ctx.lead_magnets.get(lead.lead_magnet_id) if lead.lead_magnet_id else None
                 subject = render_email(log.subject, lead, campaign, lead_magnet)
                 body = render_email(log.body, lead, campaign, lead_magnet)
 
@@ -109,27 +258,226 @@ async def send_email(session: Session, log: EmailLogDB) -> tuple[bool, Optional[
                     except httpx.HTTPError as exc:
                         success = False
                         error_message = f"MailerSend client error: {str(exc)}"
+                elif provider == "smtp":
+                    success, provider_id, error_message = await _send_smtp(settings, lead.email, subject, body)
                 elif provider == "mock":
                     print(f"[MOCK EMAIL] To: {lead.email} | Subject: {subject}")
                     success = True
                     provider_id = f"mock-id-{datetime.utcnow().timestamp()}"
                 elif provider == "none":
                     error_message = "Email provider not configured"
+                    error_class = "not_configured"
                 else:
                     error_message = f"Unsupported email provider: {provider}"
+                    error_class = "not_configured"
+                if not success and not error_class:
+                    error_class = "rejected"
+    except EmailProviderError as exc:
+        return DeliveryResult(
+            False,
+            error_message=str(exc),
+            error_class=_error_class(exc),
+            status_code=exc.status_code,
+            retry_after=exc.retry_after,
+        )
     except Exception as exc:
         print(f"Email Sending Exception: {exc}")
         error_message = str(exc)
+        error_class = "exception"
         success = False
 
-    log.status = "sent" if success else "failed"
-    log.sent_at = datetime.utcnow() if success else None
-    log.provider_message_id = provider_id
-    log.error_message = error_message
-    session.add(log)
+    return DeliveryResult(success, provider_id, error_message, error_class)
+
+
+@dataclass
+class BulkRecipient:
+    email: str
+    subject: str
+    text: str
+    substitutions: dict[str, str]
+
+
+def coalesce(logs: list[EmailLogDB], max_size: int) -> list[list[EmailLogDB]]:
+    """Group logs that share a subject/body template (same nurture step), in first-seen order.
+
+    Send windows line many leads up on the same `next_attempt_at`, so a due batch is mostly
+    a handful of templates; each group can go out as one provider request.
+    """
+    groups: dict[tuple[str, str], list[EmailLogDB]] = {}
+    for log in logs:
+        groups.setdefault((log.subject, log.body), []).append(log)
+    chunks: list[list[EmailLogDB]] = []
+    for group in groups.values():
+        chunks.extend(group[idx : idx + max_size] for idx in range(0, len(group), max(1, max_size)))
+    return chunks
+
+
+def _bulk_sender(settings: Settings):
+    if not get_settings().email_bulk_enabled:
+        return None
+    provider = (settings.email_provider or "none").lower()
+    if provider == "sendgrid" and settings.email_api_key:
+        return _send_sendgrid_bulk
+    if provider == "mailersend" and settings.email_api_key and not (
+        "mlsn." in settings.email_api_key and len(settings.email_api_key) < 20
+    ):
+        return _send_mailersend_bulk
+    return None
+
+
+async def deliver_bulk(ctx: SendContext, logs: list[EmailLogDB], sender) -> list[DeliveryResult]:
+    """Send logs sharing one template in a single provider request; every log gets the request's result."""
+    results: dict[str, DeliveryResult] = {}
+    recipients: list[tuple[EmailLogDB, BulkRecipient]] = []
+    for log in logs:
+        lead = ctx.leads.get(log.lead_id)
+        if not lead:
+            results[log.id] = DeliveryResult(False, error_message="Lead not found", error_class="lead_not_found")
+            continue
+        campaign = ctx.campaigns.get(lead.campaign_id) if lead.campaign_id else None
+        lead_magnet = ctx.lead_magnets.get(lead.lead_magnet_id) if lead.lead_magnet_id else None
+        recipients.append(
+            (
+                log,
+                BulkRecipient(
+                    email=lead.email,
+                    subject=render_email(log.subject, lead, campaign, lead_magnet),
+                    text=render_email(log.body, lead, campaign, lead_magnet),
+                    substitutions=substitutions(lead, campaign, lead_magnet),
+                ),
+            )
+        )
+    if recipients:
+        try:
+            success, provider_id, error_message = await sender(
+                ctx.settings, with_footer(logs[0].body), [recipient for _, recipient in recipients]
+            )
+            shared = DeliveryResult(success, provider_id, error_message, None if success else "rejected")
+        except EmailProviderError as exc:
+            shared = DeliveryResult(
+                False,
+                error_message=str(exc),
+                error_class=_error_class(exc),
+                status_code=exc.status_code,
+                retry_after=exc.retry_after,
+            )
+        except Exception as exc:
+            print(f"Email Sending Exception: {exc}")
+            shared = DeliveryResult(False, error_message=str(exc), error_class="exception")
+        for log, _ in recipients:
+            results[log.id] = shared
+    return [results[log.id] for log in logs]
+
+
+async def deliver_batch(
+    ctx: SendContext, logs: list[EmailLogDB], workers: Optional[int] = None
+) -> list[DeliveryResult]:
+    """Send `logs`, pacing provider requests through the provider's throttle.
+
+    With a bulk-capable provider, logs sharing a template are coalesced into one request
+    (one throttle token). Up to EMAIL_SEND_CONCURRENCY requests are in flight at once, so
+    the throttle rather than round-trip latency bounds throughput. Logs that cannot be sent
+    because the provider is rate limiting us or its circuit breaker is open come back
+    deferred and stay queued. `workers` is the number of dispatch processes sharing the
+    provider's rate (see get_throttle).
+    """
+    provider = (ctx.settings.email_provider or "none").lower()
+    throttle = get_throttle(provider, workers)
+    sender = _bulk_sender(ctx.settings)
+    if sender:
+        groups = coalesce(logs, get_settings().email_bulk_max_recipients)
+    else:
+        groups = [[log] for log in logs]
+    # SMTP requests each hold a pooled connection; more in flight would only queue for one.
+    limit = get_settings().email_send_concurrency
+    if provider == "smtp":
+        limit = min(limit, get_settings().smtp_pool_size)
+    semaphore = asyncio.Semaphore(max(1, limit))
+
+    results: dict[str, DeliveryResult] = {}
+
+    async def send_group(group: list[EmailLogDB]) -> None:
+        async with semaphore:
+            if not await throttle.acquire():
+                for log in group:
+                    results[log.id] = DeliveryResult(False, deferred=True)
+                return
+            if len(group) == 1:
+                group_results = [await deliver_email(ctx, group[0])]
+            else:
+                group_results = await deliver_bulk(ctx, group, sender)
+        metrics.inc("email_provider_requests_total", provider=provider)
+
+        # Every log in a group shares the request's outcome; missing leads never reached the provider.
+        request = next((result for result in group_results if result.error_class != "lead_not_found"), None)
+        if request and request.success:
+            throttle.record_success()
+        elif request and request.error_class == "rate_limited":
+            throttle.record_throttled(request.retry_after)
+        elif request and request.retryable:
+            throttle.record_failure()
+        for log, result in zip(group, group_results):
+            if result.success:
+                outcome = "sent"
+            elif result.error_class == "rate_limited":
+                outcome = "throttled"
+            elif result.retryable:
+                outcome = "retryable_error"
+            else:
+                outcome = "failed"
+            metrics.inc("email_sends_total", provider=provider, outcome=outcome)
+            results[log.id] = result
+
+    await asyncio.gather(*(send_group(group) for group in groups))
+    return [results[log.id] for log in logs]
+
+
+async def send_email(
+    session: Session, log: EmailLogDB, due_by: Optional[datetime] = None
+) -> tuple[bool, Optional[str], Optional[str]]:
+    """Send one queued log due by `due_by` (default now), unless another sender already claimed it.
+
+    `session` must not expire on commit: the claim commits before the log's values are used.
+    """
+    if not claim_logs(session, [log], due_by or datetime.utcnow()):
+        return False, None, "Already claimed by another sender"
+    ctx = load_send_context(session, [log])
+    result = (await deliver_batch(ctx, [log]))[0]
+    values = status_values(log, result)
+    if values:
+        funnel = transitions([log], [values], ctx.leads)
+        for key, value in values.items():
+            setattr(log, key, value)
+        session.add(log)
+        record_funnel(session, funnel)
+    else:
+        release_logs(session, [log])
     session.commit()
-    session.refresh(log)
-    return success, provider_id, error_message
+    return result.as_tuple()
+
+
+def _retry_after(response: httpx.Response) -> Optional[float]:
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, (when - datetime.now(when.tzinfo)).total_seconds())
+
+
+def _raise_for_provider_status(name: str, response: httpx.Response, message: str) -> None:
+    if response.status_code == 429 or response.status_code >= 500:
+        raise EmailProviderError(
+            f"{name} {response.status_code}: {message}",
+            status_code=response.status_code,
+            retry_after=_retry_after(response),
+        )
 
 
 async def _send_sendgrid(settings, to_email: str, subject: str, body: str) -> tuple[bool, Optional[str], Optional[str]]:
@@ -140,14 +488,20 @@ async def _send_sendgrid(settings, to_email: str, subject: str, body: str) -> tu
         "from": {"email": settings.email_from or "no-reply@genieops.ai", "name": settings.email_from_name or "GenieOps"},
         "content": [{"type": "text/plain", "value": body}],
     }
-    async with httpx.AsyncClient(timeout=30) as client:
-        response = await client.post(
-            "https://api.sendgrid.com/v3/mail/send",
-            headers={"Authorization": f"Bearer {settings.email_api_key}"},
-            json=payload,
-        )
+    try:
+        async with httpx.AsyncClient(timeout=30) as client:
+            response = await client.post(
+                get_settings().sendgrid_api_url,
+                headers={"Authorization": f"Bearer {settings.email_api_key}"},
+                json=payload,
+            )
+    except httpx.TimeoutException:
+        raise EmailProviderError("SendGrid connection timed out", error_class="timeout")
+    except httpx.TransportError as exc:
+        raise EmailProviderError(f"SendGrid connection error: {exc}")
     if response.status_code in (200, 202):
         return True, response.headers.get("X-Message-Id"), None
+    _raise_for_provider_status("SendGrid", response, response.text)
     return False, None, response.text
 
 
@@ -166,22 +520,103 @@ async def _send_mailersend(settings, to_email: str, subject: str, body: str) ->
     try:
         async with httpx.AsyncClient(timeout=10) as client:
             response = await client.post(
-                "https://api.mailersend.com/v1/email",
+                get_settings().mailersend_api_url,
                 headers={
                     "Authorization": f"Bearer {settings.email_api_key}",
                     "Content-Type": "application/json",
                 },
                 json=payload,
             )
-        if response.status_code in (200, 202):
-            return True, response.headers.get("X-Message-Id", "sent"), None
-        try:
-            err_data = response.json()
-            err_msg = err_data.get("message") or str(err_data)
-        except Exception:
-            err_msg = response.text
-        return False, None, f"MailerSend {response.status_code}: {err_msg}"
     except httpx.TimeoutException:
-        return False, None, "MailerSend connection timed out"
+        raise EmailProviderError("MailerSend connection timed out", error_class="timeout")
+    except httpx.TransportError as exc:
+        raise EmailProviderError(f"MailerSend connection error: {exc}")
     except Exception as e:
-        return False, None, f"MailerSend client error: {str(e)}"
\ No newline at end of file
+        return False, None, f"MailerSend client error: {str(e)}"
+    if response.status_code in (200, 202):
+        return True, response.headers.get("X-Message-Id", "sent"), None
+    try:
+        err_data = response.json()
+        err_msg = err_data.get("message") or str(err_data)
+    except Exception:
+        err_msg = response.text
+    _raise_for_provider_status("MailerSend", response, err_msg)
+    return False, None, f"MailerSend {response.status_code}: {err_msg}"
+
+
+async def _send_smtp(settings, to_email: str, subject: str, body: str) -> tuple[bool, Optional[str], Optional[str]]:
+    sender = settings.email_from or "no-reply@genieops.ai"
+    message = build_message(sender, settings.email_from_name or "GenieOps", to_email, subject, body)
+    try:
+        pool = get_smtp_pool(password=settings.email_api_key)
+    except ValueError as exc:
+        raise EmailProviderError(str(exc), error_class="not_configured")
+    try:
+        # smtplib is blocking; run on a worker thread so the event loop keeps pacing other sends.
+        reply = await asyncio.to_thread(pool.send, sender, [to_email], message.as_bytes())
+    except SMTPSendError as exc:
+        if exc.transient:
+            raise EmailProviderError(str(exc), error_class="server_error")
+        return False, None, str(exc)
+    except TimeoutError:
+        raise EmailProviderError("SMTP connection timed out", error_class="timeout")
+    except (smtplib.SMTPException, OSError) as exc:
+        raise EmailProviderError(f"SMTP connection error: {exc}")
+    return True, reply, None
+
+
+async def _send_sendgrid_bulk(settings, body: str, recipients: list[BulkRecipient]) -> tuple[bool, Optional[str], Optional[str]]:
+    # One request, one personalization per lead; SendGrid fills the {{tokens}} in the shared body.
+    payload = {
+        "personalizations": [
+            {"to": [{"email": r.email}], "subject": r.subject, "substitutions": r.substitutions} for r in recipients
+        ],
+        "from": {"email": settings.email_from or "no-reply@genieops.ai", "name": settings.email_from_name or "GenieOps"},
+        "content": [{"type": "text/plain", "value": body}],
+    }
+    try:
+        async with httpx.AsyncClient(timeout=30) as client:
+            response = await client.post(
+                get_settings().sendgrid_api_url,
+                headers={"Authorization": f"Bearer {settings.email_api_key}"},
+                json=payload,
+            )
+    except httpx.TimeoutException:
+        raise EmailProviderError("SendGrid connection timed out", error_class="timeout")
+    except httpx.TransportError as exc:
+        raise EmailProviderError(f"SendGrid connection error: {exc}")
+    if response.status_code in (200, 202):
+        return True, response.headers.get("X-Message-Id"), None
+    _raise_for_provider_status("SendGrid", response, response.text)
+    return False, None, response.text
+
+
+async def _send_mailersend_bulk(settings, body: str, recipients: list[BulkRecipient]) -> tuple[bool, Optional[str], Optional[str]]:
+    sender = {"email": settings.email_from or "no-reply@genieops.ai", "name": settings.email_from_name or "GenieOps"}
+    payload = [{"from": sender, "to": [{"email": r.email}], "subject": r.subject, "text": r.text} for r in recipients]
+    try:
+        async with httpx.AsyncClient(timeout=30) as client:
+            response = await client.post(
+                get_settings().mailersend_bulk_api_url,
+                headers={
+                    "Authorization": f"Bearer {settings.email_api_key}",
+                    "Content-Type": "application/json",
+                },
+                json=payload,
+            )
+    except httpx.TimeoutException:
+        raise EmailProviderError("MailerSend connection timed out", error_class="timeout")
+    except httpx.TransportError as exc:
+        raise EmailProviderError(f"MailerSend connection error: {exc}")
+    if response.status_code in (200, 202):
+        try:
+            bulk_id = response.json().get("bulk_email_id")
+        except Exception:
+            bulk_id = None
+        return True, bulk_id or response.headers.get("X-Message-Id", "sent"), None
+    try:
+        err_msg = response.json().get("message") or response.text
+    except Exception:
+        err_msg = response.text
+    _raise_for_provider_status("MailerSend", response, err_msg)
+    return False, None, f"MailerSend {response.status_code}: {err_msg}"
@@ -0,0 +1,189 @@
+from __future__ import annotations
+import asyncio
+from datetime import datetime, timedelta
+import math
+import threading
+import time
+from typing import Optional
+from app.core.config import get_settings
+from app.core.metrics import gauge_key, metrics
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+_BREAKER_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class ProviderThrottle:
+    """Token bucket with AIMD rate adaptation and a circuit breaker for one email provider.
+
+    The send rate grows additively after successes and is cut multiplicatively on a 429,
+    honouring `Retry-After`. Consecutive unhealthy responses (5xx, timeouts, 429 storms)
+    open the breaker; while open no tokens are handed out and callers leave work queued.
+    A rate of 0 disables rate limiting but keeps the breaker.
+    """
+
+    def __init__(
+        self,
+        provider: str,
+        rate: float,
+        burst: int,
+        min_rate: float = 0.5,
+        increase_step: float = 0.5,
+        decrease_factor: float = 0.5,
+        failure_threshold: int = 5,
+        cooldown_seconds: float = 60.0,
+    ):
+        self.provider = provider
+        self.max_rate = rate
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.min_rate = min(min_rate, rate) if rate > 0 else 0
+        self.increase_step = increase_step
+        self.decrease_factor = decrease_factor
+        self.failure_threshold = failure_threshold
+        self.cooldown_seconds = cooldown_seconds
+        self.tokens = float(self.burst)
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._open_until = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        if self.rate > 0:
+            self.tokens = min(self.burst, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self) -> Optional[float]:
+        """Take a token; returns 0 on success, seconds to wait, or None while the breaker is open."""
+        with self._lock:
+            now = time.monotonic()
+            if self.state == OPEN:
+                if now < self._open_until:
+                    return None
+                self.state = HALF_OPEN
+                self._trial_in_flight = False
+            if self.state == HALF_OPEN:
+                if self._trial_in_flight:
+                    return None
+                self._trial_in_flight = True
+                return 0.0
+            if now < self._paused_until:
+                return self._paused_until - now
+            if self.rate <= 0:
+                return 0.0
+            self._refill(now)
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0.0
+            return (1 - self.tokens) / self.rate
+
+    async def acquire(self, max_wait: float = 5.0) -> bool:
+        """Wait for a token; False if the breaker is open or the wait would exceed `max_wait`."""
+        while True:
+            wait = self.reserve()
+            if wait is None or wait > max_wait:
+                return False
+            if wait <= 0:
+                return True
+            await asyncio.sleep(wait)
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.consecutive_failures = 0
+            self.state = CLOSED
+            self._trial_in_flight = False
+            if self.max_rate > 0:
+                self.rate = min(self.max_rate, self.rate + self.increase_step)
+
+    def record_throttled(self, retry_after: Optional[float] = None) -> None:
+        with self._lock:
+            now = time.monotonic()
+            if self.max_rate > 0:
+                self.rate = max(self.min_rate, self.rate * self.decrease_factor)
+                self.tokens = 0
+                self._updated = now
+            if retry_after:
+                self._paused_until = max(self._paused_until, now + retry_after)
+            self._record_failure(now, retry_after)
+        metrics.inc("email_provider_throttled_total", provider=self.provider)
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._record_failure(time.monotonic(), None)
+
+    def _record_failure(self, now: float, retry_after: Optional[float]) -> None:
+        self.consecutive_failures += 1
+        self._trial_in_flight = False
+        if self.state == HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            if self.state != OPEN:
+                metrics.inc("email_provider_breaker_opened_total", provider=self.provider)
+            self.state = OPEN
+            self._open_until = now + max(self.cooldown_seconds, retry_after or 0)
+
+    def resume_at(self) -> datetime:
+        """Wall-clock time at which sending to this provider may resume."""
+        with self._lock:
+            blocked_until = max(self._paused_until, self._open_until if self.state == OPEN else 0.0)
+            delay = max(0.0, blocked_until - time.monotonic())
+        return datetime.utcnow() + timedelta(seconds=delay)
+
+    def snapshot(self) -> dict[str, float]:
+        with self._lock:
+            self._refill(time.monotonic())
+            labels = {"provider": self.provider}
+            return {
+                gauge_key("email_throttle_rate", **labels): self.rate,
+                gauge_key("email_throttle_tokens", **labels): self.tokens,
+                gauge_key("email_breaker_state", **labels): _BREAKER_STATE_VALUES[self.state],
+                gauge_key("email_breaker_consecutive_failures", **labels): self.consecutive_failures,
+            }
+
+
+_throttles: dict[str, ProviderThrottle] = {}
+_throttles_lock = threading.Lock()
+
+
+def get_throttle(provider: str, workers: Optional[int] = None) -> ProviderThrottle:
+    """The process's throttle for `provider`, created on first use.
+
+    `workers` is the number of processes dispatching in parallel (a sharded worker's shard
+    count); the larger of it and EMAIL_DISPATCH_WORKERS divides the provider's rate.
+    """
+    provider = (provider or "none").lower()
+    with _throttles_lock:
+        throttle = _throttles.get(provider)
+        if throttle is None:
+            settings = get_settings()
+            # The configured rate is the provider's limit; it is shared by every dispatching process.
+            workers = max(1, settings.email_dispatch_workers, workers or 1)
+            throttle = ProviderThrottle(
+                provider,
+                rate=settings.email_rate_limits.get(provider, 0.0) / workers,
+                burst=math.ceil(settings.email_rate_burst / workers),
+                failure_threshold=settings.email_breaker_failure_threshold,
+                cooldown_seconds=settings.email_breaker_cooldown_seconds,
+            )
+            _throttles[provider] = throttle
+        return throttle
+
+
+def reset_throttles() -> None:
+    with _throttles_lock:
+        _throttles.clear()
+
+
+def _collect() -> dict[str, float]:
+    with _throttles_lock:
+        throttles = list(_throttles.values())
+    values: dict[str, float] = {}
+    for throttle in throttles:
+        values.update(throttle.snapshot())
+    return values
+
+
+metrics.register_collector(_collect)
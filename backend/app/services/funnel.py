@@ -0,0 +1,233 @@
+"""Funnel rollups: leads and email outcomes per (campaign, landing page, day).
+
+Writers fold their changes into a FunnelDelta and call `record_funnel` in the same
+transaction: lead capture adds a lead and its queued emails, dispatch moves emails between
+status columns, requeueing moves dead letters back to queued. /api/analytics/funnel reads
+only funnel_rollups; `rebuild_funnel_rollups` recomputes it from the raw tables.
+"""
+from __future__ import annotations
+from collections import Counter
+from datetime import date, datetime, timezone
+from typing import Iterable, Optional
+from sqlalchemy import delete, func, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Engine
+from sqlmodel import Session, select
+from app.core.metrics import metrics
+from app.models.db import (
+    EmailLog as EmailLogDB,
+    EmailLogArchive as EmailLogArchiveDB,
+    FunnelRollup as FunnelRollupDB,
+    Lead as LeadDB,
+)
+from app.models.schemas import FunnelCounts, FunnelReport, FunnelRow
+
+STATUS_COLUMNS = {
+    "queued": "emails_queued",
+    "sent": "emails_sent",
+    "failed": "emails_failed",
+    "dead": "emails_dead",
+}
+COLUMNS = ("leads",) + tuple(STATUS_COLUMNS.values())
+GROUPS = {
+    "day": (FunnelRollupDB.day,),
+    "campaign": (FunnelRollupDB.campaign_id,),
+    "landing_page": (FunnelRollupDB.campaign_id, FunnelRollupDB.landing_page_id),
+}
+
+_UPSERT_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+
+def _day(value: Optional[datetime]) -> date:
+    if value is None:
+        return datetime.utcnow().date()
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc)
+    return value.date()
+
+
+class FunnelDelta:
+    """Pending counter changes, keyed by (campaign, landing page, day, column)."""
+
+    def __init__(self):
+        self.counts: Counter[tuple[str, str, date, str]] = Counter()
+
+    def __bool__(self) -> bool:
+        return any(self.counts.values())
+
+    def lead(self, campaign_id: Optional[str], landing_page_id: Optional[str], created_at: Optional[datetime]) -> None:
+        self.counts[(campaign_id or "", landing_page_id or "", _day(created_at), "leads")] += 1
+
+    def email(
+        self,
+        campaign_id: Optional[str],
+        landing_page_id: Optional[str],
+        scheduled_at: Optional[datetime],
+        status: str,
+        count: int = 1,
+    ) -> None:
+        column = STATUS_COLUMNS.get(status)
+        if column:
+            self.counts[(campaign_id or "", landing_page_id or "", _day(scheduled_at), column)] += count
+
+    def transition(
+        self,
+        campaign_id: Optional[str],
+        landing_page_id: Optional[str],
+        scheduled_at: Optional[datetime],
+        old: str,
+        new: str,
+    ) -> None:
+        if old != new:
+            self.email(campaign_id, landing_page_id, scheduled_at, old, -1)
+            self.email(campaign_id, landing_page_id, scheduled_at, new)
+
+    def capture(
+        self, campaign_id: Optional[str], landing_page_id: Optional[str], created_at: datetime, logs: list[dict]
+    ) -> None:
+        """A new lead plus its freshly queued email_logs rows."""
+        self.lead(campaign_id, landing_page_id, created_at)
+        for row in logs:
+            self.email(campaign_id, landing_page_id, row["scheduled_at"], row["status"])
+
+    def rows(self) -> list[dict]:
+        now = datetime.utcnow()
+        rows: dict[tuple[str, str, date], dict] = {}
+        for (campaign_id, landing_page_id, day, column), count in self.counts.items():
+            if not count:
+                continue
+            row = rows.setdefault(
+                (campaign_id, landing_page_id, day),
+                {"campaign_id": campaign_id, "landing_page_id": landing_page_id, "day": day, "updated_at": now}
+                | {name: 0 for name in COLUMNS},
+            )
+            row[column] += count
+        # Sorted so concurrent writers lock rows in the same order.
+        return [rows[key] for key in sorted(rows)]
+
+
+def transitions(logs: Iterable[EmailLogDB], values: Iterable[Optional[dict]], leads: dict[str, LeadDB]) -> FunnelDelta:
+    """Delta for status updates about to be written (`values` as from status_values) for `logs`."""
+    delta = FunnelDelta()
+    for log, value in zip(logs, values):
+        lead = leads.get(log.lead_id)
+        if value is None or lead is None:
+            continue
+        delta.transition(lead.campaign_id, lead.landing_page_id, log.scheduled_at or log.created_at, log.status, value["status"])
+    return delta
+
+
+def record_funnel(session: Session, delta: FunnelDelta) -> None:
+    """Add `delta` to funnel_rollups in the caller's transaction; the caller commits."""
+    rows = delta.rows()
+    if not rows:
+        return
+    upsert = _UPSERT_INSERTS.get(session.get_bind().dialect.name)
+    if upsert is not None:
+        stmt = upsert(FunnelRollupDB)
+        changes = {name: getattr(FunnelRollupDB, name) + getattr(stmt.excluded, name) for name in COLUMNS}
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["campaign_id", "landing_page_id", "day"],
+            set_={**changes, "updated_at": stmt.excluded.updated_at},
+        )
+        session.exec(stmt, params=rows)
+        return
+    for row in rows:
+        updated = session.exec(
+            update(FunnelRollupDB)
+            .where(
+                FunnelRollupDB.campaign_id == row["campaign_id"],
+                FunnelRollupDB.landing_page_id == row["landing_page_id"],
+                FunnelRollupDB.day == row["day"],
+            )
+            .values(
+                updated_at=row["updated_at"],
+                **{name: getattr(FunnelRollupDB, name) + row[name] for name in COLUMNS},
+            )
+        )
+        if not updated.rowcount:
+            session.add(FunnelRollupDB(**row))
+
+
+def funnel_report(
+    session: Session,
+    campaign_id: Optional[str] = None,
+    landing_page_id: Optional[str] = None,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    group_by: str = "day",
+) -> FunnelReport:
+    """Summed rollups between `start` and `end` (inclusive), one row per `group_by` value."""
+    keys = GROUPS[group_by]
+    sums = [func.coalesce(func.sum(getattr(FunnelRollupDB, name)), 0).label(name) for name in COLUMNS]
+    stmt = select(*keys, *sums)
+    if campaign_id:
+        stmt = stmt.where(FunnelRollupDB.campaign_id == campaign_id)
+    if landing_page_id:
+        stmt = stmt.where(FunnelRollupDB.landing_page_id == landing_page_id)
+    if start:
+        stmt = stmt.where(FunnelRollupDB.day >= start)
+    if end:
+        stmt = stmt.where(FunnelRollupDB.day <= end)
+    rows = []
+    for row in session.exec(stmt.group_by(*keys).order_by(*keys)).all():
+        group = dict(zip((key.key for key in keys), row[: len(keys)]))
+        counts = dict(zip(COLUMNS, row[len(keys) :]))
+        rows.append(
+            FunnelRow(
+                campaign_id=group.get("campaign_id") or None,
+                landing_page_id=group.get("landing_page_id") or None,
+                day=group.get("day"),
+                **counts,
+            )
+        )
+    totals = FunnelCounts(**{name: sum(getattr(row, name) for row in rows) for name in COLUMNS})
+    return FunnelReport(group_by=group_by, totals=totals, rows=rows)
+
+
+def delete_campaign_rollups(session: Session, campaign_id: str) -> None:
+    """Drop a deleted campaign's rollups; the caller commits."""
+    session.exec(delete(FunnelRollupDB).where(FunnelRollupDB.campaign_id == campaign_id))
+
+
+def rebuild_funnel_rollups(engine: Optional[Engine] = None, batch_size: int = 1000) -> int:
+    """Recompute funnel_rollups from leads, email_logs and email_logs_archive; returns rows written.
+
+    Leads are read in id order, `batch_size` at a time with their emails, and folded into the
+    table batch by batch inside one transaction, so readers see the old rollups until it commits.
+    """
+    if engine is None:
+        from app.db.session import engine
+    from app.services.leads import lead_campaign_id
+
+    batch_size = max(1, batch_size)
+    with Session(engine) as session:
+        session.exec(delete(FunnelRollupDB))
+        after = ""
+        while True:
+            leads = session.exec(
+                select(LeadDB.id, lead_campaign_id(), LeadDB.landing_page_id, LeadDB.created_at)
+                .where(LeadDB.id > after)
+                .order_by(LeadDB.id)
+                .limit(batch_size)
+            ).all()
+            if not leads:
+                break
+            delta = FunnelDelta()
+            keys = {}
+            for lead_id, campaign_id, landing_page_id, created_at in leads:
+                keys[lead_id] = (campaign_id, landing_page_id)
+                delta.lead(campaign_id, landing_page_id, created_at)
+            for model in (EmailLogDB, EmailLogArchiveDB):
+                emails = session.exec(
+                    select(model.lead_id, model.status, func.coalesce(model.scheduled_at, model.created_at))
+                    .where(model.lead_id.in_(keys))
+                ).all()
+                for lead_id, status, scheduled_at in emails:
+                    delta.email(*keys[lead_id], scheduled_at, status)
+            record_funnel(session, delta)
+            after = leads[-1][0]
+        session.commit()
+        written = session.exec(select(func.count()).select_from(FunnelRollupDB)).one()
+    metrics.inc("funnel_rollup_rebuilds_total")
+    return written
@@ -1,10 +1,12 @@
 from __future__ import annotations
 from datetime import datetime
 from sqlmodel import Session
-from app.models.db import Asset as AssetDB, LandingPage as LandingPageDB, LeadMagnet as LeadMagnetDB
+from app.models.db import Asset as AssetDB, Campaign as CampaignDB, LandingPage as LandingPageDB, LeadMagnet as LeadMagnetDB
 from app.models.schemas import Asset, LandingPage, LeadMagnet, LeadMagnetType
 
 
+from app.services.landing_render import apply_render
+from app.services.landing_resolver import invalidate_landings
 from app.services.llm_service import LLMClient, ideate_lead_magnets
 from app.core.config import get_settings
 
@@ -48,9 +50,12 @@ def generate_asset_and_landing(session: Session, lead_magnet_id: str) -> tuple[A
         sections=None,
         form_schema=None,
     )
+    campaign = session.get(CampaignDB, lead_magnet.campaign_id) if lead_magnet.campaign_id else None
+    apply_render(landing_db, campaign.product_context if campaign else None)
     session.add(asset_db)
     session.add(landing_db)
     session.commit()
+    invalidate_landings()
     session.refresh(asset_db)
     session.refresh(landing_db)
 
@@ -0,0 +1,469 @@
+from __future__ import annotations
+from collections import OrderedDict
+from functools import lru_cache
+import hashlib
+import json
+import threading
+from typing import Optional
+import bleach
+from bleach.css_sanitizer import CSSSanitizer
+from sqlalchemy import or_
+from sqlalchemy.engine import Engine
+from sqlmodel import Session, select
+from app.core.config import get_settings
+from app.core.metrics import metrics
+from app.models.db import (
+    Campaign as CampaignDB,
+    LandingPage as LandingPageDB,
+    LandingPageVariant as LandingPageVariantDB,
+    LeadMagnet as LeadMagnetDB,
+)
+from app.services.landing_resolver import ResolvedLanding, ResolvedVariant, invalidate_landings
+
+# Bump when the allow-lists or injected markup change so cached/stored renders are redone.
+SANITIZER_VERSION = 2
+
+ALLOWED_CSS_PROPERTIES = [
+    "color",
+    "background",
+    "background-color",
+    "font",
+    "font-size",
+    "font-weight",
+    "font-family",
+    "text-align",
+    "text-decoration",
+    "margin",
+    "margin-top",
+    "margin-right",
+    "margin-bottom",
+    "margin-left",
+    "padding",
+    "padding-top",
+    "padding-right",
+    "padding-bottom",
+    "padding-left",
+    "border",
+    "border-radius",
+    "display",
+    "width",
+    "height",
+    "max-width",
+    "min-width",
+    "max-height",
+    "min-height",
+]
+
+ALLOWED_TAGS = [
+    "html",
+    "head",
+    "body",
+    "title",
+    "meta",
+    "link",
+    "style",
+    "div",
+    "span",
+    "p",
+    "h1",
+    "h2",
+    "h3",
+    "h4",
+    "h5",
+    "h6",
+    "a",
+    "img",
+    "ul",
+    "ol",
+    "li",
+    "br",
+    "hr",
+    "strong",
+    "em",
+    "b",
+    "i",
+    "section",
+    "header",
+    "footer",
+    "main",
+    "form",
+    "input",
+    "button",
+    "label",
+    "textarea",
+    "select",
+    "option",
+    "table",
+    "thead",
+    "tbody",
+    "tr",
+    "th",
+    "td",
+]
+
+ALLOWED_ATTRS = {
+    "*": ["class", "style", "id"],
+    "a": ["href", "title", "target", "rel"],
+    "img": ["src", "alt", "title"],
+    "input": ["type", "name", "value", "placeholder", "required"],
+    "button": ["type"],
+    "form": ["action", "method"],
+    "textarea": ["name", "placeholder", "required", "rows", "cols"],
+    "select": ["name"],
+    "option": ["value"],
+    "meta": ["charset", "name", "content"],
+    "link": ["rel", "href"],
+}
+
+_cleaner_lock = threading.Lock()
+
+
+@lru_cache(maxsize=1)
+def _cleaner() -> bleach.sanitizer.Cleaner:
+    # Built once (on first use, as CSSSanitizer needs tinycss2) instead of on every page view.
+    return bleach.sanitizer.Cleaner(
+        tags=ALLOWED_TAGS,
+        attributes=ALLOWED_ATTRS,
+        protocols=["http", "https", "mailto"],
+        css_sanitizer=CSSSanitizer(allowed_css_properties=ALLOWED_CSS_PROPERTIES),
+        strip=True,
+    )
+
+
+def sanitize_html(html_content: str) -> str:
+    # Cleaner holds parser state and is not thread-safe.
+    with _cleaner_lock:
+        return _cleaner().clean(html_content)
+
+
+def brand(product_context: Optional[dict]) -> tuple[Optional[str], Optional[str]]:
+    product_context = product_context or {}
+    logo_url = product_context.get("logo_url") or product_context.get("logoUrl")
+    company_name = product_context.get("company_name") or product_context.get("companyName")
+    return logo_url, company_name
+
+
+def _inject_brand(html_content: str, logo_url: Optional[str], company_name: Optional[str]) -> str:
+    if not logo_url:
+        return html_content
+    name_html = f"<span style=\"font-family:Inter,system-ui,sans-serif;font-weight:600;color:#111827;\">{company_name}</span>" if company_name else ""
+    logo_html = (
+        "<div id=\"brand-nav\" style=\"display:flex;align-items:center;gap:12px;"
+        "padding:16px 24px;border-bottom:1px solid #e5e7eb;background:#ffffff;"
+        "position:sticky;top:0;z-index:10;\">"
+        f"<img src=\"{logo_url}\" alt=\"{company_name or 'Logo'}\" style=\"height:32px;width:auto;\"/>"
+        f"{name_html}"
+        "</div>"
+    )
+
+    lower = html_content.lower()
+    body_idx = lower.find("<body")
+    if body_idx != -1:
+        close_idx = html_content.find(">", body_idx)
+        if close_idx != -1:
+            return html_content[: close_idx + 1] + logo_html + html_content[close_idx + 1 :]
+    return logo_html + html_content
+
+
+def _inject_form_script(
+    html_content: str,
+    slug: str,
+    api_base: str = "",
+    variant: Optional[str] = None,
+    thank_you_url: Optional[str] = None,
+) -> str:
+    if "<script>" in html_content:
+        return html_content
+    # Variant pages report the arm the visitor saw with the submission.
+    variant_field = f"\n                data._variant = {json.dumps(variant)};" if variant else ""
+    # Exported pages go to their exported thank-you page; the app follows the server's redirect_url.
+    redirect = json.dumps(thank_you_url) if thank_you_url else "result.redirect_url"
+    script = f"""
+        <script>
+          document.addEventListener('DOMContentLoaded', function() {{
+            const forms = document.querySelectorAll('form');
+            forms.forEach(form => {{
+              form.addEventListener('submit', async (e) => {{
+                e.preventDefault();
+                const formData = new FormData(form);
+                const data = Object.fromEntries(formData.entries());
+
+                // Add honeypot if missing from DOM
+                data._honeypot = "";{variant_field}
+
+                try {{
+                  const res = await fetch('{api_base}/public/lp/{slug}/submit', {{
+                    method: 'POST',
+                    headers: {{'Content-Type': 'application/json'}},
+                    body: JSON.stringify(data)
+                  }});
+                  const result = await res.json();
+                  if (result.success) {{
+                    if ({redirect}) {{
+                        window.location.href = {redirect};
+                    }} else {{
+                        alert('Thanks! We will be in touch.');
+                        form.reset();
+                    }}
+                  }} else {{
+                    alert('Something went wrong.');
+                  }}
+                }} catch (err) {{
+                  console.error(err);
+                  alert('Error submitting form');
+                }}
+              }});
+            }});
+          }});
+        </script>
+        """
+    if "</body>" not in html_content:
+        # The sanitizer parses a fragment and drops <html>/<body>, so usually we just append.
+        return html_content + script
+    return html_content.replace("</body>", f"{script}</body>")
+
+
+def render_landing_html(
+    html_content: str,
+    product_context: Optional[dict],
+    slug: str,
+    api_base: str = "",
+    variant: Optional[str] = None,
+    thank_you_url: Optional[str] = None,
+) -> str:
+    """Sanitize stored landing HTML, then inject the brand bar and the form-submit script.
+
+    `api_base` prefixes the submit URL for pages served from another origin (static export);
+    `variant` is the split-test variant key the form submits with; `thank_you_url`, when set,
+    replaces the redirect_url the submit response carries.
+    """
+    logo_url, company_name = brand(product_context)
+    rendered = _inject_brand(sanitize_html(html_content or ""), logo_url, company_name)
+    return _inject_form_script(rendered, slug, api_base.rstrip("/"), variant, thank_you_url)
+
+
+def content_version(html_content: str, product_context: Optional[dict], slug: str = "", variant: str = "") -> str:
+    """Digest of everything a rendered page depends on: sanitizer, stored HTML, brand, slug (and variant key)."""
+    logo_url, company_name = brand(product_context)
+    digest = hashlib.blake2b(digest_size=16)
+    parts = (str(SANITIZER_VERSION), html_content or "", logo_url or "", company_name or "", slug or "")
+    for part in parts + ((variant,) if variant else ()):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+_cache: OrderedDict[tuple[str, str, str], str] = OrderedDict()
+_lock = threading.Lock()
+
+
+def invalidate_landing_html(landing_id: Optional[str] = None) -> None:
+    """Drop cached renders (variants included) for one landing page, or all of them; call after landing/campaign writes."""
+    with _lock:
+        if landing_id is None:
+            _cache.clear()
+            return
+        for key in [key for key in _cache if key[0] == landing_id]:
+            del _cache[key]
+
+
+def landing_html(landing_id: str, html_content: str, product_context: Optional[dict], slug: str) -> str:
+    """Rendered page from a bounded LRU keyed by (landing id, request slug, content version).
+
+    The version covers the stored HTML and brand fields, so a write from another process
+    can never be served stale; in-process writes also invalidate eagerly to free memory.
+    """
+    key = (landing_id, slug, content_version(html_content, product_context, slug))
+    hit = _cached(key)
+    if hit is not None:
+        return hit
+    rendered = render_landing_html(html_content, product_context, slug)
+    _remember(key, rendered)
+    return rendered
+
+
+def _cached(key: tuple[str, str, str]) -> Optional[str]:
+    with _lock:
+        hit = _cache.get(key)
+        if hit is not None:
+            _cache.move_to_end(key)
+    metrics.inc("landing_html_cache_total", result="hit" if hit is not None else "miss")
+    return hit
+
+
+def _remember(key: tuple[str, str, str], rendered: str) -> None:
+    size = get_settings().landing_html_cache_size
+    if size > 0:
+        with _lock:
+            _cache[key] = rendered
+            _cache.move_to_end(key)
+            while len(_cache) > size:
+                _cache.popitem(last=False)
+
+
+def variant_html(session: Session, landing: ResolvedLanding, variant: ResolvedVariant) -> Optional[str]:
+    """Rendered page for a split-test variant, through the same LRU under its own key.
+
+    Keyed by (landing id, variant id, stored content version), so a hit needs no query and
+    every variant write (which stores a new version) misses. None if the variant is gone.
+    """
+    key = (landing.id, variant.id, variant.content_version or "")
+    hit = _cached(key)
+    if hit is not None:
+        return hit
+    row = session.exec(
+        _with_product_context(
+            select(
+                LandingPageVariantDB.html_content,
+                LandingPageVariantDB.rendered_html,
+                LandingPageVariantDB.render_version,
+                CampaignDB.product_context,
+            ).join(LandingPageDB, LandingPageDB.id == LandingPageVariantDB.landing_page_id)
+        ).where(LandingPageVariantDB.id == variant.id)
+    ).first()
+    if row is None:
+        return None
+    html_content, rendered, render_version, product_context = row
+    if rendered is None or render_version != SANITIZER_VERSION:
+        rendered = render_landing_html(html_content, product_context, landing.slug, variant=variant.key)
+    _remember(key, rendered)
+    return rendered
+
+
+def apply_render(landing: LandingPageDB, product_context: Optional[dict]) -> bool:
+    """Store the sanitized, script-injected page on `landing`; False if it was already current."""
+    version = content_version(landing.html_content, product_context, landing.slug)
+    if landing.rendered_html is not None and landing.content_version == version:
+        return False
+    landing.rendered_html = render_landing_html(landing.html_content, product_context, landing.slug)
+    landing.content_version = version
+    landing.render_version = SANITIZER_VERSION
+    return True
+
+
+def apply_variant_render(variant: LandingPageVariantDB, product_context: Optional[dict], slug: str) -> bool:
+    """Store the rendered page on a split-test variant, as apply_render does for its landing page."""
+    version = content_version(variant.html_content, product_context, slug, variant.key)
+    if variant.rendered_html is not None and variant.content_version == version:
+        return False
+    variant.rendered_html = render_landing_html(variant.html_content, product_context, slug, variant=variant.key)
+    variant.content_version = version
+    variant.render_version = SANITIZER_VERSION
+    return True
+
+
+def _with_product_context(stmt):
+    return (
+        stmt.outerjoin(LeadMagnetDB, LeadMagnetDB.id == LandingPageDB.lead_magnet_id)
+        .outerjoin(CampaignDB, CampaignDB.id == LeadMagnetDB.campaign_id)
+    )
+
+
+def _variant_rows():
+    return _with_product_context(
+        select(LandingPageVariantDB, LandingPageDB.slug, CampaignDB.product_context).join(
+            LandingPageDB, LandingPageDB.id == LandingPageVariantDB.landing_page_id
+        )
+    )
+
+
+def prerender_campaign(session: Session, campaign_id: str) -> int:
+    """Re-render every landing page (and variant) of a campaign, as its HTML, slug or brand may have changed, and commit."""
+    rows = session.exec(
+        _with_product_context(select(LandingPageDB, CampaignDB.product_context)).where(CampaignDB.id == campaign_id)
+    ).all()
+    changed = 0
+    for landing, product_context in rows:
+        if apply_render(landing, product_context):
+            session.add(landing)
+            changed += 1
+    for variant, slug, product_context in session.exec(_variant_rows().where(CampaignDB.id == campaign_id)).all():
+        if apply_variant_render(variant, product_context, slug):
+            session.add(variant)
+            changed += 1
+    if changed:
+        session.commit()
+    invalidate_landing_html()
+    invalidate_landings()
+    return changed
+
+
+def _stale(model=LandingPageDB):
+    return or_(
+        model.rendered_html.is_(None),
+        model.render_version.is_(None),
+        model.render_version != SANITIZER_VERSION,
+    )
+
+
+def has_stale_renders(session: Session) -> bool:
+    return any(
+        session.exec(select(model.id).where(_stale(model)).limit(1)).first() is not None
+        for model in (LandingPageDB, LandingPageVariantDB)
+    )
+
+
+def rerender_all(engine: Optional[Engine] = None, stale_only: bool = True, batch_size: int = 100) -> int:
+    """Backfill/re-render stored pages, then variants, in id order, one transaction per batch. Returns pages written."""
+    if engine is None:
+        from app.db.session import engine
+    written = 0
+    after = ""
+    while True:
+        with Session(engine) as session:
+            stmt = _with_product_context(select(LandingPageDB, CampaignDB.product_context)).where(LandingPageDB.id > after)
+            if stale_only:
+                stmt = stmt.where(_stale())
+            rows = session.exec(stmt.order_by(LandingPageDB.id).limit(batch_size)).all()
+            if not rows:
+                break
+            for landing, product_context in rows:
+                if not stale_only:
+                    landing.rendered_html = None
+                if apply_render(landing, product_context):
+                    session.add(landing)
+                    written += 1
+            session.commit()
+            after = rows[-1][0].id
+    after = ""
+    while True:
+        with Session(engine) as session:
+            stmt = _variant_rows().where(LandingPageVariantDB.id > after)
+            if stale_only:
+                stmt = stmt.where(_stale(LandingPageVariantDB))
+            rows = session.exec(stmt.order_by(LandingPageVariantDB.id).limit(batch_size)).all()
+            if not rows:
+                break
+            for variant, slug, product_context in rows:
+                if not stale_only:
+                    variant.rendered_html = None
+                if apply_variant_render(variant, product_context, slug):
+                    session.add(variant)
+                    written += 1
+            session.commit()
+            after = rows[-1][0].id
+    invalidate_landing_html()
+    invalidate_landings()
+    metrics.inc("landing_prerender_total", written)
+    return written
+
+
+def start_background_rerender(engine: Optional[Engine] = None) -> Optional[threading.Thread]:
+    """Re-render pages left by an older sanitizer in a daemon thread; None if all are current."""
+    if engine is None:
+        from app.db.session import engine
+    with Session(engine) as session:
+        if not has_stale_renders(session):
+            return None
+    thread = threading.Thread(target=rerender_all, args=(engine,), name="landing-rerender", daemon=True)
+    thread.start()
+    return thread
+
+
+def stored_render(session: Session, landing_id: str):
+    """(rendered_html, content_version, render_version) by primary key, without the source HTML."""
+    return session.exec(
+        select(LandingPageDB.rendered_html, LandingPageDB.content_version, LandingPageDB.render_version).where(
+            LandingPageDB.id == landing_id
+        )
+    ).first()
@@ -0,0 +1,98 @@
+from __future__ import annotations
+from collections import OrderedDict
+from dataclasses import dataclass
+import threading
+import time
+from typing import Optional
+from sqlalchemy import case, or_
+from sqlmodel import Session, select
+from app.core.config import get_settings
+from app.core.metrics import metrics
+from app.models.db import LandingPage as LandingPageDB, LandingPageVariant as LandingPageVariantDB, LeadMagnet as LeadMagnetDB
+
+
+@dataclass(frozen=True)
+class ResolvedVariant:
+    id: str
+    key: str
+    weight: float
+    content_version: Optional[str]
+    render_version: Optional[int]
+
+
+@dataclass(frozen=True)
+class ResolvedLanding:
+    id: str
+    slug: str
+    lead_magnet_id: str
+    campaign_id: Optional[str]
+    content_version: Optional[str]
+    render_version: Optional[int]
+    # Split-test variants ordered by key; empty when the page is not under test.
+    variants: tuple[ResolvedVariant, ...] = ()
+
+
+_cache: OrderedDict[str, tuple[float, ResolvedLanding]] = OrderedDict()
+_lock = threading.Lock()
+
+
+def invalidate_landings() -> None:
+    """Drop every cached resolution; call after any landing page write."""
+    with _lock:
+        _cache.clear()
+
+
+def _load(session: Session, slug_or_id: str) -> Optional[ResolvedLanding]:
+    # Slug and primary key are both indexed; a slug match wins if a slug happens to equal another page's id.
+    # Variants come back in the same query, one row each (a single row with NULLs when there are none).
+    rows = session.exec(
+        select(
+            LandingPageDB.id,
+            LandingPageDB.slug,
+            LandingPageDB.lead_magnet_id,
+            LeadMagnetDB.campaign_id,
+            LandingPageDB.content_version,
+            LandingPageDB.render_version,
+            LandingPageVariantDB.id,
+            LandingPageVariantDB.key,
+            LandingPageVariantDB.weight,
+            LandingPageVariantDB.content_version,
+            LandingPageVariantDB.render_version,
+        )
+        .outerjoin(LeadMagnetDB, LeadMagnetDB.id == LandingPageDB.lead_magnet_id)
+        .outerjoin(LandingPageVariantDB, LandingPageVariantDB.landing_page_id == LandingPageDB.id)
+        .where(or_(LandingPageDB.slug == slug_or_id, LandingPageDB.id == slug_or_id))
+        .order_by(case((LandingPageDB.slug == slug_or_id, 0), else_=1), LandingPageVariantDB.key)
+    ).all()
+    if not rows:
+        return None
+    landing = rows[0][:6]
+    variants = tuple(
+        ResolvedVariant(*row[6:]) for row in rows if row[0] == landing[0] and row[6] is not None
+    )
+    return ResolvedLanding(*landing, variants=variants)
+
+
+def resolve_landing(session: Session, slug_or_id: str) -> Optional[ResolvedLanding]:
+    """Find a landing page by slug or id in one query, through a small TTL/LRU cache.
+
+    Misses are not cached, so a page created in another process is visible at once; the
+    TTL bounds how long another process's edits (new content version, new slug) go unseen.
+    """
+    settings = get_settings()
+    now = time.monotonic()
+    with _lock:
+        hit = _cache.get(slug_or_id)
+        if hit and now - hit[0] < settings.landing_resolver_cache_ttl_seconds:
+            _cache.move_to_end(slug_or_id)
+            metrics.inc("landing_resolver_cache_total", result="hit")
+            return hit[1]
+    metrics.inc("landing_resolver_cache_total", result="miss")
+    resolved = _load(session, slug_or_id)
+    if resolved is not None and settings.landing_resolver_cache_size > 0:
+        with _lock:
+            _cache[slug_or_id] = (now, resolved)
+            _cache.move_to_end(slug_or_id)
+            while len(_cache) > settings.landing_resolver_cache_size:
+                _cache.popitem(last=False)
+    return resolved
@@ -0,0 +1,238 @@
+"""Stateless split tests for landing pages.
+
+A page under test has one or more LandingPageVariant rows; the page itself is the "control"
+arm. The arm a visitor sees is a hash of their visitor cookie and the slug, so views write
+nothing and a returning visitor always gets the same arm. The arm is stored on the lead only
+when they submit, and landing_variant_stats is incremented in the same transaction.
+"""
+from __future__ import annotations
+from collections import Counter
+from datetime import datetime
+import hashlib
+import math
+import re
+from typing import Iterable, Optional
+from uuid import uuid4
+from fastapi import Request, Response
+from sqlalchemy import delete, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlmodel import Session, select
+from app.models.db import (
+    Campaign as CampaignDB,
+    LandingPage as LandingPageDB,
+    LandingPageVariant as LandingPageVariantDB,
+    LandingVariantStat as LandingVariantStatDB,
+    LeadMagnet as LeadMagnetDB,
+)
+from app.models.schemas import LandingVariant, LandingVariantCreate, LandingVariantReport, LandingVariantUpdate
+from app.services.landing_render import apply_variant_render, invalidate_landing_html
+from app.services.landing_resolver import ResolvedLanding, ResolvedVariant, invalidate_landings
+
+CONTROL = "control"
+CONTROL_WEIGHT = 1.0
+VISITOR_COOKIE = "genie_vid"
+VISITOR_COOKIE_MAX_AGE = 365 * 24 * 3600
+# Pages under test differ per visitor: shared caches must not store them, browsers may revalidate.
+SPLIT_TEST_CACHE_CONTROL = "private, no-cache"
+
+_VISITOR_ID = re.compile(r"^[A-Za-z0-9_-]{8,64}$")
+_UPSERT_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+
+def visitor_id(request: Request) -> tuple[str, bool]:
+    """(visitor id, is new): the visitor cookie, or a fresh id to set on the response."""
+    value = request.cookies.get(VISITOR_COOKIE) or ""
+    if _VISITOR_ID.match(value):
+        return value, False
+    return uuid4().hex, True
+
+
+def _point(visitor: str, slug: str, key: str) -> float:
+    """Uniform in (0, 1), fixed per (slug, visitor, arm)."""
+    digest = hashlib.blake2b(f"{slug}:{visitor}:{key}".encode("utf-8"), digest_size=8).digest()
+    return (int.from_bytes(digest, "big") + 1) / (2**64 + 1)
+
+
+def _score(visitor: str, slug: str, key: str, weight: float) -> float:
+    # Weighted rendezvous hashing: the highest score wins, each arm with probability weight / total.
+    return weight / -math.log(_point(visitor, slug, key))
+
+
+def choose_variant(landing: ResolvedLanding, visitor: str) -> Optional[ResolvedVariant]:
+    """The variant `visitor` sees on `landing`, or None for the control arm.
+
+    Deterministic in (visitor, slug) and proportional to the weights. Each arm's score depends
+    only on its own key and weight, so adding a variant only moves visitors into it, and
+    changing one arm's weight only moves visitors into or out of that arm.
+    """
+    best, best_score = None, _score(visitor, landing.slug, CONTROL, CONTROL_WEIGHT)
+    for variant in landing.variants:
+        if variant.weight > 0:
+            score = _score(visitor, landing.slug, variant.key, variant.weight)
+            if score > best_score:
+                best, best_score = variant, score
+    return best
+
+
+def arm(variant: Optional[ResolvedVariant]) -> str:
+    return variant.key if variant else CONTROL
+
+
+def submitted_variant(landing: ResolvedLanding, claimed: object, visitor: Optional[str]) -> Optional[str]:
+    """Arm to record on a lead: the page's own `_variant` field, else the visitor cookie's arm.
+
+    None when the page is not under test, or when neither identifies the arm (e.g. API clients).
+    """
+    if not landing.variants:
+        return None
+    if claimed == CONTROL or any(variant.key == claimed for variant in landing.variants):
+        return claimed
+    if visitor and _VISITOR_ID.match(visitor):
+        return arm(choose_variant(landing, visitor))
+    return None
+
+
+def split_test_response(response: Response, visitor: str, new_visitor: bool) -> Response:
+    """Make a public response safe to vary per visitor, and pin new visitors with the cookie."""
+    response.headers["Cache-Control"] = SPLIT_TEST_CACHE_CONTROL
+    response.headers["Vary"] = "Accept-Encoding, Cookie"
+    if new_visitor:
+        response.set_cookie(VISITOR_COOKIE, visitor, max_age=VISITOR_COOKIE_MAX_AGE, httponly=True, samesite="lax")
+    return response
+
+
+def record_conversions(session: Session, leads: Iterable[tuple[Optional[str], Optional[str]]]) -> None:
+    """Add inserted leads, as (landing page id, variant) pairs, to the per-arm counts; the caller commits."""
+    counts = Counter((landing_id, variant) for landing_id, variant in leads if landing_id and variant)
+    if not counts:
+        return
+    now = datetime.utcnow()
+    rows = [
+        {"landing_page_id": landing_id, "variant": variant, "leads": count, "updated_at": now}
+        for (landing_id, variant), count in counts.items()
+    ]
+    upsert = _UPSERT_INSERTS.get(session.get_bind().dialect.name)
+    if upsert is not None:
+        stmt = upsert(LandingVariantStatDB)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["landing_page_id", "variant"],
+            set_={"leads": LandingVariantStatDB.leads + stmt.excluded.leads, "updated_at": stmt.excluded.updated_at},
+        )
+        session.exec(stmt, params=rows)
+        return
+    for row in rows:
+        updated = session.exec(
+            update(LandingVariantStatDB)
+            .where(
+                LandingVariantStatDB.landing_page_id == row["landing_page_id"],
+                LandingVariantStatDB.variant == row["variant"],
+            )
+            .values(leads=LandingVariantStatDB.leads + row["leads"], updated_at=now)
+        )
+        if not updated.rowcount:
+            session.add(LandingVariantStatDB(**row))
+
+
+def _to_schema(item: LandingPageVariantDB, leads: int = 0) -> LandingVariant:
+    return LandingVariant(
+        id=item.id,
+        landing_page_id=item.landing_page_id,
+        key=item.key,
+        weight=item.weight,
+        headline=item.headline,
+        subheadline=item.subheadline,
+        cta=item.cta,
+        html_content=item.html_content,
+        leads=leads,
+        created_at=item.created_at,
+    )
+
+
+def _landing_context(session: Session, landing_page_id: str) -> Optional[tuple[str, Optional[dict]]]:
+    return session.exec(
+        select(LandingPageDB.slug, CampaignDB.product_context)
+        .outerjoin(LeadMagnetDB, LeadMagnetDB.id == LandingPageDB.lead_magnet_id)
+        .outerjoin(CampaignDB, CampaignDB.id == LeadMagnetDB.campaign_id)
+        .where(LandingPageDB.id == landing_page_id)
+    ).first()
+
+
+def _saved(session: Session, variant: LandingPageVariantDB, slug: str, product_context: Optional[dict]) -> None:
+    apply_variant_render(variant, product_context, slug)
+    session.add(variant)
+    session.commit()
+    session.refresh(variant)
+    invalidate_landing_html(variant.landing_page_id)
+    invalidate_landings()
+
+
+def list_variants(session: Session, landing_page_id: str) -> Optional[LandingVariantReport]:
+    if session.get(LandingPageDB, landing_page_id) is None:
+        return None
+    leads = dict(
+        session.exec(
+            select(LandingVariantStatDB.variant, LandingVariantStatDB.leads).where(
+                LandingVariantStatDB.landing_page_id == landing_page_id
+            )
+        ).all()
+    )
+    variants = session.exec(
+        select(LandingPageVariantDB)
+        .where(LandingPageVariantDB.landing_page_id == landing_page_id)
+        .order_by(LandingPageVariantDB.key)
+    ).all()
+    return LandingVariantReport(
+        landing_page_id=landing_page_id,
+        leads=leads,
+        variants=[_to_schema(item, leads.get(item.key, 0)) for item in variants],
+    )
+
+
+def create_variant(session: Session, landing_page_id: str, payload: LandingVariantCreate) -> Optional[LandingVariant]:
+    """Add a variant to a landing page; raises ValueError for a reserved or duplicate key."""
+    context = _landing_context(session, landing_page_id)
+    if context is None:
+        return None
+    if payload.key == CONTROL:
+        raise ValueError(f"'{CONTROL}' is reserved for the original page")
+    duplicate = session.exec(
+        select(LandingPageVariantDB.id).where(
+            LandingPageVariantDB.landing_page_id == landing_page_id, LandingPageVariantDB.key == payload.key
+        )
+    ).first()
+    if duplicate:
+        raise ValueError(f"Variant '{payload.key}' already exists")
+    variant = LandingPageVariantDB(landing_page_id=landing_page_id, **payload.model_dump())
+    _saved(session, variant, *context)
+    return _to_schema(variant)
+
+
+def update_variant(
+    session: Session, landing_page_id: str, variant_id: str, payload: LandingVariantUpdate
+) -> Optional[LandingVariant]:
+    variant = session.get(LandingPageVariantDB, variant_id)
+    context = _landing_context(session, landing_page_id)
+    if variant is None or variant.landing_page_id != landing_page_id or context is None:
+        return None
+    for key, value in payload.model_dump(exclude_none=True).items():
+        setattr(variant, key, value)
+    _saved(session, variant, *context)
+    return _to_schema(variant)
+
+
+def delete_variant(session: Session, landing_page_id: str, variant_id: str) -> bool:
+    """Remove a variant; its recorded leads and counts stay for reporting."""
+    variant = session.get(LandingPageVariantDB, variant_id)
+    if variant is None or variant.landing_page_id != landing_page_id:
+        return False
+    session.delete(variant)
+    session.commit()
+    invalidate_landing_html(landing_page_id)
+    invalidate_landings()
+    return True
+
+
+def delete_landing_variants(session: Session, landing_page_id: str) -> None:
+    """Drop a landing page's variants and counts before the page itself; the caller commits."""
+    session.exec(delete(LandingPageVariantDB).where(LandingPageVariantDB.landing_page_id == landing_page_id))
+    session.exec(delete(LandingVariantStatDB).where(LandingVariantStatDB.landing_page_id == landing_page_id))
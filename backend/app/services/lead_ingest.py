@@ -0,0 +1,341 @@
+"""Group-commit ingestion for public lead submissions (LEAD_INGEST_MODE=queued).
+
+The request validates the submission, assigns the lead id and hands it to a queue; one
+writer thread drains the queue every LEAD_INGEST_FLUSH_MS and commits each batch of leads,
+welcome emails and nurture sequences in a single transaction. A repeat submission (same
+address on the same landing page) gets the id of the lead already queued or stored.
+
+With LEAD_INGEST_SPOOL_PATH set, each process appends accepted submissions to its own spool
+file (`<path>.<pid>-<token>`), holds an exclusive lock on it while running and truncates it
+whenever its queue is drained. On startup a process adopts every spool whose lock it can
+take (its owner is gone): the entries are queued again (writes are idempotent on the lead
+id) and the file is removed.
+"""
+from __future__ import annotations
+from dataclasses import asdict, dataclass
+from datetime import datetime
+import fcntl
+import glob
+import json
+import os
+import queue
+import threading
+import time
+from typing import Optional
+from uuid import uuid4
+from sqlalchemy import insert
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import OperationalError
+from sqlmodel import Session
+from app.core.config import get_settings
+from app.core.metrics import metrics
+from app.models.db import EmailLog as EmailLogDB
+from app.models.schemas import LeadCreate
+from app.services.email_dispatcher import notify_enqueued, publish_enqueued
+from app.services.email_service import sequence_rows
+from app.services.funnel import FunnelDelta, record_funnel
+from app.services.landing_variants import record_conversions
+from app.services.leads import find_lead, insert_leads, lead_id_for, welcome_log_row
+
+_MAX_RETRY_SECONDS = 5.0
+
+
+class IngestQueueFull(Exception):
+    """The in-memory queue is at LEAD_INGEST_QUEUE_SIZE; callers should write directly."""
+
+
+@dataclass(frozen=True)
+class Submission:
+    id: str
+    email: str
+    received_at: datetime
+    landing_page_id: Optional[str] = None
+    lead_magnet_id: Optional[str] = None
+    campaign_id: Optional[str] = None
+    name: Optional[str] = None
+    company: Optional[str] = None
+    variant: Optional[str] = None
+
+    @classmethod
+    def from_lead(cls, payload: LeadCreate, idempotency_key: Optional[str] = None) -> "Submission":
+        lead_id = lead_id_for(payload.landing_page_id, idempotency_key)
+        return cls(id=lead_id, received_at=datetime.utcnow(), **payload.model_dump())
+
+    @property
+    def address(self) -> Optional[tuple[str, str]]:
+        """The (landing page, address) a lead is unique on; None without a landing page."""
+        return (self.landing_page_id, self.email.lower()) if self.landing_page_id else None
+
+    def to_json(self) -> str:
+        data = asdict(self)
+        data["received_at"] = self.received_at.isoformat()
+        return json.dumps(data, separators=(",", ":"))
+
+    @classmethod
+    def from_json(cls, line: str) -> "Submission":
+        data = json.loads(line)
+        data["received_at"] = datetime.fromisoformat(data["received_at"])
+        return cls(**data)
+
+
+def write_batch(engine: Engine, submissions: list[Submission]) -> int:
+    """Insert leads plus their welcome and sequence emails in one transaction; skips repeats."""
+    with Session(engine) as session:
+        leads = [
+            {
+                "id": sub.id,
+                "campaign_id": sub.campaign_id,
+                "lead_magnet_id": sub.lead_magnet_id,
+                "landing_page_id": sub.landing_page_id,
+                "email": sub.email,
+                "name": sub.name,
+                "company": sub.company,
+                "variant": sub.variant,
+                "created_at": sub.received_at,
+            }
+            for sub in submissions
+        ]
+        inserted = insert_leads(session, leads)
+        fresh = [sub for sub in submissions if sub.id in inserted]
+        if not fresh:
+            session.rollback()
+            return 0
+        record_conversions(session, [(sub.landing_page_id, sub.variant) for sub in fresh])
+        welcome = []
+        logs = []
+        funnel = FunnelDelta()
+        for sub in fresh:
+            first = welcome_log_row(sub.id, sub.received_at)
+            steps = sequence_rows(session, sub.id, sub.lead_magnet_id, sub.campaign_id, sub.received_at)
+            funnel.capture(sub.campaign_id, sub.landing_page_id, sub.received_at, [first] + steps)
+            welcome.append(first)
+            logs.extend(steps)
+        # Welcome rows (NULL sequence/step) go in their own executemany: bulk inserts batch per key set.
+        logs = welcome + logs
+        session.exec(insert(EmailLogDB), params=logs)
+        record_funnel(session, funnel)
+        earliest = min(row["scheduled_at"] for row in logs)
+        publish_enqueued(session, earliest)
+        session.commit()
+    notify_enqueued(earliest)
+    return len(fresh)
+
+
+class LeadIngestor:
+    def __init__(
+        self,
+        engine: Engine,
+        flush_ms: float = 5.0,
+        max_batch: int = 500,
+        queue_size: int = 10000,
+        spool_path: Optional[str] = None,
+        spool_fsync: bool = False,
+    ):
+        self.engine = engine
+        self.flush_seconds = max(flush_ms, 0.0) / 1000
+        self.max_batch = max(max_batch, 1)
+        self.spool_path = spool_path
+        self.spool_fsync = spool_fsync
+        self._queue: queue.Queue[Submission] = queue.Queue(maxsize=queue_size)
+        self._lock = threading.Lock()
+        self._pending = 0
+        # (landing page, address) -> id of the queued, not yet committed lead.
+        self._queued: dict[tuple[str, str], str] = {}
+        self._spool = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def pending(self) -> int:
+        """Accepted submissions not yet committed."""
+        with self._lock:
+            return self._pending
+
+    def queued_id(self, submission: Submission) -> Optional[str]:
+        """Id of a queued lead `submission` repeats, if any."""
+        with self._lock:
+            return self._queued.get(submission.address) if submission.address else None
+
+    def start(self) -> "LeadIngestor":
+        orphans = []
+        if self.spool_path:
+            own = f"{self.spool_path}.{os.getpid()}-{uuid4().hex[:8]}"
+            self._spool = open(own, "a", encoding="utf-8")
+            fcntl.flock(self._spool, fcntl.LOCK_EX)
+            orphans = self._orphaned_spools()
+        self._thread = threading.Thread(target=self._run, name="lead-ingest", daemon=True)
+        self._thread.start()
+        for path, handle in orphans:
+            self._adopt(path, handle)
+        return self
+
+    def submit(self, submission: Submission, block: bool = False) -> str:
+        """Queue `submission` (spooling it first); returns the lead id, an already queued one for a repeat.
+
+        Blocking file I/O: call it off the event loop.
+        """
+        line = submission.to_json() + "\n" if self.spool_path else None
+        with self._lock:
+            existing = self._queued.get(submission.address) if submission.address else None
+            if existing:
+                metrics.inc("lead_duplicates_total")
+                return existing
+            try:
+                self._queue.put(submission, block=block)
+            except queue.Full:
+                metrics.inc("lead_ingest_rejected_total")
+                raise IngestQueueFull()
+            self._pending += 1
+            if submission.address:
+                self._queued[submission.address] = submission.id
+            if line is not None and self._spool is not None:
+                self._spool.write(line)
+                self._spool.flush()
+                if self.spool_fsync:
+                    os.fsync(self._spool.fileno())
+        metrics.inc("lead_ingest_accepted_total")
+        return submission.id
+
+    def close(self, timeout: float = 10.0) -> None:
+        """Stop accepting work and wait for the writer to drain the queue."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        if self._spool is not None:
+            with self._lock:
+                spool, self._spool = self._spool, None
+                # Drained: nothing for another process to adopt.
+                if self._pending == 0:
+                    os.remove(spool.name)
+                spool.close()
+
+    def _orphaned_spools(self) -> list[tuple[str, object]]:
+        """Spool files (including a pre-pid `<path>` one) whose owner no longer holds the lock."""
+        orphans = []
+        for path in sorted(glob.glob(glob.escape(self.spool_path) + ".*")) + [self.spool_path]:
+            if path == self._spool.name or not os.path.isfile(path):
+                continue
+            try:
+                handle = open(path, encoding="utf-8")
+            except FileNotFoundError:
+                continue
+            try:
+                fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                handle.close()  # a live process owns it
+                continue
+            orphans.append((path, handle))
+        return orphans
+
+    def _adopt(self, path: str, handle) -> None:
+        adopted = 0
+        with handle:
+            for line in handle:
+                if not line.strip():
+                    continue
+                try:
+                    submission = Submission.from_json(line)
+                except (ValueError, TypeError) as exc:
+                    print(f"[WARN] Skipping unreadable spooled lead submission: {exc}")
+                    continue
+                # Into this process's spool before the orphan is removed; blocks while the queue is full.
+                self.submit(submission, block=True)
+                adopted += 1
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+        if adopted:
+            print(f"[INFO] Queued {adopted} spooled lead submissions from {path}")
+
+    def _run(self) -> None:
+        while not (self._stop.is_set() and self._queue.empty()):
+            try:
+                batch = [self._queue.get(timeout=0.1)]
+            except queue.Empty:
+                continue
+            deadline = time.monotonic() + self.flush_seconds
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                try:
+                    batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            self._commit(batch)
+
+    def _commit(self, batch: list[Submission]) -> None:
+        delay = 0.05
+        while True:
+            try:
+                write_batch(self.engine, batch)
+                metrics.inc("lead_ingest_batches_total")
+                metrics.inc("lead_ingest_committed_total", len(batch))
+                break
+            except OperationalError as exc:
+                # Database unavailable or locked: keep the batch (it is also in the spool) and retry.
+                print(f"[WARN] Lead ingest batch of {len(batch)} failed, retrying: {exc}")
+                if self._stop.is_set() and delay >= _MAX_RETRY_SECONDS:
+                    return
+                time.sleep(delay)
+                delay = min(delay * 2, _MAX_RETRY_SECONDS)
+            except Exception as exc:
+                print(f"[WARN] Lead ingest batch of {len(batch)} failed, writing one by one: {exc}")
+                for submission in batch:
+                    try:
+                        write_batch(self.engine, [submission])
+                        metrics.inc("lead_ingest_committed_total")
+                    except Exception as item_exc:
+                        print(f"[WARN] Dropping lead submission {submission.id}: {item_exc}")
+                        metrics.inc("lead_ingest_dropped_total")
+                break
+        with self._lock:
+            self._pending -= len(batch)
+            for submission in batch:
+                if submission.address and self._queued.get(submission.address) == submission.id:
+                    del self._queued[submission.address]
+            if self._pending == 0 and self._spool is not None:
+                self._spool.seek(0)
+                self._spool.truncate()
+
+
+_ingestor: Optional[LeadIngestor] = None
+_ingestor_lock = threading.Lock()
+
+
+def get_ingestor() -> Optional[LeadIngestor]:
+    """The process-wide ingestor when LEAD_INGEST_MODE=queued, started on first use; else None."""
+    global _ingestor
+    settings = get_settings()
+    if (settings.lead_ingest_mode or "sync").lower() != "queued":
+        return None
+    with _ingestor_lock:
+        if _ingestor is None:
+            from app.db.session import engine
+
+            _ingestor = LeadIngestor(
+                engine,
+                flush_ms=settings.lead_ingest_flush_ms,
+                max_batch=settings.lead_ingest_max_batch,
+                queue_size=settings.lead_ingest_queue_size,
+                spool_path=settings.lead_ingest_spool_path,
+                spool_fsync=settings.lead_ingest_spool_fsync,
+            ).start()
+        return _ingestor
+
+
+def close_ingestor() -> None:
+    global _ingestor
+    with _ingestor_lock:
+        ingestor, _ingestor = _ingestor, None
+    if ingestor is not None:
+        ingestor.close()
+
+
+def _collect() -> dict[str, float]:
+    ingestor = _ingestor
+    if ingestor is None:
+        return {}
+    return {"lead_ingest_queue_depth": ingestor._queue.qsize(), "lead_ingest_pending": ingestor.pending}
+
+
+metrics.register_collector(_collect)
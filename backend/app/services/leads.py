@@ -1,8 +1,150 @@
 from __future__ import annotations
-from datetime import datetime
-from sqlmodel import Session
-from app.models.db import Lead as LeadDB, EmailLog as EmailLogDB
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Optional
+from uuid import NAMESPACE_URL, uuid4, uuid5
+from sqlalchemy import and_, func, insert, or_
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlmodel import Session, select
+from app.core.metrics import metrics
+from app.models.db import LandingPage as LandingPageDB, Lead as LeadDB, LeadMagnet as LeadMagnetDB, EmailLog as EmailLogDB
 from app.models.schemas import LeadCreate, EmailLog
+from app.services.email_dispatcher import notify_enqueued, publish_enqueued, shard_key_for
+from app.services.email_service import sequence_rows
+from app.services.funnel import FunnelDelta, record_funnel
+from app.services.landing_variants import record_conversions
+
+
+WELCOME_SUBJECT = "Welcome"
+WELCOME_BODY = "Thanks for downloading."
+
+# Sequence emails due within this window are sent right after the response.
+IMMEDIATE_SEND_WINDOW = timedelta(minutes=1)
+
+# Dialects with INSERT ... ON CONFLICT DO NOTHING ... RETURNING.
+_UPSERT_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+_IDEMPOTENCY_NAMESPACE = uuid5(NAMESPACE_URL, "genieops:lead-idempotency")
+
+
+def lead_id_for(landing_page_id: Optional[str], idempotency_key: Optional[str] = None) -> str:
+    """Lead id for a submission: derived from the Idempotency-Key when given, so retries collide."""
+    if not idempotency_key:
+        return str(uuid4())
+    return str(uuid5(_IDEMPOTENCY_NAMESPACE, f"{landing_page_id or ''}:{idempotency_key}"))
+
+
+def lead_campaign_id():
+    """SQL expression for a lead's campaign, resolved through its lead magnet or landing page when unset.
+
+    Leads captured before the public routes stamped campaign_id carry only those ids.
+    """
+    via_magnet = select(LeadMagnetDB.campaign_id).where(LeadMagnetDB.id == LeadDB.lead_magnet_id)
+    via_landing = (
+        select(LeadMagnetDB.campaign_id)
+        .join(LandingPageDB, LandingPageDB.lead_magnet_id == LeadMagnetDB.id)
+        .where(LandingPageDB.id == LeadDB.landing_page_id)
+    )
+    return func.coalesce(LeadDB.campaign_id, via_magnet.scalar_subquery(), via_landing.scalar_subquery())
+
+
+def find_lead(session: Session, lead_id: str, landing_page_id: Optional[str], email: str) -> Optional[LeadDB]:
+    """The lead a submission collides with: same id, or same address on the same landing page."""
+    match = LeadDB.id == lead_id
+    if landing_page_id:
+        same_address = and_(LeadDB.landing_page_id == landing_page_id, func.lower(LeadDB.email) == email.lower())
+        match = or_(match, same_address)
+    return session.exec(select(LeadDB).where(match).limit(1)).first()
+
+
+def insert_leads(session: Session, rows: list[dict]) -> set[str]:
+    """Insert lead rows, skipping any that already exist (same id, or same address on the
+    landing page). Returns the ids actually inserted; the caller commits."""
+    if not rows:
+        return set()
+    upsert = _UPSERT_INSERTS.get(session.get_bind().dialect.name)
+    if upsert is not None:
+        stmt = upsert(LeadDB).on_conflict_do_nothing().returning(LeadDB.id)
+        inserted = set(session.exec(stmt, params=rows).scalars())
+    else:
+        # No ON CONFLICT: skip known rows; a concurrent duplicate still fails on the unique index.
+        fresh = [row for row in rows if find_lead(session, row["id"], row["landing_page_id"], row["email"]) is None]
+        if fresh:
+            session.exec(insert(LeadDB), params=fresh)
+        inserted = {row["id"] for row in fresh}
+    if len(inserted) < len(rows):
+        metrics.inc("lead_duplicates_total", len(rows) - len(inserted))
+    return inserted
+
+
+def welcome_log_row(lead_id: str, now: Optional[datetime] = None) -> dict:
+    """email_logs row for the immediate welcome email, for multi-row inserts."""
+    now = now or datetime.utcnow()
+    return {
+        "id": str(uuid4()),
+        "lead_id": lead_id,
+        "sequence_id": None,
+        "step_id": None,
+        "subject": WELCOME_SUBJECT,
+        "body": WELCOME_BODY,
+        "status": "queued",
+        "scheduled_at": now,
+        "next_attempt_at": now,
+        "attempt_count": 0,
+        "shard_key": shard_key_for(lead_id),
+        "created_at": now,
+    }
+
+
+@dataclass(frozen=True)
+class CapturedLead:
+    lead_id: str
+    created: bool
+    # Earliest sequence email due now, to send in the background after responding.
+    immediate_log_id: Optional[str] = None
+    log_ids: tuple[str, ...] = ()
+
+
+def capture_lead(
+    session: Session,
+    payload: LeadCreate,
+    idempotency_key: Optional[str] = None,
+    now: Optional[datetime] = None,
+) -> CapturedLead:
+    """Insert the lead, its welcome email and nurture sequence (plus funnel and split-test counts) in one transaction.
+
+    A repeat submission (same Idempotency-Key, or same address on the same landing page)
+    writes nothing and returns the existing lead with created=False.
+    """
+    now = now or datetime.utcnow()
+    lead_id = lead_id_for(payload.landing_page_id, idempotency_key)
+    if not insert_leads(session, [{"id": lead_id, "created_at": now, **payload.model_dump()}]):
+        session.rollback()
+        existing = find_lead(session, lead_id, payload.landing_page_id, payload.email)
+        if existing is None:
+            raise RuntimeError(f"Lead insert for {payload.email} conflicted but no existing lead was found")
+        return CapturedLead(lead_id=existing.id, created=False)
+    record_conversions(session, [(payload.landing_page_id, payload.variant)])
+
+    steps = sequence_rows(session, lead_id, payload.lead_magnet_id, payload.campaign_id, now)
+    # Welcome row (NULL sequence/step) first: bulk inserts batch per key set.
+    logs = [welcome_log_row(lead_id, now)] + steps
+    session.exec(insert(EmailLogDB), params=logs)
+    funnel = FunnelDelta()
+    funnel.capture(payload.campaign_id, payload.landing_page_id, now, logs)
+    record_funnel(session, funnel)
+    earliest = min(row["scheduled_at"] for row in logs)
+    publish_enqueued(session, earliest)
+    session.commit()
+    notify_enqueued(earliest)
+
+    due = [row for row in steps if row["scheduled_at"] <= now + IMMEDIATE_SEND_WINDOW]
+    immediate = min(due, key=lambda row: row["scheduled_at"], default=None)
+    return CapturedLead(
+        lead_id=lead_id,
+        created=True,
+        immediate_log_id=immediate["id"] if immediate else None,
+        log_ids=tuple(row["id"] for row in logs),
+    )
 
 
 def create_lead(session: Session, payload: LeadCreate) -> LeadDB:
@@ -13,14 +155,19 @@ def create_lead(session: Session, payload: LeadCreate) -> LeadDB:
         email=payload.email,
         name=payload.name,
         company=payload.company,
+        variant=payload.variant,
     )
     session.add(db_item)
+    funnel = FunnelDelta()
+    funnel.lead(payload.campaign_id, payload.landing_page_id, db_item.created_at)
+    record_funnel(session, funnel)
     session.commit()
     session.refresh(db_item)
     return db_item
 
 
 def create_email_log(session: Session, lead_id: str, subject: str, body: str) -> EmailLog:
+    now = datetime.utcnow()
     db_item = EmailLogDB(
         lead_id=lead_id,
         sequence_id=None,
@@ -28,12 +175,21 @@ def create_email_log(session: Session, lead_id: str, subject: str, body: str) ->
         subject=subject,
         body=body,
         status="queued",
-        scheduled_at=datetime.utcnow(),
+        scheduled_at=now,
+        next_attempt_at=now,
         sent_at=None,
+        shard_key=shard_key_for(lead_id),
     )
     session.add(db_item)
+    lead = session.get(LeadDB, lead_id)
+    if lead is not None:
+        funnel = FunnelDelta()
+        funnel.email(lead.campaign_id, lead.landing_page_id, now, "queued")
+        record_funnel(session, funnel)
+    publish_enqueued(session, db_item.scheduled_at)
     session.commit()
     session.refresh(db_item)
+    notify_enqueued(db_item.scheduled_at)
     return EmailLog(
         id=db_item.id,
         lead_id=db_item.lead_id,
@@ -46,5 +202,8 @@ def create_email_log(session: Session, lead_id: str, subject: str, body: str) ->
         error_message=db_item.error_message,
         scheduled_at=db_item.scheduled_at,
         sent_at=db_item.sent_at,
+        attempt_count=db_item.attempt_count,
+        next_attempt_at=db_item.next_attempt_at,
+        last_error_class=db_item.last_error_class,
         created_at=db_item.created_at,
     )
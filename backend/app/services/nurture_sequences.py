@@ -3,6 +3,7 @@ from typing import Optional
 from sqlmodel import Session, select
 from app.models.db import NurtureSequence as NurtureSequenceDB
 from app.models.schemas import NurtureSequence, NurtureSequenceCreate, NurtureSequenceUpdate
+from app.services.sequence_plans import invalidate_plans
 
 
 def _to_schema(item: NurtureSequenceDB) -> NurtureSequence:
@@ -28,6 +29,7 @@ def create_sequence(session: Session, payload: NurtureSequenceCreate) -> Nurture
     item = NurtureSequenceDB(**payload.model_dump())
     session.add(item)
     session.commit()
+    invalidate_plans()
     session.refresh(item)
     return _to_schema(item)
 
@@ -41,6 +43,7 @@ def update_sequence(session: Session, sequence_id: str, payload: NurtureSequence
         setattr(item, key, value)
     session.add(item)
     session.commit()
+    invalidate_plans()
     session.refresh(item)
     return _to_schema(item)
 
@@ -51,4 +54,5 @@ def delete_sequence(session: Session, sequence_id: str) -> bool:
         return False
     session.delete(item)
     session.commit()
+    invalidate_plans()
     return True
\ No newline at end of file
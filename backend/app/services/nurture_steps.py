@@ -3,6 +3,7 @@ from typing import Optional
 from sqlmodel import Session, select
 from app.models.db import NurtureStep as NurtureStepDB
 from app.models.schemas import NurtureStep, NurtureStepCreate, NurtureStepUpdate
+from app.services.sequence_plans import invalidate_plans
 
 
 def _to_schema(item: NurtureStepDB) -> NurtureStep:
@@ -35,6 +36,7 @@ def create_step(session: Session, payload: NurtureStepCreate) -> NurtureStep:
     item = NurtureStepDB(**payload.model_dump())
     session.add(item)
     session.commit()
+    invalidate_plans()
     session.refresh(item)
     return _to_schema(item)
 
@@ -48,6 +50,7 @@ def update_step(session: Session, step_id: str, payload: NurtureStepUpdate) -> O
         setattr(item, key, value)
     session.add(item)
     session.commit()
+    invalidate_plans()
     session.refresh(item)
     return _to_schema(item)
 
@@ -58,4 +61,5 @@ def delete_step(session: Session, step_id: str) -> bool:
         return False
     session.delete(item)
     session.commit()
+    invalidate_plans()
     return True
\ No newline at end of file
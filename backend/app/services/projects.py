@@ -2,7 +2,7 @@ from __future__ import annotations
 import re
 from typing import Optional
 from sqlmodel import Session, select
-from sqlalchemy import inspect, text
+from sqlalchemy import delete, inspect, text
 from app.models.db import (
     Campaign as CampaignDB,
     LeadMagnet as LeadMagnetDB,
@@ -12,6 +12,7 @@ from app.models.db import (
     NurtureStep as NurtureStepDB,
     Lead as LeadDB,
     EmailLog as EmailLogDB,
+    EmailLogArchive as EmailLogArchiveDB,
 )
 from app.models.schemas import (
     Asset,
@@ -26,6 +27,11 @@ from app.models.schemas import (
     ProjectView,
     ProductContext,
 )
+from app.services.landing_render import invalidate_landing_html, prerender_campaign
+from app.services.landing_resolver import invalidate_landings
+from app.services.funnel import delete_campaign_rollups
+from app.services.landing_variants import delete_landing_variants
+from app.services.sequence_plans import invalidate_plans
 
 
 def _campaign_to_icp(campaign: CampaignDB) -> ICPProfile:
@@ -204,6 +210,7 @@ def _build_project(session: Session, campaign: CampaignDB) -> ProjectView:
         linked_in_post=campaign.linked_in_post,
         upgrade_offer=upgrade,
         product_context=ProductContext(**campaign.product_context) if campaign.product_context else None,
+        send_window=campaign.send_window,
     )
 
 
@@ -254,6 +261,7 @@ def create_project(session: Session, payload: ProjectCreate) -> ProjectView:
         linked_in_post=payload.linked_in_post,
         upgrade_offer=payload.upgrade_offer.model_dump() if payload.upgrade_offer else None,
         product_context=payload.product_context.model_dump() if payload.product_context else None,
+        send_window=payload.send_window,
     )
     session.add(campaign)
     session.commit()
@@ -331,6 +339,8 @@ def create_project(session: Session, payload: ProjectCreate) -> ProjectView:
             session.add(step)
         session.commit()
 
+    invalidate_plans()
+    prerender_campaign(session, campaign.id)
     return _build_project(session, campaign)
 
 
@@ -356,6 +366,8 @@ def update_project(session: Session, campaign_id: str, payload: ProjectUpdate) -
             setattr(campaign, "strategy_summary", value)
             continue
         setattr(campaign, key, value)
+    if "send_window" in payload.model_fields_set:
+        campaign.send_window = payload.send_window
     session.add(campaign)
     session.commit()
 
@@ -493,6 +505,8 @@ def update_project(session: Session, campaign_id: str, payload: ProjectUpdate) -
             session.add(step)
         session.commit()
 
+    invalidate_plans()
+    prerender_campaign(session, campaign.id)
     return _build_project(session, campaign)
 
 
@@ -507,6 +521,7 @@ def delete_project(session: Session, campaign_id: str) -> bool:
         logs = session.exec(select(EmailLogDB).where(EmailLogDB.lead_id == lead.id)).all()
         for log in logs:
             session.delete(log)
+        session.exec(delete(EmailLogArchiveDB).where(EmailLogArchiveDB.lead_id == lead.id))
         session.delete(lead)
     session.commit()
 
@@ -525,7 +540,9 @@ def delete_project(session: Session, campaign_id: str) -> bool:
                 lp_logs = session.exec(select(EmailLogDB).where(EmailLogDB.lead_id == lpl.id)).all()
                 for log in lp_logs:
                     session.delete(log)
+                session.exec(delete(EmailLogArchiveDB).where(EmailLogArchiveDB.lead_id == lpl.id))
                 session.delete(lpl)
+            delete_landing_variants(session, lp.id)
             session.delete(lp)
         session.delete(lm)
 
@@ -538,6 +555,10 @@ def delete_project(session: Session, campaign_id: str) -> bool:
             session.delete(step)
         session.delete(seq)
 
+    delete_campaign_rollups(session, campaign.id)
     session.delete(campaign)
     session.commit()
+    invalidate_plans()
+    invalidate_landing_html()
+    invalidate_landings()
     return True
@@ -0,0 +1,82 @@
+from __future__ import annotations
+from dataclasses import dataclass
+import threading
+import time
+from typing import Optional
+from sqlmodel import Session, select
+from app.core.config import get_settings
+from app.models.db import (
+    Campaign as CampaignDB,
+    NurtureSequence as NurtureSequenceDB,
+    NurtureStep as NurtureStepDB,
+)
+
+
+@dataclass(frozen=True)
+class StepPlan:
+    id: str
+    subject: str
+    body: str
+    offset_days: int
+
+
+@dataclass(frozen=True)
+class SequencePlan:
+    sequence_id: str
+    campaign_id: Optional[str]
+    steps: tuple[StepPlan, ...]
+    send_window: Optional[str] = None
+
+
+_cache: dict[tuple[str, str], tuple[float, Optional[SequencePlan]]] = {}
+_lock = threading.Lock()
+
+
+def invalidate_plans() -> None:
+    """Drop every cached plan; call after any write to nurture sequences, steps or campaigns."""
+    with _lock:
+        _cache.clear()
+
+
+def _load(session: Session, column, value: str) -> Optional[SequencePlan]:
+    seq = session.exec(select(NurtureSequenceDB).where(column == value)).first()
+    if not seq:
+        return None
+    steps = session.exec(
+        select(NurtureStepDB).where(NurtureStepDB.sequence_id == seq.id).order_by(NurtureStepDB.order)
+    ).all()
+    campaign = session.get(CampaignDB, seq.campaign_id) if seq.campaign_id else None
+    return SequencePlan(
+        sequence_id=seq.id,
+        campaign_id=seq.campaign_id,
+        steps=tuple(StepPlan(step.id, step.subject, step.body, step.offset_days or 0) for step in steps),
+        send_window=campaign.send_window if campaign else None,
+    )
+
+
+def _cached(session: Session, kind: str, column, value: str) -> Optional[SequencePlan]:
+    ttl = get_settings().sequence_plan_cache_ttl_seconds
+    key = (kind, value)
+    now = time.monotonic()
+    with _lock:
+        hit = _cache.get(key)
+    if hit and now - hit[0] < ttl:
+        return hit[1]
+    plan = _load(session, column, value)
+    with _lock:
+        _cache[key] = (now, plan)
+    return plan
+
+
+def plan_for(session: Session, lead_magnet_id: Optional[str], campaign_id: Optional[str]) -> Optional[SequencePlan]:
+    """Resolve the nurture plan for a lead: lead magnet match first, then campaign.
+
+    Results (including "no sequence") are cached in-process. Writes in this process
+    invalidate immediately; the TTL bounds staleness for writes made by other processes.
+    """
+    plan = None
+    if lead_magnet_id:
+        plan = _cached(session, "lead_magnet", NurtureSequenceDB.lead_magnet_id, lead_magnet_id)
+    if not plan and campaign_id:
+        plan = _cached(session, "campaign", NurtureSequenceDB.campaign_id, campaign_id)
+    return plan
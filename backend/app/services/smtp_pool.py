@@ -0,0 +1,284 @@
+from __future__ import annotations
+from contextlib import contextmanager
+from email.message import EmailMessage
+import queue
+import re
+import smtplib
+import ssl
+import threading
+import time
+from typing import Iterator, Optional
+from app.core.config import get_settings
+from app.core.metrics import gauge_key, metrics
+
+
+class SMTPSendError(Exception):
+    """A relay refused a message. `transient` is True for 4xx replies (retry later)."""
+
+    def __init__(self, code: int, message: str):
+        super().__init__(f"SMTP {code}: {message}")
+        self.code = code
+        self.transient = 400 <= code < 500
+
+
+def _encode_data(msg: bytes) -> bytes:
+    # RFC 5321 4.5.2: CRLF line endings, dot-stuffing, terminated by <CRLF>.<CRLF>
+    data = re.sub(rb"(?:\r\n|\n|\r(?!\n))", b"\r\n", msg)
+    data = re.sub(rb"(?m)^\.", b"..", data)
+    if not data.endswith(b"\r\n"):
+        data += b"\r\n"
+    return data + b".\r\n"
+
+
+class _Connection:
+    def __init__(self, smtp: smtplib.SMTP):
+        self.smtp = smtp
+        self.messages = 0
+
+    @property
+    def pipelining(self) -> bool:
+        return self.smtp.has_extn("pipelining")
+
+    def close(self) -> None:
+        try:
+            self.smtp.quit()
+        except (smtplib.SMTPException, OSError):
+            self.smtp.close()
+
+    def send(self, sender: str, recipients: list[str], msg: bytes) -> str:
+        """Send one message; returns the relay's final reply text (usually carries a queue id)."""
+        if self.pipelining:
+            reply = self._send_pipelined(sender, recipients, msg)
+        else:
+            reply = self._send_serial(sender, recipients, msg)
+        self.messages += 1
+        return reply
+
+    def _send_pipelined(self, sender: str, recipients: list[str], msg: bytes) -> str:
+        # RFC 2920: MAIL, RCPT and DATA go out in one write; replies are read in order.
+        smtp = self.smtp
+        commands = [f"MAIL FROM:<{sender}>"] + [f"RCPT TO:<{rcpt}>" for rcpt in recipients] + ["DATA"]
+        smtp.send("".join(f"{command}\r\n" for command in commands))
+        replies = [smtp.getreply() for _ in commands]
+        mail_reply, rcpt_replies, data_reply = replies[0], replies[1:-1], replies[-1]
+        if mail_reply[0] != 250:
+            self._abort(data_reply)
+            raise SMTPSendError(*self._decode(mail_reply))
+        accepted = [reply for reply in rcpt_replies if reply[0] in (250, 251)]
+        if not accepted:
+            self._abort(data_reply)
+            raise SMTPSendError(*self._decode(rcpt_replies[0]))
+        if data_reply[0] != 354:
+            self._reset()
+            raise SMTPSendError(*self._decode(data_reply))
+        smtp.send(_encode_data(msg))
+        code, text = self._decode(smtp.getreply())
+        if code != 250:
+            raise SMTPSendError(code, text)
+        return text
+
+    def _send_serial(self, sender: str, recipients: list[str], msg: bytes) -> str:
+        smtp = self.smtp
+        try:
+            smtp.sendmail(sender, recipients, msg)
+        except smtplib.SMTPRecipientsRefused as exc:
+            code, text = next(iter(exc.recipients.values()))
+            raise SMTPSendError(code, text.decode("utf-8", "replace") if isinstance(text, bytes) else text)
+        except smtplib.SMTPResponseException as exc:
+            text = exc.smtp_error.decode("utf-8", "replace") if isinstance(exc.smtp_error, bytes) else exc.smtp_error
+            raise SMTPSendError(exc.smtp_code, text)
+        return "sent"
+
+    def _abort(self, data_reply: tuple[int, bytes]) -> None:
+        # The server may have accepted DATA despite the earlier failure; end it empty.
+        if data_reply[0] == 354:
+            self.smtp.send(b".\r\n")
+            self.smtp.getreply()
+        self._reset()
+
+    def _reset(self) -> None:
+        try:
+            self.smtp.rset()
+        except smtplib.SMTPException:
+            pass
+
+    @staticmethod
+    def _decode(reply: tuple[int, bytes]) -> tuple[int, str]:
+        code, text = reply
+        return code, text.decode("utf-8", "replace") if isinstance(text, bytes) else str(text)
+
+
+class SMTPPool:
+    """Bounded pool of persistent, authenticated connections to one SMTP relay.
+
+    Connections are opened lazily up to `size` and reused across messages, so a batch
+    pays the TCP/TLS/AUTH handshake once per connection instead of once per email.
+    Connections are recycled after `max_messages` messages or `max_idle_seconds` idle.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int = 587,
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        starttls: bool = True,
+        use_ssl: bool = False,
+        size: int = 4,
+        timeout: float = 30.0,
+        max_messages: int = 1000,
+        max_idle_seconds: float = 240.0,
+    ):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.starttls = starttls
+        self.use_ssl = use_ssl
+        self.size = max(1, size)
+        self.timeout = timeout
+        self.max_messages = max_messages
+        self.max_idle_seconds = max_idle_seconds
+        self.opened = 0
+        self._idle: queue.LifoQueue[tuple[float, _Connection]] = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(self.size)
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def _connect(self) -> _Connection:
+        if self.use_ssl:
+            smtp: smtplib.SMTP = smtplib.SMTP_SSL(
+                self.host, self.port, timeout=self.timeout, context=ssl.create_default_context()
+            )
+        else:
+            smtp = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        try:
+            smtp.ehlo()
+            if self.starttls and not self.use_ssl and smtp.has_extn("starttls"):
+                smtp.starttls(context=ssl.create_default_context())
+                smtp.ehlo()
+            if self.username:
+                smtp.login(self.username, self.password or "")
+        except BaseException:
+            smtp.close()
+            raise
+        with self._lock:
+            self.opened += 1
+        metrics.inc("smtp_connections_opened_total", relay=self.host)
+        return _Connection(smtp)
+
+    def _checkout(self) -> _Connection:
+        while True:
+            try:
+                idle_since, conn = self._idle.get_nowait()
+            except queue.Empty:
+                return self._connect()
+            if time.monotonic() - idle_since < self.max_idle_seconds:
+                return conn
+            conn.close()
+
+    @contextmanager
+    def connection(self) -> Iterator[_Connection]:
+        if not self._slots.acquire(timeout=self.timeout):
+            raise TimeoutError(f"No SMTP connection to {self.host} available within {self.timeout}s")
+        conn: Optional[_Connection] = None
+        healthy = False
+        try:
+            conn = self._checkout()
+            yield conn
+            healthy = True
+        except SMTPSendError as exc:
+            # The relay answered, so the session is still usable unless it is closing (421).
+            healthy = exc.code != 421
+            raise
+        finally:
+            if conn is not None:
+                if healthy and not self._closed and conn.messages < self.max_messages:
+                    self._idle.put((time.monotonic(), conn))
+                else:
+                    conn.close()
+            self._slots.release()
+
+    def send(self, sender: str, recipients: list[str], msg: bytes) -> str:
+        """Send a message, reconnecting once if a pooled connection was dropped by the relay."""
+        for attempt in range(2):
+            try:
+                with self.connection() as conn:
+                    return conn.send(sender, recipients, msg)
+            except (smtplib.SMTPServerDisconnected, ConnectionResetError, BrokenPipeError):
+                if attempt:
+                    raise
+        raise AssertionError("unreachable")
+
+    def close(self) -> None:
+        self._closed = True
+        while True:
+            try:
+                _, conn = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            conn.close()
+
+    def snapshot(self) -> dict[str, float]:
+        return {
+            gauge_key("smtp_pool_idle", relay=self.host): self._idle.qsize(),
+            gauge_key("smtp_pool_opened", relay=self.host): self.opened,
+        }
+
+
+def build_message(sender: str, sender_name: Optional[str], to_email: str, subject: str, body: str) -> EmailMessage:
+    message = EmailMessage()
+    message["From"] = f"{sender_name} <{sender}>" if sender_name else sender
+    message["To"] = to_email
+    # Rendered subjects can carry the body's unsubscribe footer; headers must be one line.
+    message["Subject"] = subject.splitlines()[0] if subject else ""
+    message.set_content(body)
+    return message
+
+
+_pools: dict[tuple, SMTPPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_smtp_pool(password: Optional[str] = None) -> SMTPPool:
+    """Shared pool for the relay configured in settings (one per host/port/user)."""
+    settings = get_settings()
+    if not settings.smtp_host:
+        raise ValueError("SMTP_HOST is not configured")
+    password = settings.smtp_password or password
+    key = (settings.smtp_host, settings.smtp_port, settings.smtp_username, password)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = SMTPPool(
+                settings.smtp_host,
+                settings.smtp_port,
+                username=settings.smtp_username,
+                password=password,
+                starttls=settings.smtp_starttls,
+                use_ssl=settings.smtp_ssl,
+                size=settings.smtp_pool_size,
+                timeout=settings.smtp_timeout_seconds,
+                max_messages=settings.smtp_max_messages_per_connection,
+            )
+            _pools[key] = pool
+        return pool
+
+
+def close_smtp_pools() -> None:
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.close()
+        _pools.clear()
+
+
+def _collect() -> dict[str, float]:
+    with _pools_lock:
+        pools = list(_pools.values())
+    gauges: dict[str, float] = {}
+    for pool in pools:
+        gauges.update(pool.snapshot())
+    return gauges
+
+
+metrics.register_collector(_collect)
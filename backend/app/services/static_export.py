@@ -0,0 +1,191 @@
+"""Static export of published landing and thank-you pages for object storage / CDN hosting.
+
+Layout under the export directory:
+
+    lp/<slug>/index.html             landing page (same output as GET /public/lp/{slug})
+    lp/<slug>/thank-you/index.html   thank-you page (same output as GET /public/lp/{slug}/thank-you)
+    *.gz / *.br                      precompressed copies (.br only when brotli is installed)
+    manifest.json                    per slug: landing id, content hash and the files written
+
+Re-running rewrites only pages whose content hash changed and removes pages that were
+deleted or unpublished. Forms keep posting to `<api_base>/public/lp/{slug}/submit` and then go
+to `/lp/<slug>/thank-you/` on the export host (the app's redirect_url is an SPA route).
+"""
+from __future__ import annotations
+from datetime import datetime, timezone
+import hashlib
+import json
+import os
+from pathlib import Path
+import re
+import shutil
+import threading
+from typing import Optional
+from sqlalchemy.engine import Engine
+from sqlmodel import Session, select
+from app.core.config import get_settings
+from app.core.http_cache import available_encodings, body_etag, compress
+from app.core.metrics import metrics
+from app.models.db import (
+    Campaign as CampaignDB,
+    LandingPage as LandingPageDB,
+    LeadMagnet as LeadMagnetDB,
+)
+from app.services.landing_render import render_landing_html
+from app.services.thank_you import render_thank_you_html
+
+MANIFEST_NAME = "manifest.json"
+MANIFEST_VERSION = 2
+PUBLISHED_STATUS = "published"
+
+_EXTENSIONS = {"gzip": ".gz", "br": ".br"}
+# Slugs become directory names; anything else could escape the export root.
+_SAFE_SLUG = re.compile(r"^[A-Za-z0-9][A-Za-z0-9._-]*$")
+_export_lock = threading.Lock()
+
+
+def page_files(
+    landing: LandingPageDB,
+    lead_magnet_type: str,
+    product_context: Optional[dict],
+    upgrade_offer: Optional[dict],
+    api_base: str = "",
+) -> dict[str, str]:
+    """Relative path -> HTML for one landing page and its thank-you page."""
+    # Not the stored rendered_html: the exported form redirects to the exported thank-you page.
+    landing_page = render_landing_html(
+        landing.html_content, product_context, landing.slug, api_base, thank_you_url=f"/lp/{landing.slug}/thank-you/"
+    )
+    return {
+        f"lp/{landing.slug}/index.html": landing_page,
+        f"lp/{landing.slug}/thank-you/index.html": render_thank_you_html(
+            landing.headline, lead_magnet_type, upgrade_offer
+        ),
+    }
+
+
+def _content_hash(files: dict[str, str]) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    for path in sorted(files):
+        digest.update(path.encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(files[path].encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+
+def load_manifest(root: Path) -> dict:
+    path = root / MANIFEST_NAME
+    if not path.exists():
+        return {}
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except ValueError:
+        print(f"[WARN] Ignoring unreadable export manifest {path}")
+        return {}
+
+
+def _write_page(root: Path, files: dict[str, str], encodings: tuple[str, ...]) -> dict:
+    written = {}
+    for rel, html in files.items():
+        raw = html.encode("utf-8")
+        _write_atomic(root / rel, raw)
+        for encoding in encodings:
+            _write_atomic(root / (rel + _EXTENSIONS[encoding]), compress(raw, encoding))
+        written[rel] = {"bytes": len(raw), "etag": body_etag(raw)}
+    return written
+
+
+def _remove_page(root: Path, slug: str) -> None:
+    shutil.rmtree(root / "lp" / slug, ignore_errors=True)
+
+
+def export_static(
+    out_dir: Optional[str] = None,
+    engine: Optional[Engine] = None,
+    full: bool = False,
+    api_base: Optional[str] = None,
+) -> dict:
+    """Export every page of a published campaign; returns counts and the export directory."""
+    settings = get_settings()
+    if engine is None:
+        from app.db.session import engine
+    root = Path(out_dir or settings.static_export_dir).resolve()
+    api_base = (settings.public_api_base_url if api_base is None else api_base).rstrip("/")
+    encodings = available_encodings()
+
+    with _export_lock:
+        previous = load_manifest(root)
+        # A different submit origin or codec set changes every file, so start over.
+        if (
+            previous.get("version") != MANIFEST_VERSION
+            or previous.get("api_base") != api_base
+            or previous.get("encodings") != list(encodings)
+        ):
+            full = True
+        old_pages: dict = {} if full else previous.get("pages", {})
+
+        with Session(engine) as session:
+            rows = session.exec(
+                select(LandingPageDB, LeadMagnetDB.type, CampaignDB.product_context, CampaignDB.upgrade_offer)
+                .join(LeadMagnetDB, LeadMagnetDB.id == LandingPageDB.lead_magnet_id)
+                .join(CampaignDB, CampaignDB.id == LeadMagnetDB.campaign_id)
+                .where(CampaignDB.status == PUBLISHED_STATUS)
+                .order_by(LandingPageDB.slug)
+            ).all()
+
+        pages: dict[str, dict] = {}
+        exported = unchanged = skipped = 0
+        for landing, magnet_type, product_context, upgrade_offer in rows:
+            if not _SAFE_SLUG.match(landing.slug) or ".." in landing.slug:
+                print(f"[WARN] Not exporting landing page {landing.id}: unsafe slug {landing.slug!r}")
+                skipped += 1
+                continue
+            files = page_files(landing, magnet_type, product_context, upgrade_offer, api_base)
+            content_hash = _content_hash(files)
+            old = old_pages.get(landing.slug)
+            if old and old.get("hash") == content_hash and all((root / rel).exists() for rel in old.get("files", {})):
+                pages[landing.slug] = old
+                unchanged += 1
+                continue
+            if full:
+                _remove_page(root, landing.slug)
+            pages[landing.slug] = {
+                "landing_id": landing.id,
+                "hash": content_hash,
+                "files": _write_page(root, files, encodings),
+            }
+            exported += 1
+
+        removed = 0
+        for slug in set(previous.get("pages", {})) - set(pages):
+            if _SAFE_SLUG.match(slug) and ".." not in slug:
+                _remove_page(root, slug)
+            removed += 1
+
+        manifest = {
+            "version": MANIFEST_VERSION,
+            "generated_at": datetime.now(timezone.utc).isoformat(),
+            "api_base": api_base,
+            "encodings": list(encodings),
+            "pages": pages,
+        }
+        _write_atomic(root / MANIFEST_NAME, json.dumps(manifest, indent=2, sort_keys=True).encode("utf-8"))
+
+    metrics.inc("static_export_pages_total", exported, result="exported")
+    metrics.inc("static_export_pages_total", unchanged, result="unchanged")
+    metrics.inc("static_export_pages_total", removed, result="removed")
+    return {
+        "directory": str(root),
+        "exported": exported,
+        "unchanged": unchanged,
+        "removed": removed,
+        "skipped": skipped,
+    }
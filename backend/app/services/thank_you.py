@@ -0,0 +1,241 @@
+"""Post-conversion (thank-you) page and its SPA payload, rendered once per content version.
+
+Both depend only on the landing headline/theme, the lead magnet type and the campaign's
+upgrade offer and brand, so they are keyed by a digest of those and kept in a bounded LRU.
+An edit to any of them changes the key, so writers have nothing to invalidate; stale entries
+age out of the LRU.
+"""
+from __future__ import annotations
+from collections import OrderedDict
+from dataclasses import dataclass
+import hashlib
+import json
+import threading
+from typing import Optional
+from sqlmodel import Session, select
+from app.core.config import get_settings
+from app.core.metrics import metrics
+from app.core.responses import ok
+from app.models.db import (
+    Campaign as CampaignDB,
+    LandingPage as LandingPageDB,
+    LeadMagnet as LeadMagnetDB,
+)
+
+
+class ThankYouNotFound(Exception):
+    """The landing page exists but its lead magnet or campaign does not."""
+
+
+@dataclass(frozen=True)
+class ThankYouPage:
+    version: str
+    html: bytes
+    json: bytes
+
+
+def render_thank_you_html(headline: str, lead_magnet_type: str, upgrade_offer: Optional[dict]) -> str:
+    """The post-conversion page: confirmation plus the campaign's upgrade offer, if any."""
+    upgrade = upgrade_offer or {}
+    
+    # Simple HTML Template for Thank You Page
+    html = f"""
+    <!DOCTYPE html>
+    <html lang="en">
+    <head>
+        <meta charset="UTF-8">
+        <meta name="viewport" content="width=device-width, initial-scale=1.0">
+        <title>Thank You | {headline}</title>
+         <script src="https://cdn.tailwindcss.com"></script>
+         <link href="https://fonts.googleapis.com/css2?family=Inter:wght@400;600;700&display=swap" rel="stylesheet">
+         <style>
+            body {{ font-family: 'Inter', sans-serif; }}
+         </style>
+    </head>
+    <body class="bg-gray-50 min-h-screen flex flex-col">
+        
+        <main class="flex-grow flex items-center justify-center p-4">
+            <div class="max-w-3xl w-full bg-white rounded-2xl shadow-xl overflow-hidden border border-gray-100">
+                
+                <!-- Success Header -->
+                <div class="bg-green-50 p-8 text-center border-b border-green-100">
+                    <div class="w-16 h-16 bg-green-100 text-green-600 rounded-full flex items-center justify-center mx-auto mb-4">
+                        <svg xmlns="http://www.w3.org/2000/svg" class="h-8 w-8" fill="none" viewBox="0 0 24 24" stroke="currentColor">
+                          <path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M5 13l4 4L19 7" />
+                        </svg>
+                    </div>
+                    <h1 class="text-3xl font-bold text-gray-900 mb-2">Success! check your inbox.</h1>
+                    <p class="text-green-800">Your {lead_magnet_type.replace('_', ' ')} is on its way to your email.</p>
+                </div>
+
+                <!-- Upgrade Offer Section -->
+                <div class="p-8 md:p-12">
+    """
+    
+    if upgrade:
+        html += f"""
+                    <div class="text-center mb-8">
+                        <span class="inline-block px-3 py-1 bg-purple-100 text-purple-700 rounded-full text-xs font-bold tracking-wide uppercase mb-4">
+                            Limited Time Offer
+                        </span>
+                        <h2 class="text-2xl md:text-3xl font-extrabold text-gray-900 mb-4">
+                            {upgrade.get('core_offer', 'Wait! Before you go...')}
+                        </h2>
+                        <div class="flex items-end justify-center gap-3 mb-4">
+                            <span class="text-sm text-gray-400 line-through">{upgrade.get('value_anchor', '')}</span>
+                            <span class="text-3xl font-extrabold text-gray-900">{upgrade.get('price', '')}</span>
+                        </div>
+                        <p class="text-lg text-gray-600 leading-relaxed max-w-2xl mx-auto">
+                            Here is a special offer tailored to your next step.
+                        </p>
+                    </div>
+                    
+                    <div class="max-w-2xl mx-auto mb-8">
+                        <div class="bg-white border border-purple-100 rounded-xl p-4 mb-4">
+                            <div class="flex items-center gap-2 font-semibold text-purple-700 mb-2">
+                                <span>🛡️</span>
+                                <span>Guarantee</span>
+                            </div>
+                            <p class="text-gray-700">{upgrade.get('guarantee', '100% satisfaction guaranteed.')}</p>
+                        </div>
+
+                        <div class="bg-purple-50 border border-purple-100 rounded-xl p-4">
+                            <div class="text-xs font-bold text-purple-600 uppercase tracking-wider mb-3">Bonuses Included</div>
+                            <ul class="space-y-2 text-sm text-gray-700">
+                                {''.join([f"<li class='flex items-start gap-2'><span class='text-purple-500 mt-0.5'>✔</span><span>{b}</span></li>" for b in (upgrade.get('bonuses') or [])])}
+                            </ul>
+                        </div>
+                    </div>
+
+                    <div class="text-center">
+                        <a href="#" class="inline-block bg-purple-600 hover:bg-purple-700 text-white text-lg font-bold py-4 px-12 rounded-xl shadow-lg hover:shadow-xl transition transform hover:-translate-y-1">
+                            Claim Offer &rarr;
+                        </a>
+                        <p class="mt-4 text-sm text-gray-400">No thanks, I'll stick to the free guide.</p>
+                    </div>
+        """
+    else:
+        html += """
+                    <div class="text-center">
+                        <p class="text-gray-600">You can close this page now.</p>
+                    </div>
+        """
+
+    html += """
+                </div>
+            </div>
+        </main>
+        
+        <footer class="bg-gray-900 text-white py-6 text-center text-sm text-gray-500">
+            &copy; 2024 All rights reserved.
+        </footer>
+
+    </body>
+    </html>
+    """
+    
+    return html
+
+
+def thank_you_payload(
+    upgrade_offer: Optional[dict],
+    product_context: Optional[dict],
+    background_style: Optional[str],
+    theme: Optional[str],
+) -> dict:
+    """Upgrade offer and brand fields for the SPA thank-you screen."""
+    upgrade = upgrade_offer or {}
+    product_context = product_context or {}
+    return {
+        "headline": upgrade.get("core_offer")
+        or upgrade.get("coreOffer")
+        or upgrade.get("positioning")
+        or "Wait! Before you go...",
+        "copy": upgrade.get("offerCopy")
+        or upgrade.get("offer_copy")
+        or "Here is a special offer tailored to your next step.",
+        "cta": upgrade.get("cta") or "Claim Offer",
+        "coreOffer": upgrade.get("core_offer") or upgrade.get("coreOffer"),
+        "price": upgrade.get("price"),
+        "valueAnchor": upgrade.get("value_anchor") or upgrade.get("valueAnchor"),
+        "guarantee": upgrade.get("guarantee"),
+        "bonuses": upgrade.get("bonuses", []),
+        "companyName": product_context.get("company_name")
+        or product_context.get("companyName")
+        or "GenieOps",
+        "logoUrl": product_context.get("logo_url")
+        or product_context.get("logoUrl"),
+        "primaryColor": product_context.get("primary_color")
+        or product_context.get("primaryColor")
+        or "#2563eb",
+        "fontStyle": product_context.get("font_style")
+        or product_context.get("fontStyle")
+        or "sans",
+        "backgroundStyle": background_style,
+        "theme": theme,
+        "designVibe": product_context.get("design_vibe")
+        or product_context.get("designVibe"),
+    }
+
+
+_cache: OrderedDict[str, ThankYouPage] = OrderedDict()
+_lock = threading.Lock()
+
+
+def _version(*parts) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(json.dumps(parts, sort_keys=True, default=str).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def thank_you_page(session: Session, landing_id: str) -> Optional[ThankYouPage]:
+    """One joined LandingPage -> LeadMagnet -> Campaign query, then cached HTML and JSON bytes.
+
+    Returns None for an unknown landing page; raises ThankYouNotFound for a dangling one.
+    """
+    row = session.exec(
+        select(
+            LandingPageDB.headline,
+            LandingPageDB.background_style,
+            LandingPageDB.theme,
+            LeadMagnetDB.id,
+            LeadMagnetDB.type,
+            CampaignDB.id,
+            CampaignDB.upgrade_offer,
+            CampaignDB.product_context,
+        )
+        .outerjoin(LeadMagnetDB, LeadMagnetDB.id == LandingPageDB.lead_magnet_id)
+        .outerjoin(CampaignDB, CampaignDB.id == LeadMagnetDB.campaign_id)
+        .where(LandingPageDB.id == landing_id)
+    ).first()
+    if row is None:
+        return None
+    headline, background_style, theme, magnet_id, magnet_type, campaign_id, upgrade_offer, product_context = row
+    if magnet_id is None:
+        raise ThankYouNotFound("Lead Magnet not found")
+    if campaign_id is None:
+        raise ThankYouNotFound("Campaign not found")
+
+    version = _version(headline, background_style, theme, magnet_type, upgrade_offer, product_context)
+    with _lock:
+        hit = _cache.get(version)
+        if hit is not None:
+            _cache.move_to_end(version)
+    if hit is not None:
+        metrics.inc("thank_you_cache_total", result="hit")
+        return hit
+    metrics.inc("thank_you_cache_total", result="miss")
+    payload = thank_you_payload(upgrade_offer, product_context, background_style, theme)
+    page = ThankYouPage(
+        version=version,
+        html=render_thank_you_html(headline, magnet_type, upgrade_offer).encode("utf-8"),
+        json=ok(payload).model_dump_json().encode("utf-8"),
+    )
+    size = get_settings().thank_you_cache_size
+    if size > 0:
+        with _lock:
+            _cache[version] = page
+            _cache.move_to_end(version)
+            while len(_cache) > size:
+                _cache.popitem(last=False)
+    return page
@@ -0,0 +1,81 @@
+"""Standalone email dispatch worker.
+
+Runs only the email dispatcher, so API processes can start with
+EMAIL_SCHEDULER_ENABLED=false and send throughput scales independently:
+
+    python -m app.worker                  # all queued email
+    python -m app.worker --shard 0/4      # logs where crc32(lead_id) % 4 == 0
+
+SIGTERM/SIGINT trigger a graceful drain: the batch in flight is sent and written
+back before the process exits.
+"""
+from __future__ import annotations
+import argparse
+import logging
+import signal
+import sys
+import threading
+from typing import Optional
+from app.services.email_dispatcher import parse_shard
+from app.services.email_scheduler import build_scheduler, drain
+
+logger = logging.getLogger("app.worker")
+
+
+def _parse_args(argv: Optional[list[str]]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m app.worker", description="Run the email dispatcher.")
+    parser.add_argument("--shard", default=None, help="Process only shard i of N, e.g. 0/4.")
+    parser.add_argument(
+        "--drain-timeout",
+        type=float,
+        default=60.0,
+        help="Seconds to wait for the in-flight batch on shutdown.",
+    )
+    parser.add_argument(
+        "--until-idle",
+        action="store_true",
+        help="Send everything currently due, then exit (useful for cron and benchmarks).",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    args = _parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    try:
+        shard = parse_shard(args.shard)
+    except ValueError as exc:
+        logger.error(str(exc))
+        return 2
+
+    if args.until_idle:
+        try:
+            drain(shard=shard)
+        except Exception as exc:
+            logger.error(f"Email worker: dispatch failed: {exc}")
+            return 1
+        return 0
+
+    stop = threading.Event()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(sig, lambda *_: stop.set())
+
+    dispatcher = build_scheduler(shard=shard)
+    dispatcher.start()
+    logger.info(f"Email worker started (shard={args.shard or 'all'}).")
+    while not stop.wait(1.0):
+        if not dispatcher.running:
+            logger.error("Email dispatcher stopped unexpectedly.")
+            return 1
+
+    logger.info("Email worker draining...")
+    dispatcher.shutdown(wait=True, timeout=args.drain_timeout)
+    if dispatcher.running:
+        logger.warning("Email worker drain timed out; the in-flight batch was not written back.")
+        return 1
+    logger.info("Email worker stopped.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,202 @@
+"""Email dispatch throughput benchmark against a local provider stand-in.
+
+Seeds N leads with one due EmailLog each, points the SendGrid/MailerSend client
+at `ProviderStub` (configurable latency, 5xx and 429 rates), drains the queue
+through the real dispatch path and reports one JSON object:
+
+    sends_per_second, queries_per_email, lag_p50_ms / lag_p99_ms (scheduled -> sent), ...
+
+    python -m benchmarks.email_dispatch --emails 2000 --latency-ms 20
+    python -m benchmarks.email_dispatch --database-url postgresql+psycopg://... --output results.jsonl
+
+With --output the result is appended as a JSON line so runs can be diffed over time.
+"""
+from __future__ import annotations
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from uuid import uuid4
+
+from sqlalchemy import event, insert
+from sqlmodel import SQLModel, Session, create_engine, select
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BACKEND_ROOT))
+
+from benchmarks.provider_stub import ProviderStub  # noqa: E402
+
+
+def configure(provider_url: str, rate_limit: float) -> None:
+    """Point the provider clients at the stub; must run before app settings are first read."""
+    os.environ["SENDGRID_API_URL"] = provider_url
+    os.environ["MAILERSEND_API_URL"] = provider_url
+    os.environ["EMAIL_RATE_LIMITS"] = json.dumps({"sendgrid": rate_limit, "mailersend": rate_limit})
+    os.environ["EMAIL_RETRY_BASE_SECONDS"] = "3600"
+    from app.core.config import get_settings
+    from app.services.email_throttle import reset_throttles
+
+    get_settings.cache_clear()
+    reset_throttles()
+
+
+def seed(engine, emails: int, provider: str, scheduled_at: datetime | None = None) -> None:
+    from app.core.config import get_settings
+    from app.models.db import AppSetting, EmailLog, Lead
+    from app.services.email_dispatcher import shard_key_for
+
+    SQLModel.metadata.drop_all(engine)
+    SQLModel.metadata.create_all(engine)
+    env = get_settings()
+    due = scheduled_at or datetime.utcnow()
+    leads = [{"id": str(uuid4()), "email": f"bench{idx}@example.com", "name": f"Bench {idx}"} for idx in range(emails)]
+    logs = [
+        {
+            "id": str(uuid4()),
+            "lead_id": lead["id"],
+            "subject": "Hello {{name}}",
+            "body": "Benchmark body for {{name}}",
+            "status": "queued",
+            "scheduled_at": due,
+            "next_attempt_at": due,
+            "shard_key": shard_key_for(lead["id"]),
+        }
+        for lead in leads
+    ]
+    with Session(engine) as session:
+        session.add(
+            AppSetting(
+                llm_provider=env.llm_provider,
+                llm_api_key=env.llm_api_key,
+                llm_model=env.llm_model,
+                email_provider=provider,
+                email_api_key="bench-" + "k" * 40,
+            )
+        )
+        session.exec(insert(Lead), params=leads)
+        session.exec(insert(EmailLog), params=logs)
+        session.commit()
+
+
+def dispatch_until_idle(engine, timeout: float) -> None:
+    """Like `drain`, but sleeps through throttle pauses so 429 runs still finish."""
+    from app.services.email_logs import list_due
+    from app.services.email_scheduler import _process_due
+
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        resume_at = _process_due(engine)
+        if resume_at:
+            wait = (resume_at - datetime.utcnow()).total_seconds()
+            if wait > 0:
+                time.sleep(min(wait, max(0.0, deadline - time.monotonic())))
+            continue
+        with Session(engine) as session:
+            if not list_due(session, datetime.utcnow()):
+                return
+
+
+def _percentile(values: list[float], pct: float) -> float | None:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def run(
+    database_url: str,
+    emails: int,
+    provider: str,
+    latency_ms: float,
+    error_rate: float,
+    throttle_rate: float,
+    rate_limit: float,
+    timeout: float = 300.0,
+) -> dict:
+    with ProviderStub(latency_ms=latency_ms, error_rate=error_rate, throttle_rate=throttle_rate) as stub:
+        configure(stub.url, rate_limit)
+        from app.models.db import EmailLog
+
+        engine = create_engine(database_url)
+        seed(engine, emails, provider)
+
+        queries = 0
+
+        def _count(*_):
+            nonlocal queries
+            queries += 1
+
+        event.listen(engine, "before_cursor_execute", _count)
+        started = time.perf_counter()
+        dispatch_until_idle(engine, timeout)
+        elapsed = time.perf_counter() - started
+        event.remove(engine, "before_cursor_execute", _count)
+
+        with Session(engine) as session:
+            logs = session.exec(select(EmailLog)).all()
+        engine.dispose()
+
+    sent = [log for log in logs if log.status == "sent"]
+    lags = [(log.sent_at - log.scheduled_at).total_seconds() * 1000 for log in sent if log.sent_at and log.scheduled_at]
+    attempted = sum(log.attempt_count or 0 for log in logs)
+    return {
+        "benchmark": "email_dispatch",
+        "timestamp": datetime.utcnow().isoformat(),
+        "dialect": engine.dialect.name,
+        "provider": provider,
+        "emails": emails,
+        "latency_ms": latency_ms,
+        "error_rate": error_rate,
+        "throttle_rate": throttle_rate,
+        "rate_limit": rate_limit,
+        "sent": len(sent),
+        "not_sent": len(logs) - len(sent),
+        "provider_requests": stub.requests,
+        "seconds": round(elapsed, 3),
+        "sends_per_second": round(len(sent) / elapsed, 1) if elapsed else None,
+        "queries": queries,
+        "queries_per_email": round(queries / attempted, 3) if attempted else None,
+        "lag_p50_ms": _percentile(lags, 50),
+        "lag_p99_ms": _percentile(lags, 99),
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--emails", type=int, default=1000)
+    parser.add_argument("--database-url", default=None, help="Defaults to a temporary SQLite file.")
+    parser.add_argument("--provider", choices=["sendgrid", "mailersend"], default="sendgrid")
+    parser.add_argument("--latency-ms", type=float, default=10.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with 500.")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Fraction of requests answered with 429.")
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="Client-side sends/sec limit (0 = unlimited).")
+    parser.add_argument("--timeout", type=float, default=300.0, help="Stop dispatching after this many seconds.")
+    parser.add_argument("--output", default=None, help="Append the JSON result to this file.")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = args.database_url or f"sqlite:///{Path(tmp) / 'bench.db'}"
+        result = run(
+            database_url,
+            args.emails,
+            args.provider,
+            args.latency_ms,
+            args.error_rate,
+            args.throttle_rate,
+            args.rate_limit,
+            args.timeout,
+        )
+    line = json.dumps(result)
+    print(line)
+    if args.output:
+        with open(args.output, "a", encoding="utf-8") as handle:
+            handle.write(line + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,194 @@
+"""Event-loop lag while POST /public/lp/{slug}/submit is under load.
+
+Seeds a campaign with a landing page and a 2-step nurture sequence into a temporary SQLite file
+per mode, then drives the app in-process (httpx ASGITransport, one event loop) with
+`--concurrency` submitters while a probe task sleeps 5 ms in a loop and records how late it
+wakes up. The lag is what every other awaiting request (LLM calls, page views) waits on.
+
+    blocking    the pre-async handler: sync Session queries straight on the event loop
+    threadpool  the same handler with its DB work on the bounded DB threadpool (run_db)
+    async       the shipped route: AsyncSession (aiosqlite), sync services via run_sync
+
+    python -m benchmarks.event_loop_lag --leads 2000 --concurrency 50
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+from fastapi import APIRouter, Depends, FastAPI, Request
+from sqlmodel import Session
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BACKEND_ROOT))
+
+os.environ.setdefault("EMAIL_SCHEDULER_ENABLED", "false")
+os.environ.setdefault("LANDING_RERENDER_ON_STARTUP", "false")
+os.environ.setdefault("PUBLIC_RATE_LIMIT_ENABLED", "false")
+
+SLUG = "bench"
+PROBE_SECONDS = 0.005
+
+
+def seed(path: Path):
+    from sqlmodel import SQLModel, create_engine
+    from app.db.session import create_async_db_engine
+    from app.models.db import Campaign, LandingPage, LeadMagnet, NurtureSequence, NurtureStep
+
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        campaign = Campaign(name="Bench", icp_role="CTO", icp_industry="SaaS", status="published")
+        session.add(campaign)
+        session.flush()
+        magnet = LeadMagnet(
+            campaign_id=campaign.id,
+            title="Checklist",
+            type="checklist",
+            pain_point_alignment="",
+            value_promise="",
+            conversion_score=1.0,
+            format_recommendation="pdf",
+        )
+        session.add(magnet)
+        session.flush()
+        session.add(LandingPage(lead_magnet_id=magnet.id, slug=SLUG, headline="Bench", subheadline="", cta="Go", html_content="<form></form>"))
+        seq = NurtureSequence(campaign_id=campaign.id, lead_magnet_id=magnet.id)
+        session.add(seq)
+        session.flush()
+        # No day-0 step: nothing is sent in the background, only the request path is measured.
+        for order, offset in enumerate((2, 5), start=1):
+            session.add(NurtureStep(sequence_id=seq.id, order=order, subject=f"Step {order}", body="Hi", offset_days=offset))
+        session.commit()
+    return engine, create_async_db_engine(f"sqlite:///{path}")
+
+
+def build_app(mode: str, engine, async_engine):
+    from sqlmodel.ext.asyncio.session import AsyncSession
+    from app.api.routes import public
+    from app.core.responses import ok
+    from app.db.session import get_async_session, get_session, run_db
+    from app.models.schemas import LeadCreate
+    from app.services.landing_resolver import resolve_landing
+    from app.services.leads import capture_lead
+
+    def _submit(session: Session, slug: str, body: dict) -> str:
+        landing = resolve_landing(session, slug)
+        lead_data = LeadCreate(
+            campaign_id=landing.campaign_id,
+            landing_page_id=landing.id,
+            lead_magnet_id=landing.lead_magnet_id,
+            email=body["email"],
+            name=body.get("name"),
+        )
+        return capture_lead(session, lead_data).lead_id
+
+    legacy = APIRouter()
+
+    @legacy.post("/lp/{slug}/submit", response_model=None)
+    async def submit(slug: str, request: Request, session: Session = Depends(get_session)):
+        body = await request.json()
+        if mode == "threadpool":
+            return ok({"lead_id": await run_db(_submit, session, slug, body)})
+        return ok({"lead_id": _submit(session, slug, body)})
+
+    def _session():
+        with Session(engine) as session:
+            yield session
+
+    async def _async_session():
+        async with AsyncSession(async_engine, expire_on_commit=False) as session:
+            yield session
+
+    app = FastAPI()
+    app.include_router(public.router if mode == "async" else legacy, prefix="/public")
+    app.dependency_overrides[get_session] = _session
+    app.dependency_overrides[get_async_session] = _async_session
+    return app
+
+
+async def probe(stop: asyncio.Event, lags: list[float]) -> None:
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(PROBE_SECONDS)
+        lags.append(time.perf_counter() - started - PROBE_SECONDS)
+
+
+async def fire(app, leads: int, concurrency: int) -> tuple[float, list[float], list[float]]:
+    import httpx
+
+    lags: list[float] = []
+    latencies: list[float] = []
+    counter = iter(range(leads))
+    stop = asyncio.Event()
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+
+        async def worker() -> None:
+            for idx in counter:
+                started = time.perf_counter()
+                response = await client.post(f"/public/lp/{SLUG}/submit", json={"email": f"lead{idx}@example.com", "name": "Bench"})
+                latencies.append(time.perf_counter() - started)
+                assert response.status_code == 200, response.text
+
+        probe_task = asyncio.create_task(probe(stop, lags))
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+        stop.set()
+        await probe_task
+    return elapsed, latencies, lags
+
+
+async def measure(app, async_engine, leads: int, concurrency: int) -> tuple[float, list[float], list[float]]:
+    try:
+        return await fire(app, leads, concurrency)
+    finally:
+        await async_engine.dispose()
+
+
+def _pct(values: list[float], q: float) -> float:
+    values = sorted(values)
+    return round(values[min(len(values) - 1, int(len(values) * q))] * 1000, 2) if values else 0.0
+
+
+def run(mode: str, leads: int, concurrency: int, tmp: Path) -> dict:
+    from app.services.landing_resolver import invalidate_landings
+    from app.services.sequence_plans import invalidate_plans
+
+    invalidate_landings()
+    invalidate_plans()
+    engine, async_engine = seed(tmp / f"{mode}.db")
+    elapsed, latencies, lags = asyncio.run(measure(build_app(mode, engine, async_engine), async_engine, leads, concurrency))
+    engine.dispose()
+    return {
+        "rps": round(leads / elapsed, 1),
+        "p50_ms": _pct(latencies, 0.5),
+        "p99_ms": _pct(latencies, 0.99),
+        "loop_lag_p50_ms": _pct(lags, 0.5),
+        "loop_lag_p99_ms": _pct(lags, 0.99),
+        "loop_lag_max_ms": round(max(lags, default=0.0) * 1000, 2),
+        "probe_wakeups": len(lags),
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--leads", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--modes", nargs="+", default=["blocking", "threadpool", "async"], choices=["blocking", "threadpool", "async"])
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for mode in args.modes:
+            result = run(mode, args.leads, args.concurrency, Path(tmp))
+            print(json.dumps({"benchmark": "event_loop_lag", "mode": mode, "leads": args.leads, "concurrency": args.concurrency, **result}))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,166 @@
+"""Peak memory of streaming lead exports against a materialised list.
+
+Seeds `--rows` leads (one email log each) into a temporary SQLite file, or uses `--database-url`
+as is, then runs each export mode in a fresh process so its peak RSS (getrusage ru_maxrss) is its
+own. "csv" / "ndjson" drain `export_rows` as the export endpoints do; "list" loads every lead as
+an ORM object first, the way list_logs reads its page, for comparison. RSS growth is the peak minus
+the process's peak just before the export started.
+
+    python -m benchmarks.export_rows --rows 1000000
+    python -m benchmarks.export_rows --rows 100000 --modes csv list --output results.jsonl
+"""
+from __future__ import annotations
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BACKEND_ROOT))
+
+SEED_BATCH = 10000
+
+
+def seed(database_url: str, rows: int) -> None:
+    from sqlalchemy import insert
+    from sqlmodel import SQLModel, Session, create_engine
+    from app.models.db import Campaign, EmailLog, Lead
+
+    engine = create_engine(database_url)
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        campaign = Campaign(name="Bench", icp_role="CTO", icp_industry="SaaS")
+        session.add(campaign)
+        session.commit()
+        campaign_id = campaign.id
+    started = datetime.utcnow() - timedelta(days=365)
+    with engine.begin() as conn:
+        for offset in range(0, rows, SEED_BATCH):
+            ids = range(offset, min(rows, offset + SEED_BATCH))
+            created = [started + timedelta(seconds=idx * 30) for idx in ids]
+            conn.execute(
+                insert(Lead),
+                [
+                    {
+                        "id": f"lead-{idx:08d}",
+                        "campaign_id": campaign_id,
+                        "email": f"lead{idx}@example.com",
+                        "name": f"Lead {idx}",
+                        "company": "Acme",
+                        "created_at": at,
+                    }
+                    for idx, at in zip(ids, created)
+                ],
+            )
+            conn.execute(
+                insert(EmailLog),
+                [
+                    {
+                        "id": f"log-{idx:08d}",
+                        "lead_id": f"lead-{idx:08d}",
+                        "subject": "Welcome",
+                        "body": "Hi",
+                        "status": "sent",
+                        "attempt_count": 1,
+                        "created_at": at,
+                        "sent_at": at,
+                    }
+                    for idx, at in zip(ids, created)
+                ],
+            )
+    engine.dispose()
+
+
+def _peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS.
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def export_once(database_url: str, mode: str) -> dict:
+    """Run one export in this process and measure it (called in a child process)."""
+    from sqlmodel import Session, create_engine, select
+    from app.models.db import Lead
+    from app.services.data_export import export_rows
+
+    engine = create_engine(database_url)
+    with engine.connect() as conn:
+        conn.exec_driver_sql("SELECT 1")
+    baseline = _peak_rss_mb()
+    started = time.perf_counter()
+    size = rows = 0
+    if mode == "list":
+        with Session(engine) as session:
+            leads = session.exec(select(Lead).order_by(Lead.created_at, Lead.id)).all()
+            for lead in leads:
+                size += len(lead.model_dump_json()) + 1
+            rows = len(leads)
+    else:
+        for chunk in export_rows(engine, "leads", mode):
+            size += len(chunk)
+            rows += chunk.count(b"\n")
+        if mode == "csv":
+            rows -= 1  # header
+    elapsed = time.perf_counter() - started
+    peak = _peak_rss_mb()
+    engine.dispose()
+    return {
+        "mode": mode,
+        "rows": rows,
+        "bytes": size,
+        "seconds": round(elapsed, 3),
+        "rows_per_second": round(rows / elapsed, 1) if elapsed else None,
+        "peak_rss_mb": round(peak, 1),
+        "rss_growth_mb": round(peak - baseline, 1),
+    }
+
+
+def run_child(database_url: str, mode: str) -> dict:
+    output = subprocess.run(
+        [sys.executable, "-m", "benchmarks.export_rows", "--child", mode, "--database-url", database_url],
+        cwd=BACKEND_ROOT,
+        env={**os.environ, "DATABASE_URL": database_url},
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--modes", nargs="+", default=["csv", "ndjson", "list"], choices=["csv", "ndjson", "list"])
+    parser.add_argument("--database-url", default=None, help="Export an existing database instead of seeding one.")
+    parser.add_argument("--output", default=None, help="Append the JSON results to this file.")
+    parser.add_argument("--child", default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        print(json.dumps(export_once(args.database_url, args.child)))
+        return 0
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = args.database_url
+        if database_url is None:
+            database_url = f"sqlite:///{Path(tmp) / 'export.db'}"
+            started = time.perf_counter()
+            seed(database_url, args.rows)
+            print(json.dumps({"benchmark": "export_rows", "seeded": args.rows, "seconds": round(time.perf_counter() - started, 1)}))
+        lines = [json.dumps({"benchmark": "export_rows", **run_child(database_url, mode)}) for mode in args.modes]
+    for line in lines:
+        print(line)
+    if args.output:
+        with open(args.output, "a", encoding="utf-8") as handle:
+            handle.write("\n".join(lines) + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
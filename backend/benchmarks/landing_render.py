@@ -0,0 +1,124 @@
+"""Requests per second for GET /public/lp/{slug}: live render, in-memory cache, stored render.
+
+Seeds one campaign/lead magnet/landing page (with a ~`--kb` KB generated page and a brand
+logo) into a temporary SQLite database, then drives the real FastAPI app in-process with
+TestClient for `--seconds` per variant. "uncached" sets LANDING_HTML_CACHE_SIZE=0, so every
+request runs the bleach sanitizer (the pre-cache behaviour); "prerendered" backfills
+`rendered_html` first, so the route serves the stored page after one lookup.
+
+    python -m benchmarks.landing_render --seconds 5 --kb 40
+"""
+from __future__ import annotations
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BACKEND_ROOT))
+
+
+def page_html(kb: int) -> str:
+    section = (
+        "<section class='py-12'><h2 style='color:#111827;font-size:28px'>Why teams switch</h2>"
+        "<p style='margin:0 0 12px'>Cut reporting time with <strong>automated</strong> rollups and "
+        "<a href='https://example.com/docs' onclick='track()'>clear docs</a>.</p>"
+        "<ul><li>Fast setup</li><li>No code</li><li>SOC 2</li></ul></section>"
+    )
+    body = section * max(1, kb * 1024 // len(section))
+    return f"<html><head><title>Bench</title></head><body><main>{body}<form><input name='email'/></form></main></body></html>"
+
+
+def seed(kb: int) -> str:
+    from sqlmodel import SQLModel, Session
+    from app.db.session import engine
+    from app.models.db import Campaign, LandingPage, LeadMagnet
+
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        campaign = Campaign(
+            name="Bench",
+            icp_role="CTO",
+            icp_industry="SaaS",
+            product_context={"logo_url": "https://cdn.example.com/logo.png", "company_name": "Bench Co"},
+        )
+        session.add(campaign)
+        session.flush()
+        magnet = LeadMagnet(
+            campaign_id=campaign.id,
+            title="Checklist",
+            type="checklist",
+            pain_point_alignment="",
+            value_promise="",
+            conversion_score=1.0,
+            format_recommendation="pdf",
+        )
+        session.add(magnet)
+        session.flush()
+        landing = LandingPage(
+            lead_magnet_id=magnet.id,
+            slug="bench",
+            headline="Bench",
+            subheadline="",
+            cta="Get it",
+            html_content=page_html(kb),
+        )
+        session.add(landing)
+        session.commit()
+        return landing.slug
+
+
+def measure(client, path: str, seconds: float) -> dict:
+    latencies = []
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        response = client.get(path)
+        latencies.append(time.perf_counter() - started)
+        assert response.status_code == 200, response.status_code
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "rps": round(len(latencies) / sum(latencies), 1),
+        "p50_ms": round(latencies[len(latencies) // 2] * 1000, 3),
+        "p99_ms": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000, 3),
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--kb", type=int, default=40, help="Approximate stored page size.")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["DATABASE_URL"] = f"sqlite:///{Path(tmp) / 'bench.db'}"
+        os.environ["EMAIL_SCHEDULER_ENABLED"] = "false"
+        os.environ["PUBLIC_RATE_LIMIT_ENABLED"] = "false"
+        from fastapi.testclient import TestClient
+        from app.core.config import get_settings
+        from app.main import create_app
+        from app.services.landing_render import invalidate_landing_html, rerender_all
+
+        slug = seed(args.kb)
+        client = TestClient(create_app())
+        settings = get_settings()
+        default_size = settings.landing_html_cache_size
+        for variant, size in (("uncached", 0), ("cached", default_size)):
+            settings.landing_html_cache_size = size
+            invalidate_landing_html()
+            client.get(f"/public/lp/{slug}")  # warm-up (fills the cache when enabled)
+            result = measure(client, f"/public/lp/{slug}", args.seconds)
+            print(json.dumps({"benchmark": "landing_render", "variant": variant, "page_kb": args.kb, **result}))
+        rerender_all()
+        client.get(f"/public/lp/{slug}")
+        result = measure(client, f"/public/lp/{slug}", args.seconds)
+        print(json.dumps({"benchmark": "landing_render", "variant": "prerendered", "page_kb": args.kb, **result}))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
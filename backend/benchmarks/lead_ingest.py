@@ -0,0 +1,176 @@
+"""Load test for POST /public/lp/{slug}/submit in sync vs queued (group-commit) ingestion.
+
+For each mode, seeds a campaign with a landing page and a 3-step nurture sequence into a fresh
+SQLite file, starts the real app under uvicorn in a subprocess, and fires `--leads` submissions
+with `--concurrency` in-flight requests. Reports accepted requests per second and latency, then
+how long until every lead (and its emails) is committed. Immediate welcome sends (sync mode)
+go to the local provider stub, so no network is involved.
+
+    python -m benchmarks.lead_ingest --leads 2000 --concurrency 50
+    python -m benchmarks.lead_ingest --modes queued --spool   # include the spool-file write
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BACKEND_ROOT))
+
+SLUG = "bench"
+
+
+def seed(database_url: str) -> None:
+    from sqlmodel import SQLModel, Session, create_engine
+    from app.models.db import Campaign, LandingPage, LeadMagnet, NurtureSequence, NurtureStep
+
+    engine = create_engine(database_url)
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        campaign = Campaign(name="Bench", icp_role="CTO", icp_industry="SaaS", status="published")
+        session.add(campaign)
+        session.flush()
+        magnet = LeadMagnet(
+            campaign_id=campaign.id,
+            title="Checklist",
+            type="checklist",
+            pain_point_alignment="",
+            value_promise="",
+            conversion_score=1.0,
+            format_recommendation="pdf",
+        )
+        session.add(magnet)
+        session.flush()
+        session.add(LandingPage(lead_magnet_id=magnet.id, slug=SLUG, headline="Bench", subheadline="", cta="Go", html_content="<form></form>"))
+        seq = NurtureSequence(campaign_id=campaign.id, lead_magnet_id=magnet.id)
+        session.add(seq)
+        session.flush()
+        for order, offset in enumerate((0, 2, 5), start=1):
+            session.add(NurtureStep(sequence_id=seq.id, order=order, subject=f"Step {order}", body="Hi {{name}}", offset_days=offset))
+        session.commit()
+    engine.dispose()
+
+
+def count_rows(database_url: str) -> tuple[int, int]:
+    from sqlalchemy import create_engine, text
+
+    engine = create_engine(database_url)
+    with engine.connect() as conn:
+        leads = conn.execute(text("SELECT COUNT(*) FROM leads")).scalar_one()
+        logs = conn.execute(text("SELECT COUNT(*) FROM email_logs")).scalar_one()
+    engine.dispose()
+    return leads, logs
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(env: dict, port: int) -> subprocess.Popen:
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_ROOT,
+        env={**os.environ, **env},
+    )
+    import httpx
+
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/public/landing/{SLUG}", timeout=1).status_code == 200:
+                return process
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError("server did not start")
+
+
+async def fire(port: int, leads: int, concurrency: int) -> list[float]:
+    import httpx
+
+    latencies: list[float] = []
+    counter = iter(range(leads))
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=60) as client:
+
+        async def worker() -> None:
+            for idx in counter:
+                started = time.perf_counter()
+                response = await client.post(f"/public/lp/{SLUG}/submit", json={"email": f"lead{idx}@example.com", "name": "Bench"})
+                latencies.append(time.perf_counter() - started)
+                assert response.status_code == 200, response.text
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies
+
+
+def run(mode: str, leads: int, concurrency: int, spool: bool, tmp: Path, provider_url: str) -> dict:
+    database_url = f"sqlite:///{tmp / f'{mode}.db'}"
+    seed(database_url)
+    env = {
+        "DATABASE_URL": database_url,
+        "EMAIL_SCHEDULER_ENABLED": "false",
+        "PUBLIC_RATE_LIMIT_ENABLED": "false",
+        "LANDING_RERENDER_ON_STARTUP": "false",
+        "LEAD_INGEST_MODE": mode,
+        "EMAIL_PROVIDER": "sendgrid",
+        "EMAIL_API_KEY": "bench",
+        "SENDGRID_API_URL": provider_url,
+        "EMAIL_RATE_LIMITS": json.dumps({"sendgrid": 100000}),
+    }
+    if spool:
+        env["LEAD_INGEST_SPOOL_PATH"] = str(tmp / f"{mode}.spool")
+    port = _free_port()
+    process = start_server(env, port)
+    try:
+        started = time.perf_counter()
+        latencies = asyncio.run(fire(port, leads, concurrency))
+        accepted_s = time.perf_counter() - started
+        while count_rows(database_url)[0] < leads and time.perf_counter() - started < 120:
+            time.sleep(0.05)
+        durable_s = time.perf_counter() - started
+    finally:
+        process.terminate()
+        process.wait(10)
+    committed, emails = count_rows(database_url)
+    latencies.sort()
+    return {
+        "leads": leads,
+        "committed": committed,
+        "email_logs": emails,
+        "accept_rps": round(leads / accepted_s, 1),
+        "p50_ms": round(latencies[len(latencies) // 2] * 1000, 2),
+        "p99_ms": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000, 2),
+        "all_committed_s": round(durable_s, 3),
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--leads", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--modes", nargs="+", default=["sync", "queued"], choices=["sync", "queued"])
+    parser.add_argument("--spool", action="store_true", help="Set LEAD_INGEST_SPOOL_PATH for queued mode.")
+    args = parser.parse_args(argv)
+
+    from benchmarks.provider_stub import ProviderStub
+
+    with tempfile.TemporaryDirectory() as tmp, ProviderStub() as stub:
+        for mode in args.modes:
+            result = run(mode, args.leads, args.concurrency, args.spool and mode == "queued", Path(tmp), stub.url)
+            print(json.dumps({"benchmark": "lead_ingest", "mode": mode, "spool": args.spool and mode == "queued", **result}))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
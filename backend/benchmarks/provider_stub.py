@@ -0,0 +1,75 @@
+"""Local HTTP stand-in for the SendGrid and MailerSend send endpoints.
+
+Accepts any POST, sleeps for the configured latency and answers 202 with an
+X-Message-Id, or - at the configured rates - 500 or 429 with Retry-After.
+"""
+from __future__ import annotations
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from uuid import uuid4
+
+
+class ProviderStub:
+    def __init__(self, latency_ms: float = 0.0, error_rate: float = 0.0, throttle_rate: float = 0.0, seed: int = 1):
+        self.latency_ms = latency_ms
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.requests = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def __enter__(self) -> "ProviderStub":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _outcome(self) -> int:
+        with self._lock:
+            self.requests += 1
+            roll = self._random.random()
+        if roll < self.throttle_rate:
+            return 429
+        if roll < self.throttle_rate + self.error_rate:
+            return 500
+        return 202
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                self.rfile.read(int(self.headers.get("Content-Length") or 0))
+                if stub.latency_ms:
+                    time.sleep(stub.latency_ms / 1000)
+                status = stub._outcome()
+                body = b"" if status == 202 else json.dumps({"message": f"stub {status}"}).encode()
+                self.send_response(status)
+                if status == 202:
+                    self.send_header("X-Message-Id", str(uuid4()))
+                if status == 429:
+                    self.send_header("Retry-After", "1")
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
@@ -0,0 +1,304 @@
+"""Load generator for the public landing-page routes, usable as a regression gate.
+
+Scenarios (each runs for `--duration` seconds with `--concurrency` async clients):
+
+    view    GET /public/lp/{slug} (every 10th request: GET /public/landing/{slug} JSON)
+    submit  waves of `--concurrency` simultaneous POST /public/lp/{slug}/submit
+    funnel  each client loops view -> submit -> thank-you (GET /public/lp/{slug}/thank-you)
+
+By default each scenario gets a fresh API process (uvicorn, `--workers`) on a seeded database:
+a new SQLite file, or `--database-url postgresql://...` (schema created if missing; each run
+seeds its own slug). `--url` targets an already running server instead (pass `--slug`).
+Admission control is disabled in spawned servers unless `--rate-limits` is given.
+
+Per step it reports requests/s, error rate and p50/p95/p99 latency; from /api/metrics it
+reports the peak DB connections checked out against pool capacity (sync and async engines).
+
+Gates: `--max-p99-ms`, `--max-error-rate`, `--min-rps` are absolute; `--baseline FILE` compares
+with a previous `--output FILE` and fails when rps drops or p99 grows by more than `--tolerance`.
+The exit status is 1 when any gate fails.
+
+    python -m benchmarks.public_load --scenarios view submit funnel --duration 10 --concurrency 20
+    python -m benchmarks.public_load --output baseline.json
+    python -m benchmarks.public_load --baseline baseline.json --tolerance 0.2
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from uuid import uuid4
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BACKEND_ROOT))
+
+SCENARIOS = ("view", "submit", "funnel")
+
+
+def seed(database_url: str, slug: str) -> None:
+    from sqlmodel import SQLModel, Session, create_engine
+    from app.models.db import Campaign, LandingPage, LeadMagnet, NurtureSequence, NurtureStep
+    from app.services.landing_render import rerender_all
+
+    engine = create_engine(database_url)
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        campaign = Campaign(name="Load test", icp_role="CTO", icp_industry="SaaS", status="published")
+        session.add(campaign)
+        session.flush()
+        magnet = LeadMagnet(
+            campaign_id=campaign.id,
+            title="Checklist",
+            type="checklist",
+            pain_point_alignment="",
+            value_promise="",
+            conversion_score=1.0,
+            format_recommendation="pdf",
+        )
+        session.add(magnet)
+        session.flush()
+        html = "<main><h1>Load test</h1>" + "<p>Copy paragraph for the landing page.</p>" * 200 + "<form></form></main>"
+        session.add(LandingPage(lead_magnet_id=magnet.id, slug=slug, headline="Load test", subheadline="", cta="Go", html_content=html))
+        seq = NurtureSequence(campaign_id=campaign.id, lead_magnet_id=magnet.id)
+        session.add(seq)
+        session.flush()
+        # No day-0 step: nothing is sent after a submit, so only the request path is measured.
+        for order, offset in enumerate((2, 5), start=1):
+            session.add(NurtureStep(sequence_id=seq.id, order=order, subject=f"Step {order}", body="Hi", offset_days=offset))
+        session.commit()
+    rerender_all(engine)
+    engine.dispose()
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(database_url: str, workers: int, rate_limits: bool, slug: str) -> tuple[subprocess.Popen, str]:
+    import httpx
+
+    port = _free_port()
+    env = {
+        **os.environ,
+        "DATABASE_URL": database_url,
+        "EMAIL_SCHEDULER_ENABLED": "false",
+        "LANDING_RERENDER_ON_STARTUP": "false",
+    }
+    if not rate_limits:
+        env["PUBLIC_RATE_LIMIT_ENABLED"] = "false"
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--workers", str(workers), "--log-level", "warning"],
+        cwd=BACKEND_ROOT,
+        env=env,
+    )
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"{url}/public/landing/{slug}", timeout=1).status_code == 200:
+                return process, url
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError("server did not start")
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies: dict[str, list[float]] = {}
+        self.errors: dict[str, int] = {}
+
+    async def call(self, step: str, request) -> bool:
+        import httpx
+
+        started = time.perf_counter()
+        try:
+            response = await request
+            ok = response.status_code < 400
+        except httpx.HTTPError:
+            ok = False
+        self.latencies.setdefault(step, []).append(time.perf_counter() - started)
+        if not ok:
+            self.errors[step] = self.errors.get(step, 0) + 1
+        return ok
+
+    def report(self, elapsed: float) -> dict:
+        steps = {}
+        for step, values in self.latencies.items():
+            values = sorted(values)
+            steps[step] = {
+                "requests": len(values),
+                "rps": round(len(values) / elapsed, 1),
+                "error_rate": round(self.errors.get(step, 0) / len(values), 4),
+                "p50_ms": _pct(values, 0.50),
+                "p95_ms": _pct(values, 0.95),
+                "p99_ms": _pct(values, 0.99),
+            }
+        everything = sorted(v for values in self.latencies.values() for v in values)
+        total = len(everything)
+        return {
+            "requests": total,
+            "rps": round(total / elapsed, 1) if elapsed else 0.0,
+            "error_rate": round(sum(self.errors.values()) / total, 4) if total else 0.0,
+            "p50_ms": _pct(everything, 0.50),
+            "p95_ms": _pct(everything, 0.95),
+            "p99_ms": _pct(everything, 0.99),
+            "steps": steps,
+        }
+
+
+def _pct(values: list[float], q: float) -> float:
+    return round(values[min(len(values) - 1, int(len(values) * q))] * 1000, 2) if values else 0.0
+
+
+async def sample_pool(client, stop: asyncio.Event, peaks: dict[str, float]) -> None:
+    """Poll /api/metrics for DB pool gauges until stopped; keeps the highest values seen."""
+    while True:
+        try:
+            gauges = (await client.get("/api/metrics")).json()["data"]["gauges"]
+            for key, value in gauges.items():
+                if key.startswith("db_pool_"):
+                    peaks[key] = max(peaks.get(key, 0), value)
+        except Exception:
+            pass
+        if stop.is_set():
+            return
+        try:
+            await asyncio.wait_for(stop.wait(), 0.25)
+        except asyncio.TimeoutError:
+            pass
+
+
+def pool_report(peaks: dict[str, float]) -> dict:
+    report = {}
+    for engine in ("sync", "async"):
+        capacity = peaks.get(f"db_pool_capacity{{engine={engine}}}")
+        if not capacity:
+            continue
+        peak = max(peaks.get(f"db_pool_checked_out_peak{{engine={engine}}}", 0), peaks.get(f"db_pool_checked_out{{engine={engine}}}", 0))
+        report[engine] = {"peak_checked_out": peak, "capacity": capacity, "saturation": round(peak / capacity, 2)}
+    return report
+
+
+async def drive(url: str, slug: str, scenario: str, duration: float, concurrency: int) -> dict:
+    import httpx
+
+    recorder = Recorder()
+    limits = httpx.Limits(max_connections=concurrency + 1, max_keepalive_connections=concurrency + 1)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=30) as client:
+        deadline = time.perf_counter() + duration
+        counter = iter(range(10**9))
+
+        def submit():
+            payload = {"email": f"load-{uuid4().hex[:12]}@example.com", "name": "Load"}
+            return recorder.call("submit", client.post(f"/public/lp/{slug}/submit", json=payload))
+
+        async def view_worker() -> None:
+            while time.perf_counter() < deadline:
+                if next(counter) % 10 == 9:
+                    await recorder.call("view_json", client.get(f"/public/landing/{slug}"))
+                else:
+                    await recorder.call("view", client.get(f"/public/lp/{slug}"))
+
+        async def funnel_worker() -> None:
+            while time.perf_counter() < deadline:
+                await recorder.call("view", client.get(f"/public/lp/{slug}"))
+                if await submit():
+                    await recorder.call("thank_you", client.get(f"/public/lp/{slug}/thank-you"))
+
+        async def submit_waves() -> None:
+            while time.perf_counter() < deadline:
+                await asyncio.gather(*(submit() for _ in range(concurrency)))
+
+        stop = asyncio.Event()
+        peaks: dict[str, float] = {}
+        sampler = asyncio.create_task(sample_pool(client, stop, peaks))
+        started = time.perf_counter()
+        if scenario == "submit":
+            await submit_waves()
+        else:
+            worker = view_worker if scenario == "view" else funnel_worker
+            await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+        stop.set()
+        await sampler
+    return {**recorder.report(elapsed), "db_pool": pool_report(peaks)}
+
+
+def check_gates(scenario: str, result: dict, args, baseline: dict) -> list[str]:
+    failures = []
+    if args.max_p99_ms is not None and result["p99_ms"] > args.max_p99_ms:
+        failures.append(f"p99 {result['p99_ms']} ms > {args.max_p99_ms} ms")
+    if args.max_error_rate is not None and result["error_rate"] > args.max_error_rate:
+        failures.append(f"error rate {result['error_rate']} > {args.max_error_rate}")
+    if args.min_rps is not None and result["rps"] < args.min_rps:
+        failures.append(f"{result['rps']} req/s < {args.min_rps}")
+    previous = baseline.get(scenario)
+    if previous:
+        if result["rps"] < previous["rps"] * (1 - args.tolerance):
+            failures.append(f"{result['rps']} req/s vs baseline {previous['rps']}")
+        if result["p99_ms"] > previous["p99_ms"] * (1 + args.tolerance):
+            failures.append(f"p99 {result['p99_ms']} ms vs baseline {previous['p99_ms']} ms")
+    return failures
+
+
+def run_scenario(scenario: str, args, tmp: Path) -> dict:
+    if args.url:
+        return asyncio.run(drive(args.url.rstrip("/"), args.slug, scenario, args.duration, args.concurrency))
+    database_url = args.database_url or f"sqlite:///{tmp / f'{scenario}.db'}"
+    slug = f"load-{uuid4().hex[:8]}"
+    seed(database_url, slug)
+    process, url = start_server(database_url, args.workers, args.rate_limits, slug)
+    try:
+        return asyncio.run(drive(url, slug, scenario, args.duration, args.concurrency))
+    finally:
+        process.terminate()
+        process.wait(10)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenarios", nargs="+", default=list(SCENARIOS), choices=SCENARIOS)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes for spawned servers")
+    parser.add_argument("--database-url", help="Database for spawned servers (default: a fresh SQLite file)")
+    parser.add_argument("--url", help="Target a running server instead of spawning one")
+    parser.add_argument("--slug", help="Published landing page slug on --url")
+    parser.add_argument("--rate-limits", action="store_true", help="Keep admission control on in spawned servers")
+    parser.add_argument("--max-p99-ms", type=float)
+    parser.add_argument("--max-error-rate", type=float)
+    parser.add_argument("--min-rps", type=float)
+    parser.add_argument("--baseline", help="JSON written by an earlier --output run")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    parser.add_argument("--output", help="Write per-scenario results as JSON (a future --baseline)")
+    args = parser.parse_args(argv)
+    if args.url and not args.slug:
+        parser.error("--url needs --slug")
+
+    baseline = json.loads(Path(args.baseline).read_text()) if args.baseline else {}
+    results: dict[str, dict] = {}
+    failed = False
+    with tempfile.TemporaryDirectory() as tmp:
+        for scenario in args.scenarios:
+            result = run_scenario(scenario, args, Path(tmp))
+            failures = check_gates(scenario, result, args, baseline)
+            failed = failed or bool(failures)
+            results[scenario] = result
+            print(json.dumps({"benchmark": "public_load", "scenario": scenario, "concurrency": args.concurrency, **result, "gate_failures": failures}))
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2))
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
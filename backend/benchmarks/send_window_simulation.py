@@ -0,0 +1,105 @@
+"""Simulate a day of lead captures and count provider requests with and without send windows.
+
+Leads arrive at random over `--hours`; each gets a nurture sequence (`--offsets` days). Send
+times are computed with the real `align()` and due logs are grouped with the real `coalesce()`.
+The dispatcher is modelled as event-driven: when idle it claims every due log (up to the batch
+size) and spends `--request-ms` per provider request. No database or network is involved.
+
+    python -m benchmarks.send_window_simulation --leads 5000 --windows none 1m 15m business_hours
+"""
+from __future__ import annotations
+import argparse
+import heapq
+import json
+import random
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+from types import SimpleNamespace
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BACKEND_ROOT))
+
+from app.core.send_windows import align, parse_send_window  # noqa: E402
+from app.services.email_service import coalesce  # noqa: E402
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))] if ordered else 0.0
+
+
+def schedule(leads: int, hours: float, offsets: list[int], spec: str | None, start: datetime, seed: int) -> list:
+    rng = random.Random(seed)
+    window = parse_send_window(spec)
+    logs = []
+    for idx in range(leads):
+        captured = start + timedelta(seconds=rng.uniform(0, hours * 3600))
+        for step, offset in enumerate(offsets):
+            target = captured + timedelta(days=offset)
+            if offset > 0:
+                target += timedelta(minutes=5)
+            logs.append(
+                SimpleNamespace(
+                    id=f"{idx}-{step}",
+                    subject=f"Step {step}",
+                    body=f"Body {step}",
+                    target=target,
+                    due=align(target, window),
+                )
+            )
+    return logs
+
+
+def simulate(logs: list, batch_size: int, bulk_max: int, request_ms: float, bulk: bool) -> dict:
+    queue = [(log.due, idx, log) for idx, log in enumerate(logs)]
+    heapq.heapify(queue)
+    clock = queue[0][0] if queue else datetime.utcnow()
+    request_cost = timedelta(milliseconds=request_ms)
+    requests = passes = 0
+    lags: list[float] = []
+    while queue:
+        clock = max(clock, queue[0][0])
+        batch = []
+        while queue and queue[0][0] <= clock and len(batch) < batch_size:
+            batch.append(heapq.heappop(queue)[2])
+        passes += 1
+        groups = coalesce(batch, bulk_max) if bulk else [[log] for log in batch]
+        for group in groups:
+            clock += request_cost
+            requests += 1
+            lags.extend((clock - log.target).total_seconds() for log in group)
+    return {
+        "emails": len(logs),
+        "provider_requests": requests,
+        "emails_per_request": round(len(logs) / requests, 2) if requests else None,
+        "dispatcher_passes": passes,
+        "delay_p50_s": round(_percentile(lags, 50), 3),
+        "delay_p99_s": round(_percentile(lags, 99), 3),
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--leads", type=int, default=5000)
+    parser.add_argument("--hours", type=float, default=24.0, help="Lead arrival period.")
+    parser.add_argument("--offsets", type=int, nargs="+", default=[0, 2, 5], help="Sequence step offsets in days.")
+    parser.add_argument("--windows", nargs="+", default=["none", "1m", "15m", "business_hours"])
+    parser.add_argument("--batch-size", type=int, default=100, help="EMAIL_DISPATCH_BATCH_SIZE")
+    parser.add_argument("--bulk-max", type=int, default=500, help="EMAIL_BULK_MAX_RECIPIENTS")
+    parser.add_argument("--request-ms", type=float, default=150.0, help="Provider round trip per request.")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args(argv)
+
+    start = datetime(2026, 10, 19)  # a Monday
+    for spec in args.windows:
+        window = None if spec == "none" else spec
+        logs = schedule(args.leads, args.hours, args.offsets, window, start, args.seed)
+        for bulk in (False, True):
+            result = simulate(logs, args.batch_size, args.bulk_max, args.request_ms, bulk)
+            print(json.dumps({"benchmark": "send_window_simulation", "window": spec, "coalesced": bulk, **result}))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,110 @@
+"""Email dispatch throughput across 1, 2 and 4 worker processes.
+
+Seeds N due emails, runs `python -m app.worker --shard i/K --until-idle` in K
+parallel processes and reports sends per second for each K. Uses the `mock`
+email provider, so on SQLite this mostly measures database contention; point
+--database-url at Postgres for a realistic multi-writer run.
+
+    python -m benchmarks.worker_throughput --emails 5000 --workers 1 2 4
+"""
+from __future__ import annotations
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from uuid import uuid4
+
+from sqlalchemy import insert
+from sqlmodel import SQLModel, Session, create_engine, func, select
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BACKEND_ROOT))
+
+from app.models.db import AppSetting, EmailLog, Lead  # noqa: E402
+from app.services.email_dispatcher import shard_key_for  # noqa: E402
+
+
+def seed(database_url: str, emails: int) -> None:
+    engine = create_engine(database_url)
+    SQLModel.metadata.drop_all(engine)
+    SQLModel.metadata.create_all(engine)
+    due = datetime.utcnow() - timedelta(minutes=1)
+    leads = [{"id": str(uuid4()), "email": f"bench{idx}@example.com", "name": f"Bench {idx}"} for idx in range(emails)]
+    logs = [
+        {
+            "id": str(uuid4()),
+            "lead_id": lead["id"],
+            "subject": "Hello {{name}}",
+            "body": "Benchmark body",
+            "status": "queued",
+            "scheduled_at": due,
+            "next_attempt_at": due,
+            "shard_key": shard_key_for(lead["id"]),
+        }
+        for lead in leads
+    ]
+    with Session(engine) as session:
+        session.add(AppSetting(llm_provider="openai", email_provider="mock"))
+        session.exec(insert(Lead), params=leads)
+        session.exec(insert(EmailLog), params=logs)
+        session.commit()
+    engine.dispose()
+
+
+def count_sent(database_url: str) -> int:
+    engine = create_engine(database_url)
+    with Session(engine) as session:
+        sent = session.exec(select(func.count()).select_from(EmailLog).where(EmailLog.status == "sent")).one()
+    engine.dispose()
+    return sent
+
+
+def run(database_url: str, emails: int, workers: int) -> dict:
+    seed(database_url, emails)
+    env = dict(os.environ, DATABASE_URL=database_url, EMAIL_SCHEDULER_ENABLED="false")
+    started = time.perf_counter()
+    procs = [
+        subprocess.Popen(
+            [sys.executable, "-m", "app.worker", "--shard", f"{idx}/{workers}", "--until-idle"],
+            cwd=BACKEND_ROOT,
+            env=env,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        for idx in range(workers)
+    ]
+    codes = [proc.wait() for proc in procs]
+    elapsed = time.perf_counter() - started
+    sent = count_sent(database_url)
+    return {
+        "benchmark": "worker_throughput",
+        "workers": workers,
+        "emails": emails,
+        "sent": sent,
+        "seconds": round(elapsed, 3),
+        "sends_per_second": round(sent / elapsed, 1) if elapsed else None,
+        "exit_codes": codes,
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--emails", type=int, default=2000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--database-url", default=None, help="Defaults to a temporary SQLite file.")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = args.database_url or f"sqlite:///{Path(tmp) / 'bench.db'}"
+        for workers in args.workers:
+            print(json.dumps(run(database_url, args.emails, workers)), flush=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
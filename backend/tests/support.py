@@ -0,0 +1,63 @@
+"""Shared helpers for tests that need a throwaway database."""
+import os
+import sys
+from contextlib import contextmanager
+from pathlib import Path
+
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+# Route tests share one client address; admission control is tested on its own (test_admission).
+os.environ.setdefault("PUBLIC_RATE_LIMIT_ENABLED", "false")
+
+from sqlalchemy import event  # noqa: E402
+from sqlalchemy.ext.asyncio import create_async_engine  # noqa: E402
+from sqlalchemy.pool import NullPool, StaticPool  # noqa: E402
+from sqlmodel import SQLModel, create_engine  # noqa: E402
+from sqlmodel.ext.asyncio.session import AsyncSession  # noqa: E402
+
+from app.models import db  # noqa: E402,F401
+
+
+def memory_engine():
+    """An in-memory SQLite engine with the full schema, shareable across threads."""
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    SQLModel.metadata.create_all(engine)
+    return engine
+
+
+def sqlite_file_engines(path):
+    """Sync and async (aiosqlite) engines on one SQLite file with the full schema.
+
+    The async engine does not pool, so nothing is left bound to a TestClient's event loop.
+    """
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+    SQLModel.metadata.create_all(engine)
+    return engine, create_async_engine(f"sqlite+aiosqlite:///{path}", poolclass=NullPool)
+
+
+def async_session_override(async_engine):
+    """A `get_async_session` dependency override bound to `async_engine`."""
+
+    async def _session():
+        async with AsyncSession(async_engine, expire_on_commit=False) as session:
+            yield session
+
+    return _session
+
+
+@contextmanager
+def count_queries(engine):
+    """Collect every SQL statement sent to `engine` inside the block."""
+    statements = []
+
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", _record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", _record)
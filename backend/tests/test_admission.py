@@ -0,0 +1,122 @@
+import asyncio
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from support import memory_engine
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+
+from app.api.routes import public
+from app.core.config import get_settings
+from app.core.errors import add_exception_handlers
+from app.core.metrics import metrics
+from app.db.session import get_async_session, get_session
+from app.services.admission import Admission, MemoryBucketStore, SqliteBucketStore, reset_admission
+
+
+class BucketStoreTests(unittest.TestCase):
+    def test_burst_then_refill(self):
+        store = MemoryBucketStore()
+        self.assertEqual([store.take("k", 2, 1.0, 100.0) for _ in range(2)], [0.0, 0.0])
+        self.assertAlmostEqual(store.take("k", 2, 1.0, 100.0), 1.0)
+        self.assertAlmostEqual(store.take("k", 2, 1.0, 100.5), 0.5)
+        self.assertEqual(store.take("k", 2, 1.0, 101.0), 0.0)
+
+    def test_least_recently_used_keys_are_evicted(self):
+        store = MemoryBucketStore(max_keys=2)
+        for key in ("a", "b", "c"):
+            store.take(key, 1, 0.1, 0.0)
+        self.assertEqual(len(store), 2)
+        self.assertEqual(store.take("a", 1, 0.1, 0.0), 0.0)  # evicted, starts full again
+        self.assertGreater(store.take("c", 1, 0.1, 0.0), 0)
+
+    def test_sqlite_store_is_shared_between_instances(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "buckets.sqlite")
+            worker_a, worker_b = SqliteBucketStore(path), SqliteBucketStore(path)
+            self.assertEqual(worker_a.take("k", 2, 1.0, 10.0), 0.0)
+            self.assertEqual(worker_b.take("k", 2, 1.0, 10.0), 0.0)
+            self.assertGreater(worker_a.take("k", 2, 1.0, 10.0), 0)
+            self.assertEqual(worker_b.prune(11.0), 1)
+
+    def test_ip_and_slug_rules_are_independent(self):
+        admission = Admission(MemoryBucketStore(), {"submit_ip": [1, 0.1], "submit_slug": [0, 1.0]}, clock=lambda: 0.0)
+        self.assertEqual(admission.check("submit", "1.2.3.4", "acme"), 0.0)
+        self.assertAlmostEqual(admission.check("submit", "1.2.3.4", "other"), 10.0)
+        self.assertEqual(admission.check("submit", "5.6.7.8", "acme"), 0.0)  # slug rule disabled
+        self.assertEqual(admission.check("view", "1.2.3.4", "acme"), 0.0)  # no view rules
+
+
+class AdmissionRouteTests(unittest.TestCase):
+    def setUp(self):
+        metrics.reset()
+        reset_admission()
+        settings = get_settings()
+        limits = {"view_slug": [1, 0.001], "submit_ip": [1, 0.001]}
+        for name, value in (("public_rate_limit_enabled", True), ("public_rate_limits", limits)):
+            patcher = mock.patch.object(settings, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.addCleanup(reset_admission)
+
+        self.sessions = []
+        engine = memory_engine()
+
+        def _session():
+            self.sessions.append("sync")
+            with Session(engine) as session:
+                yield session
+
+        async def _async_session():
+            self.sessions.append("async")
+            yield mock.AsyncMock(**{"run_sync.return_value": None})  # landing not found
+
+        app = FastAPI()
+        app.include_router(public.router, prefix="/public")
+        add_exception_handlers(app)
+        app.dependency_overrides[get_session] = _session
+        app.dependency_overrides[get_async_session] = _async_session
+        self.client = TestClient(app)
+
+    def test_over_limit_requests_get_429_before_any_session(self):
+        with mock.patch.object(public, "resolve_landing", return_value=None):
+            self.assertEqual(self.client.get("/public/lp/acme").status_code, 404)
+            limited = self.client.get("/public/lp/acme")
+            self.assertEqual(self.client.post("/public/lp/acme/submit", json={"email": "a@example.com"}).status_code, 404)
+            blocked = self.client.post("/public/lp/other/submit", json={"email": "a@example.com"})
+        self.assertEqual(limited.status_code, 429)
+        self.assertEqual(blocked.status_code, 429)
+        self.assertEqual(int(limited.headers["retry-after"]), 1000)
+        self.assertEqual(self.sessions, ["sync", "async"])  # only the two admitted requests opened one
+        counters = metrics.snapshot()["counters"]
+        self.assertEqual(counters["public_requests_rejected_total{kind=view,rule=view_slug}"], 1)
+        self.assertEqual(counters["public_requests_rejected_total{kind=submit,rule=submit_ip}"], 1)
+
+    def test_sqlite_buckets_are_taken_off_the_event_loop(self):
+        on_loop = []
+        take = SqliteBucketStore.take
+
+        def recording_take(store, *args):
+            try:
+                asyncio.get_running_loop()
+                on_loop.append(True)
+            except RuntimeError:
+                on_loop.append(False)
+            return take(store, *args)
+
+        with tempfile.TemporaryDirectory() as tmp, mock.patch.object(
+            get_settings(), "public_rate_limit_backend", "sqlite"
+        ), mock.patch.object(get_settings(), "public_rate_limit_store_path", os.path.join(tmp, "buckets.sqlite")), mock.patch.object(
+            SqliteBucketStore, "take", recording_take
+        ), mock.patch.object(public, "resolve_landing", return_value=None):
+            self.client.get("/public/lp/acme")
+            self.assertEqual(self.client.get("/public/lp/acme").status_code, 429)
+        self.assertTrue(on_loop)
+        self.assertNotIn(True, on_loop)
+
+
+if __name__ == "__main__":
+    unittest.main()
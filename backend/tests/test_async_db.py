@@ -0,0 +1,100 @@
+import asyncio
+import os
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+from support import async_session_override, sqlite_file_engines
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlmodel import Session, select
+
+from app.api.routes import settings as settings_routes
+from app.core.config import get_settings
+from app.db import session as db_session
+from app.db.session import async_database_url, get_async_session, run_db
+from app.models.db import AppSetting
+
+
+class AsyncDatabaseUrlTests(unittest.TestCase):
+    def test_maps_backends_to_async_drivers(self):
+        self.assertEqual(async_database_url("sqlite:///./genieops.db"), "sqlite+aiosqlite:///./genieops.db")
+        self.assertEqual(async_database_url("postgresql://u:p@db/app"), "postgresql+psycopg://u:p@db/app")
+        self.assertEqual(async_database_url("postgresql+psycopg2://u:p@db/app"), "postgresql+psycopg://u:p@db/app")
+        with self.assertRaises(ValueError):
+            async_database_url("mysql://u:p@db/app")
+
+
+class RunDbTests(unittest.TestCase):
+    def test_threadpool_is_bounded_and_loop_stays_responsive(self):
+        lock = threading.Lock()
+        state = {"running": 0, "peak": 0}
+
+        def blocking() -> None:
+            with lock:
+                state["running"] += 1
+                state["peak"] = max(state["peak"], state["running"])
+            time.sleep(0.05)
+            with lock:
+                state["running"] -= 1
+
+        async def main() -> float:
+            ticks = 0
+
+            async def ticker() -> None:
+                nonlocal ticks
+                while True:
+                    await asyncio.sleep(0.01)
+                    ticks += 1
+
+            task = asyncio.create_task(ticker())
+            await asyncio.gather(*(run_db(blocking) for _ in range(6)))
+            task.cancel()
+            return ticks
+
+        with mock.patch.object(get_settings(), "db_threadpool_size", 2):
+            ticks = asyncio.run(main())
+        self.assertEqual(state["peak"], 2)
+        self.assertGreater(ticks, 5)  # ~150 ms of blocking work ran while the loop kept ticking
+
+
+class PoolGaugeTests(unittest.TestCase):
+    def test_peak_checked_out_is_tracked_per_engine(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            engine, async_engine = sqlite_file_engines(os.path.join(tmp, "app.db"))
+            db_session._track_pool("probe", engine)
+            self.addCleanup(db_session._pool_peaks.pop, "probe")
+            with engine.connect(), engine.connect():
+                pass
+            with engine.connect():
+                pass
+            engine.dispose()
+            asyncio.run(async_engine.dispose())
+        self.assertEqual(db_session._pool_peaks["probe"], 2)
+
+
+class AsyncSettingsRouteTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.engine, async_engine = sqlite_file_engines(os.path.join(self.tmp.name, "app.db"))
+        app = FastAPI()
+        app.include_router(settings_routes.router, prefix="/api/settings")
+        app.dependency_overrides[get_async_session] = async_session_override(async_engine)
+        self.client = TestClient(app)
+
+    def tearDown(self):
+        self.engine.dispose()
+        self.tmp.cleanup()
+
+    def test_settings_round_trip_through_async_session(self):
+        self.assertEqual(self.client.get("/api/settings").status_code, 200)
+        updated = self.client.put("/api/settings", json={"email_from": "hello@example.com"})
+        self.assertEqual(updated.json()["data"]["email_from"], "hello@example.com")
+        with Session(self.engine) as session:
+            self.assertEqual(len(session.exec(select(AppSetting)).all()), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,123 @@
+import csv
+import io
+import json
+import unittest
+from datetime import datetime, timedelta
+from unittest import mock
+
+from support import count_queries, memory_engine
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+
+from app.api.routes import exports
+from app.core.config import get_settings
+from app.db.session import get_session
+from app.models.db import Campaign, EmailLog, LandingPage, Lead, LeadMagnet
+from app.services.data_export import LEAD_COLUMNS, export_rows
+
+
+class DataExportTests(unittest.TestCase):
+    def setUp(self):
+        self.engine = memory_engine()
+        self.now = datetime.utcnow()
+        with Session(self.engine) as session:
+            launch = Campaign(name="Launch", icp_role="CTO", icp_industry="SaaS")
+            other = Campaign(name="Other", icp_role="CTO", icp_industry="SaaS")
+            session.add_all([launch, other])
+            session.flush()
+            self.campaign_id = launch.id
+            for idx in range(30):
+                lead = Lead(
+                    email=f"lead{idx}@example.com",
+                    name=f'Lead, "{idx}"',
+                    campaign_id=launch.id if idx % 3 else other.id,
+                    landing_page_id="lp-a" if idx % 2 else "lp-b",
+                    created_at=self.now - timedelta(days=idx),
+                )
+                session.add(lead)
+                session.flush()
+                session.add(EmailLog(lead_id=lead.id, subject="Hi", body="x" * 500, status="sent", created_at=lead.created_at))
+            session.commit()
+
+        def _session():
+            with Session(self.engine) as session:
+                yield session
+
+        app = FastAPI()
+        app.include_router(exports.router, prefix="/api/exports")
+        app.dependency_overrides[get_session] = _session
+        self.client = TestClient(app)
+
+    def test_csv_export_filters_in_one_query(self):
+        start = (self.now - timedelta(days=9)).date()
+        with count_queries(self.engine) as statements:
+            response = self.client.get("/api/exports/leads", params={"campaign_id": self.campaign_id, "start": start})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.headers["content-type"].startswith("text/csv"))
+        self.assertIn("attachment", response.headers["content-disposition"])
+        rows = list(csv.DictReader(io.StringIO(response.text)))
+        self.assertEqual(tuple(rows[0]), LEAD_COLUMNS)
+        expected = [f"lead{idx}@example.com" for idx in range(9, -1, -1) if idx % 3]  # oldest first
+        self.assertEqual([row["email"] for row in rows], expected)
+        self.assertEqual(rows[0]["name"], 'Lead, "8"')
+        self.assertEqual(len(statements), 1)
+
+    def test_ndjson_email_logs_filter_through_the_lead(self):
+        end = (self.now - timedelta(days=20)).date()
+        response = self.client.get(
+            "/api/exports/email-logs", params={"format": "ndjson", "landing_page_id": "lp-a", "end": end}
+        )
+        self.assertEqual(response.headers["content-type"], "application/x-ndjson")
+        records = [json.loads(line) for line in response.text.splitlines()]
+        self.assertEqual(len(records), 5)  # odd idx from 21 to 29
+        self.assertNotIn("body", records[0])
+        self.assertEqual(records[0]["status"], "sent")
+        self.assertEqual(self.client.get("/api/exports/leads", params={"format": "xml"}).status_code, 422)
+
+    def test_output_is_flushed_in_bounded_chunks(self):
+        settings = get_settings()
+        with mock.patch.object(settings, "export_chunk_bytes", 256), mock.patch.object(settings, "export_yield_per", 4):
+            chunks = list(export_rows(self.engine, "email-logs", "csv"))
+        self.assertGreater(len(chunks), 5)
+        self.assertTrue(all(len(chunk) < 512 for chunk in chunks))
+        self.assertEqual(b"".join(chunks).count(b"\n"), 31)  # header + 30 logs
+
+    def test_campaign_filter_resolves_leads_without_one_and_csv_cells_are_not_formulas(self):
+        with Session(self.engine) as session:
+            magnet = LeadMagnet(
+                campaign_id=self.campaign_id,
+                title="Checklist",
+                type="checklist",
+                pain_point_alignment="",
+                value_promise="",
+                conversion_score=1.0,
+                format_recommendation="pdf",
+            )
+            session.add(magnet)
+            session.flush()
+            landing = LandingPage(lead_magnet_id=magnet.id, slug="acme", headline="H", subheadline="", cta="Go", html_content="")
+            session.add(landing)
+            session.flush()
+            # No campaign_id, as leads captured before it was stamped.
+            session.add(Lead(email="magnet@example.com", name="=HYPERLINK(\"http://x\")", lead_magnet_id=magnet.id))
+            session.add(Lead(email="landing@example.com", name="-2+3", company="@SUM(A1)", landing_page_id=landing.id))
+            session.add(Lead(email="orphan@example.com", name="Orphan"))
+            session.commit()
+
+        response = self.client.get("/api/exports/leads", params={"campaign_id": self.campaign_id})
+        rows = {row["email"]: row for row in csv.DictReader(io.StringIO(response.text))}
+        self.assertEqual(len(rows), 20 + 2)
+        self.assertNotIn("orphan@example.com", rows)
+        self.assertEqual(rows["magnet@example.com"]["name"], "'=HYPERLINK(\"http://x\")")
+        self.assertEqual(rows["landing@example.com"]["name"], "'-2+3")
+        self.assertEqual(rows["landing@example.com"]["company"], "'@SUM(A1)")
+        self.assertEqual(rows["lead1@example.com"]["name"], 'Lead, "1"')
+
+        ndjson = self.client.get("/api/exports/leads", params={"campaign_id": self.campaign_id, "format": "ndjson"})
+        records = {record["email"]: record for record in map(json.loads, ndjson.text.splitlines())}
+        self.assertEqual(records["landing@example.com"]["company"], "@SUM(A1)")  # JSON values are left as is
+
+
+if __name__ == "__main__":
+    unittest.main()
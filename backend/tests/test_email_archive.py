@@ -0,0 +1,53 @@
+import unittest
+from datetime import datetime, timedelta
+
+from support import count_queries, memory_engine
+
+from sqlmodel import Session, select
+
+from app.models.db import EmailLog, EmailLogArchive, Lead
+from app.services.email_archive import archive_email_logs, archived_body
+
+
+class EmailArchiveTests(unittest.TestCase):
+    def setUp(self):
+        self.engine = memory_engine()
+        old = datetime.utcnow() - timedelta(days=40)
+        recent = datetime.utcnow() - timedelta(days=1)
+        with Session(self.engine) as session:
+            lead = Lead(email="a@example.com")
+            session.add(lead)
+            session.flush()
+            for idx, status in enumerate(["sent", "sent", "failed", "dead", "sent"]):
+                session.add(EmailLog(id=f"old-{idx}", lead_id=lead.id, subject="s", body=f"body {idx} " * 50, status=status, created_at=old))
+            session.add(EmailLog(id="old-queued", lead_id=lead.id, subject="s", body="b", status="queued", created_at=old))
+            session.add(EmailLog(id="recent-sent", lead_id=lead.id, subject="s", body="b", status="sent", created_at=recent))
+            session.commit()
+
+    def test_moves_old_terminal_logs_in_batches(self):
+        with count_queries(self.engine) as statements:
+            moved = archive_email_logs(self.engine, older_than_days=30, batch_size=2, compress=True)
+
+        self.assertEqual(moved, 5)
+        deletes = [stmt for stmt in statements if stmt.lstrip().upper().startswith("DELETE")]
+        self.assertEqual(len(deletes), 3)  # 2 + 2 + 1
+        with Session(self.engine) as session:
+            hot = {log.id for log in session.exec(select(EmailLog)).all()}
+            archived = session.exec(select(EmailLogArchive).order_by(EmailLogArchive.id)).all()
+        self.assertEqual(hot, {"old-queued", "recent-sent"})
+        self.assertEqual([row.id for row in archived], [f"old-{idx}" for idx in range(5)])
+        self.assertIsNone(archived[0].body)
+        self.assertLess(len(archived[0].body_compressed), len("body 0 " * 50))
+        self.assertEqual(archived_body(archived[0]), "body 0 " * 50)
+
+    def test_uncompressed_archive_keeps_body(self):
+        archive_email_logs(self.engine, older_than_days=30, compress=False)
+        with Session(self.engine) as session:
+            row = session.get(EmailLogArchive, "old-3")
+        self.assertEqual(row.status, "dead")
+        self.assertEqual(row.body, "body 3 " * 50)
+        self.assertEqual(archived_body(row), row.body)
+
+
+if __name__ == "__main__":
+    unittest.main()
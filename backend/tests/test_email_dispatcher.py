@@ -0,0 +1,109 @@
+import threading
+import time
+import unittest
+from datetime import datetime, timedelta
+from unittest import mock
+
+from support import memory_engine
+
+from sqlmodel import Session
+
+from app.models.db import Lead, EmailLog
+from app.services import email_dispatcher
+from app.services.email_dispatcher import EmailDispatcher
+from app.services.leads import create_email_log
+
+
+class EmailDispatcherTests(unittest.TestCase):
+    def setUp(self):
+        self.engine = memory_engine()
+        self.calls = []
+        self.called = threading.Event()
+
+        def process_due():
+            self.calls.append(datetime.utcnow())
+            self.called.set()
+
+        self.dispatcher = EmailDispatcher(process_due, self.engine, safety_poll_seconds=60, listen=False)
+
+    def tearDown(self):
+        self.dispatcher.shutdown()
+
+    def _start_idle(self):
+        self.dispatcher.start()
+        # The startup catch-up pass runs once; wait for it before measuring wakeups.
+        self.assertTrue(self.called.wait(2))
+        self.called.clear()
+
+    def test_sleeps_until_next_deadline(self):
+        self._start_idle()
+        due_at = datetime.utcnow() + timedelta(milliseconds=300)
+        self.dispatcher.notify(due_at)
+
+        self.assertFalse(self.called.wait(0.1))
+        self.assertTrue(self.called.wait(2))
+        self.assertGreaterEqual(self.calls[-1], due_at)
+
+    def test_enqueue_wakes_running_dispatcher(self):
+        self._start_idle()
+        with Session(self.engine) as session:
+            lead = Lead(email="a@example.com")
+            session.add(lead)
+            session.commit()
+            started = time.monotonic()
+            create_email_log(session, lead.id, "Welcome", "Thanks")
+
+        self.assertTrue(self.called.wait(2))
+        self.assertLess(time.monotonic() - started, 1.0)
+
+    def test_earliest_queued_row_is_tracked_after_a_pass(self):
+        future = datetime.utcnow() + timedelta(hours=2)
+        with Session(self.engine) as session:
+            lead = Lead(email="b@example.com")
+            session.add(lead)
+            session.commit()
+            session.add(EmailLog(lead_id=lead.id, subject="s", body="b", status="queued", scheduled_at=future, next_attempt_at=future))
+            session.commit()
+
+        self._start_idle()
+        deadline = time.monotonic() + 2
+        while self.dispatcher.next_deadline() is None and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(self.dispatcher.next_deadline(), future)
+
+    def test_failing_pass_backs_off_instead_of_spinning(self):
+        calls = []
+
+        def process_due():
+            calls.append(time.monotonic())
+            raise RuntimeError("status UPDATE failed")
+
+        with Session(self.engine) as session:
+            lead = Lead(email="c@example.com")
+            session.add(lead)
+            session.commit()
+            # Already due, so every pass would find it again.
+            session.add(EmailLog(lead_id=lead.id, subject="s", body="b", status="queued", next_attempt_at=datetime.utcnow()))
+            session.commit()
+
+        dispatcher = EmailDispatcher(process_due, self.engine, safety_poll_seconds=60, listen=False)
+        with mock.patch.object(email_dispatcher, "FAILURE_BACKOFF_SECONDS", 0.1):
+            dispatcher.start()
+            try:
+                deadline = time.monotonic() + 1.0
+                while time.monotonic() < deadline:
+                    dispatcher.notify()  # enqueues during the backoff do not cut it short
+                    time.sleep(0.01)
+            finally:
+                dispatcher.shutdown()
+        # 0.1 + 0.2 + 0.4 s of backoff fit in the second: the first pass and three retries.
+        self.assertLessEqual(len(calls), 5)
+        self.assertGreaterEqual(len(calls), 2)
+
+    def test_notify_without_running_dispatcher_is_noop(self):
+        self.assertIsNone(email_dispatcher._active)
+        email_dispatcher.notify_enqueued(datetime.utcnow())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+import unittest
+from datetime import datetime, timedelta
+
+from support import memory_engine
+
+from sqlmodel import Session
+
+from app.core.config import get_settings
+from app.models.db import EmailLog, Lead
+from app.services.email_logs import list_due, requeue_dead
+from app.services.email_service import DeliveryResult, retry_delay, status_values
+
+
+class RetryStatusTests(unittest.TestCase):
+    def test_retryable_failure_is_rescheduled_with_backoff(self):
+        log = EmailLog(id="log-1", lead_id="lead-1", subject="s", body="b", status="queued", attempt_count=1)
+        values = status_values(log, DeliveryResult(False, error_message="boom", error_class="server_error"))
+        self.assertEqual(values["status"], "queued")
+        self.assertEqual(values["attempt_count"], 2)
+        expected = datetime.utcnow() + timedelta(seconds=retry_delay(2))
+        self.assertAlmostEqual(values["next_attempt_at"].timestamp(), expected.timestamp(), delta=2)
+
+    def test_backoff_grows_and_respects_retry_after(self):
+        env = get_settings()
+        self.assertEqual(retry_delay(1), env.email_retry_base_seconds)
+        self.assertEqual(retry_delay(3), env.email_retry_base_seconds * 4)
+        self.assertEqual(retry_delay(50), env.email_retry_max_seconds)
+        self.assertEqual(retry_delay(1, retry_after=env.email_retry_base_seconds * 10), env.email_retry_base_seconds * 10)
+
+    def test_last_attempt_moves_to_dead(self):
+        attempts = get_settings().email_max_attempts
+        log = EmailLog(id="log-1", lead_id="lead-1", subject="s", body="b", status="queued", attempt_count=attempts - 1)
+        values = status_values(log, DeliveryResult(False, error_class="timeout"))
+        self.assertEqual(values["status"], "dead")
+
+    def test_permanent_failure_is_not_retried(self):
+        log = EmailLog(id="log-1", lead_id="lead-1", subject="s", body="b", status="queued")
+        values = status_values(log, DeliveryResult(False, error_class="rejected"))
+        self.assertEqual(values["status"], "failed")
+
+
+class RequeueDeadTests(unittest.TestCase):
+    def test_requeue_dead_letters(self):
+        engine = memory_engine()
+        with Session(engine) as session:
+            lead = Lead(email="a@example.com")
+            session.add(lead)
+            session.flush()
+            for status in ("dead", "dead", "failed"):
+                session.add(EmailLog(lead_id=lead.id, subject="s", body="b", status=status, attempt_count=5))
+            session.commit()
+
+            self.assertEqual(requeue_dead(session), 2)
+            due = list_due(session, datetime.utcnow() + timedelta(seconds=1))
+            self.assertEqual(len(due), 2)
+            self.assertTrue(all(log.attempt_count == 0 for log in due))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,116 @@
+import asyncio
+import unittest
+from datetime import datetime, timedelta
+
+from support import count_queries, memory_engine
+
+from sqlmodel import Session, select
+
+from app.core.config import get_settings
+from app.models.db import AppSetting, Campaign, EmailLog, Lead, LeadMagnet
+from app.services.email_logs import claim_logs
+from app.services.email_scheduler import _process_due
+from app.services.email_service import send_email
+
+
+class BatchSendTests(unittest.TestCase):
+    def setUp(self):
+        self.engine = memory_engine()
+        env = get_settings()
+        with Session(self.engine) as session:
+            session.add(
+                AppSetting(
+                    llm_provider=env.llm_provider,
+                    llm_api_key=env.llm_api_key,
+                    llm_model=env.llm_model,
+                    email_provider="mock",
+                )
+            )
+            campaign = Campaign(name="Launch", icp_role="CTO", icp_industry="SaaS")
+            session.add(campaign)
+            session.commit()
+            magnet = LeadMagnet(
+                campaign_id=campaign.id,
+                title="Checklist",
+                type="checklist",
+                pain_point_alignment="",
+                value_promise="",
+                conversion_score=1.0,
+                format_recommendation="pdf",
+            )
+            session.add(magnet)
+            session.commit()
+            self.campaign_id = campaign.id
+            self.magnet_id = magnet.id
+
+    def _seed_due(self, count):
+        past = datetime.utcnow() - timedelta(minutes=1)
+        with Session(self.engine) as session:
+            for idx in range(count):
+                lead = Lead(
+                    email=f"lead{idx}@example.com",
+                    name=f"Lead {idx}",
+                    campaign_id=self.campaign_id,
+                    lead_magnet_id=self.magnet_id,
+                )
+                session.add(lead)
+                session.flush()
+                session.add(
+                    EmailLog(
+                        lead_id=lead.id,
+                        subject="Hi {{name}}",
+                        body="Your {{lead_magnet_title}} from {{campaign_name}}",
+                        status="queued",
+                        scheduled_at=past,
+                        next_attempt_at=past,
+                    )
+                )
+            session.commit()
+
+    def test_query_count_is_independent_of_batch_size(self):
+        self._seed_due(1)
+        with count_queries(self.engine) as single:
+            _process_due(self.engine)
+
+        self._seed_due(25)
+        with count_queries(self.engine) as batch:
+            _process_due(self.engine)
+
+        self.assertEqual(len(single), len(batch))
+        # list_due, claim UPDATE, settings, leads, campaigns, lead magnets, bulk status UPDATE, funnel upsert
+        self.assertLessEqual(len(batch), 8)
+        self.assertEqual(sum(1 for stmt in batch if stmt.lstrip().upper().startswith("UPDATE")), 2)
+
+    def test_statuses_written_back(self):
+        self._seed_due(3)
+        _process_due(self.engine)
+        with Session(self.engine) as session:
+            logs = session.exec(select(EmailLog)).all()
+        self.assertEqual({log.status for log in logs}, {"sent"})
+        self.assertTrue(all(log.sent_at and log.provider_message_id for log in logs))
+
+    def test_claimed_logs_are_sent_once(self):
+        self._seed_due(2)
+        with Session(self.engine) as session:
+            logs = session.exec(select(EmailLog)).all()
+            first = claim_logs(session, logs, datetime.utcnow())
+            second = claim_logs(session, logs, datetime.utcnow())
+        self.assertEqual((len(first), second), (2, []))
+        # Leased logs are not due for the dispatcher either.
+        with count_queries(self.engine) as statements:
+            _process_due(self.engine)
+        self.assertEqual(len(statements), 1)  # list_due finds nothing
+
+    def test_post_submit_send_skips_a_log_the_dispatcher_claimed(self):
+        self._seed_due(1)
+        with Session(self.engine) as session:
+            claim_logs(session, session.exec(select(EmailLog)).all(), datetime.utcnow())  # a dispatcher pass
+        with Session(self.engine, expire_on_commit=False) as session:
+            log = session.exec(select(EmailLog)).one()
+            ok, _, error = asyncio.run(send_email(session, log, datetime.utcnow() + timedelta(minutes=1)))
+        self.assertFalse(ok)
+        self.assertIn("claimed", error)
+
+
+if __name__ == "__main__":
+    unittest.main()
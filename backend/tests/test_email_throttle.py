@@ -0,0 +1,128 @@
+import asyncio
+import sys
+import unittest
+from pathlib import Path
+from unittest import mock
+
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BACKEND_ROOT))
+
+from app.core.config import get_settings  # noqa: E402
+from app.core.metrics import metrics  # noqa: E402
+from app.models.db import EmailLog, Lead  # noqa: E402
+from app.models.schemas import Settings  # noqa: E402
+from app.services import email_service  # noqa: E402
+from app.services.email_service import EmailProviderError, SendContext, deliver_batch, status_values  # noqa: E402
+from app.services.email_throttle import CLOSED, OPEN, ProviderThrottle, get_throttle, reset_throttles  # noqa: E402
+
+
+class ProviderThrottleTests(unittest.TestCase):
+    def test_bucket_limits_burst(self):
+        throttle = ProviderThrottle("test", rate=1.0, burst=2)
+        self.assertEqual(throttle.reserve(), 0.0)
+        self.assertEqual(throttle.reserve(), 0.0)
+        self.assertGreater(throttle.reserve(), 0.5)
+
+    def test_aimd_adjusts_rate(self):
+        throttle = ProviderThrottle("test", rate=10.0, burst=5, increase_step=1.0, failure_threshold=100)
+        throttle.record_throttled(retry_after=2)
+        self.assertEqual(throttle.rate, 5.0)
+        self.assertGreater(throttle.reserve(), 1.0)
+        throttle.record_success()
+        self.assertEqual(throttle.rate, 6.0)
+        for _ in range(10):
+            throttle.record_success()
+        self.assertEqual(throttle.rate, 10.0)
+
+    def test_breaker_opens_and_half_opens(self):
+        throttle = ProviderThrottle("test", rate=0, burst=1, failure_threshold=2, cooldown_seconds=0.05)
+        throttle.record_failure()
+        self.assertEqual(throttle.state, CLOSED)
+        throttle.record_failure()
+        self.assertEqual(throttle.state, OPEN)
+        self.assertIsNone(throttle.reserve())
+
+        import time
+
+        time.sleep(0.06)
+        self.assertEqual(throttle.reserve(), 0.0)  # single trial request
+        self.assertIsNone(throttle.reserve())
+        throttle.record_success()
+        self.assertEqual(throttle.state, CLOSED)
+
+
+class DeliverBatchThrottleTests(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        reset_throttles()
+        metrics.reset()
+
+    def tearDown(self):
+        reset_throttles()
+
+    def _context(self, count):
+        settings = Settings(llm_provider="openai", email_provider="mailersend", email_api_key="k" * 40)
+        leads = [Lead(id=f"lead-{idx}", email=f"{idx}@example.com") for idx in range(count)]
+        # Distinct bodies so nothing coalesces into a bulk request; each log is its own send.
+        logs = [EmailLog(id=f"log-{idx}", lead_id=lead.id, subject="s", body=f"b{idx}", status="queued") for idx, lead in enumerate(leads)]
+        return SendContext(settings=settings, leads={lead.id: lead for lead in leads}), logs
+
+    async def test_rate_limit_storm_leaves_logs_queued(self):
+        ctx, logs = self._context(20)
+        send = mock.AsyncMock(side_effect=EmailProviderError("MailerSend 429: slow down", status_code=429, retry_after=30))
+        with mock.patch.object(email_service, "_send_mailersend", send):
+            results = await deliver_batch(ctx, logs)
+
+        # Retry-After pauses the provider, so only the first request is actually made.
+        self.assertEqual(send.await_count, 1)
+        retry = status_values(logs[0], results[0])
+        self.assertEqual(retry["status"], "queued")
+        self.assertEqual(retry["last_error_class"], "rate_limited")
+        self.assertTrue(all(result.deferred for result in results[1:]))
+        self.assertTrue(all(status_values(log, result) is None for log, result in zip(logs[1:], results[1:])))
+        gauges = metrics.snapshot()["gauges"]
+        self.assertEqual(gauges["email_throttle_rate{provider=mailersend}"], 5.0)
+
+    async def test_open_breaker_stops_dispatch(self):
+        ctx, logs = self._context(10)
+        send = mock.AsyncMock(side_effect=EmailProviderError("MailerSend 503: unavailable", status_code=503))
+        with mock.patch.object(email_service, "_send_mailersend", send):
+            results = await deliver_batch(ctx, logs)
+
+        failed = [result for result in results if not result.deferred]
+        self.assertEqual(len(failed), 5)  # default breaker threshold
+        self.assertTrue(all(result.deferred for result in results[5:]))
+        self.assertEqual(metrics.snapshot()["gauges"]["email_breaker_state{provider=mailersend}"], 2)
+
+    async def test_groups_are_sent_concurrently(self):
+        ctx, logs = self._context(8)
+        in_flight = peak = 0
+
+        async def send(*args):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.05)
+            in_flight -= 1
+            return True, "id", None
+
+        with mock.patch.object(email_service, "_send_mailersend", send):
+            results = await deliver_batch(ctx, logs)
+        self.assertTrue(all(result.success for result in results))
+        self.assertEqual(peak, 8)  # EMAIL_SEND_CONCURRENCY
+
+    def test_rate_is_split_between_dispatch_workers(self):
+        with mock.patch.object(get_settings(), "email_dispatch_workers", 4):
+            throttle = get_throttle("sendgrid")
+        self.assertEqual(throttle.rate, get_settings().email_rate_limits["sendgrid"] / 4)
+        self.assertEqual(throttle.burst, 3)  # ceil(10 / 4)
+
+    def test_shard_count_splits_the_rate_without_touching_settings(self):
+        throttle = get_throttle("sendgrid", workers=5)
+        self.assertEqual(throttle.rate, get_settings().email_rate_limits["sendgrid"] / 5)
+        self.assertEqual(throttle.burst, 2)  # ceil(10 / 5)
+        self.assertEqual(get_settings().email_dispatch_workers, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,51 @@
+import unittest
+from datetime import datetime, timedelta
+
+from support import memory_engine
+
+from sqlmodel import Session
+
+from app.models.db import EmailLog, Lead
+from app.services.email_dispatcher import parse_shard, shard_key_for
+from app.services.email_logs import list_due
+
+
+class ShardingTests(unittest.TestCase):
+    def test_parse_shard(self):
+        self.assertIsNone(parse_shard(None))
+        self.assertEqual(parse_shard("1/4"), (1, 4))
+        for bad in ("4/4", "x/2", "1", "0/0"):
+            with self.assertRaises(ValueError):
+                parse_shard(bad)
+
+    def test_shards_partition_due_logs(self):
+        engine = memory_engine()
+        past = datetime.utcnow() - timedelta(minutes=1)
+        with Session(engine) as session:
+            for idx in range(40):
+                lead = Lead(email=f"{idx}@example.com")
+                session.add(lead)
+                session.flush()
+                session.add(
+                    EmailLog(
+                        lead_id=lead.id,
+                        subject="s",
+                        body="b",
+                        status="queued",
+                        scheduled_at=past,
+                        next_attempt_at=past,
+                        shard_key=shard_key_for(lead.id),
+                    )
+                )
+            session.commit()
+
+            everything = {log.id for log in list_due(session, datetime.utcnow())}
+            shards = [{log.id for log in list_due(session, datetime.utcnow(), shard=(idx, 3))} for idx in range(3)]
+
+        self.assertEqual(set().union(*shards), everything)
+        self.assertEqual(sum(len(shard) for shard in shards), len(everything))
+        self.assertTrue(all(shards))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,147 @@
+import unittest
+from datetime import datetime, timedelta
+from unittest import mock
+
+from support import count_queries, memory_engine
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlmodel import Session, select
+
+from app.api.routes import analytics
+from app.core.config import get_settings
+from app.db.session import get_session
+from app.models.db import AppSetting, Campaign, EmailLog, LandingPage, Lead, LeadMagnet, NurtureSequence, NurtureStep
+from app.models.schemas import LeadCreate
+from app.services import email_scheduler
+from app.services.email_logs import list_logs, requeue_dead
+from app.services.email_scheduler import _process_due
+from app.services.email_service import DeliveryResult
+from app.services.funnel import funnel_report, rebuild_funnel_rollups
+from app.services.lead_ingest import Submission, write_batch
+from app.services.leads import capture_lead
+from app.services.sequence_plans import invalidate_plans
+
+
+class FunnelRollupTests(unittest.TestCase):
+    def setUp(self):
+        invalidate_plans()
+        self.engine = memory_engine()
+        env = get_settings()
+        with Session(self.engine) as session:
+            session.add(AppSetting(llm_provider=env.llm_provider, email_provider="mock"))
+            campaign = Campaign(name="Launch", icp_role="CTO", icp_industry="SaaS")
+            session.add(campaign)
+            session.flush()
+            magnet = LeadMagnet(
+                campaign_id=campaign.id,
+                title="Checklist",
+                type="checklist",
+                pain_point_alignment="",
+                value_promise="",
+                conversion_score=1.0,
+                format_recommendation="pdf",
+            )
+            session.add(magnet)
+            session.flush()
+            landing = LandingPage(lead_magnet_id=magnet.id, slug="acme", headline="H", subheadline="", cta="Go", html_content="")
+            session.add(landing)
+            seq = NurtureSequence(campaign_id=campaign.id, lead_magnet_id=magnet.id)
+            session.add(seq)
+            session.flush()
+            session.add(NurtureStep(sequence_id=seq.id, order=1, subject="Day 0", body="b", offset_days=0))
+            session.add(NurtureStep(sequence_id=seq.id, order=2, subject="Day 2", body="b", offset_days=2))
+            session.commit()
+            self.campaign_id, self.magnet_id, self.landing_id = campaign.id, magnet.id, landing.id
+
+    def tearDown(self):
+        invalidate_plans()
+
+    def _payload(self, email: str) -> LeadCreate:
+        return LeadCreate(
+            campaign_id=self.campaign_id, lead_magnet_id=self.magnet_id, landing_page_id=self.landing_id, email=email
+        )
+
+    def _report(self, **filters) -> dict:
+        with Session(self.engine) as session:
+            return funnel_report(session, **filters).model_dump()
+
+    def _run_funnel(self) -> None:
+        with Session(self.engine) as session:
+            capture_lead(session, self._payload("a@example.com"))
+            capture_lead(session, self._payload("b@example.com"))
+        write_batch(self.engine, [Submission.from_lead(self._payload("c@example.com"))])
+
+        async def deliver(ctx, logs, workers=None):
+            # The first due email times out on its only attempt (dead); the rest are sent.
+            return [DeliveryResult(False, error_message="timeout", error_class="timeout")] + [
+                DeliveryResult(True, "provider-id") for _ in logs[1:]
+            ]
+
+        with mock.patch.object(get_settings(), "email_max_attempts", 1), mock.patch.object(
+            email_scheduler, "deliver_batch", deliver
+        ):
+            _process_due(self.engine)
+
+    def test_writers_keep_rollups_equal_to_a_rebuild(self):
+        self._run_funnel()
+        totals = self._report()["totals"]
+        self.assertEqual(totals, {"leads": 3, "emails_queued": 3, "emails_sent": 5, "emails_failed": 0, "emails_dead": 1})
+
+        with Session(self.engine) as session:
+            self.assertEqual(requeue_dead(session), 1)
+        incremental = self._report()
+        self.assertEqual(incremental["totals"]["emails_queued"], 4)
+        self.assertEqual(incremental["totals"]["emails_dead"], 0)
+
+        self.assertEqual(rebuild_funnel_rollups(self.engine, batch_size=2), 2)  # today and day +2
+        self.assertEqual(self._report(), incremental)
+
+        later = self._report(start=(datetime.utcnow() + timedelta(days=1)).date(), group_by="landing_page")
+        self.assertEqual(len(later["rows"]), 1)
+        self.assertEqual(later["rows"][0]["landing_page_id"], self.landing_id)
+        self.assertEqual(later["totals"]["emails_queued"], 3)  # the Day 2 emails
+        self.assertEqual(later["totals"]["leads"], 0)
+
+    def test_rebuild_files_leads_without_a_campaign_under_their_landing_page(self):
+        with Session(self.engine) as session:
+            # Captured before campaign_id was stamped on leads.
+            lead = Lead(email="old@example.com", landing_page_id=self.landing_id)
+            session.add(lead)
+            session.flush()
+            session.add(EmailLog(lead_id=lead.id, subject="Welcome", body="b", status="sent", scheduled_at=lead.created_at))
+            session.commit()
+        rebuild_funnel_rollups(self.engine)
+        report = self._report(group_by="campaign")
+        self.assertEqual([row["campaign_id"] for row in report["rows"]], [self.campaign_id])
+        self.assertEqual(report["totals"]["leads"], 1)
+        self.assertEqual(report["totals"]["emails_sent"], 1)
+
+    def test_endpoint_reads_only_rollups(self):
+        self._run_funnel()
+
+        def _session():
+            with Session(self.engine) as session:
+                yield session
+
+        app = FastAPI()
+        app.include_router(analytics.router, prefix="/api/analytics")
+        app.dependency_overrides[get_session] = _session
+        client = TestClient(app)
+        with count_queries(self.engine) as statements:
+            response = client.get("/api/analytics/funnel", params={"campaign_id": self.campaign_id, "group_by": "campaign"})
+        self.assertEqual(response.json()["data"]["rows"][0]["leads"], 3)
+        self.assertEqual(len(statements), 1)
+        self.assertIn("FROM funnel_rollups", statements[0])
+        self.assertEqual(client.get("/api/analytics/funnel", params={"group_by": "email"}).status_code, 422)
+
+    def test_campaign_log_filter_is_one_query(self):
+        self._run_funnel()
+        with Session(self.engine) as session, count_queries(self.engine) as statements:
+            logs = list_logs(session, campaign_id=self.campaign_id)
+            sequence_logs = session.exec(select(EmailLog).where(EmailLog.sequence_id.is_not(None))).all()
+        self.assertEqual(len(statements), 2)
+        self.assertEqual({log.id for log in logs}, {log.id for log in sequence_logs})
+
+
+if __name__ == "__main__":
+    unittest.main()
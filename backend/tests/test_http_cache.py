@@ -0,0 +1,82 @@
+import gzip
+import unittest
+from unittest import mock
+
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from app.core import http_cache
+from app.core.http_cache import cached_response, choose_encoding, clear_variants
+
+BODY = "<html><body>" + "<p>Launch day</p>" * 200 + "</body></html>"
+
+
+def _app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/page")
+    def page(request: Request):
+        return cached_response(request, BODY, "text/html", '"v1"')
+
+    return app
+
+
+class ChooseEncodingTests(unittest.TestCase):
+    def test_prefers_best_available_coding(self):
+        self.assertEqual(choose_encoding(None), "identity")
+        self.assertEqual(choose_encoding("gzip, deflate"), "gzip")
+        self.assertEqual(choose_encoding("gzip;q=0, deflate"), "identity")
+        with mock.patch.object(http_cache, "brotli", None):
+            self.assertEqual(choose_encoding("br, gzip"), "gzip")
+        with mock.patch.object(http_cache, "brotli", object()):
+            self.assertEqual(choose_encoding("gzip, br"), "br")
+            self.assertEqual(choose_encoding("br;q=0.5, gzip"), "gzip")
+            self.assertEqual(choose_encoding("*"), "br")
+
+
+class CachedResponseTests(unittest.TestCase):
+    def setUp(self):
+        clear_variants()
+        self.client = TestClient(_app())
+
+    def test_sends_validators_and_honours_if_none_match(self):
+        first = self.client.get("/page", headers={"Accept-Encoding": "identity"})
+        self.assertEqual(first.headers["etag"], '"v1"')
+        self.assertIn("max-age", first.headers["cache-control"])
+        self.assertEqual(first.headers["vary"], "Accept-Encoding")
+        again = self.client.get("/page", headers={"If-None-Match": 'W/"v0", "v1"'})
+        self.assertEqual(again.status_code, 304)
+        self.assertEqual(again.content, b"")
+        self.assertEqual(again.headers["etag"], '"v1"')
+        self.assertEqual(self.client.get("/page", headers={"If-None-Match": '"v0"'}).status_code, 200)
+
+    def test_gzip_variant_is_compressed_once(self):
+        with mock.patch.object(http_cache, "compress", wraps=http_cache.compress) as compress:
+            for _ in range(3):
+                response = self.client.get("/page", headers={"Accept-Encoding": "gzip"})
+                self.assertEqual(response.headers["content-encoding"], "gzip")
+                self.assertEqual(response.text, BODY)  # httpx decodes the gzip body
+        compress.assert_called_once()
+        self.assertEqual(gzip.decompress(http_cache._variants[('"v1"', "gzip")]).decode(), BODY)
+
+    def test_each_encoding_has_its_own_etag(self):
+        plain = self.client.get("/page", headers={"Accept-Encoding": "identity"})
+        gzipped = self.client.get("/page", headers={"Accept-Encoding": "gzip"})
+        self.assertEqual(plain.headers["etag"], '"v1"')
+        self.assertEqual(gzipped.headers["etag"], '"v1-gzip"')
+        self.assertEqual(gzipped.headers["vary"], "Accept-Encoding")
+        for response in (plain, gzipped):
+            etag = response.headers["etag"]
+            again = self.client.get("/page", headers={"Accept-Encoding": "gzip", "If-None-Match": etag})
+            self.assertEqual(again.status_code, 304)
+            self.assertEqual(again.headers["etag"], etag)
+        self.assertEqual(self.client.get("/page", headers={"If-None-Match": '"v0-gzip"'}).status_code, 200)
+
+    def test_small_bodies_are_not_compressed(self):
+        with mock.patch.object(http_cache.get_settings(), "public_compress_min_bytes", len(BODY) + 1):
+            response = self.client.get("/page", headers={"Accept-Encoding": "gzip"})
+        self.assertNotIn("content-encoding", response.headers)
+
+
+if __name__ == "__main__":
+    unittest.main()
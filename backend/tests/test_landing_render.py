@@ -0,0 +1,157 @@
+import unittest
+from unittest import mock
+
+from support import count_queries, memory_engine
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+
+from app.api.routes import public
+from app.db.session import get_session
+from app.models.db import Campaign, LandingPage, LeadMagnet
+from app.services import landing_render
+from app.services.landing_render import (
+    invalidate_landing_html,
+    landing_html,
+    prerender_campaign,
+    render_landing_html,
+    rerender_all,
+)
+from app.services.landing_resolver import invalidate_landings
+
+PAGE = "<html><body><h1 onclick='x()'>Hi</h1><script>alert(1)</script><form></form></body></html>"
+BRAND = {"logo_url": "https://cdn.example.com/logo.png", "company_name": "Acme"}
+
+
+class LandingRenderTests(unittest.TestCase):
+    def setUp(self):
+        invalidate_landing_html()
+
+    def tearDown(self):
+        invalidate_landing_html()
+
+    def test_render_sanitizes_and_injects(self):
+        html = render_landing_html(PAGE, BRAND, "acme")
+        self.assertNotIn("onclick", html)
+        self.assertNotIn("<script>alert", html)
+        self.assertTrue(html.startswith('<div id="brand-nav"'))
+        self.assertIn("<h1>Hi</h1>", html)
+
+    def test_hit_does_no_sanitisation(self):
+        with mock.patch.object(landing_render, "sanitize_html", wraps=landing_render.sanitize_html) as sanitize:
+            first = landing_html("lp-1", PAGE, BRAND, "acme")
+            second = landing_html("lp-1", PAGE, BRAND, "acme")
+        self.assertEqual(sanitize.call_count, 1)
+        self.assertEqual(first, second)
+
+    def test_content_changes_and_invalidation_rerender(self):
+        with mock.patch.object(landing_render, "sanitize_html", wraps=landing_render.sanitize_html) as sanitize:
+            landing_html("lp-1", PAGE, BRAND, "acme")
+            updated = landing_html("lp-1", PAGE.replace("Hi", "Hello"), BRAND, "acme")
+            rebranded = landing_html("lp-1", PAGE, {"logo_url": "https://cdn.example.com/new.png"}, "acme")
+            invalidate_landing_html("lp-1")
+            landing_html("lp-1", PAGE, BRAND, "acme")
+        self.assertEqual(sanitize.call_count, 4)
+        self.assertIn("Hello", updated)
+        self.assertIn("new.png", rebranded)
+
+    def test_cache_is_bounded(self):
+        with mock.patch.object(landing_render.get_settings(), "landing_html_cache_size", 2):
+            for idx in range(5):
+                landing_html(f"lp-{idx}", PAGE, None, f"page-{idx}")
+        self.assertEqual(len(landing_render._cache), 2)
+        self.assertEqual([key[0] for key in landing_render._cache], ["lp-3", "lp-4"])
+
+
+class StoredRenderTests(unittest.TestCase):
+    def setUp(self):
+        invalidate_landing_html()
+        invalidate_landings()
+        self.engine = memory_engine()
+        with Session(self.engine) as session:
+            campaign = Campaign(name="C", icp_role="CTO", icp_industry="SaaS", product_context=BRAND)
+            session.add(campaign)
+            session.flush()
+            magnet = LeadMagnet(
+                campaign_id=campaign.id,
+                title="T",
+                type="checklist",
+                pain_point_alignment="",
+                value_promise="",
+                conversion_score=1.0,
+                format_recommendation="pdf",
+            )
+            session.add(magnet)
+            session.flush()
+            landing = LandingPage(lead_magnet_id=magnet.id, slug="acme", headline="H", subheadline="", cta="Go", html_content=PAGE)
+            session.add(landing)
+            session.commit()
+            self.campaign_id, self.landing_id = campaign.id, landing.id
+
+        app = FastAPI()
+        app.include_router(public.router, prefix="/public")
+
+        def _session():
+            with Session(self.engine) as session:
+                yield session
+
+        app.dependency_overrides[get_session] = _session
+        self.client = TestClient(app)
+
+    def _landing(self) -> LandingPage:
+        with Session(self.engine) as session:
+            return session.get(LandingPage, self.landing_id)
+
+    def test_prerender_stores_rendered_page(self):
+        with Session(self.engine) as session:
+            self.assertEqual(prerender_campaign(session, self.campaign_id), 1)
+            self.assertEqual(prerender_campaign(session, self.campaign_id), 0)
+        landing = self._landing()
+        self.assertEqual(landing.rendered_html, render_landing_html(PAGE, BRAND, "acme"))
+        self.assertEqual(landing.render_version, landing_render.SANITIZER_VERSION)
+
+    def test_backfill_only_touches_stale_rows(self):
+        self.assertEqual(rerender_all(self.engine), 1)
+        self.assertEqual(rerender_all(self.engine), 0)
+        self.assertEqual(rerender_all(self.engine, stale_only=False), 1)
+        with mock.patch.object(landing_render, "SANITIZER_VERSION", landing_render.SANITIZER_VERSION + 1):
+            self.assertEqual(rerender_all(self.engine), 1)
+            self.assertEqual(self._landing().render_version, landing_render.SANITIZER_VERSION)
+
+    def test_public_page_is_one_lookup_once_rendered(self):
+        rerender_all(self.engine)
+        with mock.patch.object(landing_render, "sanitize_html") as sanitize, count_queries(self.engine) as statements:
+            by_slug = self.client.get("/public/lp/acme")
+            by_id = self.client.get(f"/public/lp/{self.landing_id}")
+        sanitize.assert_not_called()
+        self.assertEqual(len(statements), 4)  # resolve + stored body, per key
+        with count_queries(self.engine) as statements:
+            self.client.get("/public/lp/acme")
+            revalidated = self.client.get("/public/lp/acme", headers={"If-None-Match": by_slug.headers["etag"]})
+        self.assertEqual(len(statements), 1)  # resolution cached; the 304 loads nothing
+        self.assertEqual(revalidated.status_code, 304)
+        self.assertEqual(by_slug.text, self._landing().rendered_html)
+        self.assertEqual(by_id.text, by_slug.text)
+        self.assertEqual(self.client.get("/public/lp/missing").status_code, 404)
+
+    def test_public_pages_revalidate_with_etag(self):
+        rerender_all(self.engine)
+        for path in ("/public/lp/acme", "/public/lp/acme/thank-you", "/public/landing/acme"):
+            first = self.client.get(path)
+            self.assertEqual(first.status_code, 200, path)
+            etag = first.headers["etag"]
+            self.assertEqual(self.client.get(path, headers={"If-None-Match": etag}).status_code, 304, path)
+        self.assertEqual(first.headers["content-type"], "application/json")
+        self.assertNotIn("rendered_html", first.json()["data"])
+        version = self._landing().content_version
+        self.assertEqual(self.client.get("/public/lp/acme", headers={"Accept-Encoding": "identity"}).headers["etag"], f'"{version}"')
+        self.assertEqual(self.client.get("/public/lp/acme").headers["etag"], f'"{version}-gzip"')
+
+    def test_unrendered_page_falls_back_to_live_render(self):
+        response = self.client.get("/public/lp/acme")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.text, render_landing_html(PAGE, BRAND, "acme"))
+
+
+if __name__ == "__main__":
+    unittest.main()
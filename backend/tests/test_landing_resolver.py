@@ -0,0 +1,80 @@
+import unittest
+from unittest import mock
+
+from support import count_queries, memory_engine
+
+from sqlmodel import Session
+
+from app.models.db import Campaign, LandingPage, LeadMagnet
+from app.services import landing_resolver
+from app.services.landing_resolver import invalidate_landings, resolve_landing
+
+
+class LandingResolverTests(unittest.TestCase):
+    def setUp(self):
+        invalidate_landings()
+        self.engine = memory_engine()
+        with Session(self.engine) as session:
+            campaign = Campaign(name="C", icp_role="CTO", icp_industry="SaaS")
+            session.add(campaign)
+            session.flush()
+            magnet = LeadMagnet(
+                campaign_id=campaign.id,
+                title="T",
+                type="checklist",
+                pain_point_alignment="",
+                value_promise="",
+                conversion_score=1.0,
+                format_recommendation="pdf",
+            )
+            session.add(magnet)
+            session.flush()
+            landing = LandingPage(lead_magnet_id=magnet.id, slug="acme", headline="H", subheadline="", cta="Go", html_content="")
+            session.add(landing)
+            session.commit()
+            self.campaign_id, self.magnet_id, self.landing_id = campaign.id, magnet.id, landing.id
+
+    def tearDown(self):
+        invalidate_landings()
+
+    def test_slug_or_id_in_one_query_then_cached(self):
+        with Session(self.engine) as session, count_queries(self.engine) as statements:
+            by_slug = resolve_landing(session, "acme")
+            by_id = resolve_landing(session, self.landing_id)
+            resolve_landing(session, "acme")
+            resolve_landing(session, self.landing_id)
+        self.assertEqual(len(statements), 2)
+        self.assertEqual(by_slug, by_id)
+        self.assertEqual(
+            (by_slug.id, by_slug.lead_magnet_id, by_slug.campaign_id),
+            (self.landing_id, self.magnet_id, self.campaign_id),
+        )
+
+    def test_misses_are_not_cached_and_writes_invalidate(self):
+        with Session(self.engine) as session, count_queries(self.engine) as statements:
+            self.assertIsNone(resolve_landing(session, "missing"))
+            self.assertIsNone(resolve_landing(session, "missing"))
+            resolve_landing(session, "acme")
+        self.assertEqual(len(statements), 3)
+
+        with Session(self.engine) as session:
+            landing = session.get(LandingPage, self.landing_id)
+            landing.slug = "acme-2"
+            session.add(landing)
+            session.commit()
+            self.assertIsNotNone(resolve_landing(session, "acme"))  # cached until invalidated
+            invalidate_landings()
+            self.assertIsNone(resolve_landing(session, "acme"))
+            self.assertEqual(resolve_landing(session, "acme-2").id, self.landing_id)
+
+    def test_ttl_expiry_reloads(self):
+        with Session(self.engine) as session:
+            with mock.patch.object(landing_resolver.get_settings(), "landing_resolver_cache_ttl_seconds", 0):
+                with count_queries(self.engine) as statements:
+                    resolve_landing(session, "acme")
+                    resolve_landing(session, "acme")
+        self.assertEqual(len(statements), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
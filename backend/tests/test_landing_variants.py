@@ -0,0 +1,167 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from support import async_session_override, count_queries, sqlite_file_engines
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlmodel import Session, select
+
+from app.api.routes import public
+from app.db.session import get_async_session, get_session
+from app.models.db import Campaign, LandingPage, Lead, LeadMagnet
+from app.models.schemas import LandingVariantCreate, LandingVariantUpdate
+from app.services.landing_render import invalidate_landing_html, rerender_all
+from app.services.landing_resolver import ResolvedLanding, ResolvedVariant, invalidate_landings, resolve_landing
+from app.services.landing_variants import (
+    VISITOR_COOKIE,
+    choose_variant,
+    create_variant,
+    list_variants,
+    update_variant,
+)
+
+
+def _landing(*weights: float) -> ResolvedLanding:
+    variants = tuple(ResolvedVariant(f"v{i}", f"v{i}", weight, None, None) for i, weight in enumerate(weights))
+    return ResolvedLanding("lp", "acme", "m", "c", None, None, variants)
+
+
+class ChooseVariantTests(unittest.TestCase):
+    def test_sticky_per_visitor_and_proportional_to_weights(self):
+        landing = _landing(1.0, 2.0)
+        arms = [choose_variant(landing, f"visitor-{i:05d}") for i in range(6000)]
+        self.assertEqual(arms[:50], [choose_variant(landing, f"visitor-{i:05d}") for i in range(50)])
+        shares = [sum(1 for arm in arms if (arm.key if arm else None) == key) / len(arms) for key in (None, "v0", "v1")]
+        for share, expected in zip(shares, (0.25, 0.25, 0.5)):
+            self.assertAlmostEqual(share, expected, delta=0.03)
+
+    def test_adding_a_variant_only_moves_visitors_into_it(self):
+        before, after = _landing(1.0), _landing(1.0, 1.0)
+        visitors = [f"visitor-{i:05d}" for i in range(6000)]
+        moved = [(choose_variant(before, v), choose_variant(after, v)) for v in visitors]
+        changed = [(old, new) for old, new in moved if (old and old.key) != (new and new.key)]
+        self.assertTrue(all(new.key == "v1" for _, new in changed))
+        self.assertAlmostEqual(len(changed) / len(visitors), 1 / 3, delta=0.03)
+
+    def test_paused_variants_get_no_traffic(self):
+        landing = _landing(0.0)
+        self.assertTrue(all(choose_variant(landing, f"visitor-{i:05d}") is None for i in range(200)))
+
+
+class SplitTestRouteTests(unittest.TestCase):
+    def setUp(self):
+        invalidate_landings()
+        invalidate_landing_html()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.engine, async_engine = sqlite_file_engines(os.path.join(self.tmp.name, "ab.db"))
+        with Session(self.engine) as session:
+            campaign = Campaign(name="Launch", icp_role="CTO", icp_industry="SaaS")
+            session.add(campaign)
+            session.flush()
+            magnet = LeadMagnet(
+                campaign_id=campaign.id,
+                title="Checklist",
+                type="checklist",
+                pain_point_alignment="",
+                value_promise="",
+                conversion_score=1.0,
+                format_recommendation="pdf",
+            )
+            session.add(magnet)
+            session.flush()
+            landing = LandingPage(
+                lead_magnet_id=magnet.id, slug="acme", headline="H", subheadline="", cta="Go", html_content="<h1>Original</h1>"
+            )
+            session.add(landing)
+            session.commit()
+            self.landing_id = landing.id
+            create_variant(session, landing.id, LandingVariantCreate(key="b", html_content="<h1>Bold</h1>", headline="Bold"))
+        rerender_all(self.engine)
+
+        def _session():
+            with Session(self.engine) as session:
+                yield session
+
+        app = FastAPI()
+        app.include_router(public.router, prefix="/public")
+        app.dependency_overrides[get_session] = _session
+        app.dependency_overrides[get_async_session] = async_session_override(async_engine)
+        self.client = TestClient(app)
+        patcher = mock.patch.object(public, "send_email_task")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        with Session(self.engine) as session:
+            resolved = resolve_landing(session, "acme")
+        visitors = [f"visitor-{i:05d}" for i in range(100)]
+        self.variant_visitor = next(v for v in visitors if choose_variant(resolved, v) is not None)
+        self.control_visitor = next(v for v in visitors if choose_variant(resolved, v) is None)
+
+    def tearDown(self):
+        self.engine.dispose()
+        self.tmp.cleanup()
+        invalidate_landings()
+        invalidate_landing_html()
+
+    def _get(self, path: str, visitor: str):
+        self.client.cookies.clear()
+        return self.client.get(path, headers={"Cookie": f"{VISITOR_COOKIE}={visitor}"})
+
+    def test_new_visitor_gets_cookie_and_a_private_response(self):
+        response = self.client.get("/public/lp/acme")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(VISITOR_COOKIE, response.cookies)
+        self.assertEqual(response.headers["cache-control"], "private, no-cache")
+        self.assertIn("Cookie", response.headers["vary"])
+
+    def test_variant_pages_are_sticky_cached_and_write_nothing(self):
+        first = self._get("/public/lp/acme", self.variant_visitor)
+        self.assertIn("Bold", first.text)
+        self.assertIn('data._variant = "b";', first.text)
+        self.assertNotIn(VISITOR_COOKIE, first.cookies)
+        with count_queries(self.engine) as statements:
+            again = self._get("/public/lp/acme", self.variant_visitor)
+            control = self._get("/public/lp/acme", self.control_visitor)
+        self.assertEqual(again.text, first.text)
+        self.assertIn("Original", control.text)
+        self.assertNotIn("_variant", control.text)
+        self.assertFalse([s for s in statements if not s.lstrip().upper().startswith("SELECT")])
+        self.assertEqual(len(statements), 1)  # the control's stored render; the variant came from memory
+
+        etag = again.headers["etag"]
+        self.client.cookies.clear()
+        revalidated = self.client.get(
+            "/public/lp/acme", headers={"Cookie": f"{VISITOR_COOKIE}={self.variant_visitor}", "If-None-Match": etag}
+        )
+        self.assertEqual(revalidated.status_code, 304)
+
+        data = self._get("/public/landing/acme", self.variant_visitor).json()["data"]
+        self.assertEqual((data["variant"], data["headline"]), ("b", "Bold"))
+
+    def test_submissions_record_the_arm_and_count_once(self):
+        self.client.cookies.clear()
+        cookie = {"Cookie": f"{VISITOR_COOKIE}={self.variant_visitor}"}
+        for email in ("a@example.com", "A@example.com", "b@example.com"):
+            self.client.post("/public/lp/acme/submit", json={"email": email}, headers=cookie)
+        self.client.post("/public/landing/acme", json={"email": "c@example.com", "_variant": "control"})
+        self.client.post("/public/landing/acme", json={"email": "d@example.com"})
+
+        with Session(self.engine) as session:
+            arms = dict(session.exec(select(Lead.email, Lead.variant)).all())
+            report = list_variants(session, self.landing_id)
+        self.assertEqual(arms, {"a@example.com": "b", "b@example.com": "b", "c@example.com": "control", "d@example.com": None})
+        self.assertEqual(report.leads, {"b": 2, "control": 1})
+        self.assertEqual(report.variants[0].leads, 2)
+
+    def test_variant_edits_are_served_at_once(self):
+        self._get("/public/lp/acme", self.variant_visitor)
+        with Session(self.engine) as session:
+            variant_id = list_variants(session, self.landing_id).variants[0].id
+            update_variant(session, self.landing_id, variant_id, LandingVariantUpdate(html_content="<h1>Bolder</h1>"))
+        self.assertIn("Bolder", self._get("/public/lp/acme", self.variant_visitor).text)
+
+
+if __name__ == "__main__":
+    unittest.main()
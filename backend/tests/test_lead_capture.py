@@ -0,0 +1,137 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from support import async_session_override, count_queries, sqlite_file_engines
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlmodel import Session, select
+
+from app.api.routes import public
+from app.db.session import get_async_session
+from app.models.db import Campaign, EmailLog, LandingPage, Lead, LeadMagnet, NurtureSequence, NurtureStep
+from app.models.schemas import LeadCreate
+from app.services.lead_ingest import Submission, write_batch
+from app.services.landing_resolver import invalidate_landings
+from app.services.leads import capture_lead
+from app.services.sequence_plans import invalidate_plans
+
+
+class LeadCaptureTests(unittest.TestCase):
+    def setUp(self):
+        invalidate_plans()
+        invalidate_landings()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.engine, async_engine = sqlite_file_engines(os.path.join(self.tmp.name, "leads.db"))
+        with Session(self.engine) as session:
+            campaign = Campaign(name="Launch", icp_role="CTO", icp_industry="SaaS")
+            session.add(campaign)
+            session.flush()
+            magnet = LeadMagnet(
+                campaign_id=campaign.id,
+                title="Checklist",
+                type="checklist",
+                pain_point_alignment="",
+                value_promise="",
+                conversion_score=1.0,
+                format_recommendation="pdf",
+            )
+            session.add(magnet)
+            session.flush()
+            landing = LandingPage(lead_magnet_id=magnet.id, slug="acme", headline="H", subheadline="", cta="Go", html_content="<p>x</p>")
+            session.add(landing)
+            seq = NurtureSequence(campaign_id=campaign.id, lead_magnet_id=magnet.id)
+            session.add(seq)
+            session.flush()
+            session.add(NurtureStep(sequence_id=seq.id, order=1, subject="Day 0", body="b", offset_days=0))
+            session.add(NurtureStep(sequence_id=seq.id, order=2, subject="Day 2", body="b", offset_days=2))
+            session.commit()
+            self.campaign_id, self.magnet_id, self.landing_id = campaign.id, magnet.id, landing.id
+
+        app = FastAPI()
+        app.include_router(public.router, prefix="/public")
+        app.dependency_overrides[get_async_session] = async_session_override(async_engine)
+        self.client = TestClient(app)
+        patcher = mock.patch.object(public, "send_email_task")
+        self.send_email_task = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.engine.dispose()
+        self.tmp.cleanup()
+        invalidate_plans()
+        invalidate_landings()
+
+    def _payload(self, email: str) -> LeadCreate:
+        return LeadCreate(
+            campaign_id=self.campaign_id,
+            lead_magnet_id=self.magnet_id,
+            landing_page_id=self.landing_id,
+            email=email,
+        )
+
+    def _counts(self) -> tuple[int, int]:
+        with Session(self.engine) as session:
+            return len(session.exec(select(Lead.id)).all()), len(session.exec(select(EmailLog.id)).all())
+
+    def test_capture_is_one_transaction_of_four_inserts(self):
+        with Session(self.engine) as session:
+            capture_lead(session, self._payload("warm@example.com"))  # loads the cached sequence plan
+        commits = []
+
+        def _commit(conn):
+            commits.append(conn)
+
+        event.listen(self.engine, "commit", _commit)
+        try:
+            with Session(self.engine) as session, count_queries(self.engine) as statements:
+                captured = capture_lead(session, self._payload("ada@example.com"))
+        finally:
+            event.remove(self.engine, "commit", _commit)
+        self.assertEqual(len(statements), 4)  # lead, welcome email, sequence emails, funnel rollup
+        self.assertTrue(all(sql.lstrip().upper().startswith("INSERT") for sql in statements))
+        self.assertEqual(len(commits), 1)
+        self.assertTrue(captured.created)
+        self.assertEqual(len(captured.log_ids), 3)
+        with Session(self.engine) as session:
+            immediate = session.get(EmailLog, captured.immediate_log_id)
+        self.assertEqual(immediate.subject, "Day 0")
+
+    def test_repeat_address_returns_existing_lead(self):
+        with Session(self.engine) as session:
+            first = capture_lead(session, self._payload("Ada@example.com"))
+            again = capture_lead(session, self._payload("ada@example.com"))
+        self.assertTrue(first.created)
+        self.assertFalse(again.created)
+        self.assertEqual(again.lead_id, first.lead_id)
+        self.assertIsNone(again.immediate_log_id)
+        self.assertEqual(self._counts(), (1, 3))
+
+    def test_double_submit_enqueues_sequence_once(self):
+        first = self.client.post("/public/lp/acme/submit", json={"email": "ada@example.com"})
+        second = self.client.post("/public/landing/acme", json={"email": "ADA@example.com"})
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(second.json()["data"]["lead_id"], first.json()["data"]["lead_id"])
+        self.assertEqual(self._counts(), (1, 3))  # welcome + two sequence steps
+        self.send_email_task.assert_called_once()  # day-0 email, first submission only
+
+    def test_idempotency_key_maps_retries_to_one_lead(self):
+        headers = {"Idempotency-Key": "form-123"}
+        first = self.client.post("/public/lp/acme/submit", json={"email": "ada@example.com"}, headers=headers)
+        retry = self.client.post("/public/lp/acme/submit", json={"email": "ada+retry@example.com"}, headers=headers)
+        self.assertEqual(retry.json()["data"]["lead_id"], first.json()["data"]["lead_id"])
+        self.assertEqual(self._counts(), (1, 3))
+        too_long = self.client.post("/public/lp/acme/submit", json={"email": "b@example.com"}, headers={"Idempotency-Key": "k" * 256})
+        self.assertEqual(too_long.status_code, 400)
+
+    def test_batch_skips_repeats_within_and_across_batches(self):
+        subs = [Submission.from_lead(self._payload(email)) for email in ("a@example.com", "A@example.com", "b@example.com")]
+        self.assertEqual(write_batch(self.engine, subs), 2)
+        self.assertEqual(write_batch(self.engine, [Submission.from_lead(self._payload("b@EXAMPLE.com"))]), 0)
+        self.assertEqual(self._counts(), (2, 6))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,161 @@
+import glob
+import os
+import tempfile
+import unittest
+from datetime import datetime
+from unittest import mock
+
+from support import async_session_override, count_queries, memory_engine, sqlite_file_engines
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from sqlmodel import Session, select
+
+from app.api.routes import public
+from app.db.session import get_async_session
+from app.models.db import Campaign, EmailLog, LandingPage, Lead, LeadMagnet, NurtureSequence, NurtureStep
+from app.models.schemas import LeadCreate
+from app.services.landing_resolver import invalidate_landings
+from app.services.lead_ingest import LeadIngestor, Submission, write_batch
+from app.services.sequence_plans import invalidate_plans
+
+
+class LeadIngestTests(unittest.TestCase):
+    def setUp(self):
+        invalidate_plans()
+        self.engine = memory_engine()
+        with Session(self.engine) as session:
+            campaign = Campaign(name="Launch", icp_role="CTO", icp_industry="SaaS")
+            session.add(campaign)
+            session.flush()
+            seq = NurtureSequence(campaign_id=campaign.id)
+            session.add(seq)
+            session.flush()
+            session.add(NurtureStep(sequence_id=seq.id, order=1, subject="Day 0", body="b", offset_days=0))
+            session.add(NurtureStep(sequence_id=seq.id, order=2, subject="Day 2", body="b", offset_days=2))
+            session.commit()
+            self.campaign_id = campaign.id
+        self.tmp = tempfile.TemporaryDirectory()
+        self.spool = os.path.join(self.tmp.name, "leads.spool")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+        invalidate_plans()
+
+    def _submission(self, idx: int) -> Submission:
+        return Submission.from_lead(LeadCreate(campaign_id=self.campaign_id, email=f"lead{idx}@example.com"))
+
+    def _counts(self) -> tuple[int, int]:
+        with Session(self.engine) as session:
+            return len(session.exec(select(Lead.id)).all()), len(session.exec(select(EmailLog.id)).all())
+
+    def test_batch_is_one_transaction_with_multi_row_inserts(self):
+        submissions = [self._submission(idx) for idx in range(20)]
+        with count_queries(self.engine) as statements:
+            self.assertEqual(write_batch(self.engine, submissions), 20)
+        inserts = [sql for sql in statements if sql.lstrip().upper().startswith("INSERT")]
+        self.assertEqual(len(inserts), 4)  # leads, welcome emails, sequence emails, funnel rollups
+        self.assertEqual(self._counts(), (20, 60))  # welcome + two sequence steps each
+        self.assertEqual(write_batch(self.engine, submissions), 0)  # replays are idempotent
+
+    def test_writer_group_commits_queued_submissions(self):
+        ingestor = LeadIngestor(self.engine, flush_ms=20, max_batch=100).start()
+        ids = [ingestor.submit(self._submission(idx)) for idx in range(50)]
+        ingestor.close()
+        self.assertEqual(ingestor.pending, 0)
+        with Session(self.engine) as session:
+            stored = set(session.exec(select(Lead.id)).all())
+        self.assertEqual(stored, set(ids))
+
+    def test_orphaned_spools_are_adopted_and_live_ones_left_alone(self):
+        # Another running worker's spool: locked, so never replayed or truncated.
+        live = LeadIngestor(self.engine, flush_ms=1000, spool_path=self.spool).start()
+        live.submit(self._submission(3))
+        committed = self._submission(0)
+        write_batch(self.engine, [committed])
+        lost = self._submission(1)
+        orphan = f"{self.spool}.99999-dead"
+        with open(orphan, "w", encoding="utf-8") as spool:
+            spool.write(committed.to_json() + "\n")
+            spool.write(lost.to_json() + "\n")
+            spool.write("{not json\n")
+
+        ingestor = LeadIngestor(self.engine, spool_path=self.spool).start()
+        ingestor.submit(self._submission(2))
+        ingestor.close()
+        self.assertEqual(self._counts(), (3, 9))  # leads 0, 1 and 2
+        self.assertFalse(os.path.exists(orphan))
+        [live_spool] = glob.glob(self.spool + ".*")
+        self.assertIn("lead3@example.com", open(live_spool, encoding="utf-8").read())
+
+        live.close()
+        self.assertEqual(self._counts()[0], 4)
+        self.assertEqual(glob.glob(self.spool + "*"), [])
+
+    def test_repeat_submission_gets_the_queued_id(self):
+        ingestor = LeadIngestor(self.engine, flush_ms=300).start()
+        payload = LeadCreate(campaign_id=self.campaign_id, landing_page_id="lp", email="a@example.com")
+        first = ingestor.submit(Submission.from_lead(payload))
+        again = Submission.from_lead(payload.model_copy(update={"email": "A@example.com"}))
+        self.assertEqual(ingestor.queued_id(again), first)
+        self.assertEqual(ingestor.submit(again), first)
+        ingestor.close()
+        self.assertEqual(ingestor.pending, 0)
+        self.assertIsNone(ingestor.queued_id(again))
+        with Session(self.engine) as session:
+            self.assertEqual(session.exec(select(Lead.id)).all(), [first])
+
+    def test_round_trips_through_spool_format(self):
+        submission = Submission("id-1", "a@example.com", datetime(2026, 10, 19, 9, 30), name="Ada")
+        self.assertEqual(Submission.from_json(submission.to_json()), submission)
+
+
+class QueuedRouteTests(unittest.TestCase):
+    def setUp(self):
+        invalidate_landings()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.engine, async_engine = sqlite_file_engines(os.path.join(self.tmp.name, "queued.db"))
+        with Session(self.engine) as session:
+            campaign = Campaign(name="Launch", icp_role="CTO", icp_industry="SaaS")
+            session.add(campaign)
+            session.flush()
+            magnet = LeadMagnet(
+                campaign_id=campaign.id,
+                title="Checklist",
+                type="checklist",
+                pain_point_alignment="",
+                value_promise="",
+                conversion_score=1.0,
+                format_recommendation="pdf",
+            )
+            session.add(magnet)
+            session.flush()
+            session.add(LandingPage(lead_magnet_id=magnet.id, slug="acme", headline="H", subheadline="", cta="Go", html_content=""))
+            session.commit()
+        self.ingestor = LeadIngestor(self.engine).start()
+        patcher = mock.patch.object(public, "get_ingestor", return_value=self.ingestor)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        app = FastAPI()
+        app.include_router(public.router, prefix="/public")
+        app.dependency_overrides[get_async_session] = async_session_override(async_engine)
+        self.client = TestClient(app)
+
+    def tearDown(self):
+        self.ingestor.close()
+        self.engine.dispose()
+        self.tmp.cleanup()
+        invalidate_landings()
+
+    def test_repeat_of_a_stored_lead_returns_its_id(self):
+        first = self.client.post("/public/lp/acme/submit", json={"email": "a@example.com"}).json()["data"]["lead_id"]
+        self.ingestor.close()  # committed; nothing left in the queue to match against
+        again = self.client.post("/public/lp/acme/submit", json={"email": "A@example.com"}).json()["data"]["lead_id"]
+        self.assertEqual(again, first)
+        with Session(self.engine) as session:
+            self.assertEqual(session.exec(select(Lead.id)).all(), [first])
+
+
+if __name__ == "__main__":
+    unittest.main()
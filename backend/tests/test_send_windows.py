@@ -0,0 +1,115 @@
+import unittest
+from datetime import datetime, timedelta
+from unittest import mock
+
+from support import memory_engine
+
+from sqlmodel import Session
+
+from app.core.metrics import metrics
+from app.core.send_windows import align, parse_send_window
+from app.models.db import Campaign, EmailLog, Lead, NurtureSequence, NurtureStep
+from app.models.schemas import CampaignUpdate, Settings
+from app.services import email_service
+from app.services.email_service import SendContext, deliver_batch, enqueue_sequence_for_lead
+from app.services.email_throttle import reset_throttles
+from app.services.sequence_plans import invalidate_plans
+
+
+class SendWindowTests(unittest.TestCase):
+    def test_aligns_up_to_bucket_boundary(self):
+        window = parse_send_window("15m")
+        self.assertEqual(align(datetime(2026, 10, 19, 10, 7, 30), window), datetime(2026, 10, 19, 10, 15))
+        self.assertEqual(align(datetime(2026, 10, 19, 10, 15), window), datetime(2026, 10, 19, 10, 15))
+        self.assertEqual(align(datetime(2026, 10, 19, 23, 59), window), datetime(2026, 10, 20, 0, 0))
+
+    def test_business_hours_skip_nights_and_weekends(self):
+        window = parse_send_window("business_hours")
+        # Monday 2026-10-19
+        self.assertEqual(align(datetime(2026, 10, 19, 6, 10), window), datetime(2026, 10, 19, 9, 0))
+        self.assertEqual(align(datetime(2026, 10, 19, 16, 50), window), datetime(2026, 10, 20, 9, 0))
+        self.assertEqual(align(datetime(2026, 10, 23, 18, 0), window), datetime(2026, 10, 26, 9, 0))
+        self.assertEqual(align(datetime(2026, 10, 24, 12, 0), window), datetime(2026, 10, 26, 9, 0))
+
+    def test_no_window_keeps_exact_time(self):
+        when = datetime(2026, 10, 19, 10, 7, 31, 123)
+        self.assertIsNone(parse_send_window(None))
+        self.assertEqual(align(when, parse_send_window("")), when)
+
+    def test_invalid_specs_are_rejected(self):
+        for spec in ("weekly", "0m", "25h", "1h@17-09", "15m@09-25"):
+            with self.assertRaises(ValueError):
+                parse_send_window(spec)
+        with self.assertRaises(ValueError):
+            CampaignUpdate(send_window="sometimes")
+
+
+class EnqueueAlignmentTests(unittest.TestCase):
+    def setUp(self):
+        invalidate_plans()
+        self.engine = memory_engine()
+        with Session(self.engine) as session:
+            campaign = Campaign(name="Launch", icp_role="CTO", icp_industry="SaaS", send_window="15m")
+            session.add(campaign)
+            session.flush()
+            seq = NurtureSequence(campaign_id=campaign.id)
+            session.add(seq)
+            session.flush()
+            session.add(NurtureStep(sequence_id=seq.id, order=1, subject="Welcome", body="b", offset_days=0))
+            session.add(NurtureStep(sequence_id=seq.id, order=2, subject="Follow up", body="b", offset_days=2))
+            session.commit()
+            self.campaign_id = campaign.id
+
+    def tearDown(self):
+        invalidate_plans()
+
+    def test_leads_share_bucketed_send_times(self):
+        with Session(self.engine) as session:
+            logs = []
+            for idx in range(3):
+                lead = Lead(email=f"{idx}@example.com", campaign_id=self.campaign_id)
+                session.add(lead)
+                session.commit()
+                logs.extend(enqueue_sequence_for_lead(session, lead))
+
+        welcome = {log.scheduled_at for log in logs if log.subject == "Welcome"}
+        self.assertLessEqual(len(welcome), 2)  # unless the run straddles a boundary
+        for log in logs:
+            self.assertEqual((log.scheduled_at.minute % 15, log.scheduled_at.second, log.scheduled_at.microsecond), (0, 0, 0))
+            self.assertEqual(log.next_attempt_at, log.scheduled_at)
+
+
+class BulkDeliveryTests(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        reset_throttles()
+        metrics.reset()
+
+    def tearDown(self):
+        reset_throttles()
+
+    async def test_logs_sharing_a_template_go_out_in_one_request(self):
+        settings = Settings(llm_provider="openai", email_provider="sendgrid", email_api_key="k" * 40)
+        leads = [Lead(id=f"lead-{idx}", email=f"{idx}@example.com", name=f"Lead {idx}") for idx in range(6)]
+        logs = [
+            EmailLog(id=f"log-{idx}", lead_id=lead.id, subject=f"Step {idx % 2}", body="Hi {{name}}", status="queued")
+            for idx, lead in enumerate(leads)
+        ]
+        logs.append(EmailLog(id="orphan", lead_id="missing", subject="Step 0", body="Hi {{name}}", status="queued"))
+        ctx = SendContext(settings=settings, leads={lead.id: lead for lead in leads})
+        bulk = mock.AsyncMock(return_value=(True, "bulk-1", None))
+
+        with mock.patch.object(email_service, "_send_sendgrid_bulk", bulk):
+            results = await deliver_batch(ctx, logs)
+
+        self.assertEqual(bulk.await_count, 2)
+        _, body, recipients = bulk.await_args_list[0].args
+        self.assertTrue(body.startswith("Hi {{name}}"))
+        self.assertEqual([r.email for r in recipients], ["0@example.com", "2@example.com", "4@example.com"])
+        self.assertEqual(recipients[1].substitutions["{{name}}"], "Lead 2")
+        self.assertTrue(all(result.success for result in results[:6]))
+        self.assertEqual(results[6].error_class, "lead_not_found")
+        self.assertEqual(metrics.snapshot()["counters"]["email_provider_requests_total{provider=sendgrid}"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+import unittest
+
+from support import count_queries, memory_engine
+
+from sqlmodel import Session, select
+
+from app.models.db import EmailLog, Lead, NurtureSequence, NurtureStep
+from app.models.schemas import NurtureStepCreate
+from app.services import nurture_steps
+from app.services.email_service import enqueue_sequence_for_lead
+from app.services.sequence_plans import invalidate_plans
+
+
+class EnqueueSequenceTests(unittest.TestCase):
+    def setUp(self):
+        invalidate_plans()
+        self.engine = memory_engine()
+        with Session(self.engine) as session:
+            seq = NurtureSequence(campaign_id="campaign-1", lead_magnet_id="magnet-1")
+            session.add(seq)
+            session.flush()
+            for order, offset in ((2, 3), (1, 0), (3, 7)):
+                session.add(
+                    NurtureStep(sequence_id=seq.id, order=order, subject=f"Step {order}", body="b", offset_days=offset)
+                )
+            session.commit()
+            self.sequence_id = seq.id
+
+    def tearDown(self):
+        invalidate_plans()
+
+    def _lead(self, session, idx):
+        lead = Lead(email=f"{idx}@example.com", lead_magnet_id="magnet-1", campaign_id="campaign-1")
+        session.add(lead)
+        session.commit()
+        return lead
+
+    def test_warm_cache_enqueue_is_one_insert_plus_rollup(self):
+        with Session(self.engine) as session:
+            enqueue_sequence_for_lead(session, self._lead(session, 0))
+            lead = self._lead(session, 1)
+            session.refresh(lead)
+            with count_queries(self.engine) as statements:
+                logs = enqueue_sequence_for_lead(session, lead)
+
+        self.assertEqual(len(statements), 2)
+        self.assertTrue(statements[0].lstrip().upper().startswith("INSERT INTO EMAIL_LOGS"))
+        self.assertTrue(statements[1].lstrip().upper().startswith("INSERT INTO FUNNEL_ROLLUPS"))
+        self.assertEqual([log.subject for log in logs], ["Step 1", "Step 2", "Step 3"])
+        self.assertTrue(all(log.id for log in logs))
+
+    def test_rows_are_persisted(self):
+        with Session(self.engine) as session:
+            logs = enqueue_sequence_for_lead(session, self._lead(session, 0))
+            stored = session.exec(select(EmailLog)).all()
+        self.assertEqual({log.id for log in stored}, {log.id for log in logs})
+        self.assertTrue(all(log.next_attempt_at == log.scheduled_at for log in stored))
+
+    def test_step_writes_invalidate_plan(self):
+        with Session(self.engine) as session:
+            self.assertEqual(len(enqueue_sequence_for_lead(session, self._lead(session, 0))), 3)
+            nurture_steps.create_step(
+                session,
+                NurtureStepCreate(sequence_id=self.sequence_id, order=4, subject="Step 4", body="b", offset_days=10),
+            )
+            self.assertEqual(len(enqueue_sequence_for_lead(session, self._lead(session, 1))), 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,191 @@
+import base64
+import socketserver
+import threading
+import unittest
+from unittest import mock
+
+from app.core.metrics import metrics
+from app.models.db import EmailLog, Lead
+from app.models.schemas import Settings
+from app.services import email_service
+from app.services.email_service import SendContext, deliver_batch
+from app.services.email_throttle import reset_throttles
+from app.services.smtp_pool import SMTPPool, SMTPSendError
+
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    """Minimal ESMTP server: EHLO/AUTH PLAIN/MAIL/RCPT/DATA/RSET/NOOP/QUIT."""
+
+    def reply(self, line):
+        self.wfile.write(line.encode() + b"\r\n")
+
+    def readline(self):
+        # Read from the socket directly so we can see what arrived in the same packet.
+        while b"\n" not in self.pending:
+            chunk = self.request.recv(65536)
+            if not chunk:
+                return b""
+            self.pending += chunk
+        line, _, self.pending = self.pending.partition(b"\n")
+        return line + b"\n"
+
+    def handle(self):
+        server = self.server
+        self.pending = b""
+        recipients = []
+        with server.lock:
+            server.connections += 1
+        self.reply("220 test ESMTP")
+        while True:
+            line = self.readline()
+            if not line:
+                return
+            # Commands still pending after reading one were sent in the same write.
+            if self.pending and not line.upper().startswith(b"DATA"):
+                server.pipelined_batches += 1
+            command = line.decode().strip()
+            verb = command.split(" ", 1)[0].upper()
+            if verb == "EHLO":
+                extensions = ["AUTH PLAIN"] + (["PIPELINING"] if server.pipelining else [])
+                self.wfile.write(b"250-test\r\n" + b"".join(f"250-{ext}\r\n".encode() for ext in extensions[:-1]))
+                self.reply(f"250 {extensions[-1]}")
+            elif verb == "AUTH":
+                _, user, password = base64.b64decode(command.split()[2]).split(b"\0")
+                server.logins.append((user.decode(), password.decode()))
+                self.reply("235 ok")
+            elif verb == "MAIL":
+                recipients = []
+                self.reply("250 ok")
+            elif verb == "RCPT":
+                address = command.split(":", 1)[1].strip("<> ")
+                if address in server.rejects:
+                    self.reply(server.rejects[address])
+                else:
+                    recipients.append(address)
+                    self.reply("250 ok")
+            elif verb == "DATA":
+                if not recipients:
+                    self.reply("554 no valid recipients")
+                    continue
+                self.reply("354 go ahead")
+                lines = []
+                while True:
+                    data = self.readline()
+                    if data in (b".\r\n", b""):
+                        break
+                    lines.append(data)
+                server.messages.append(b"".join(lines))
+                recipients = []
+                self.reply(f"250 ok queued as q{len(server.messages)}")
+            elif verb == "RSET":
+                recipients = []
+                self.reply("250 ok")
+            elif verb == "NOOP":
+                self.reply("250 ok")
+            elif verb == "QUIT":
+                self.reply("221 bye")
+                return
+            else:
+                self.reply("502 unknown")
+
+
+class _SMTPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, pipelining=True):
+        super().__init__(("127.0.0.1", 0), _SMTPHandler)
+        self.pipelining = pipelining
+        self.lock = threading.Lock()
+        self.connections = 0
+        self.pipelined_batches = 0
+        self.logins = []
+        self.messages = []
+        self.rejects = {}
+
+
+class SMTPPoolTests(unittest.TestCase):
+    def _serve(self, pipelining=True):
+        server = _SMTPServer(pipelining=pipelining)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        pool = SMTPPool("127.0.0.1", server.server_address[1], username="relay", password="secret", size=2, timeout=5)
+        self.addCleanup(pool.close)
+        return server, pool
+
+    def test_connections_are_reused_across_messages(self):
+        server, pool = self._serve()
+        for idx in range(20):
+            pool.send("from@example.com", [f"to{idx}@example.com"], b"Subject: hi\r\n\r\nbody\r\n")
+
+        self.assertEqual(len(server.messages), 20)
+        self.assertEqual(server.connections, 1)
+        self.assertEqual(server.logins, [("relay", "secret")])
+
+    def test_pipelines_envelope_when_supported(self):
+        server, pool = self._serve()
+        reply = pool.send("from@example.com", ["to@example.com"], b"Subject: hi\r\n\r\n.leading dot\r\n")
+
+        self.assertIn("queued as q1", reply)
+        self.assertGreaterEqual(server.pipelined_batches, 1)
+        self.assertIn(b"..leading dot", server.messages[0])
+
+    def test_falls_back_without_pipelining(self):
+        server, pool = self._serve(pipelining=False)
+        pool.send("from@example.com", ["to@example.com"], b"Subject: hi\r\n\r\nbody\r\n")
+        pool.send("from@example.com", ["to@example.com"], b"Subject: hi\r\n\r\nbody\r\n")
+
+        self.assertEqual(len(server.messages), 2)
+        self.assertEqual(server.connections, 1)
+        self.assertEqual(server.pipelined_batches, 0)
+
+    def test_rejections_keep_connection_and_classify(self):
+        server, pool = self._serve()
+        server.rejects = {"gone@example.com": "550 no such user", "busy@example.com": "451 try later"}
+        with self.assertRaises(SMTPSendError) as permanent:
+            pool.send("from@example.com", ["gone@example.com"], b"x\r\n")
+        with self.assertRaises(SMTPSendError) as transient:
+            pool.send("from@example.com", ["busy@example.com"], b"x\r\n")
+        pool.send("from@example.com", ["ok@example.com"], b"x\r\n")
+
+        self.assertFalse(permanent.exception.transient)
+        self.assertTrue(transient.exception.transient)
+        self.assertEqual(len(server.messages), 1)
+        self.assertEqual(server.connections, 1)
+
+
+class SMTPProviderTests(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        reset_throttles()
+        metrics.reset()
+        self.server = _SMTPServer()
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.pool = SMTPPool("127.0.0.1", self.server.server_address[1], size=2, timeout=5)
+
+    def tearDown(self):
+        self.pool.close()
+        self.server.shutdown()
+        self.server.server_close()
+        reset_throttles()
+
+    async def test_batch_shares_pooled_connection(self):
+        settings = Settings(llm_provider="openai", email_provider="smtp", email_from="news@example.com")
+        leads = [Lead(id=f"lead-{idx}", email=f"{idx}@example.com", name=f"Lead {idx}") for idx in range(10)]
+        leads[3].email = "gone@example.com"
+        self.server.rejects = {"gone@example.com": "550 no such user"}
+        logs = [EmailLog(id=f"log-{idx}", lead_id=lead.id, subject="Hi {{name}}", body="b", status="queued") for idx, lead in enumerate(leads)]
+        ctx = SendContext(settings=settings, leads={lead.id: lead for lead in leads})
+
+        with mock.patch.object(email_service, "get_smtp_pool", return_value=self.pool):
+            results = await deliver_batch(ctx, logs)
+
+        self.assertEqual(sum(result.success for result in results), 9)
+        self.assertEqual(results[3].error_class, "rejected")
+        # Sends run concurrently over the pool's connections, never one connection per email.
+        self.assertLessEqual(self.server.connections, 2)
+        self.assertTrue(any(b"Subject: Hi Lead 0" in message for message in self.server.messages))
+
+
+if __name__ == "__main__":
+    unittest.main()
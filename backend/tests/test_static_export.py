@@ -0,0 +1,107 @@
+import gzip
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from support import memory_engine
+
+from sqlmodel import Session
+
+from app.models.db import Campaign, LandingPage, LeadMagnet
+from app.services.landing_render import rerender_all
+from app.services.thank_you import render_thank_you_html
+from app.services.static_export import MANIFEST_NAME, export_static
+
+PAGE = "<html><body><h1>Launch</h1><form><input name='email'/></form></body></html>"
+OFFER = {"core_offer": "Pro plan", "price": "$49"}
+
+
+class StaticExportTests(unittest.TestCase):
+    def setUp(self):
+        self.engine = memory_engine()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        self.ids = {}
+        for slug, status in (("live", "published"), ("draft", "draft")):
+            self._seed(slug, status)
+        rerender_all(self.engine)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _seed(self, slug: str, status: str) -> None:
+        with Session(self.engine) as session:
+            campaign = Campaign(name=slug, status=status, icp_role="CTO", icp_industry="SaaS", upgrade_offer=OFFER)
+            session.add(campaign)
+            session.flush()
+            magnet = LeadMagnet(
+                campaign_id=campaign.id,
+                title="T",
+                type="check_list",
+                pain_point_alignment="",
+                value_promise="",
+                conversion_score=1.0,
+                format_recommendation="pdf",
+            )
+            session.add(magnet)
+            session.flush()
+            landing = LandingPage(lead_magnet_id=magnet.id, slug=slug, headline="Launch", subheadline="", cta="Go", html_content=PAGE)
+            session.add(landing)
+            session.commit()
+            self.ids[slug] = (campaign.id, landing.id)
+
+    def _export(self, **kwargs) -> dict:
+        return export_static(out_dir=str(self.root), engine=self.engine, **kwargs)
+
+    def test_exports_published_pages_with_variants_and_manifest(self):
+        result = self._export()
+        self.assertEqual((result["exported"], result["unchanged"], result["removed"]), (1, 0, 0))
+        with Session(self.engine) as session:
+            stored = session.get(LandingPage, self.ids["live"][1]).rendered_html
+        landing = (self.root / "lp/live/index.html").read_text()
+        self.assertIn("'/public/lp/live/submit'", landing)
+        # The app's page follows the submit response; the exported one goes to the exported thank-you page.
+        self.assertIn("window.location.href = result.redirect_url", stored)
+        self.assertIn('window.location.href = "/lp/live/thank-you/"', landing)
+        self.assertEqual(gzip.decompress((self.root / "lp/live/index.html.gz").read_bytes()).decode(), landing)
+        thank_you = (self.root / "lp/live/thank-you/index.html").read_text()
+        self.assertEqual(thank_you, render_thank_you_html("Launch", "check_list", OFFER))
+        self.assertFalse((self.root / "lp/draft").exists())
+        manifest = json.loads((self.root / MANIFEST_NAME).read_text())
+        self.assertEqual(set(manifest["pages"]), {"live"})
+        self.assertEqual(manifest["pages"]["live"]["landing_id"], self.ids["live"][1])
+
+    def test_reexport_is_incremental(self):
+        self._export()
+        self.assertEqual(self._export()["unchanged"], 1)
+        with Session(self.engine) as session:
+            campaign = session.get(Campaign, self.ids["live"][0])
+            campaign.upgrade_offer = {"core_offer": "Team plan"}
+            session.add(campaign)
+            draft = session.get(Campaign, self.ids["draft"][0])
+            draft.status = "published"
+            session.add(draft)
+            session.commit()
+        result = self._export()
+        self.assertEqual((result["exported"], result["unchanged"]), (2, 0))
+        self.assertIn("Team plan", (self.root / "lp/live/thank-you/index.html").read_text())
+
+        with Session(self.engine) as session:
+            campaign = session.get(Campaign, self.ids["live"][0])
+            campaign.status = "archived"
+            session.add(campaign)
+            session.commit()
+        result = self._export()
+        self.assertEqual((result["exported"], result["unchanged"], result["removed"]), (0, 1, 1))
+        self.assertFalse((self.root / "lp/live").exists())
+
+    def test_api_base_rewrites_submit_url(self):
+        self._export(api_base="https://api.example.com/")
+        self.assertIn("'https://api.example.com/public/lp/live/submit'", (self.root / "lp/live/index.html").read_text())
+        self.assertEqual(self._export(api_base="https://api.example.com")["unchanged"], 1)
+        self.assertEqual(self._export(api_base="")["exported"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+import json
+import unittest
+from unittest import mock
+
+from support import count_queries, memory_engine
+
+from sqlmodel import Session
+
+from app.models.db import Campaign, LandingPage, LeadMagnet
+from app.services import thank_you
+from app.services.thank_you import ThankYouNotFound, thank_you_page
+
+
+class ThankYouPageTests(unittest.TestCase):
+    def setUp(self):
+        thank_you._cache.clear()
+        self.engine = memory_engine()
+        with Session(self.engine) as session:
+            campaign = Campaign(
+                name="C",
+                icp_role="CTO",
+                icp_industry="SaaS",
+                upgrade_offer={"core_offer": "Pro plan", "price": "$49"},
+                product_context={"company_name": "Acme"},
+            )
+            session.add(campaign)
+            session.flush()
+            magnet = LeadMagnet(
+                campaign_id=campaign.id,
+                title="T",
+                type="check_list",
+                pain_point_alignment="",
+                value_promise="",
+                conversion_score=1.0,
+                format_recommendation="pdf",
+            )
+            session.add(magnet)
+            session.flush()
+            landing = LandingPage(lead_magnet_id=magnet.id, slug="acme", headline="Launch", subheadline="", cta="Go", html_content="")
+            session.add(landing)
+            session.commit()
+            self.campaign_id, self.landing_id = campaign.id, landing.id
+
+    def test_one_query_and_rendered_once(self):
+        with Session(self.engine) as session, count_queries(self.engine) as statements:
+            with mock.patch.object(thank_you, "render_thank_you_html", wraps=thank_you.render_thank_you_html) as render:
+                first = thank_you_page(session, self.landing_id)
+                second = thank_you_page(session, self.landing_id)
+        self.assertEqual(len(statements), 2)
+        render.assert_called_once()
+        self.assertIs(first, second)
+        self.assertIn(b"Pro plan", first.html)
+        data = json.loads(first.json)["data"]
+        self.assertEqual((data["coreOffer"], data["companyName"], data["backgroundStyle"]), ("Pro plan", "Acme", "plain_white"))
+
+    def test_cache_is_sized_separately_from_landing_pages(self):
+        settings = thank_you.get_settings()
+        with Session(self.engine) as session, mock.patch.object(settings, "landing_html_cache_size", 0):
+            self.assertIs(thank_you_page(session, self.landing_id), thank_you_page(session, self.landing_id))
+            thank_you._cache.clear()
+            with mock.patch.object(settings, "thank_you_cache_size", 0):
+                self.assertIsNot(thank_you_page(session, self.landing_id), thank_you_page(session, self.landing_id))
+
+    def test_upgrade_offer_change_gives_new_version(self):
+        with Session(self.engine) as session:
+            before = thank_you_page(session, self.landing_id)
+            campaign = session.get(Campaign, self.campaign_id)
+            campaign.upgrade_offer = {"core_offer": "Team plan"}
+            session.add(campaign)
+            session.commit()
+            after = thank_you_page(session, self.landing_id)
+        self.assertNotEqual(before.version, after.version)
+        self.assertIn(b"Team plan", after.html)
+
+    def test_missing_and_dangling_pages(self):
+        with Session(self.engine) as session:
+            self.assertIsNone(thank_you_page(session, "missing"))
+            campaign = session.get(Campaign, self.campaign_id)
+            session.delete(campaign)
+            session.commit()
+            with self.assertRaises(ThankYouNotFound):
+                thank_you_page(session, self.landing_id)
+
+
+if __name__ == "__main__":
+    unittest.main()